@@ -139,14 +139,18 @@ def create_app():
     
     # Register Convonet Todo blueprint (main routes including LLM provider API)
     try:
-        from convonet.routes import convonet_todo_bp, preload_mcp_tools_sync
+        from convonet.routes import convonet_todo_bp, preload_mcp_tools_sync, prebuild_agent_graphs_sync
         app.register_blueprint(convonet_todo_bp)
         print(f"✅ Convonet Todo blueprint registered at {convonet_todo_bp.url_prefix}")
         
         # Pre-load MCP tools at startup (for Gemini compatibility)
         # This caches tools so they're available without blocking requests
         print("🔧 Pre-loading MCP tools at startup...")
-        preload_mcp_tools_sync()
+        # App context lets the in-process tool backend share the app's DB connection pool
+        with app.app_context():
+            preload_mcp_tools_sync()
+            # Build a graph per available LLM provider so provider switches never build on the request path
+            prebuild_agent_graphs_sync()
     except ImportError as e:
         print(f"⚠️  Convonet Todo routes not available: {e}")
         import traceback
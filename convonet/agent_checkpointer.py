@@ -0,0 +1,402 @@
+"""
+Agent Checkpointer
+Bounded, persistent LangGraph checkpoint storage (Redis, Postgres or in-memory)
+so conversation state expires, survives restarts and is shared across workers
+"""
+
+import os
+import json
+import time
+import base64
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterator, AsyncIterator, Sequence, Tuple
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    WRITES_IDX_MAP,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.memory import InMemorySaver
+
+logger = logging.getLogger(__name__)
+
+try:
+    from langgraph.checkpoint.base import get_checkpoint_metadata
+except ImportError:  # older langgraph-checkpoint
+    def get_checkpoint_metadata(config, metadata):
+        return metadata
+
+# Optional backends
+try:
+    from convonet.redis_manager import redis_manager
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_manager = None
+    REDIS_AVAILABLE = False
+
+try:
+    from psycopg.rows import dict_row
+    from psycopg_pool import ConnectionPool
+    from langgraph.checkpoint.postgres import PostgresSaver
+    POSTGRES_CHECKPOINT_AVAILABLE = True
+except ImportError:
+    PostgresSaver = object
+    POSTGRES_CHECKPOINT_AVAILABLE = False
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+CHECKPOINT_TTL = _env_int('AGENT_CHECKPOINT_TTL', 24 * 3600)  # idle seconds before a thread expires
+CHECKPOINTS_PER_THREAD = _env_int('AGENT_CHECKPOINTS_PER_THREAD', 10)
+MEMORY_MAX_THREADS = _env_int('AGENT_MEMORY_MAX_THREADS', 500)
+
+
+def _thread_config(config) -> Tuple[str, str]:
+    configurable = config["configurable"]
+    return str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")
+
+
+class RedisCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer on the app's Redis connection.
+
+    Only the newest ``max_checkpoints`` checkpoints of a thread are kept and
+    every key expires ``ttl`` seconds after the thread was last written. Uses
+    the synchronous binary client for both the sync and async API: a checkpoint
+    read/write is a single sub-millisecond round trip, and a sync client is not
+    tied to whichever event loop happens to run the graph.
+
+    Layout (``prefix`` = "checkpoint"):
+        {prefix}:idx:{thread}:{ns}          sorted set of checkpoint ids (score = write time)
+        {prefix}:cp:{thread}:{ns}:{id}      hash: checkpoint, metadata, parent id
+        {prefix}:writes:{thread}:{ns}:{id}  hash: pending writes by "task_id|idx"
+        {prefix}:ns:{thread}                set of checkpoint namespaces (for delete_thread)
+    """
+
+    def __init__(self, ttl: int = CHECKPOINT_TTL, max_checkpoints: int = CHECKPOINTS_PER_THREAD, prefix: str = "checkpoint", serde=None):
+        super().__init__(serde=serde)
+        self.ttl = ttl
+        self.max_checkpoints = max(1, max_checkpoints)
+        self.prefix = prefix
+
+    def _client(self):
+        return redis_manager.get_binary_client()
+
+    def _idx_key(self, thread_id: str, ns: str) -> str:
+        return f"{self.prefix}:idx:{thread_id}:{ns}"
+
+    def _cp_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:cp:{thread_id}:{ns}:{checkpoint_id}"
+
+    def _writes_key(self, thread_id: str, ns: str, checkpoint_id: str) -> str:
+        return f"{self.prefix}:writes:{thread_id}:{ns}:{checkpoint_id}"
+
+    def _ns_key(self, thread_id: str) -> str:
+        return f"{self.prefix}:ns:{thread_id}"
+
+    # -- sync API ----------------------------------------------------------------
+
+    def get_tuple(self, config) -> Optional[CheckpointTuple]:
+        thread_id, ns = _thread_config(config)
+        client = self._client()
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            candidates = [checkpoint_id]
+        else:
+            candidates = [m.decode() for m in client.zrevrange(self._idx_key(thread_id, ns), 0, self.max_checkpoints - 1)]
+
+        for candidate in candidates:
+            saved = client.hgetall(self._cp_key(thread_id, ns, candidate))
+            if saved:
+                return self._load_tuple(client, thread_id, ns, candidate, saved)
+        return None
+
+    def list(self, config, *, filter: Optional[Dict[str, Any]] = None, before=None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        client = self._client()
+        if config is not None:
+            threads = [_thread_config(config)]
+        else:
+            threads = []
+            for key in client.scan_iter(match=f"{self.prefix}:idx:*"):
+                thread_id, _, ns = key.decode()[len(self.prefix) + 5:].partition(":")
+                threads.append((thread_id, ns))
+
+        before_id = get_checkpoint_id(before) if before else None
+        wanted_id = get_checkpoint_id(config) if config else None
+        for thread_id, ns in threads:
+            for member in client.zrevrange(self._idx_key(thread_id, ns), 0, -1):
+                checkpoint_id = member.decode()
+                if wanted_id and checkpoint_id != wanted_id:
+                    continue
+                if before_id and checkpoint_id >= before_id:
+                    continue
+                saved = client.hgetall(self._cp_key(thread_id, ns, checkpoint_id))
+                if not saved:
+                    continue
+                checkpoint_tuple = self._load_tuple(client, thread_id, ns, checkpoint_id, saved)
+                if filter and not all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items()):
+                    continue
+                yield checkpoint_tuple
+                if limit is not None:
+                    limit -= 1
+                    if limit <= 0:
+                        return
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id, ns = _thread_config(config)
+        checkpoint_id = checkpoint["id"]
+        checkpoint_type, checkpoint_bytes = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_bytes = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        client = self._client()
+        idx_key = self._idx_key(thread_id, ns)
+        cp_key = self._cp_key(thread_id, ns, checkpoint_id)
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(cp_key, mapping={
+            "checkpoint_type": checkpoint_type,
+            "checkpoint": checkpoint_bytes,
+            "metadata_type": metadata_type,
+            "metadata": metadata_bytes,
+            "parent_id": config["configurable"].get("checkpoint_id") or "",
+        })
+        pipe.zadd(idx_key, {checkpoint_id: time.time()})
+        pipe.sadd(self._ns_key(thread_id), ns)
+        for key in (cp_key, idx_key, self._ns_key(thread_id)):
+            pipe.expire(key, self.ttl)
+        pipe.zrange(idx_key, 0, -(self.max_checkpoints + 1))
+        stale = pipe.execute()[-1]
+
+        if stale:
+            stale_ids = [m.decode() for m in stale]
+            pipe = client.pipeline(transaction=False)
+            for stale_id in stale_ids:
+                pipe.delete(self._cp_key(thread_id, ns, stale_id), self._writes_key(thread_id, ns, stale_id))
+            pipe.zrem(idx_key, *stale_ids)
+            pipe.execute()
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}}
+
+    def put_writes(self, config, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        thread_id, ns = _thread_config(config)
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        writes_key = self._writes_key(thread_id, ns, checkpoint_id)
+        client = self._client()
+
+        pipe = client.pipeline(transaction=False)
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            value_type, value_bytes = self.serde.dumps_typed(value)
+            field = f"{task_id}|{write_idx}"
+            payload = json.dumps([task_id, channel, value_type, base64.b64encode(value_bytes).decode(), task_path])
+            if write_idx >= 0:
+                pipe.hsetnx(writes_key, field, payload)  # regular writes are never overwritten
+            else:
+                pipe.hset(writes_key, field, payload)
+        pipe.expire(writes_key, self.ttl)
+        pipe.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        client = self._client()
+        thread_id = str(thread_id)
+        namespaces = [m.decode() for m in client.smembers(self._ns_key(thread_id))] or [""]
+        for ns in namespaces:
+            idx_key = self._idx_key(thread_id, ns)
+            ids = [m.decode() for m in client.zrange(idx_key, 0, -1)]
+            keys = [idx_key]
+            for checkpoint_id in ids:
+                keys += [self._cp_key(thread_id, ns, checkpoint_id), self._writes_key(thread_id, ns, checkpoint_id)]
+            client.delete(*keys)
+        client.delete(self._ns_key(thread_id))
+
+    def _load_tuple(self, client, thread_id: str, ns: str, checkpoint_id: str, saved: Dict[bytes, bytes]) -> CheckpointTuple:
+        checkpoint = self.serde.loads_typed((saved[b"checkpoint_type"].decode(), saved[b"checkpoint"]))
+        metadata = self.serde.loads_typed((saved[b"metadata_type"].decode(), saved[b"metadata"]))
+        parent_id = saved.get(b"parent_id", b"").decode()
+
+        pending_writes = []
+        raw_writes = client.hgetall(self._writes_key(thread_id, ns, checkpoint_id))
+        for field in sorted(raw_writes, key=lambda f: (f.decode().rpartition("|")[0], int(f.decode().rpartition("|")[2]))):
+            task_id, channel, value_type, value_b64, _ = json.loads(raw_writes[field])
+            pending_writes.append((task_id, channel, self.serde.loads_typed((value_type, base64.b64decode(value_b64)))))
+
+        return CheckpointTuple(
+            config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}},
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config={"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": parent_id}} if parent_id else None,
+            pending_writes=pending_writes,
+        )
+
+    # -- async API (same Redis calls, see class docstring) -----------------------
+
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None) -> AsyncIterator[CheckpointTuple]:
+        for checkpoint_tuple in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id: str, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+
+class ThreadedPostgresSaver(PostgresSaver):
+    """
+    PostgresSaver on a psycopg connection pool, with the async API run in
+    worker threads (the sync pool is not tied to an event loop). Threads whose
+    newest checkpoint is older than ``ttl`` are pruned, at most once a minute.
+    """
+
+    def __init__(self, pool, ttl: int = CHECKPOINT_TTL):
+        super().__init__(pool)
+        self.ttl = ttl
+        self._last_prune = 0.0
+
+    def prune_expired(self) -> int:
+        """Delete threads idle for longer than the TTL; returns how many were removed"""
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                SELECT thread_id FROM checkpoints
+                GROUP BY thread_id
+                HAVING max((checkpoint->>'ts')::timestamptz) < now() - make_interval(secs => %s)
+                """,
+                (self.ttl,),
+            )
+            expired = [row["thread_id"] for row in cur.fetchall()]
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        if expired:
+            logger.info(f"🧹 Pruned {len(expired)} expired conversation thread(s) from Postgres")
+        return len(expired)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved_config = super().put(config, checkpoint, metadata, new_versions)
+        if time.time() - self._last_prune > 60:
+            self._last_prune = time.time()
+            try:
+                self.prune_expired()
+            except Exception as e:
+                logger.warning(f"⚠️ Checkpoint prune failed: {e}")
+        return saved_config
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id: str, task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-process fallback: InMemorySaver that evicts the least recently written
+    threads beyond ``max_threads`` and threads idle for longer than ``ttl``.
+    """
+
+    def __init__(self, max_threads: int = MEMORY_MAX_THREADS, ttl: int = CHECKPOINT_TTL, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._last_write: "OrderedDict[str, float]" = OrderedDict()
+        self._evict_lock = threading.Lock()
+
+    def _drop_thread(self, thread_id: str):
+        if hasattr(InMemorySaver, "delete_thread"):
+            super().delete_thread(thread_id)
+            return
+        self.storage.pop(thread_id, None)
+        for key in [k for k in self.writes if k[0] == thread_id]:
+            self.writes.pop(key, None)
+        for key in [k for k in getattr(self, "blobs", {}) if k[0] == thread_id]:
+            self.blobs.pop(key, None)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        now = time.time()
+        with self._evict_lock:
+            self._last_write[thread_id] = now
+            self._last_write.move_to_end(thread_id)
+            while self._last_write:
+                oldest_id, last = next(iter(self._last_write.items()))
+                if len(self._last_write) <= self.max_threads and now - last <= self.ttl:
+                    break
+                self._last_write.popitem(last=False)
+                self._drop_thread(oldest_id)
+        return saved_config
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+
+def _create_checkpointer() -> BaseCheckpointSaver:
+    backend = os.getenv('AGENT_CHECKPOINTER', 'redis').lower()
+
+    if backend == 'redis':
+        if REDIS_AVAILABLE and redis_manager is not None and redis_manager.is_available():
+            logger.info(f"✅ Agent checkpointer: Redis (ttl={CHECKPOINT_TTL}s, {CHECKPOINTS_PER_THREAD} checkpoints/thread)")
+            return RedisCheckpointSaver()
+        logger.warning("⚠️ Redis not available for agent checkpoints, using in-memory checkpointer")
+
+    elif backend == 'postgres':
+        db_uri = os.getenv('AGENT_CHECKPOINT_DB_URI') or os.getenv('DB_URI')
+        if POSTGRES_CHECKPOINT_AVAILABLE and db_uri:
+            try:
+                pool = ConnectionPool(
+                    conninfo=db_uri,
+                    max_size=_env_int('AGENT_CHECKPOINT_POOL_SIZE', 5),
+                    kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+                    open=True,
+                )
+                saver = ThreadedPostgresSaver(pool)
+                saver.setup()
+                logger.info(f"✅ Agent checkpointer: Postgres (ttl={CHECKPOINT_TTL}s)")
+                return saver
+            except Exception as e:
+                logger.error(f"❌ Postgres checkpointer failed, using in-memory checkpointer: {e}")
+        else:
+            logger.warning("⚠️ Postgres checkpointer needs langgraph-checkpoint-postgres, psycopg and a DB URI; using in-memory checkpointer")
+
+    logger.info(f"ℹ️ Agent checkpointer: in-memory (max {MEMORY_MAX_THREADS} threads, ttl={CHECKPOINT_TTL}s)")
+    return BoundedMemorySaver()
+
+
+# Global checkpointer instance (shared by every compiled graph in the process)
+_checkpointer = None
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Get the global agent checkpointer (backend chosen by AGENT_CHECKPOINTER: redis, postgres or memory)"""
+    global _checkpointer
+    if _checkpointer is None:
+        with _checkpointer_lock:
+            if _checkpointer is None:
+                _checkpointer = _create_checkpointer()
+    return _checkpointer
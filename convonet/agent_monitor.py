@@ -31,6 +31,7 @@ class ToolCallInfo:
     result: Optional[Any] = None
     error: Optional[str] = None
     duration_ms: Optional[float] = None
+    queued_ms: float = 0.0  # Wait for a tool concurrency slot before the call started
     status: str = "pending"  # success, failed, timeout
 
 
@@ -240,6 +241,53 @@ class AgentMonitor:
                 "avg_tool_calls_per_interaction": 0
             }
 
+    
+    def track_turn_timing(self, timing: Dict[str, Any]) -> bool:
+        """Store the per-stage timing breakdown of a voice turn"""
+        try:
+            key = "voice_turn_timings:recent"
+            self.redis.redis_client.lpush(key, json.dumps(timing))
+            self.redis.redis_client.ltrim(key, 0, self.max_interactions - 1)
+            self.redis.redis_client.expire(key, 86400 * 7)  # 7 days
+            return True
+        except Exception as e:
+            print(f"❌ Error tracking turn timing: {e}")
+            return False
+    
+    def get_recent_turn_timings(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get recent voice turn timing breakdowns (newest first)"""
+        try:
+            raw = self.redis.redis_client.lrange("voice_turn_timings:recent", 0, limit - 1)
+            return [json.loads(item.decode('utf-8') if isinstance(item, bytes) else item) for item in raw]
+        except Exception as e:
+            print(f"❌ Error getting turn timings: {e}")
+            return []
+    
+    def get_turn_latency_stats(self, limit: int = 500) -> Dict[str, Any]:
+        """p50/p95 of total turn latency and of each stage and mark over recent turns"""
+        def percentiles(values: List[float]) -> Dict[str, Any]:
+            values = sorted(values)
+            if not values:
+                return {"count": 0, "p50_ms": None, "p95_ms": None, "max_ms": None}
+            pick = lambda q: values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+            return {"count": len(values), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": values[-1]}
+        
+        timings = self.get_recent_turn_timings(limit=limit)
+        stage_durations: Dict[str, List[float]] = {}
+        mark_offsets: Dict[str, List[float]] = {}
+        for timing in timings:
+            for name, stage in (timing.get("stages") or {}).items():
+                stage_durations.setdefault(name, []).append(stage.get("duration_ms", 0))
+            for name, offset in (timing.get("marks") or {}).items():
+                mark_offsets.setdefault(name, []).append(offset)
+        
+        return {
+            "turns": len(timings),
+            "total": percentiles([t["total_ms"] for t in timings if t.get("total_ms") is not None]),
+            "stages": {name: percentiles(values) for name, values in stage_durations.items()},
+            "marks": {name: percentiles(values) for name, values in mark_offsets.items()},
+        }
+
 
 # Global instance
 _agent_monitor = None
@@ -89,3 +89,21 @@ def get_stats():
             "error": str(e)
         }), 500
 
+
+@agent_monitor_bp.route('/api/turn-latency')
+def get_turn_latency():
+    """Get per-stage voice turn latency percentiles and recent turn breakdowns"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        monitor = get_agent_monitor()
+        
+        return jsonify({
+            "success": True,
+            "stats": monitor.get_turn_latency_stats(),
+            "recent": monitor.get_recent_turn_timings(limit=limit)
+        })
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
@@ -0,0 +1,261 @@
+"""
+Agent Runtime
+Long-lived background event loops that Flask/Socket.IO handlers submit agent
+coroutines to, with bounded concurrency, backpressure and per-request cancellation
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Optional, Dict, Any, List, Coroutine
+
+from convonet.loop_thread import LoopThread, real_lock, wait_future
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class AgentRuntimeBusy(RuntimeError):
+    """Raised when the runtime already holds its maximum number of pending requests"""
+
+
+class AgentJob:
+    """Handle for a coroutine submitted to the agent runtime"""
+
+    def __init__(self, request_id: str, key: Optional[str], loop_index: int):
+        self.request_id = request_id
+        self.key = key
+        self.loop_index = loop_index
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.future: Optional[concurrent.futures.Future] = None
+
+    def result(self, timeout: Optional[float] = None):
+        """Block until the coroutine finishes; raises asyncio.TimeoutError (and cancels it) on timeout"""
+        try:
+            return wait_future(self.future, timeout)
+        except concurrent.futures.TimeoutError:
+            self.cancel()
+            raise asyncio.TimeoutError(f"Agent request {self.request_id} did not finish within {timeout}s")
+
+    def cancel(self) -> bool:
+        """Cancel the request; the coroutine receives CancelledError at its next await"""
+        return self.future.cancel() if self.future is not None else False
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+
+class _RuntimeLoop(LoopThread):
+    """One event loop thread with its own concurrency semaphore"""
+
+    def __init__(self, index: int, max_concurrency: int):
+        super().__init__(f"agent-runtime-{index}")
+        self.index = index
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+
+
+class AgentRuntime:
+    """
+    Persistent event loops for agent execution.
+
+    Every turn used to spin up (and tear down) its own event loop, so the LLM
+    SDKs' async HTTP clients and MCP sessions never reused a connection. Here the
+    loops live for the whole process: handlers on any thread call ``submit`` (or
+    the blocking ``run``) and get a job they can wait on or cancel.
+
+    Concurrency is capped per loop by a semaphore; requests beyond the cap wait
+    their turn on the loop, and once ``max_pending`` requests are queued or
+    running further submissions are rejected with AgentRuntimeBusy.
+
+    The loops run on real OS threads even under eventlet monkey patching, and
+    waiting on a job from a green thread yields to the hub (see loop_thread).
+    """
+
+    def __init__(
+        self,
+        loops: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+    ):
+        self.num_loops = max(1, loops or _env_int('AGENT_RUNTIME_LOOPS', 1))
+        self.max_concurrency = max(self.num_loops, max_concurrency or _env_int('AGENT_RUNTIME_MAX_CONCURRENCY', 8))
+        self.max_pending = max(self.max_concurrency, max_pending or _env_int('AGENT_RUNTIME_MAX_PENDING', 32))
+
+        per_loop = max(1, self.max_concurrency // self.num_loops)
+        self._loops = [_RuntimeLoop(i, per_loop) for i in range(self.num_loops)]
+        self._jobs: Dict[str, AgentJob] = {}
+        self._lock = real_lock()  # Also taken by _finish on the loop threads
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.started = 0
+        self.total_run_ms = 0.0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+        logger.info(f"✅ Agent runtime started: {self.num_loops} loop(s), max {self.max_concurrency} concurrent, "
+                    f"max {self.max_pending} pending")
+
+    @property
+    def io_loop(self) -> LoopThread:
+        """Runtime loop for short I/O calls (e.g. pooled HTTP requests) made outside the agent concurrency cap"""
+        return self._loops[0]
+
+    def submit(
+        self,
+        coro: Coroutine,
+        timeout: Optional[float] = None,
+        key: Optional[str] = None,
+        request_id: Optional[str] = None,
+    ) -> AgentJob:
+        """
+        Schedule a coroutine on the runtime
+
+        Args:
+            coro: Coroutine to run (closed without running if rejected or cancelled while queued)
+            timeout: Seconds the coroutine may run once started (None = no limit)
+            key: Grouping key (e.g. a voice session id) for cancel_key
+            request_id: Optional id for cancel(); generated if omitted
+
+        Returns:
+            AgentJob for waiting on or cancelling the request
+
+        Raises:
+            AgentRuntimeBusy: max_pending requests are already queued or running
+        """
+        with self._lock:
+            if len(self._jobs) >= self.max_pending:
+                self.rejected += 1
+                coro.close()
+                raise AgentRuntimeBusy(f"Agent runtime is at capacity ({self.max_pending} pending requests)")
+            runtime_loop = min(self._loops, key=lambda l: l.in_flight)
+            runtime_loop.in_flight += 1
+            job = AgentJob(request_id or str(uuid.uuid4()), key, runtime_loop.index)
+            self._jobs[job.request_id] = job
+            self.submitted += 1
+
+        job.future = runtime_loop.submit(self._run(job, runtime_loop, coro, timeout))
+        job.future.add_done_callback(lambda future: self._finish(job, runtime_loop, future))
+        return job
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None, key: Optional[str] = None):
+        """
+        Submit a coroutine and block the calling thread until it finishes
+
+        The timeout covers queueing as well as execution; on expiry the request
+        is cancelled and asyncio.TimeoutError is raised.
+        """
+        job = self.submit(coro, timeout=timeout, key=key)
+        return job.result(timeout=timeout)
+
+    async def _run(self, job: AgentJob, runtime_loop: _RuntimeLoop, coro: Coroutine, timeout: Optional[float]):
+        started = False
+        try:
+            async with runtime_loop.semaphore:
+                started = True
+                job.started_at = time.time()
+                if timeout is not None:
+                    return await asyncio.wait_for(coro, timeout=timeout)
+                return await coro
+        finally:
+            if not started:
+                # Cancelled while waiting for a slot - the coroutine never ran
+                coro.close()
+
+    def _finish(self, job: AgentJob, runtime_loop: _RuntimeLoop, future: concurrent.futures.Future):
+        now = time.time()
+        with self._lock:
+            self._jobs.pop(job.request_id, None)
+            runtime_loop.in_flight -= 1
+            if job.started_at is not None:
+                self.started += 1
+                wait_ms = (job.started_at - job.submitted_at) * 1000
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+                self.total_run_ms += (now - job.started_at) * 1000
+
+            if future.cancelled():
+                self.cancelled += 1
+            elif isinstance(future.exception(), asyncio.TimeoutError):
+                self.timed_out += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def cancel(self, request_id: str) -> bool:
+        """Cancel a queued or running request by id"""
+        with self._lock:
+            job = self._jobs.get(request_id)
+        return job.cancel() if job is not None else False
+
+    def cancel_key(self, key: str) -> int:
+        """Cancel every queued or running request submitted with this key"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.key == key]
+        cancelled = sum(1 for job in jobs if job.cancel())
+        if cancelled:
+            logger.info(f"🛑 Cancelled {cancelled} agent request(s) for {key}")
+        return cancelled
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.started_at is not None)
+            return {
+                "loops": self.num_loops,
+                "max_concurrency": self.max_concurrency,
+                "max_pending": self.max_pending,
+                "pending": len(self._jobs),
+                "running": running,
+                "queued": len(self._jobs) - running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "timed_out": self.timed_out,
+                "rejected": self.rejected,
+                "avg_run_ms": round(self.total_run_ms / self.started, 1) if self.started else None,
+                "avg_wait_ms": round(self.total_wait_ms / self.started, 1) if self.started else None,
+                "max_wait_ms": round(self.max_wait_ms, 1),
+                "per_loop_in_flight": [l.in_flight for l in self._loops],
+            }
+
+    def shutdown(self, timeout: float = 5.0):
+        """Cancel outstanding requests and stop the loops"""
+        with self._lock:
+            jobs: List[AgentJob] = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        for runtime_loop in self._loops:
+            runtime_loop.stop(timeout=timeout)
+
+
+# Global runtime instance
+_agent_runtime: Optional[AgentRuntime] = None
+_agent_runtime_lock = threading.Lock()
+
+
+def get_agent_runtime() -> AgentRuntime:
+    """Get the global agent runtime instance (started on first use)"""
+    global _agent_runtime
+    if _agent_runtime is None:
+        with _agent_runtime_lock:
+            if _agent_runtime is None:
+                _agent_runtime = AgentRuntime()
+    return _agent_runtime
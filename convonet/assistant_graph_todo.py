@@ -1,19 +1,24 @@
 import asyncio
 import logging
 import os
+import time
 from langchain_core.tools import BaseTool
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import ToolMessage, HumanMessage
 from langchain_anthropic import ChatAnthropic
 from langgraph.prebuilt import ToolNode, tools_condition
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
-from langgraph.checkpoint.memory import InMemorySaver
 from typing import List, Optional, Literal
 from dotenv import load_dotenv
 
 from .state import AgentState
 from .mcps.local_servers.db_todo import TodoPriority, ReminderImportance
 from .llm_provider_manager import get_llm_provider_manager, LLMProvider
+from .agent_checkpointer import get_checkpointer
+from .conversation_window import ConversationWindow, message_text
+from .prompt_cache import system_messages as build_system_messages, record_usage, usage_from_message
+from .tool_router import get_tool_router
+from .tool_registry import get_tool_registry
 # Optional Composio imports - app should work without them
 try:
     from .composio_tools import get_all_integration_tools, test_composio_connection
@@ -131,15 +136,15 @@ class TodoAgent:
             
             PERSONAL PRODUCTIVITY:
             - create_todo: Create personal todos with title, description, priority, due_date
-            - get_todos: Get all todos
+            - get_todos: List todos (filters: completed, team_id, due_after/due_before; returns next_cursor for more)
             - complete_todo: Mark todos as done
             - update_todo: Modify todo properties
             - delete_todo: Remove todos
             - create_reminder: Create reminders with text, importance, date
-            - get_reminders: Get all reminders
+            - get_reminders: List reminders (filters: importance, date_from/date_to; paginated)
             - delete_reminder: Remove reminders
             - create_calendar_event: Create events with title, start/end times, description
-            - get_calendar_events: Get all events
+            - get_calendar_events: List events (filters: date_from/date_to; paginated)
             - delete_calendar_event: Remove events
             
             TEAM COLLABORATION:
@@ -256,6 +261,8 @@ class TodoAgent:
         self.name = name
         self.system_prompt = system_prompt
         self.tools = tools
+        self.conversation_window = ConversationWindow()
+        self._summary_llm = None
         
         # Get provider manager
         provider_manager = get_llm_provider_manager()
@@ -333,25 +340,24 @@ class TodoAgent:
             else:
                 raise
         
+        self.static_system_prompt = self._render_system_prompt()
+        self.tool_registry = get_tool_registry(self.tools)
+        # Per-turn tool subsets need the tools bound in the first place (Gemini binding may be skipped)
+        self.tool_router = get_tool_router(self.tools) if hasattr(self.llm, "bound") else None
+        self._subset_llms = {}
         self.graph = self.build_graph()
 
-    def build_graph(self,) -> CompiledStateGraph:
-        builder = StateGraph(AgentState)
+    def _render_system_prompt(self) -> str:
+        """Format the system prompt once per graph; it only depends on the provider"""
+        # inject todo priorities and reminder importance into the system prompt
+        prompt = self.system_prompt.format(
+            todo_priorities=", ".join([p.value for p in TodoPriority]),
+            reminder_importance=", ".join([i.value for i in ReminderImportance])
+            )
 
-        async def assistant(state: AgentState):
-            """The main assistant node that uses the LLM to generate responses."""
-            # Log which provider is actually being used
-            print(f"🤖 Using LLM provider: {self.provider}, model: {self.model}")
-            
-            # inject todo priorities and reminder importance into the system prompt
-            system_prompt = self.system_prompt.format(
-                todo_priorities=", ".join([p.value for p in TodoPriority]),
-                reminder_importance=", ".join([i.value for i in ReminderImportance])
-                )
-            
-            # Add Gemini-specific instructions for tool calling
-            if self.provider == "gemini":
-                gemini_tool_instruction = """
+        # Add Gemini-specific instructions for tool calling
+        if self.provider == "gemini":
+            prompt += """
 
 CRITICAL FOR GEMINI TOOL CALLING:
 1. You MUST use tools when users request actions (create, add, schedule, etc.)
@@ -367,7 +373,49 @@ You: [IMMEDIATELY call create_calendar_event tool with title="workout", event_fr
 
 DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
 """
-                system_prompt = system_prompt + gemini_tool_instruction
+        return prompt
+
+    def _llm_for_tools(self, tools: List[BaseTool]):
+        """The LLM bound to a tool subset, bound once per distinct subset"""
+        key = tuple(sorted(tool.name for tool in tools))
+        if len(key) == len(self.tools):
+            return self.llm
+        llm = self._subset_llms.get(key)
+        if llm is None:
+            llm = get_llm_provider_manager().bind_tools(self.provider, self.llm.bound, tools)
+            self._subset_llms[key] = llm
+        return llm
+
+    async def _summarize(self, prompt: str) -> str:
+        """Summarize dropped conversation turns with a tool-less LLM from the same provider"""
+        if self._summary_llm is None:
+            self._summary_llm = get_llm_provider_manager().create_llm(
+                provider=self.provider,
+                model=self.model,
+                temperature=0.0,
+            )
+        response = await self._summary_llm.ainvoke([HumanMessage(content=prompt)])
+        return message_text(response)
+
+    def build_graph(self,) -> CompiledStateGraph:
+        builder = StateGraph(AgentState)
+
+        async def compact(state: AgentState):
+            """Keep the thread within the message/token window before the LLM sees it."""
+            update = await self.conversation_window.compact(
+                state.messages,
+                state.conversation_summary,
+                summarize_fn=self._summarize,
+            )
+            return update or {}
+
+        async def assistant(state: AgentState):
+            """The main assistant node that uses the LLM to generate responses."""
+            # Log which provider is actually being used
+            print(f"🤖 Using LLM provider: {self.provider}, model: {self.model}")
+            
+            # Static prefix first (cacheable), then the running summary of turns dropped from the window
+            system_messages = build_system_messages(self.provider, self.static_system_prompt, state.conversation_summary)
 
             print(f"🤖 Assistant processing: {state.messages[-1].content if state.messages else 'No messages'}")
             print(f"🤖 Message count: {len(state.messages)}")
@@ -710,7 +758,15 @@ DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
                     print(f"🔍   [{idx}] {msg_type}: {content_preview}...", flush=True)
             
             try:
-                response = await self.llm.ainvoke([SystemMessage(content=system_prompt)] + filtered_messages)
+                llm = self.llm
+                if self.tool_router is not None:
+                    tool_subset, tool_groups = self.tool_router.route(filtered_messages)
+                    llm = self._llm_for_tools(tool_subset)
+                    print(f"🧭 Tool router: binding {len(tool_subset)}/{len(self.tools)} tools ({', '.join(tool_groups) or 'all groups'})")
+                
+                llm_started = time.perf_counter()
+                response = await llm.ainvoke(system_messages + filtered_messages)
+                record_usage(self.provider, usage_from_message(response), latency_ms=(time.perf_counter() - llm_started) * 1000)
                 
                 # Log response details for debugging
                 print(f"🤖 Assistant response type: {type(response)}")
@@ -789,8 +845,7 @@ DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
                     print(f"❌ Current model: {self.model}")
                     # Clear the global cache to force reinitialization
                     import convonet.routes as routes_module
-                    routes_module._agent_graph_cache = None
-                    routes_module._agent_graph_model = None
+                    routes_module.invalidate_agent_graphs(provider=self.provider, model=self.model)
                     print("🔄 Cleared agent graph cache due to model 404 error")
                     # Raise a special exception that will trigger retry
                     raise RuntimeError(f"MODEL_404_ERROR: Model {self.model} not found. Cache cleared. Please retry.") from e
@@ -826,14 +881,17 @@ DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
                         tool_id = tool_call.get('id', f'tool_{len(tool_messages)}')
                         
                         try:
-                            # Find the tool by name
-                            tool = None
-                            for t in self.tools:
-                                if t.name == tool_name:
-                                    tool = t
-                                    break
+                            tool = self.tool_registry.get(tool_name)
+                            invalid_args = self.tool_registry.validate(tool_name, tool_args) if tool else None
                             
-                            if tool:
+                            if invalid_args:
+                                print(f"⚠️ Rejected {tool_name} call: {invalid_args}")
+                                return {
+                                    'tool_call_id': tool_id,
+                                    'content': f"Invalid arguments for {tool_name}: {invalid_args}",
+                                    'status': 'error'
+                                }
+                            elif tool:
                                 # Reduced timeout for faster failure (was 8s, now 6s)
                                 tool_timeout = 6.0
                                 try:
@@ -914,14 +972,13 @@ DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
                         retry_count = 0
                         
                         try:
-                            # Find the tool by name
-                            tool = None
-                            for t in self.tools:
-                                if t.name == tool_name:
-                                    tool = t
-                                    break
+                            tool = self.tool_registry.get(tool_name)
+                            invalid_args = self.tool_registry.validate(tool_name, tool_args) if tool else None
                             
-                            if tool:
+                            if invalid_args:
+                                print(f"⚠️ Rejected {tool_name} call: {invalid_args}")
+                                result = f"Invalid arguments for {tool_name}: {invalid_args}"
+                            elif tool:
                                 # OPTIMIZED: Reduced timeout for faster failure detection
                                 # Reduced from 8s to 6s for lower latency (Gemini uses native SDK, doesn't need longer timeout)
                                 tool_timeout = 6.0
@@ -1126,17 +1183,20 @@ DO NOT respond with text like "I'll create..." - ACTUALLY CALL THE TOOL!
                 state.messages.append(error_message)
                 return state
 
+        builder.add_node(compact)
         builder.add_node(assistant)
         builder.add_node("tools", tools_node)
 
-        builder.set_entry_point("assistant")
+        # Compact once per turn; the tools -> assistant loop never splits a tool call from its result
+        builder.set_entry_point("compact")
+        builder.add_edge("compact", "assistant")
         builder.add_conditional_edges(
             "assistant",
             tools_condition
         )
         builder.add_edge("tools", "assistant")
 
-        return builder.compile(checkpointer=InMemorySaver())
+        return builder.compile(checkpointer=get_checkpointer())
 
     def draw_graph(self,):
         if self.graph is None:
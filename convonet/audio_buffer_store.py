@@ -0,0 +1,193 @@
+"""
+Audio Buffer Store for WebRTC Voice Sessions
+Append-only binary storage for recorded utterances (Redis APPEND with in-memory ring buffer fallback)
+"""
+
+import os
+import threading
+import logging
+from typing import Optional, Dict, Any, Union
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis - the store works in-process without it
+try:
+    from convonet.redis_manager import redis_manager
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_manager = None
+    REDIS_AVAILABLE = False
+
+WEBM_HEADER = b"\x1a\x45\xdf\xa3"
+
+AudioChunk = Union[bytes, bytearray, memoryview]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class AudioBufferStore:
+    """
+    Per-session raw audio buffer.
+
+    Chunks are appended as raw bytes - never base64 - so each append costs
+    O(chunk) instead of re-encoding the whole utterance. Redis keys are plain
+    binary strings (``audio_buffer:{session_id}``) grown with APPEND. When Redis
+    is unavailable (or an operation fails) chunks spill into an in-process
+    bytearray capped at ``max_bytes``; the oldest bytes are dropped first.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[int] = None, key_prefix: str = "audio_buffer"):
+        self.max_bytes = max_bytes or _env_int('AUDIO_BUFFER_MAX_BYTES', 8 * 1024 * 1024)
+        self.ttl = ttl or _env_int('AUDIO_BUFFER_TTL', 3600)  # same as the session hash
+        self.key_prefix = key_prefix
+        self._memory: Dict[str, bytearray] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, session_id: str) -> str:
+        return f"{self.key_prefix}:{session_id}"
+
+    def _client(self):
+        """Binary-safe Redis client, or None when Redis is not usable"""
+        if not REDIS_AVAILABLE or redis_manager is None or not redis_manager.is_available():
+            return None
+        try:
+            return redis_manager.get_binary_client()
+        except Exception as e:
+            logger.error(f"❌ Audio buffer: binary Redis client unavailable: {e}")
+            return None
+
+    def _append_memory(self, session_id: str, chunk: AudioChunk) -> int:
+        with self._lock:
+            buffer = self._memory.get(session_id)
+            if buffer is None:
+                buffer = self._memory[session_id] = bytearray()
+            buffer += chunk
+            overflow = len(buffer) - self.max_bytes
+            if overflow > 0:
+                del buffer[:overflow]
+                logger.warning(f"⚠️ Audio buffer for {session_id} exceeded {self.max_bytes} bytes, dropped {overflow} oldest bytes")
+            return len(buffer)
+
+    def append(self, session_id: str, chunk: AudioChunk) -> int:
+        """
+        Append a raw audio chunk to the session buffer
+
+        Args:
+            session_id: Socket.IO session ID
+            chunk: Raw audio bytes (bytes, bytearray or memoryview)
+
+        Returns:
+            Total buffered length in bytes
+        """
+        if not chunk:
+            return self.length(session_id)
+
+        # Once a session has spilled to memory keep appending there so chunk order is preserved
+        client = None if session_id in self._memory else self._client()
+        if client is not None:
+            try:
+                key = self._key(session_id)
+                pipe = client.pipeline(transaction=False)
+                pipe.append(key, chunk)
+                pipe.expire(key, self.ttl)
+                new_length, _ = pipe.execute()
+                if new_length > self.max_bytes:
+                    # Rare: keep only the newest max_bytes
+                    tail = client.getrange(key, new_length - self.max_bytes, -1)
+                    client.set(key, tail, ex=self.ttl)
+                    logger.warning(f"⚠️ Audio buffer for {session_id} exceeded {self.max_bytes} bytes, trimmed in Redis")
+                    new_length = len(tail)
+                return new_length
+            except Exception as e:
+                logger.error(f"❌ Redis APPEND failed for {session_id}, using in-memory buffer: {e}")
+
+        return self._append_memory(session_id, chunk)
+
+    def set(self, session_id: str, data: AudioChunk) -> bool:
+        """Replace the session buffer with a complete recording (e.g. the client's final blob)"""
+        self.clear(session_id)
+        self.append(session_id, data)
+        return True
+
+    def get(self, session_id: str) -> bytes:
+        """Get the full buffered audio as raw bytes (empty bytes if nothing recorded)"""
+        data = b""
+        client = self._client()
+        if client is not None:
+            try:
+                data = client.get(self._key(session_id)) or b""
+            except Exception as e:
+                logger.error(f"❌ Redis GET failed for audio buffer {session_id}: {e}")
+
+        with self._lock:
+            spilled = self._memory.get(session_id)
+            if spilled:
+                data = data + bytes(spilled)
+        return data
+
+    def length(self, session_id: str) -> int:
+        """Get the buffered length in bytes without transferring the audio"""
+        total = 0
+        client = self._client()
+        if client is not None:
+            try:
+                total = client.strlen(self._key(session_id))
+            except Exception as e:
+                logger.error(f"❌ Redis STRLEN failed for audio buffer {session_id}: {e}")
+
+        spilled = self._memory.get(session_id)
+        return total + (len(spilled) if spilled else 0)
+
+    def clear(self, session_id: str) -> bool:
+        """Drop the session buffer from Redis and memory"""
+        with self._lock:
+            self._memory.pop(session_id, None)
+
+        client = self._client()
+        if client is not None:
+            try:
+                client.delete(self._key(session_id))
+            except Exception as e:
+                logger.error(f"❌ Redis DELETE failed for audio buffer {session_id}: {e}")
+                return False
+        return True
+
+    def info(self, session_id: str) -> Dict[str, Any]:
+        """Lightweight buffer summary for debug endpoints"""
+        client = self._client()
+        head = b""
+        if client is not None:
+            try:
+                head = client.getrange(self._key(session_id), 0, 19) or b""
+            except Exception as e:
+                logger.error(f"❌ Redis GETRANGE failed for audio buffer {session_id}: {e}")
+        if not head:
+            with self._lock:
+                head = bytes(self._memory.get(session_id, b"")[:20])
+
+        length = self.length(session_id)
+        return {
+            'length': length,
+            'has_audio': length > 0,
+            'is_webm': head[:4] == WEBM_HEADER,
+            'first_20_bytes_hex': head.hex(),
+            'storage': 'redis' if client is not None else 'memory',
+            'max_bytes': self.max_bytes
+        }
+
+
+# Global audio buffer store instance
+_audio_buffer_store = None
+
+
+def get_audio_buffer_store() -> AudioBufferStore:
+    """Get the global audio buffer store instance"""
+    global _audio_buffer_store
+    if _audio_buffer_store is None:
+        _audio_buffer_store = AudioBufferStore()
+    return _audio_buffer_store
@@ -0,0 +1,202 @@
+"""
+Audio Normalizer
+In-memory decode of WebM/Opus (PyAV), downmix to mono and resampling to 16 kHz
+PCM16 with vectorized NumPy filtering, so STT receives compact, declared-format
+audio without temp files
+"""
+
+import io
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# PyAV is optional - without it WebM is passed through to STT untouched
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    av = None
+    AV_AVAILABLE = False
+
+TARGET_SAMPLE_RATE = 16000
+WEBM_HEADER = b"\x1a\x45\xdf\xa3"
+
+# Silence gate for decoded audio (same RMS floor as DeepgramService._analyze_audio_quality)
+SILENCE_RMS = 100.0
+
+
+@dataclass
+class NormalizedAudio:
+    """Result of normalizing one utterance"""
+    pcm: bytes  # 16-bit little-endian mono PCM at sample_rate
+    sample_rate: int
+    source_format: str  # "webm" or "pcm16"
+    source_sample_rate: int
+    source_channels: int
+    input_bytes: int
+    duration_ms: float
+    rms: float
+    cpu_ms: float  # Process CPU time spent decoding + resampling
+    wall_ms: float
+
+    @property
+    def output_bytes(self) -> int:
+        return len(self.pcm)
+
+    @property
+    def is_silence(self) -> bool:
+        return self.rms < SILENCE_RMS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source_format": self.source_format,
+            "source_sample_rate": self.source_sample_rate,
+            "source_channels": self.source_channels,
+            "sample_rate": self.sample_rate,
+            "input_bytes": self.input_bytes,
+            "output_bytes": self.output_bytes,
+            "duration_ms": round(self.duration_ms, 1),
+            "rms": round(self.rms, 1),
+            "cpu_ms": round(self.cpu_ms, 2),
+            "wall_ms": round(self.wall_ms, 2),
+        }
+
+
+def is_webm(audio: bytes) -> bool:
+    return len(audio) >= 4 and bytes(audio[:4]) == WEBM_HEADER
+
+
+def _frame_to_float(frame) -> np.ndarray:
+    """Decoded PyAV audio frame as float32 of shape (channels, samples)"""
+    data = frame.to_ndarray()
+    channels = len(frame.layout.channels)
+    if not frame.format.is_planar:
+        # Packed formats come back as (1, samples * channels), interleaved
+        data = data.reshape(-1, channels).T
+    if data.dtype == np.int16:
+        return data.astype(np.float32) / 32768.0
+    if data.dtype == np.int32:
+        return data.astype(np.float32) / 2147483648.0
+    return data.astype(np.float32, copy=False)
+
+
+def decode_webm(audio: bytes) -> Tuple[np.ndarray, int, int]:
+    """
+    Decode a WebM/Opus recording in memory
+
+    Returns:
+        (mono float32 samples in [-1, 1], sample_rate, source_channels)
+    """
+    if not AV_AVAILABLE:
+        raise RuntimeError("PyAV is not installed")
+    with av.open(io.BytesIO(bytes(audio)), mode="r") as container:
+        stream = container.streams.audio[0]
+        sample_rate = stream.codec_context.sample_rate or 48000
+        channels = stream.codec_context.channels or 1
+        chunks = []
+        try:
+            for frame in container.decode(stream):
+                samples = _frame_to_float(frame)
+                chunks.append(samples.mean(axis=0) if samples.shape[0] > 1 else samples[0])
+        except av.error.InvalidDataError as e:
+            # MediaRecorder streams cut mid-cluster end with a truncated block; keep what decoded
+            logger.debug(f"WebM decode stopped early: {e}")
+    mono = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    return mono, sample_rate, channels
+
+
+def _lowpass_kernel(cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc FIR low-pass; cutoff is a fraction of the input sample rate (0 - 0.5)"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Resample mono float32 audio
+
+    Downsampling low-passes below the new Nyquist (anti-aliasing) first. Integer
+    ratios (48k -> 16k) then decimate by slicing; other ratios interpolate.
+    """
+    if src_rate == dst_rate or samples.size == 0:
+        return samples.astype(np.float32, copy=False)
+    if dst_rate < src_rate:
+        # 0.45 of the output rate leaves a little transition band below Nyquist
+        samples = np.convolve(samples, _lowpass_kernel(0.45 * dst_rate / src_rate), mode="same")
+        if src_rate % dst_rate == 0:
+            return samples[::src_rate // dst_rate].astype(np.float32, copy=False)
+    out_length = int(round(samples.size * dst_rate / src_rate))
+    positions = np.arange(out_length, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    return (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+def normalize_audio(audio: bytes, sample_rate: Optional[int] = None, target_rate: int = TARGET_SAMPLE_RATE) -> Optional[NormalizedAudio]:
+    """
+    Normalize an utterance to mono PCM16 at target_rate
+
+    Args:
+        audio: WebM/Opus recording, or raw mono PCM16
+        sample_rate: Sample rate of raw PCM (required for PCM; ignored for WebM)
+        target_rate: Output sample rate
+
+    Returns:
+        NormalizedAudio, or None when the input cannot be normalized (raw PCM of
+        unknown rate, or WebM without PyAV) and should be sent as-is
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    if is_webm(audio):
+        if not AV_AVAILABLE:
+            return None
+        samples, source_rate, channels = decode_webm(audio)
+        source_format = "webm"
+    else:
+        if not sample_rate:
+            return None
+        pcm = memoryview(audio)[:len(audio) - len(audio) % 2]
+        samples = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+        source_rate, channels, source_format = sample_rate, 1, "pcm16"
+
+    resampled = resample(samples, source_rate, target_rate)
+    if source_format == "pcm16" and source_rate == target_rate:
+        pcm_out = bytes(pcm)  # Already in the target format - no requantization
+    else:
+        pcm_out = to_pcm16(resampled)
+    rms = float(np.sqrt(np.mean(np.square(resampled * 32768.0)))) if resampled.size else 0.0
+
+    return NormalizedAudio(
+        pcm=pcm_out,
+        sample_rate=target_rate,
+        source_format=source_format,
+        source_sample_rate=source_rate,
+        source_channels=channels,
+        input_bytes=len(audio),
+        duration_ms=resampled.size * 1000.0 / target_rate,
+        rms=rms,
+        cpu_ms=(time.process_time() - cpu_start) * 1000,
+        wall_ms=(time.perf_counter() - wall_start) * 1000,
+    )
+
+
+def webm_upload_mode() -> str:
+    """
+    How WebM utterances are sent to batch STT (STT_WEBM_UPLOAD)
+
+    "linear16": decode and send 16 kHz PCM. "passthrough" (default): decode
+    only to gate silence, then send the original Opus, which is several times
+    smaller than any PCM encoding of the same speech.
+    """
+    mode = os.getenv('STT_WEBM_UPLOAD', 'passthrough').lower()
+    return mode if mode in ("linear16", "passthrough") else "passthrough"
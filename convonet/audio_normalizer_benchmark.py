@@ -0,0 +1,142 @@
+"""
+Audio Normalizer Benchmark
+Bytes uploaded to STT and transcode CPU per utterance for each batch STT input
+path: legacy 48 kHz PCM WAV, PCM resampled to 16 kHz, WebM/Opus passthrough and
+WebM/Opus decoded to 16 kHz PCM.
+
+Usage:
+    python -m convonet.audio_normalizer_benchmark
+    python -m convonet.audio_normalizer_benchmark --seconds 8 --iterations 50
+    python -m convonet.audio_normalizer_benchmark --file recording.webm
+"""
+
+import io
+import wave
+import argparse
+import statistics
+from typing import Dict, Any, List
+
+import numpy as np
+
+from convonet.audio_normalizer import AV_AVAILABLE, normalize_audio, to_pcm16
+
+CAPTURE_RATE = 48000  # MediaRecorder / getUserMedia default
+
+
+def synthetic_utterance(seconds: float, rate: int = CAPTURE_RATE) -> np.ndarray:
+    """Speech-like test signal: a gliding harmonic voice with syllable envelope, pauses and room noise"""
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * 3.5 * t), 0, None) ** 2
+    pauses = (np.sin(2 * np.pi * 0.4 * t) > -0.6).astype(np.float64)
+    signal = 0.25 * voice * syllables * pauses + 0.003 * rng.standard_normal(t.size)
+    return signal.astype(np.float32)
+
+
+def encode_webm(samples: np.ndarray, rate: int = CAPTURE_RATE) -> bytes:
+    """Encode mono float audio as WebM/Opus in memory, as MediaRecorder would"""
+    import av
+
+    buffer = io.BytesIO()
+    with av.open(buffer, mode="w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=rate)
+        stream.layout = "mono"
+        frame_size = rate // 50  # 20 ms
+        for start in range(0, samples.size, frame_size):
+            chunk = samples[start:start + frame_size]
+            if chunk.size < frame_size:
+                chunk = np.pad(chunk, (0, frame_size - chunk.size))
+            frame = av.AudioFrame.from_ndarray(chunk.reshape(1, -1), format="flt", layout="mono")
+            frame.sample_rate = rate
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def wav_bytes(pcm: bytes, rate: int) -> bytes:
+    """In-memory WAV, as the legacy PCM path uploaded it"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(rate)
+        wav_file.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def time_normalize(audio: bytes, iterations: int, sample_rate: int = None) -> Dict[str, Any]:
+    """CPU/wall stats for normalize_audio; the first call is a warm-up"""
+    result = normalize_audio(audio, sample_rate=sample_rate)
+    cpu, wall = [], []
+    for _ in range(iterations):
+        result = normalize_audio(audio, sample_rate=sample_rate)
+        cpu.append(result.cpu_ms)
+        wall.append(result.wall_ms)
+    return {
+        'upload_bytes': result.output_bytes,  # Sent as raw linear16, no container
+        'cpu_p50': statistics.median(cpu),
+        'cpu_mean': statistics.fmean(cpu),
+        'wall_p50': statistics.median(wall),
+        'duration_ms': result.duration_ms,
+    }
+
+
+def run_benchmark(seconds: float, iterations: int, webm_file: str = None) -> List[Dict[str, Any]]:
+    samples = synthetic_utterance(seconds)
+    pcm48 = to_pcm16(samples)
+    rows = [{
+        'path': 'pcm48k -> wav (legacy)',
+        'upload_bytes': len(wav_bytes(pcm48, CAPTURE_RATE)),
+        'cpu_p50': 0.0, 'cpu_mean': 0.0, 'wall_p50': 0.0,
+    }]
+    rows.append({'path': 'pcm48k -> linear16 16k', **time_normalize(pcm48, iterations, sample_rate=CAPTURE_RATE)})
+
+    if not AV_AVAILABLE:
+        print("⚠️ PyAV not installed - skipping WebM paths", flush=True)
+        return rows
+
+    if webm_file:
+        with open(webm_file, 'rb') as f:
+            webm = f.read()
+    else:
+        webm = encode_webm(samples)
+    decoded = time_normalize(webm, iterations)
+    rows.append({
+        'path': 'webm passthrough (+gate)',
+        'upload_bytes': len(webm),
+        'cpu_p50': decoded['cpu_p50'], 'cpu_mean': decoded['cpu_mean'], 'wall_p50': decoded['wall_p50'],
+    })
+    rows.append({'path': 'webm -> linear16 16k', **decoded})
+    return rows
+
+
+def print_results(rows: List[Dict[str, Any]], seconds: float, iterations: int):
+    print(f"\n📊 Per-utterance STT upload size and transcode cost ({seconds:.1f}s utterance, {iterations} iterations)")
+    print(f"{'path':<26} {'upload KB':>10} {'KB/s':>8} {'cpu p50 ms':>11} {'cpu mean ms':>12} {'wall p50 ms':>12}")
+    for row in rows:
+        print(f"{row['path']:<26} {row['upload_bytes'] / 1024:>10.1f} {row['upload_bytes'] / 1024 / seconds:>8.1f} "
+              f"{row['cpu_p50']:>11.2f} {row['cpu_mean']:>12.2f} {row['wall_p50']:>12.2f}")
+
+    legacy = rows[0]['upload_bytes']
+    for row in rows[1:]:
+        print(f"⚡ {row['path']}: {legacy / row['upload_bytes']:.1f}x fewer bytes than the legacy 48 kHz WAV")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark STT audio normalization")
+    parser.add_argument("--seconds", type=float, default=5.0, help="synthetic utterance length")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--file", help="benchmark a real WebM/Opus recording instead of the synthetic one")
+    args = parser.parse_args()
+
+    rows = run_benchmark(args.seconds, args.iterations, args.file)
+    print_results(rows, args.seconds, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
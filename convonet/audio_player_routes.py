@@ -3,7 +3,6 @@ Audio Player Routes for Convonet Project
 Integrated audio player functionality for the main Flask app
 """
 
-import base64
 import json
 import time
 import tempfile
@@ -19,6 +18,8 @@ except ImportError:
     REDIS_AVAILABLE = False
     print("⚠️ Redis not available")
 
+from convonet.audio_buffer_store import get_audio_buffer_store
+
 # Create blueprint
 audio_player_bp = Blueprint('audio_player', __name__, url_prefix='/audio-player')
 
@@ -30,20 +31,21 @@ def get_active_sessions():
     try:
         session_keys = redis_manager.redis_client.keys("session:*")
         sessions = []
+        store = get_audio_buffer_store()
         
         for key in session_keys:
             session_id = key.replace("session:", "")
             session_data = redis_manager.redis_client.hgetall(key)
             
             if session_data:
-                audio_buffer = session_data.get('audio_buffer', '')
+                audio_length = store.length(session_id)
                 sessions.append({
                     'session_id': session_id,
                     'user_name': session_data.get('user_name', 'Unknown'),
                     'authenticated': session_data.get('authenticated', 'False'),
                     'is_recording': session_data.get('is_recording', 'False'),
-                    'audio_buffer_length': len(audio_buffer),
-                    'has_audio': len(audio_buffer) > 0,
+                    'audio_buffer_length': audio_length,
+                    'has_audio': audio_length > 0,
                     'connected_at': session_data.get('connected_at', ''),
                     'authenticated_at': session_data.get('authenticated_at', '')
                 })
@@ -114,26 +116,8 @@ def api_session_info(session_id):
         if not session_data:
             return jsonify({'success': False, 'message': 'Session not found'})
         
-        # Analyze audio buffer
-        audio_buffer = session_data.get('audio_buffer', '')
-        audio_info = {
-            'length': len(audio_buffer),
-            'has_audio': len(audio_buffer) > 0,
-            'preview': audio_buffer[:100] + "..." if len(audio_buffer) > 100 else audio_buffer
-        }
-        
-        # Test base64 decoding
-        try:
-            if audio_buffer:
-                decoded = base64.b64decode(audio_buffer)
-                audio_info['decoded_length'] = len(decoded)
-                audio_info['base64_valid'] = True
-            else:
-                audio_info['decoded_length'] = 0
-                audio_info['base64_valid'] = True
-        except Exception as e:
-            audio_info['base64_valid'] = False
-            audio_info['base64_error'] = str(e)
+        # Summarize audio buffer (length and header only - the audio itself is not transferred)
+        audio_info = get_audio_buffer_store().info(session_id)
         
         return jsonify({
             'success': True,
@@ -157,17 +141,11 @@ def api_download_audio(session_id):
         if not session_data:
             return jsonify({'success': False, 'message': 'Session not found'})
         
-        # Get audio buffer
-        audio_buffer_b64 = session_data.get('audio_buffer', '')
-        if not audio_buffer_b64:
+        # Get raw audio buffer
+        audio_data = get_audio_buffer_store().get(session_id)
+        if not audio_data:
             return jsonify({'success': False, 'message': 'No audio buffer found'})
         
-        # Decode audio data
-        try:
-            audio_data = base64.b64decode(audio_buffer_b64)
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'Failed to decode audio: {e}'})
-        
         # Check if audio is WebM format (from WebRTC)
         if audio_data.startswith(b'\x1a\x45\xdf\xa3'):  # WebM/Matroska header
             # For WebM, return the original file without conversion
@@ -222,20 +200,13 @@ def api_analyze_audio(session_id):
         if not session_data:
             return jsonify({'success': False, 'message': 'Session not found'})
         
-        # Get audio buffer
-        audio_buffer_b64 = session_data.get('audio_buffer', '')
-        if not audio_buffer_b64:
+        # Get raw audio buffer
+        audio_data = get_audio_buffer_store().get(session_id)
+        if not audio_data:
             return jsonify({'success': False, 'message': 'No audio buffer found'})
         
-        # Decode audio data
-        try:
-            audio_data = base64.b64decode(audio_buffer_b64)
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'Failed to decode audio: {e}'})
-        
         # Analyze audio data
         analysis = {
-            'base64_length': len(audio_buffer_b64),
             'decoded_length': len(audio_data),
             'first_20_bytes_hex': audio_data[:20].hex(),
             'first_20_bytes_chars': str(audio_data[:20]),
@@ -0,0 +1,161 @@
+"""
+Conversation Window
+Caps the per-thread message count and token budget of agent conversations,
+folding dropped turns into a running summary
+"""
+
+import os
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, RemoveMessage
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a user and a voice productivity assistant.
+Keep only what later turns may need: names, titles and IDs of todos, reminders, events and teams that were mentioned,
+the user's stated preferences, and any request that is not finished yet. Plain sentences, at most 120 words.
+
+Current summary:
+{summary}
+
+Messages to fold into the summary:
+{transcript}
+
+Updated summary:"""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def message_text(message) -> str:
+    """Plain text of a message (Claude-style content blocks are flattened)"""
+    content = getattr(message, 'content', '')
+    if isinstance(content, list):
+        parts = []
+        for item in content:
+            if isinstance(item, dict):
+                parts.append(item.get('text') or '')
+            elif isinstance(item, str):
+                parts.append(item)
+        content = " ".join(p for p in parts if p)
+    return str(content or '')
+
+
+def estimate_tokens(message) -> int:
+    """Rough token count (~4 characters per token), including tool call arguments"""
+    chars = len(message_text(message))
+    for tool_call in getattr(message, 'tool_calls', None) or []:
+        chars += len(str(tool_call.get('args', ''))) if isinstance(tool_call, dict) else len(str(tool_call))
+    return chars // 4 + 4
+
+
+def render_transcript(messages: List[Any], max_chars: int = 400) -> str:
+    """Compact text rendering of messages for the summarizer"""
+    lines = []
+    for message in messages:
+        text = message_text(message)[:max_chars]
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {text}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool result ({getattr(message, 'name', None) or 'tool'}): {text}")
+        elif isinstance(message, AIMessage):
+            calls = [tc.get('name', 'tool') for tc in (message.tool_calls or []) if isinstance(tc, dict)]
+            if calls:
+                lines.append(f"Assistant called: {', '.join(calls)}")
+            if text:
+                lines.append(f"Assistant: {text}")
+    return "\n".join(lines)
+
+
+class ConversationWindow:
+    """
+    Message-window policy for a conversation thread.
+
+    When a thread exceeds ``max_messages`` or ``max_tokens`` it is cut back to
+    roughly half of both limits, so compaction (and its summarization call)
+    happens once every few turns rather than on every turn. Cuts only fall on a
+    user message, which keeps tool_use/tool_result pairs together; the current
+    turn is always kept even if it alone is over budget.
+    """
+
+    def __init__(
+        self,
+        max_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        summarize: Optional[bool] = None,
+        summary_timeout: float = 8.0,
+    ):
+        self.max_messages = max_messages or _env_int('CONVERSATION_MAX_MESSAGES', 40)
+        self.max_tokens = max_tokens or _env_int('CONVERSATION_MAX_TOKENS', 8000)
+        if summarize is None:
+            summarize = os.getenv('CONVERSATION_SUMMARIZE', 'true').lower() == 'true'
+        self.summarize = summarize
+        self.summary_timeout = summary_timeout
+
+    def needs_compaction(self, messages: List[Any]) -> bool:
+        return len(messages) > self.max_messages or sum(estimate_tokens(m) for m in messages) > self.max_tokens
+
+    def select_cut(self, messages: List[Any]) -> int:
+        """Index where the kept tail starts (0 = keep everything)"""
+        if not self.needs_compaction(messages):
+            return 0
+
+        target_messages = max(1, self.max_messages // 2)
+        target_tokens = max(1, self.max_tokens // 2)
+        human_indexes = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        if not human_indexes:
+            return 0
+
+        # Token total of messages[i:] for every i, built from the end
+        suffix_tokens = [0] * (len(messages) + 1)
+        for i in range(len(messages) - 1, -1, -1):
+            suffix_tokens[i] = suffix_tokens[i + 1] + estimate_tokens(messages[i])
+
+        for i in human_indexes:
+            if len(messages) - i <= target_messages and suffix_tokens[i] <= target_tokens:
+                return i
+        return human_indexes[-1]
+
+    async def compact(
+        self,
+        messages: List[Any],
+        summary: Optional[str],
+        summarize_fn: Optional[Callable[[str], Awaitable[str]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Compact a thread's messages if it is over budget
+
+        Args:
+            messages: Current thread messages (must have ids, as assigned by add_messages)
+            summary: Existing running summary, if any
+            summarize_fn: async prompt -> summary text; None disables summarization
+
+        Returns:
+            State update removing the dropped messages and carrying the new
+            summary, or None if the thread is within budget
+        """
+        cut = self.select_cut(messages)
+        if cut <= 0:
+            return None
+
+        dropped = messages[:cut]
+        update: Dict[str, Any] = {"messages": [RemoveMessage(id=m.id) for m in dropped if getattr(m, 'id', None)]}
+
+        if self.summarize and summarize_fn is not None:
+            prompt = SUMMARY_PROMPT.format(summary=summary or "(none)", transcript=render_transcript(dropped))
+            try:
+                new_summary = await asyncio.wait_for(summarize_fn(prompt), timeout=self.summary_timeout)
+                if new_summary:
+                    update["conversation_summary"] = new_summary.strip()
+            except Exception as e:
+                # Still drop the messages - bounded state matters more than a perfect summary
+                logger.warning(f"⚠️ Conversation summarization failed, truncating without summary: {e}")
+
+        logger.info(f"✂️ Conversation compacted: dropped {len(dropped)} message(s), kept {len(messages) - cut}")
+        return update
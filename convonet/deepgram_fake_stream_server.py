@@ -0,0 +1,125 @@
+"""
+Fake Deepgram Streaming Server
+Local WebSocket server that replays canned transcript frames, for exercising
+deepgram_streaming without a Deepgram account or network access.
+
+Usage:
+    python -m convonet.deepgram_fake_stream_server            # replay demo
+    DEEPGRAM_STREAM_URL=ws://127.0.0.1:8765/v1/listen ...    # point the app at it
+"""
+
+import json
+import threading
+import logging
+from typing import List, Tuple, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from websockets.sync.server import serve
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    serve = None
+    WEBSOCKETS_AVAILABLE = False
+
+# (transcript, is_final) frames replayed in order, one per `chunks_per_frame` audio messages
+DEFAULT_FRAMES: List[Tuple[str, bool]] = [
+    ("create a", False),
+    ("create a todo", False),
+    ("Create a todo", True),
+    ("to buy", False),
+    ("to buy groceries", False),
+    ("to buy groceries tomorrow.", True),
+]
+
+
+def build_results_frame(transcript: str, is_final: bool, speech_final: bool = False, from_finalize: bool = False) -> str:
+    """Build a Deepgram live `Results` message"""
+    return json.dumps({
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": 0.5,
+        "start": 0.0,
+        "is_final": is_final,
+        "speech_final": speech_final,
+        "from_finalize": from_finalize,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99, "words": []}]},
+    })
+
+
+class FakeDeepgramServer:
+    """Replays canned frames as audio arrives; answers Finalize with the remaining finals"""
+
+    def __init__(self, frames: Optional[List[Tuple[str, bool]]] = None, host: str = "127.0.0.1", port: int = 8765, chunks_per_frame: int = 2):
+        if not WEBSOCKETS_AVAILABLE:
+            raise RuntimeError("websockets package is required for the fake Deepgram server")
+        self.frames = list(frames or DEFAULT_FRAMES)
+        self.host = host
+        self.port = port
+        self.chunks_per_frame = chunks_per_frame
+        self.received_bytes = 0
+        self.control_messages: List[dict] = []
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/listen"
+
+    def _handler(self, websocket):
+        frame_index = 0
+        audio_messages = 0
+        for message in websocket:
+            if isinstance(message, (bytes, bytearray)):
+                self.received_bytes += len(message)
+                audio_messages += 1
+                if frame_index < len(self.frames) and audio_messages % self.chunks_per_frame == 0:
+                    transcript, is_final = self.frames[frame_index]
+                    websocket.send(build_results_frame(transcript, is_final))
+                    frame_index += 1
+                continue
+
+            control = json.loads(message)
+            self.control_messages.append(control)
+            if control.get("type") == "Finalize":
+                # Flush: emit the remaining finals, mark the last one from_finalize
+                remaining = [f for f in self.frames[frame_index:] if f[1]]
+                frame_index = len(self.frames)
+                if not remaining:
+                    websocket.send(build_results_frame("", True, from_finalize=True))
+                for i, (transcript, _) in enumerate(remaining):
+                    websocket.send(build_results_frame(transcript, True, speech_final=True, from_finalize=i == len(remaining) - 1))
+            elif control.get("type") == "CloseStream":
+                break
+
+    def start(self) -> "FakeDeepgramServer":
+        self._server = serve(self._handler, self.host, self.port)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Fake Deepgram server listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+
+
+if __name__ == "__main__":
+    from convonet.deepgram_streaming import StreamingSTTManager
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeDeepgramServer().start()
+    manager = StreamingSTTManager(api_key="fake", url=server.url)
+
+    def on_transcript(text, is_final):
+        print(f"{'✅ final  ' if is_final else '… interim'}: {text}")
+
+    manager.start_utterance("demo", on_transcript)
+    manager.send_audio("demo", b"\x1a\x45\xdf\xa3" + b"\x00" * 1020)
+    for _ in range(7):
+        manager.send_audio("demo", b"\x00" * 1024)
+    print(f"📝 Final transcript: {manager.finish_utterance('demo')!r}")
+    print(f"📊 {manager.get_stats()}, server received {server.received_bytes} bytes")
+    manager.close("demo")
+    server.stop()
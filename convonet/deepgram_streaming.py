@@ -0,0 +1,374 @@
+"""
+Deepgram Streaming Speech-to-Text
+Persistent per-session WebSocket connections to Deepgram's live transcription API
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from typing import Optional, Dict, Any, Callable, List
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# websockets is optional - without it callers fall back to batch transcription
+try:
+    from websockets.sync.client import connect as ws_connect
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    ws_connect = None
+    WEBSOCKETS_AVAILABLE = False
+
+WEBM_HEADER = b"\x1a\x45\xdf\xa3"
+DEFAULT_STREAM_URL = "wss://api.deepgram.com/v1/listen"
+
+# on_transcript(text, is_final) - text is the utterance so far (finals + current interim)
+TranscriptCallback = Callable[[str, bool], None]
+
+
+def _default_stream_params() -> Dict[str, Any]:
+    """Query parameters for Deepgram live transcription"""
+    return {
+        'model': os.getenv('DEEPGRAM_STREAM_MODEL', 'nova-2'),
+        'language': os.getenv('DEEPGRAM_STREAM_LANGUAGE', 'en'),
+        'interim_results': 'true',
+        'punctuate': 'true',
+        'smart_format': 'true',
+    }
+
+
+class DeepgramStreamConnection:
+    """
+    A single live Deepgram WebSocket.
+
+    Audio sent before the handshake completes is queued and flushed once the
+    socket is open, so callers never wait on the connection. A background
+    receiver collects Results frames; a keepalive thread stops Deepgram from
+    closing the socket between utterances.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        url: str = DEFAULT_STREAM_URL,
+        params: Optional[Dict[str, Any]] = None,
+        on_transcript: Optional[TranscriptCallback] = None,
+        keepalive_interval: float = 5.0,
+        connect_timeout: float = 5.0,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.params = params if params is not None else _default_stream_params()
+        self.on_transcript = on_transcript
+        self.keepalive_interval = keepalive_interval
+        self.connect_timeout = connect_timeout
+
+        self.used_container = False  # a WebM stream can't be followed by a second container
+        self.sample_rate: Optional[int] = None  # set for raw PCM streams
+        self.bytes_sent = 0
+        self._utterance_bytes = 0
+        self._ws = None
+        self._pending: List[bytes] = []
+        self._finals: List[str] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._opened = threading.Event()
+        self._closed = threading.Event()
+        self._finalized = threading.Event()
+        self._last_send = time.time()
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed.is_set()
+
+    @property
+    def has_audio(self) -> bool:
+        """Whether the current utterance has streamed any audio"""
+        return self._utterance_bytes > 0
+
+    def start(self):
+        """Open the WebSocket in the background"""
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        stream_url = f"{self.url}?{urlencode(self.params)}" if self.params else self.url
+        try:
+            ws = ws_connect(
+                stream_url,
+                additional_headers={"Authorization": f"Token {self.api_key}"},
+                open_timeout=self.connect_timeout,
+            )
+        except Exception as e:
+            logger.error(f"❌ Deepgram streaming: connection failed: {e}")
+            self._mark_closed()
+            return
+
+        with self._lock:
+            self._ws = ws
+            pending, self._pending = self._pending, []
+            try:
+                for chunk in pending:
+                    ws.send(chunk)
+                    self.bytes_sent += len(chunk)
+                self._last_send = time.time()
+            except Exception as e:
+                logger.error(f"❌ Deepgram streaming: failed to flush queued audio: {e}")
+        self._opened.set()
+        logger.info(f"✅ Deepgram streaming connection open ({len(pending)} queued chunk(s) flushed)")
+
+        threading.Thread(target=self._keepalive_loop, daemon=True).start()
+        self._receive_loop(ws)
+
+    def _receive_loop(self, ws):
+        try:
+            for message in ws:
+                if isinstance(message, bytes):
+                    continue
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    continue
+                if data.get('type') == 'Results':
+                    self._handle_results(data)
+        except Exception as e:
+            if not self._closed.is_set():
+                logger.warning(f"⚠️ Deepgram streaming receiver stopped: {e}")
+        finally:
+            self._mark_closed()
+
+    def _handle_results(self, data: Dict[str, Any]):
+        alternatives = (data.get('channel') or {}).get('alternatives') or [{}]
+        transcript = (alternatives[0].get('transcript') or '').strip()
+        is_final = bool(data.get('is_final'))
+
+        with self._lock:
+            if is_final and transcript:
+                self._finals.append(transcript)
+            parts = list(self._finals)
+        if transcript and not is_final:
+            parts.append(transcript)
+
+        if transcript and self.on_transcript:
+            try:
+                self.on_transcript(" ".join(parts), is_final)
+            except Exception as e:
+                logger.error(f"❌ Deepgram streaming transcript callback failed: {e}")
+
+        if data.get('from_finalize'):
+            self._finalized.set()
+
+    def _keepalive_loop(self):
+        keepalive = json.dumps({"type": "KeepAlive"})
+        while not self._closed.wait(self.keepalive_interval):
+            if time.time() - self._last_send >= self.keepalive_interval:
+                self._send_control(keepalive)
+
+    def _send_control(self, message: str) -> bool:
+        with self._lock:
+            if self._ws is None:
+                return False
+            try:
+                self._ws.send(message)
+                self._last_send = time.time()
+                return True
+            except Exception as e:
+                logger.warning(f"⚠️ Deepgram streaming control message failed: {e}")
+                return False
+
+    def _mark_closed(self):
+        self._closed.set()
+        self._opened.set()
+        self._finalized.set()  # unblock anyone waiting on finalize
+
+    def reset_utterance(self):
+        """Forget transcripts from the previous utterance"""
+        with self._lock:
+            self._finals = []
+            self._utterance_bytes = 0
+        self._finalized.clear()
+
+    def send_audio(self, chunk) -> bool:
+        """Forward an audio chunk (bytes, bytearray or memoryview)"""
+        if self._closed.is_set():
+            return False
+        if bytes(chunk[:4]) == WEBM_HEADER:
+            self.used_container = True
+        with self._lock:
+            self._utterance_bytes += len(chunk)
+            if self._ws is None:
+                self._pending.append(bytes(chunk))
+                return True
+            try:
+                self._ws.send(chunk)
+                self.bytes_sent += len(chunk)
+                self._last_send = time.time()
+                return True
+            except Exception as e:
+                logger.error(f"❌ Deepgram streaming send failed: {e}")
+                return False
+
+    def finalize(self, timeout: float = 2.0) -> str:
+        """
+        Flush Deepgram's buffered audio and return the utterance's final transcript
+
+        Args:
+            timeout: Max seconds to wait for the finalize response
+
+        Returns:
+            Final transcript (may be empty)
+        """
+        if not self._opened.wait(timeout):
+            logger.warning("⚠️ Deepgram streaming: connection not open at finalize")
+        elif self._send_control(json.dumps({"type": "Finalize"})):
+            if not self._finalized.wait(timeout):
+                logger.warning(f"⚠️ Deepgram streaming: finalize timed out after {timeout}s")
+
+        with self._lock:
+            return " ".join(self._finals).strip()
+
+    def close(self):
+        """Close the stream (Deepgram flushes remaining results before closing)"""
+        self._send_control(json.dumps({"type": "CloseStream"}))
+        with self._lock:
+            ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        self._mark_closed()
+
+
+class StreamingSTTManager:
+    """
+    Keeps one live Deepgram stream per voice session.
+
+    Raw PCM streams are reused across utterances. Browser MediaRecorder output
+    is a fresh WebM container per utterance, which Deepgram can't accept on an
+    already-used stream, so after each such utterance a spare connection is
+    opened right away and is ready by the time the user presses talk again.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, url: Optional[str] = None, params: Optional[Dict[str, Any]] = None):
+        self.api_key = api_key or os.getenv('DEEPGRAM_API_KEY')
+        self.url = url or os.getenv('DEEPGRAM_STREAM_URL', DEFAULT_STREAM_URL)
+        self.params = params
+        self.enabled = (
+            WEBSOCKETS_AVAILABLE
+            and bool(self.api_key)
+            and os.getenv('DEEPGRAM_STREAMING_STT', 'true').lower() == 'true'
+        )
+        self._active: Dict[str, DeepgramStreamConnection] = {}
+        self._spares: Dict[str, DeepgramStreamConnection] = {}
+        self._lock = threading.Lock()
+
+        if not self.enabled:
+            logger.info("ℹ️ Deepgram streaming STT disabled (websockets missing, no API key, or DEEPGRAM_STREAMING_STT=false)")
+
+    def _new_connection(self, sample_rate: Optional[int] = None) -> DeepgramStreamConnection:
+        params = dict(self.params if self.params is not None else _default_stream_params())
+        if sample_rate:
+            # Headerless PCM has to be described to Deepgram up front
+            params.update({'encoding': 'linear16', 'sample_rate': str(sample_rate), 'channels': '1'})
+        conn = DeepgramStreamConnection(api_key=self.api_key, url=self.url, params=params)
+        conn.sample_rate = sample_rate
+        conn.start()
+        return conn
+
+    def prewarm(self, session_id: str):
+        """Open a spare connection so the first utterance skips the handshake"""
+        if not self.enabled:
+            return
+        with self._lock:
+            spare = self._spares.get(session_id)
+            if spare is None or spare.is_closed:
+                self._spares[session_id] = self._new_connection()
+
+    def start_utterance(
+        self,
+        session_id: str,
+        on_transcript: Optional[TranscriptCallback] = None,
+        sample_rate: Optional[int] = None,
+    ) -> bool:
+        """
+        Attach a live stream to the session for the next utterance
+
+        Args:
+            session_id: Voice session id
+            on_transcript: Interim/final transcript callback
+            sample_rate: Sample rate of raw PCM16 audio; None for containerized audio (WebM)
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            conn = self._active.get(session_id)
+            if conn is None or conn.is_closed or conn.used_container or conn.sample_rate != sample_rate:
+                if conn is not None:
+                    threading.Thread(target=conn.close, daemon=True).start()
+                conn = self._spares.pop(session_id, None)
+                if conn is not None and conn.sample_rate != sample_rate:
+                    threading.Thread(target=conn.close, daemon=True).start()
+                    conn = None
+                if conn is None or conn.is_closed:
+                    conn = self._new_connection(sample_rate)
+                self._active[session_id] = conn
+        conn.on_transcript = on_transcript
+        conn.reset_utterance()
+        return True
+
+    def send_audio(self, session_id: str, chunk) -> bool:
+        """Forward an audio chunk to the session's live stream"""
+        conn = self._active.get(session_id)
+        if conn is None:
+            return False
+        return conn.send_audio(chunk)
+
+    def finish_utterance(self, session_id: str, timeout: float = 2.0) -> Optional[str]:
+        """
+        Finalize the current utterance
+
+        Returns:
+            Final transcript, or None if nothing was streamed or the stream
+            dropped (callers should fall back to batch transcription)
+        """
+        conn = self._active.get(session_id)
+        if conn is None or conn.is_closed or not conn.has_audio:
+            return None
+        transcript = conn.finalize(timeout)
+        conn.on_transcript = None
+        if conn.used_container:
+            self.prewarm(session_id)
+        return transcript
+
+    def close(self, session_id: str):
+        """Close all streams for a session (on disconnect)"""
+        with self._lock:
+            conns = [self._active.pop(session_id, None), self._spares.pop(session_id, None)]
+        for conn in conns:
+            if conn is not None:
+                threading.Thread(target=conn.close, daemon=True).start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'url': self.url,
+            'active_streams': sum(1 for c in self._active.values() if not c.is_closed),
+            'spare_streams': sum(1 for c in self._spares.values() if not c.is_closed),
+        }
+
+
+# Global streaming STT manager instance
+_streaming_stt_manager = None
+
+
+def get_streaming_stt_manager() -> StreamingSTTManager:
+    """Get the global streaming STT manager instance"""
+    global _streaming_stt_manager
+    if _streaming_stt_manager is None:
+        _streaming_stt_manager = StreamingSTTManager()
+    return _streaming_stt_manager
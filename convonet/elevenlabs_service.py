@@ -4,8 +4,11 @@ Provides voice cloning, emotional responses, and multilingual support
 """
 
 import os
+import asyncio
+import inspect
 import logging
-from typing import Optional, Dict, Any, List
+import weakref
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -18,6 +21,21 @@ except ImportError:
     ELEVENLABS_AVAILABLE = False
     logger.warning("ElevenLabs SDK not available. Install with: pip install elevenlabs")
 
+try:
+    from elevenlabs import AsyncElevenLabs
+    ASYNC_ELEVENLABS_AVAILABLE = True
+except ImportError:
+    ASYNC_ELEVENLABS_AVAILABLE = False
+
+from convonet.tts_cache import get_tts_cache
+
+# Shared keep-alive httpx pool; without it the SDK manages its own client
+try:
+    from convonet.http_client_pool import get_http_client_pool
+    HTTP_POOL_AVAILABLE = True
+except ImportError:
+    HTTP_POOL_AVAILABLE = False
+
 
 class EmotionType(str, Enum):
     """Emotion types for voice synthesis"""
@@ -40,11 +58,15 @@ class ElevenLabsService:
             raise ImportError("ElevenLabs SDK not available. Install with: pip install elevenlabs")
         
         self.api_key = api_key or os.getenv('ELEVENLABS_API_KEY')
+        self.http_pool = None
         if not self.api_key:
             logger.warning("⚠️ ELEVENLABS_API_KEY not set. ElevenLabs TTS will not work.")
             self.client = None
         else:
-            self.client = ElevenLabs(api_key=self.api_key)
+            self.client = self._create_client()
+        
+        # Per-event-loop async SDK clients sharing the pooled httpx connections
+        self._async_clients = weakref.WeakKeyDictionary()
         
         # Default voice settings
         self.default_voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel (default ElevenLabs voice)
@@ -108,6 +130,39 @@ class ElevenLabsService:
             }
         }
     
+    def _create_client(self):
+        """Sync SDK client on the shared pool (voices, cloning and the sync TTS fallback)"""
+        if HTTP_POOL_AVAILABLE:
+            try:
+                self.http_pool = get_http_client_pool()
+                return ElevenLabs(
+                    api_key=self.api_key,
+                    httpx_client=self.http_pool.sync_client("elevenlabs"),
+                    timeout=self.http_pool.config("elevenlabs").read_timeout
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ ElevenLabs: shared HTTP pool unavailable, using SDK default client: {e}")
+        self.http_pool = None
+        return ElevenLabs(api_key=self.api_key)
+    
+    def _async_client(self):
+        """Async SDK client for the running loop, on the pooled async httpx client"""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncElevenLabs(
+                api_key=self.api_key,
+                httpx_client=self.http_pool.async_client("elevenlabs"),
+                timeout=self.http_pool.config("elevenlabs").read_timeout
+            )
+            self._async_clients[loop] = client
+        return client
+    
+    @property
+    def async_enabled(self) -> bool:
+        """TTS goes through asynthesize on the shared pool (else the sync SDK path)"""
+        return ASYNC_ELEVENLABS_AVAILABLE and self.http_pool is not None
+    
     def is_available(self) -> bool:
         """Check if ElevenLabs service is available"""
         return ELEVENLABS_AVAILABLE and self.client is not None
@@ -141,6 +196,32 @@ class ElevenLabsService:
             logger.error("❌ ElevenLabs service not available")
             return None
         
+        settings = {
+            "stability": stability,
+            "similarity_boost": similarity_boost,
+            "style": style,
+            "use_speaker_boost": use_speaker_boost
+        }
+        return get_tts_cache().get_or_synthesize(
+            "elevenlabs", text,
+            lambda: self._synthesize_uncached(text, voice_id, model, stability, similarity_boost, style, use_speaker_boost),
+            voice_id=voice_id or self.default_voice_id,
+            model=model or self.default_model,
+            settings=settings
+        )
+    
+    def _synthesize_uncached(self, text, voice_id, model, stability, similarity_boost, style, use_speaker_boost) -> Optional[bytes]:
+        """Synthesize via the API, bypassing the TTS cache"""
+        if self.async_enabled:
+            try:
+                return self.http_pool.run(
+                    self.asynthesize(text, voice_id, model, stability, similarity_boost, style, use_speaker_boost),
+                    timeout=self.http_pool.config("elevenlabs").read_timeout + 5
+                )
+            except Exception as e:
+                logger.error(f"❌ ElevenLabs TTS synthesis failed: {e}")
+                return None
+        
         try:
             logger.info(f"🔊 ElevenLabs TTS: Synthesizing speech for text: '{text[:50]}...'")
             
@@ -205,6 +286,144 @@ class ElevenLabsService:
             traceback.print_exc()
             return None
     
+    async def asynthesize(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        style: float = 0.5,
+        use_speaker_boost: bool = True
+    ) -> Optional[bytes]:
+        """
+        Async synthesize() over the shared connection pool (same arguments)
+        
+        Returns:
+            Audio bytes (MP3 format) or None if failed
+        """
+        if not self.is_available() or not self.async_enabled:
+            logger.error("❌ ElevenLabs async TTS not available")
+            return None
+        
+        try:
+            logger.info(f"🔊 ElevenLabs TTS (async): Synthesizing speech for text: '{text[:50]}...'")
+            voice_settings = VoiceSettings(
+                stability=stability,
+                similarity_boost=similarity_boost,
+                style=style,
+                use_speaker_boost=use_speaker_boost
+            )
+            audio_stream = self._async_client().text_to_speech.convert(
+                voice_id=voice_id or self.default_voice_id,
+                text=text,
+                model_id=model or self.default_model,
+                voice_settings=voice_settings
+            )
+            # Some SDK versions return a coroutine resolving to the stream
+            if inspect.isawaitable(audio_stream):
+                audio_stream = await audio_stream
+            audio_bytes = b"".join([chunk async for chunk in audio_stream])
+            
+            logger.info(f"✅ ElevenLabs TTS successful: {len(audio_bytes)} bytes")
+            return audio_bytes
+        
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ ElevenLabs async TTS synthesis failed: {e}")
+            return None
+    
+    def synthesize_stream(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        style: float = 0.5,
+        use_speaker_boost: bool = True
+    ) -> Iterator[bytes]:
+        """
+        Streaming synthesize(): yields MP3 chunks as ElevenLabs sends them, so
+        playback can start on the first chunk (cached clips are yielded whole)
+        
+        Args:
+            Same as synthesize()
+            
+        Yields:
+            Audio chunks (MP3 format); errors end the stream early
+        """
+        if not self.is_available():
+            logger.error("❌ ElevenLabs service not available")
+            return
+        
+        voice_settings = {
+            "stability": stability,
+            "similarity_boost": similarity_boost,
+            "style": style,
+            "use_speaker_boost": use_speaker_boost
+        }
+        voice_id = voice_id or self.default_voice_id
+        model = model or self.default_model
+        
+        def provider_stream():
+            if self.async_enabled:
+                return self.http_pool.iterate(
+                    self.asynthesize_stream(text, voice_id, model, **voice_settings),
+                    timeout=self.http_pool.config("elevenlabs").read_timeout + 5
+                )
+            return self._stream_sync(text, voice_id, model, VoiceSettings(**voice_settings))
+        
+        try:
+            yield from get_tts_cache().stream_or_synthesize(
+                "elevenlabs", text, provider_stream,
+                voice_id=voice_id, model=model, settings=voice_settings
+            )
+        except Exception as e:
+            logger.error(f"❌ ElevenLabs streaming TTS failed: {e}")
+    
+    def _stream_sync(self, text: str, voice_id: str, model: str, voice_settings) -> Iterator[bytes]:
+        logger.info(f"🔊 ElevenLabs TTS (stream): Synthesizing speech for text: '{text[:50]}...'")
+        tts = self.client.text_to_speech
+        # stream() uses the streaming endpoint; convert() also returns a chunk generator on older SDKs
+        convert = tts.stream if hasattr(tts, 'stream') else tts.convert
+        for chunk in convert(voice_id=voice_id, text=text, model_id=model, voice_settings=voice_settings):
+            if chunk:
+                yield chunk
+    
+    async def asynthesize_stream(
+        self,
+        text: str,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+        stability: float = 0.5,
+        similarity_boost: float = 0.75,
+        style: float = 0.5,
+        use_speaker_boost: bool = True
+    ) -> AsyncIterator[bytes]:
+        """Async generator over the MP3 chunks of an ElevenLabs streaming TTS response"""
+        logger.info(f"🔊 ElevenLabs TTS (async stream): Synthesizing speech for text: '{text[:50]}...'")
+        voice_settings = VoiceSettings(
+            stability=stability,
+            similarity_boost=similarity_boost,
+            style=style,
+            use_speaker_boost=use_speaker_boost
+        )
+        tts = self._async_client().text_to_speech
+        convert = tts.stream if hasattr(tts, 'stream') else tts.convert
+        audio_stream = convert(
+            voice_id=voice_id or self.default_voice_id,
+            text=text,
+            model_id=model or self.default_model,
+            voice_settings=voice_settings
+        )
+        if inspect.isawaitable(audio_stream):
+            audio_stream = await audio_stream
+        async for chunk in audio_stream:
+            if chunk:
+                yield chunk
+    
     def synthesize_with_emotion(
         self,
         text: str,
@@ -239,6 +458,18 @@ class ElevenLabsService:
             **settings
         )
     
+    def synthesize_stream_with_emotion(
+        self,
+        text: str,
+        emotion: EmotionType,
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """Streaming synthesize_with_emotion(): yields MP3 chunks as they arrive"""
+        settings = self.emotion_settings.get(emotion, self.emotion_settings[EmotionType.NEUTRAL])
+        logger.info(f"🎭 ElevenLabs streaming TTS with emotion '{emotion.value}': '{text[:50]}...'")
+        return self.synthesize_stream(text=text, voice_id=voice_id, model=model, **settings)
+    
     def synthesize_multilingual(
         self,
         text: str,
@@ -7,10 +7,14 @@ import gc
 import json
 import os
 import sys
+import time
 from typing import Optional, Dict, Any, Callable, List
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
 from langchain_core.tools import BaseTool
 
+from .prompt_cache import get_gemini_context_cache, record_usage, usage_from_gemini
+from .tool_registry import get_tool_registry
+
 try:
     from google import genai
     from google.genai import types
@@ -20,6 +24,83 @@ except ImportError:
     print("⚠️ Google GenAI SDK not available. Install with: pip install google-genai")
 
 
+GEMINI_TOOL_TIMEOUT = 15.0  # MCP tools can take time, especially calendar operations
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+GEMINI_TOOL_CONCURRENCY = max(1, _env_int('GEMINI_TOOL_CONCURRENCY', 4))
+
+
+async def _execute_tool_call(
+    registry,
+    tc: Dict[str, Any],
+    semaphore: asyncio.Semaphore,
+    batch_start: float,
+) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    Run one Gemini tool call
+    
+    Returns:
+        (result fed back to Gemini, agent monitor entry or None if the tool is unknown).
+        The monitor entry attributes the call's own duration_ms and the queued_ms
+        it waited for a concurrency slot.
+    """
+    tool_name = tc.get('name', 'unknown')
+    tool_args = tc.get('args', {})
+    tool_id = tc.get('id')
+    
+    tool = registry.get(tool_name)
+    if not tool:
+        print(f"⚠️ Tool {tool_name} not found", flush=True)
+        return {'name': tool_name, 'id': tool_id, 'response': f"Tool {tool_name} not found"}, None
+    
+    invalid_args = registry.validate(tool_name, tool_args)
+    if invalid_args:
+        # Malformed call - let the model correct it instead of round-tripping to the tool
+        print(f"⚠️ Rejected {tool_name} call: {invalid_args}", flush=True)
+        return (
+            {'name': tool_name, 'id': tool_id, 'response': f"Invalid arguments for {tool_name}: {invalid_args}"},
+            {'result': None, 'status': 'failed', 'error': invalid_args, 'duration_ms': 0.0},
+        )
+    
+    async with semaphore:
+        tool_start_time = time.perf_counter()
+        timing = {'queued_ms': (tool_start_time - batch_start) * 1000}
+        try:
+            print(f"🔧 Executing tool: {tool_name} with args: {tool_args}", flush=True)
+            if hasattr(tool, 'ainvoke'):
+                result = await asyncio.wait_for(tool.ainvoke(tool_args), timeout=GEMINI_TOOL_TIMEOUT)
+            else:
+                result = await asyncio.wait_for(asyncio.to_thread(tool.invoke, tool_args), timeout=GEMINI_TOOL_TIMEOUT)
+            tool_duration_ms = (time.perf_counter() - tool_start_time) * 1000
+            print(f"✅ Tool {tool_name} completed in {tool_duration_ms:.0f}ms: {str(result)[:100]}...", flush=True)
+            return (
+                {'name': tool_name, 'id': tool_id, 'response': str(result)},
+                {'result': str(result), 'status': 'success', 'error': None, 'duration_ms': tool_duration_ms, **timing},
+            )
+        except asyncio.TimeoutError:
+            tool_duration_ms = (time.perf_counter() - tool_start_time) * 1000
+            print(f"⏰ Tool {tool_name} timed out", flush=True)
+            return (
+                {'name': tool_name, 'id': tool_id, 'response': "I'm sorry, the operation timed out. Please try again."},
+                {'result': None, 'status': 'timeout', 'error': 'Tool execution timed out', 'duration_ms': tool_duration_ms, **timing},
+            )
+        except Exception as e:
+            tool_duration_ms = (time.perf_counter() - tool_start_time) * 1000
+            error_str = str(e)
+            print(f"❌ Tool {tool_name} error: {error_str}", flush=True)
+            return (
+                {'name': tool_name, 'id': tool_id, 'response': f"I encountered an error: {error_str[:200]}"},
+                {'result': None, 'status': 'failed', 'error': error_str[:200], 'duration_ms': tool_duration_ms, **timing},
+            )
+
+
 class GeminiStreamingHandler:
     """
     Handles Gemini streaming using native SDK while maintaining LangGraph compatibility
@@ -38,6 +119,7 @@ class GeminiStreamingHandler:
         self.api_key = api_key
         self.model = model
         self.tools = tools or []
+        self.registry = get_tool_registry(self.tools)
         self.system_prompt = system_prompt
         self.on_text_chunk = on_text_chunk
         self.on_tool_call = on_tool_call
@@ -52,137 +134,9 @@ class GeminiStreamingHandler:
         # Don't create duplicate client - use self.client.aio if available
         self._response_stream = None  # Track active stream for cleanup
     
-    def _resolve_schema_refs(self, schema: Dict[str, Any], defs: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Resolve $ref references in JSON Schema to flat schema"""
-        if defs is None:
-            defs = schema.get("$defs", {})
-        
-        if not isinstance(schema, dict):
-            return schema
-        
-        resolved = {}
-        for key, value in schema.items():
-            if key == "$ref":
-                # Resolve reference
-                ref_path = value
-                if ref_path.startswith("#/$defs/"):
-                    ref_name = ref_path.split("/")[-1]
-                    if ref_name in defs:
-                        # Recursively resolve the referenced schema
-                        resolved.update(self._resolve_schema_refs(defs[ref_name], defs))
-                    else:
-                        # Reference not found, use string type as fallback
-                        resolved = {"type": "string"}
-                else:
-                    # External reference, use string as fallback
-                    resolved = {"type": "string"}
-            elif key == "anyOf":
-                # Handle anyOf - take first option and resolve it
-                if isinstance(value, list) and len(value) > 0:
-                    first_option = value[0]
-                    if isinstance(first_option, dict) and "$ref" in first_option:
-                        resolved.update(self._resolve_schema_refs(first_option, defs))
-                    else:
-                        resolved.update(self._resolve_schema_refs(first_option, defs))
-            elif isinstance(value, dict):
-                resolved[key] = self._resolve_schema_refs(value, defs)
-            elif isinstance(value, list):
-                resolved[key] = [self._resolve_schema_refs(item, defs) if isinstance(item, dict) else item for item in value]
-            else:
-                resolved[key] = value
-        
-        return resolved
-    
     def _convert_tools_to_gemini_format(self) -> List[Dict[str, Any]]:
-        """Convert LangChain tools to Gemini function declarations"""
-        gemini_tools = []
-        for tool in self.tools:
-            # Get tool schema - handle both Pydantic models and dicts
-            schema = {}
-            defs = {}
-            try:
-                if hasattr(tool, 'args_schema') and tool.args_schema:
-                    # Check if args_schema is a Pydantic model (has schema() method)
-                    if hasattr(tool.args_schema, 'schema'):
-                        schema = tool.args_schema.schema()
-                    # Check if args_schema is already a dict
-                    elif isinstance(tool.args_schema, dict):
-                        schema = tool.args_schema
-                    # Try get_input_schema() method (LangChain standard)
-                    elif hasattr(tool, 'get_input_schema'):
-                        schema = tool.get_input_schema().schema() if hasattr(tool.get_input_schema(), 'schema') else tool.get_input_schema()
-                # Fallback: try get_input_schema() directly on tool
-                elif hasattr(tool, 'get_input_schema'):
-                    input_schema = tool.get_input_schema()
-                    if hasattr(input_schema, 'schema'):
-                        schema = input_schema.schema()
-                    elif isinstance(input_schema, dict):
-                        schema = input_schema
-                
-                # Extract $defs if present
-                if isinstance(schema, dict):
-                    defs = schema.get("$defs", {})
-                    # Resolve $ref references in schema
-                    schema = self._resolve_schema_refs(schema, defs)
-                    
-            except Exception as e:
-                print(f"⚠️ Error getting schema for tool {tool.name}: {e}", flush=True)
-                import traceback
-                traceback.print_exc()
-                # Use empty schema as fallback
-                schema = {}
-            
-            # Convert to Gemini format - ensure properties don't have $ref
-            properties = schema.get("properties", {})
-            # Clean properties - remove any remaining $ref or $defs
-            cleaned_properties = {}
-            for prop_name, prop_schema in properties.items():
-                if isinstance(prop_schema, dict):
-                    # Remove $ref, $defs, and anyOf with $ref
-                    cleaned_prop = {k: v for k, v in prop_schema.items() 
-                                   if k not in ["$ref", "$defs"] and 
-                                   not (k == "anyOf" and isinstance(v, list) and any(isinstance(item, dict) and "$ref" in item for item in v))}
-                    # If anyOf exists without $ref, use first option
-                    if "anyOf" in cleaned_prop and isinstance(cleaned_prop["anyOf"], list) and len(cleaned_prop["anyOf"]) > 0:
-                        first_option = cleaned_prop["anyOf"][0]
-                        if isinstance(first_option, dict) and "$ref" not in first_option:
-                            cleaned_prop = first_option
-                        elif isinstance(first_option, dict):
-                            # Still has $ref, use enum if available, else string
-                            if "enum" in first_option:
-                                cleaned_prop = {"type": "string", "enum": first_option["enum"]}
-                            else:
-                                cleaned_prop = {"type": "string"}
-                    cleaned_properties[prop_name] = cleaned_prop
-                else:
-                    cleaned_properties[prop_name] = prop_schema
-            
-            # Convert to Gemini format
-            gemini_tool = {
-                "function_declarations": [{
-                    "name": tool.name,
-                    "description": tool.description or "",
-                    "parameters": {
-                        "type": "OBJECT",
-                        "properties": cleaned_properties,
-                        "required": schema.get("required", [])
-                    }
-                }]
-            }
-            gemini_tools.append(gemini_tool)
-        
-        print(f"🔧 Converted {len(gemini_tools)} tools to Gemini format", flush=True)
-        if len(gemini_tools) > 0:
-            first_tool_decl = gemini_tools[0].get('function_declarations', [{}])
-            if first_tool_decl:
-                print(f"🔧 First tool: {first_tool_decl[0].get('name', 'unknown')}", flush=True)
-                print(f"🔧 First tool description: {first_tool_decl[0].get('description', '')[:50]}...", flush=True)
-            else:
-                print(f"⚠️ First tool has no function_declarations", flush=True)
-        else:
-            print(f"⚠️ No tools converted!", flush=True)
-        
-        return gemini_tools
+        """Gemini function declarations for the handler's tools (converted once per toolset)"""
+        return self.registry.gemini_tools()
     
     async def stream_response(
         self,
@@ -390,6 +344,14 @@ class GeminiStreamingHandler:
             else:
                 print(f"⚠️ No tools_config to add to request", flush=True)
             
+            # Serve the system instruction and tool declarations from a context cache when one can be made
+            cached_content = await get_gemini_context_cache().get(
+                self.client, self.model, system_instruction, generation_config.get("tools", [])
+            )
+            if cached_content:
+                generation_config = {"temperature": 0.0, "cached_content": cached_content}
+                system_instruction = None  # Part of the cached prefix
+            
             # Add generation config to request
             request_params["config"] = generation_config
             
@@ -419,6 +381,9 @@ class GeminiStreamingHandler:
             
             # Use async generate_content_stream for streaming
             response_stream = None
+            request_started = time.perf_counter()
+            first_chunk_ms = None
+            usage_metadata = None
             try:
                 if hasattr(self.client, 'aio'):
                     try:
@@ -489,6 +454,11 @@ class GeminiStreamingHandler:
                             raise
                 
                 async for chunk in response_stream:
+                    if first_chunk_ms is None:
+                        first_chunk_ms = (time.perf_counter() - request_started) * 1000
+                    # Token counts (incl. cached_content_token_count) arrive with the last chunk
+                    if getattr(chunk, 'usage_metadata', None) is not None:
+                        usage_metadata = chunk.usage_metadata
                     # Debug: Log chunk structure (first chunk only)
                     if len(tool_calls) == 0 and full_text == "":
                         chunk_attrs = [attr for attr in dir(chunk) if not attr.startswith('_')]
@@ -719,6 +689,13 @@ class GeminiStreamingHandler:
                 else:
                     print(f"⚠️ No tool calls detected in streaming response", flush=True)
                 
+                record_usage(
+                    "gemini",
+                    usage_from_gemini(usage_metadata),
+                    latency_ms=(time.perf_counter() - request_started) * 1000,
+                    ttft_ms=first_chunk_ms,
+                )
+                
                 # Call completion callback
                 if self.on_complete:
                     self.on_complete(full_text, tool_calls)
@@ -742,6 +719,9 @@ class GeminiStreamingHandler:
                     
         except Exception as e:
             print(f"❌ Gemini streaming error: {e}", flush=True)
+            if 'cached_content' in locals() and cached_content and "cache" in str(e).lower():
+                # The context cache expired or was deleted server-side; recreate it on the next request
+                get_gemini_context_cache().invalidate(cached_content)
             import traceback
             traceback.print_exc()
             # Ensure cleanup even on error
@@ -760,6 +740,7 @@ async def stream_gemini_with_tools(
     messages: List[Any],
     socketio=None,
     session_id: Optional[str] = None,
+    on_text_chunk: Optional[Callable[[str], None]] = None,
 ) -> tuple[str, List[Dict[str, Any]]]:
     """
     Convenience function to stream Gemini response with tool support and execution
@@ -773,13 +754,15 @@ async def stream_gemini_with_tools(
         messages: Conversation history
         socketio: Optional SocketIO instance for real-time emission
         session_id: Optional session ID
+        on_text_chunk: Optional callback receiving each streamed text delta
         
     Returns:
         Tuple of (response_text, tool_calls)
     """
     text_chunks = []
     all_tool_calls = []
-    all_tool_results = {}  # Track tool results by tool_id: {result, status, error, duration_ms}
+    text_chunk_callback = on_text_chunk
+    all_tool_results = {}  # Track tool results by tool_id: {result, status, error, duration_ms, queued_ms}
     conversation_messages = messages + [HumanMessage(content=prompt)]
     max_iterations = 5  # Prevent infinite loops
     iteration = 0  # Track current iteration
@@ -787,6 +770,11 @@ async def stream_gemini_with_tools(
     def on_text_chunk(chunk: str):
         """Emit text chunk via WebSocket"""
         text_chunks.append(chunk)
+        if text_chunk_callback:
+            try:
+                text_chunk_callback(chunk)
+            except Exception as e:
+                print(f"⚠️ on_text_chunk callback failed: {e}", flush=True)
         if socketio and session_id:
             socketio.emit(
                 'agent_stream_chunk',
@@ -839,104 +827,31 @@ async def stream_gemini_with_tools(
             if tool_calls and len(tool_calls) > 0:
                 print(f"🔧 Executing {len(tool_calls)} tool call(s) from Gemini...", flush=True)
                 
-                # Execute each tool call
-                tool_results = []
+                # Assign ids up front so results line up with the calls
                 for tc in tool_calls:
-                    tool_name = tc.get('name', 'unknown')
-                    tool_args = tc.get('args', {})
-                    tool_id = tc.get('id', None)
-                    
-                    # Generate tool_id if missing (needed for tracking)
-                    if not tool_id:
+                    if not tc.get('id'):
                         import uuid
-                        tool_id = f"gemini_tool_{uuid.uuid4().hex[:12]}"
-                        tc['id'] = tool_id  # Update the tool call dict with generated ID
-                        print(f"🔧 Generated tool_id for {tool_name}: {tool_id}", flush=True)
-                    
-                    # Find the tool
-                    tool = None
-                    for t in tools:
-                        if t.name == tool_name:
-                            tool = t
-                            break
-                    
-                    if tool:
-                        import time as tool_time
-                        tool_start_time = tool_time.time()
-                        try:
-                            print(f"🔧 Executing tool: {tool_name} with args: {tool_args}", flush=True)
-                            # Execute tool (with timeout) - increased from 6s to 15s for MCP tools
-                            tool_timeout = 15.0  # MCP tools can take time, especially calendar operations
-                            if hasattr(tool, 'ainvoke'):
-                                result = await asyncio.wait_for(tool.ainvoke(tool_args), timeout=tool_timeout)
-                            else:
-                                result = await asyncio.wait_for(asyncio.to_thread(tool.invoke, tool_args), timeout=tool_timeout)
-                            
-                            tool_duration_ms = (tool_time.time() - tool_start_time) * 1000
-                            tool_result = {
-                                'name': tool_name,
-                                'id': tool_id,
-                                'response': str(result)
-                            }
-                            tool_results.append(tool_result)
-                            
-                            # Track result for agent monitor
-                            if tool_id:
-                                all_tool_results[tool_id] = {
-                                    'result': str(result),
-                                    'status': 'success',
-                                    'error': None,
-                                    'duration_ms': tool_duration_ms
-                                }
-                            
-                            print(f"✅ Tool {tool_name} completed: {str(result)[:100]}...", flush=True)
-                        except asyncio.TimeoutError:
-                            tool_duration_ms = (tool_time.time() - tool_start_time) * 1000
-                            tool_result = {
-                                'name': tool_name,
-                                'id': tool_id,
-                                'response': "I'm sorry, the operation timed out. Please try again."
-                            }
-                            tool_results.append(tool_result)
-                            
-                            # Track timeout for agent monitor
-                            if tool_id:
-                                all_tool_results[tool_id] = {
-                                    'result': None,
-                                    'status': 'timeout',
-                                    'error': 'Tool execution timed out',
-                                    'duration_ms': tool_duration_ms
-                                }
-                            
-                            print(f"⏰ Tool {tool_name} timed out", flush=True)
-                        except Exception as e:
-                            tool_duration_ms = (tool_time.time() - tool_start_time) * 1000
-                            error_str = str(e)
-                            tool_result = {
-                                'name': tool_name,
-                                'id': tool_id,
-                                'response': f"I encountered an error: {error_str[:200]}"
-                            }
-                            tool_results.append(tool_result)
-                            
-                            # Track error for agent monitor
-                            if tool_id:
-                                all_tool_results[tool_id] = {
-                                    'result': None,
-                                    'status': 'failed',
-                                    'error': error_str[:200],
-                                    'duration_ms': tool_duration_ms
-                                }
-                            
-                            print(f"❌ Tool {tool_name} error: {error_str}", flush=True)
-                    else:
-                        tool_result = {
-                            'name': tool_name,
-                            'id': tool_id,
-                            'response': f"Tool {tool_name} not found"
-                        }
-                        tool_results.append(tool_result)
-                        print(f"⚠️ Tool {tool_name} not found", flush=True)
+                        tc['id'] = f"gemini_tool_{uuid.uuid4().hex[:12]}"
+                        print(f"🔧 Generated tool_id for {tc.get('name', 'unknown')}: {tc['id']}", flush=True)
+                
+                # Calls from one response are independent - run them concurrently (up to GEMINI_TOOL_CONCURRENCY)
+                semaphore = asyncio.Semaphore(GEMINI_TOOL_CONCURRENCY)
+                batch_start = time.perf_counter()
+                outcomes = await asyncio.gather(*[
+                    _execute_tool_call(handler.registry, tc, semaphore, batch_start) for tc in tool_calls
+                ])
+                batch_ms = (time.perf_counter() - batch_start) * 1000
+                
+                tool_results = []
+                for tc, (tool_result, result_info) in zip(tool_calls, outcomes):
+                    tool_results.append(tool_result)
+                    # Track result for agent monitor
+                    if result_info is not None:
+                        all_tool_results[tc['id']] = result_info
+                if len(tool_calls) > 1:
+                    busy_ms = sum(info['duration_ms'] for _, info in outcomes if info)
+                    print(f"⚡ {len(tool_calls)} tools finished in {batch_ms:.0f}ms "
+                          f"({busy_ms:.0f}ms if run one after another, concurrency {GEMINI_TOOL_CONCURRENCY})", flush=True)
                 
                 # Add tool results to conversation as ToolMessages
                 import uuid
@@ -995,6 +910,7 @@ async def stream_gemini_with_tools(
                 enriched_tc['status'] = result_info.get('status', 'pending')
                 enriched_tc['error'] = result_info.get('error')
                 enriched_tc['duration_ms'] = result_info.get('duration_ms')
+                enriched_tc['queued_ms'] = result_info.get('queued_ms')
             enriched_tool_calls.append(enriched_tc)
         
         return final_text, enriched_tool_calls
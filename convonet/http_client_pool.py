@@ -0,0 +1,320 @@
+"""
+HTTP Client Pool
+Shared keep-alive httpx clients for the speech providers (Deepgram, ElevenLabs):
+per-provider connection limits and timeouts, HTTP/2 when h2 is installed, and
+request/handshake counters so connection reuse can be checked in production
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Optional, Dict, Any, Coroutine, AsyncIterator, Iterator
+
+from convonet.agent_runtime import get_agent_runtime
+from convonet.loop_thread import real_lock
+
+logger = logging.getLogger(__name__)
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# provider: (base_url, max_connections, max_keepalive_connections, read_timeout)
+PROVIDER_DEFAULTS = {
+    "deepgram": ("https://api.deepgram.com", 20, 10, 30.0),
+    "elevenlabs": ("https://api.elevenlabs.io", 10, 5, 60.0),
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class ProviderConfig:
+    """Pool limits and timeouts for one provider (HTTP_POOL_<PROVIDER>_* overrides)"""
+
+    def __init__(self, name: str):
+        base_url, max_connections, max_keepalive, read_timeout = PROVIDER_DEFAULTS.get(name, ("", 10, 5, 30.0))
+        prefix = f"HTTP_POOL_{name.upper()}_"
+        self.name = name
+        self.base_url = base_url
+        self.max_connections = _env_int(prefix + "MAX_CONNECTIONS", max_connections)
+        self.max_keepalive = _env_int(prefix + "MAX_KEEPALIVE", max_keepalive)
+        self.keepalive_expiry = _env_float(prefix + "KEEPALIVE_EXPIRY", 60.0)
+        self.connect_timeout = _env_float(prefix + "CONNECT_TIMEOUT", 5.0)
+        self.read_timeout = _env_float(prefix + "READ_TIMEOUT", read_timeout)
+        self.http2 = HTTP2_AVAILABLE and os.getenv(prefix + "HTTP2", "true").lower() == "true"
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            "http2": self.http2,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "keepalive_expiry": self.keepalive_expiry,
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+            "http2": self.http2,
+        }
+
+
+class ProviderStats:
+    """Request and handshake counters for one provider"""
+
+    def __init__(self):
+        self._lock = real_lock()  # Async hooks run on the runtime loop's OS thread
+        self.requests = 0
+        self.responses = 0
+        self.errors = 0
+        self.tcp_connects = 0
+        self.tls_handshakes = 0
+        self.http2_responses = 0
+        self.total_ttfb_ms = 0.0
+        self.max_ttfb_ms = 0.0
+
+    def on_trace(self, event_name: str):
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.tcp_connects += 1
+            elif event_name == "connection.start_tls.complete":
+                self.tls_handshakes += 1
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_response(self, status_code: int, http_version: str, ttfb_ms: Optional[float]):
+        with self._lock:
+            self.responses += 1
+            if status_code >= 400:
+                self.errors += 1
+            if http_version == "HTTP/2":
+                self.http2_responses += 1
+            if ttfb_ms is not None:
+                self.total_ttfb_ms += ttfb_ms
+                self.max_ttfb_ms = max(self.max_ttfb_ms, ttfb_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "responses": self.responses,
+                "errors": self.errors,
+                "tcp_connects": self.tcp_connects,
+                "tls_handshakes": self.tls_handshakes,
+                # Share of requests that rode an existing connection
+                "connection_reuse_rate": round(1 - self.tcp_connects / self.requests, 3) if self.requests else None,
+                "http2_responses": self.http2_responses,
+                "avg_ttfb_ms": round(self.total_ttfb_ms / self.responses, 1) if self.responses else None,
+                "max_ttfb_ms": round(self.max_ttfb_ms, 1),
+            }
+
+
+class HTTPClientPool:
+    """
+    Process-wide httpx clients, one per provider.
+
+    Async clients are bound to an event loop, so one is kept per loop. Sync
+    callers go through ``run``, which executes the provider's async method on
+    the agent runtime's I/O loop - every thread then shares a single
+    connection pool per provider (and one multiplexed HTTP/2 connection where
+    the server supports it). A blocking ``sync_client`` is also available for
+    SDKs that only take a sync httpx client.
+
+    Every request is traced, so TCP connects and TLS handshakes are counted
+    alongside requests; a healthy pool shows far fewer handshakes than requests.
+    """
+
+    def __init__(self):
+        if not HTTPX_AVAILABLE:
+            raise ImportError("httpx not available. Install with: pip install httpx")
+        self._configs: Dict[str, ProviderConfig] = {}
+        self._stats: Dict[str, ProviderStats] = {}
+        self._sync_clients: Dict[str, "httpx.Client"] = {}
+        self._async_clients = weakref.WeakKeyDictionary()  # loop -> {provider: AsyncClient}
+        self._lock = real_lock()
+
+    def config(self, provider: str) -> ProviderConfig:
+        with self._lock:
+            if provider not in self._configs:
+                self._configs[provider] = ProviderConfig(provider)
+                self._stats[provider] = ProviderStats()
+            return self._configs[provider]
+
+    def stats(self, provider: str) -> ProviderStats:
+        self.config(provider)
+        return self._stats[provider]
+
+    def _sync_hooks(self, stats: ProviderStats) -> Dict[str, Any]:
+        def trace(event_name, info):
+            stats.on_trace(event_name)
+
+        def on_request(request):
+            stats.on_request()
+            request.extensions["trace"] = trace
+            request.extensions["pool_started_at"] = time.perf_counter()
+
+        def on_response(response):
+            started = response.request.extensions.get("pool_started_at")
+            ttfb_ms = (time.perf_counter() - started) * 1000 if started else None
+            stats.on_response(response.status_code, response.http_version, ttfb_ms)
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def _async_hooks(self, stats: ProviderStats) -> Dict[str, Any]:
+        async def trace(event_name, info):
+            stats.on_trace(event_name)
+
+        async def on_request(request):
+            stats.on_request()
+            request.extensions["trace"] = trace
+            request.extensions["pool_started_at"] = time.perf_counter()
+
+        async def on_response(response):
+            started = response.request.extensions.get("pool_started_at")
+            ttfb_ms = (time.perf_counter() - started) * 1000 if started else None
+            stats.on_response(response.status_code, response.http_version, ttfb_ms)
+
+        return {"request": [on_request], "response": [on_response]}
+
+    def sync_client(self, provider: str) -> "httpx.Client":
+        """Shared blocking client for the provider (thread-safe)"""
+        config = self.config(provider)
+        with self._lock:
+            client = self._sync_clients.get(provider)
+            if client is None:
+                client = httpx.Client(
+                    base_url=config.base_url,
+                    event_hooks=self._sync_hooks(self._stats[provider]),
+                    **config.client_kwargs()
+                )
+                self._sync_clients[provider] = client
+            return client
+
+    def async_client(self, provider: str) -> "httpx.AsyncClient":
+        """Async client for the provider, bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        config = self.config(provider)
+        with self._lock:
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                clients = self._async_clients[loop] = {}
+            client = clients.get(provider)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    base_url=config.base_url,
+                    event_hooks=self._async_hooks(self._stats[provider]),
+                    **config.client_kwargs()
+                )
+                clients[provider] = client
+            return client
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None):
+        """
+        Run an async provider call from sync code on the agent runtime's I/O loop
+
+        Under eventlet the wait yields to other green threads (see loop_thread).
+
+        Raises:
+            asyncio.TimeoutError: the call did not finish within timeout (it is cancelled)
+        """
+        return get_agent_runtime().io_loop.run(coro, timeout=timeout)
+
+    def iterate(self, agen: AsyncIterator, timeout: Optional[float] = None) -> Iterator:
+        """
+        Consume an async generator (e.g. a streamed provider response) from sync
+        code, one item at a time on the agent runtime's I/O loop
+
+        Args:
+            agen: Async generator to drain
+            timeout: Max seconds to wait for each item
+
+        Closing the returned generator early closes ``agen`` too, which releases
+        the underlying HTTP response.
+        """
+        done = object()
+
+        async def next_item():
+            try:
+                return await agen.__anext__()
+            except StopAsyncIteration:
+                return done
+
+        try:
+            while True:
+                item = self.run(next_item(), timeout=timeout)
+                if item is done:
+                    return
+                yield item
+        finally:
+            try:
+                self.run(agen.aclose(), timeout=5)
+            except Exception as e:
+                logger.debug(f"Async stream close failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = list(self._configs)
+            async_loops = len(self._async_clients)
+        return {
+            "http2_available": HTTP2_AVAILABLE,
+            "async_loops": async_loops,
+            "providers": {
+                name: {**self._stats[name].to_dict(), "config": self._configs[name].to_dict()}
+                for name in providers
+            },
+        }
+
+    def close(self):
+        """Close the sync clients (async clients close with their loops)"""
+        with self._lock:
+            clients, self._sync_clients = list(self._sync_clients.values()), {}
+        for client in clients:
+            client.close()
+
+
+# Global pool instance
+_http_client_pool: Optional[HTTPClientPool] = None
+_http_client_pool_lock = threading.Lock()
+
+
+def get_http_client_pool() -> HTTPClientPool:
+    """Get the global HTTP client pool instance"""
+    global _http_client_pool
+    if _http_client_pool is None:
+        with _http_client_pool_lock:
+            if _http_client_pool is None:
+                _http_client_pool = HTTPClientPool()
+    return _http_client_pool
@@ -0,0 +1,362 @@
+"""
+Intent Fast Path
+Deterministic handling of the most common read-only voice commands ("what are
+my todos", "show my teams", "list departments"): the utterance is matched
+against fixed phrasings, the tool is called directly and its result is spoken
+from a template, skipping both LLM round trips. Anything that doesn't match a
+phrasing exactly goes to the agent as before
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_ENABLED = os.getenv('INTENT_FAST_PATH', 'true').lower() == 'true'
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+MAX_SPOKEN_ITEMS = _env_int('INTENT_FAST_PATH_MAX_ITEMS', 5)
+TOOL_TIMEOUT = _env_float('INTENT_FAST_PATH_TOOL_TIMEOUT', 5.0)
+
+# Politeness and filler around a command; stripped before matching
+LEADING_FILLERS = (
+    "hey", "hi", "ok", "okay", "so", "um", "uh", "please", "can you", "could you", "would you", "will you",
+    "tell me", "let me know", "let me see", "i want to know", "i want to see", "i'd like to see", "go ahead and",
+)
+TRAILING_FILLERS = ("please", "for me", "thanks", "thank you", "right now", "now")
+
+
+def normalize_utterance(text: Optional[str]) -> str:
+    """Lowercase, punctuation-free utterance with fillers stripped ("Hey, what's on my to-do list?" -> "whats on my todo list")"""
+    normalized = (text or "").lower()
+    normalized = re.sub(r"\bto[- ]dos?\b", lambda m: "todos" if m.group(0).endswith("s") else "todo", normalized)
+    normalized = normalized.replace("'", "").replace("’", "")
+    normalized = re.sub(r"[^a-z0-9 ]+", " ", normalized)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+
+    changed = True
+    while changed and normalized:
+        changed = False
+        for filler in LEADING_FILLERS:
+            if normalized == filler or normalized.startswith(filler + " "):
+                normalized = normalized[len(filler):].strip()
+                changed = True
+        for filler in TRAILING_FILLERS:
+            if normalized == filler or normalized.endswith(" " + filler):
+                normalized = normalized[:-len(filler)].strip()
+                changed = True
+    return normalized
+
+
+def _join_spoken(parts: List[str], conjunction: str = "and") -> str:
+    """"a", "a and b", "a, b, and c\""""
+    if len(parts) <= 2:
+        return f" {conjunction} ".join(parts)
+    return ", ".join(parts[:-1]) + f", {conjunction} " + parts[-1]
+
+
+def _spoken_items(parts: List[str], more: bool = False) -> str:
+    """At most MAX_SPOKEN_ITEMS items, with the rest summarized"""
+    shown = parts[:MAX_SPOKEN_ITEMS]
+    hidden = len(parts) - len(shown)
+    if hidden > 0:
+        shown.append(f"{hidden} more")
+    elif more:
+        shown.append("more")
+    return _join_spoken(shown)
+
+
+def _spoken_datetime(value: Optional[str]) -> Optional[str]:
+    """ISO timestamp -> "Monday, October 20 at 9 AM\""""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    clock = moment.strftime("%I:%M %p").lstrip("0").replace(":00 ", " ")
+    return f"{moment:%A, %B} {moment.day} at {clock}"
+
+
+def _plural(count: int, noun: str) -> str:
+    return f"{count} {noun}" if count == 1 else f"{count} {noun}s"
+
+
+def _page(result: str) -> Tuple[List[Dict[str, Any]], bool]:
+    """Items and whether more pages exist, from a db_todo page result"""
+    data = json.loads(result)
+    return data["items"], bool(data.get("next_cursor"))
+
+
+def render_todos(result: str) -> str:
+    items, more = _page(result)
+    if not items:
+        return "You don't have any open todos."
+    titles = [item["title"] for item in items]
+    count = f"more than {len(items)}" if more else str(len(items))
+    noun = "todo" if count == "1" else "todos"
+    return f"You have {count} open {noun}: {_spoken_items(titles, more)}."
+
+
+def render_reminders(result: str) -> str:
+    items, more = _page(result)
+    if not items:
+        return "You don't have any reminders."
+    parts = []
+    for item in items:
+        when = _spoken_datetime(item.get("date"))
+        parts.append(f"{item['text']} on {when}" if when else item["text"])
+    count = f"more than {len(items)} reminders" if more else _plural(len(items), "reminder")
+    return f"You have {count}: {_spoken_items(parts, more)}."
+
+
+def render_events(result: str) -> str:
+    items, more = _page(result)
+    if not items:
+        return "You don't have any upcoming events."
+    parts = []
+    for item in items:
+        when = _spoken_datetime(item.get("from"))
+        parts.append(f"{item['title']} on {when}" if when else item["title"])
+    if len(items) == 1 and not more:
+        return f"Your next event is {parts[0]}."
+    return f"Your upcoming events are {_spoken_items(parts, more)}."
+
+
+def render_teams(result: str) -> str:
+    if result.startswith("No teams found"):
+        return "There aren't any teams yet. You can ask me to create one."
+    names = re.findall(r"^• (.+?) \(ID:", result, flags=re.MULTILINE)
+    if not names:
+        raise ValueError("unrecognized get_teams result")
+    return f"There {'is' if len(names) == 1 else 'are'} {_plural(len(names), 'team')}: {_spoken_items(names)}."
+
+
+def render_departments(result: str) -> str:
+    departments = re.findall(r"^- (.+?) \(extension", result, flags=re.MULTILINE)
+    if not departments:
+        raise ValueError("unrecognized get_available_departments result")
+    return f"I can transfer you to {_join_spoken(departments, 'or')}. Just tell me which one."
+
+
+def _now_minute() -> str:
+    return datetime.now().isoformat(timespec="minutes")
+
+
+@dataclass
+class FastIntent:
+    """A command with fixed phrasings, the tool that answers it and a spoken template"""
+    name: str
+    tool: str
+    phrasings: List[str]
+    render: Callable[[str], str]
+    arguments: Callable[[Optional[str]], Dict[str, Any]] = field(default=lambda user_id: {})
+
+    def __post_init__(self):
+        self.patterns = [re.compile(phrasing) for phrasing in self.phrasings]
+
+    def matches(self, normalized: str) -> bool:
+        return any(pattern.fullmatch(normalized) for pattern in self.patterns)
+
+
+_LIST = r"(what are|whats|what is|show|show me|list|read|read me|give me|get|get me|check)"
+
+INTENTS = [
+    FastIntent(
+        name="list_todos",
+        tool="get_todos",
+        phrasings=[
+            _LIST + r" (all )?(of )?my (open |current |pending )?(todos|tasks|todo list|task list)",
+            r"whats on my (todo|task) list",
+            r"what do i (still )?have to do",
+            r"(my )?(open )?(todos|todo list|tasks)",
+            r"do i have any (open )?(todos|tasks)",
+        ],
+        render=render_todos,
+        # Not scoped to user_id: voice-created todos have no creator_id, and the agent doesn't filter either
+        arguments=lambda user_id: {"completed": False},
+    ),
+    FastIntent(
+        name="list_reminders",
+        tool="get_reminders",
+        phrasings=[
+            _LIST + r" (all )?(of )?my reminders",
+            r"(my )?reminders",
+            r"do i have any reminders",
+        ],
+        render=render_reminders,
+    ),
+    FastIntent(
+        name="list_events",
+        tool="get_calendar_events",
+        phrasings=[
+            _LIST + r" (all )?(of )?my (upcoming )?(calendar events|events|meetings|appointments|calendar|schedule|agenda)",
+            r"whats (on|in) my (calendar|schedule|agenda)",
+            r"(my )?(upcoming )?(calendar events|events|meetings|appointments)",
+            r"do i have any (upcoming )?(events|meetings|appointments)",
+        ],
+        render=render_events,
+        arguments=lambda user_id: {"date_from": _now_minute()},
+    ),
+    FastIntent(
+        name="list_teams",
+        tool="get_teams",
+        phrasings=[
+            _LIST + r" (all )?(of )?(the |my )?teams",
+            r"(what|which) teams (are there|do we have|do i have|am i in|am i on|am i part of|exist)",
+            r"(my )?teams",
+        ],
+        render=render_teams,
+    ),
+    FastIntent(
+        name="list_departments",
+        tool="get_available_departments",
+        phrasings=[
+            _LIST + r" (all )?(of )?(the )?(available )?departments",
+            r"(what|which) departments (are there|are available|do you have|can i talk to|can i speak to)",
+            r"who can i (talk|speak) to",
+            r"what are my (transfer )?options",
+        ],
+        render=render_departments,
+    ),
+]
+
+
+def match_intent(text: Optional[str]) -> Optional[FastIntent]:
+    """The fast-path intent an utterance asks for exactly, or None"""
+    normalized = normalize_utterance(text)
+    if not normalized:
+        return None
+    for intent in INTENTS:
+        if intent.matches(normalized):
+            return intent
+    return None
+
+
+def _as_text(result: Any) -> str:
+    """Tool output as a string (MCP adapters may return content blocks)"""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, list):
+        return "\n".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in result)
+    return str(result)
+
+
+@dataclass
+class FastPathResult:
+    """A turn answered without the LLM"""
+    intent: str
+    tool_name: str
+    arguments: Dict[str, Any]
+    tool_result: str
+    response: str
+    duration_ms: float
+
+
+class IntentFastPath:
+    """
+    Answers exact matches of INTENTS by calling the tool directly.
+
+    Returns None - and the turn goes to the agent - when the utterance does not
+    match, the tool is not loaded, the call fails or times out
+    (INTENT_FAST_PATH_TOOL_TIMEOUT), or its result can't be rendered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.served = 0
+        self.fallbacks = 0
+        self.total_ms = 0.0
+        self.intents: Dict[str, int] = {}
+
+    def _fallback(self, intent: FastIntent, reason: str) -> None:
+        print(f"⚡ Intent fast path: {intent.name} falls back to the agent ({reason})", flush=True)
+        with self._lock:
+            self.fallbacks += 1
+        return None
+
+    async def handle(self, text: str, tools: List[Any], user_id: Optional[str] = None) -> Optional[FastPathResult]:
+        """
+        Answer the utterance directly if it is a fast-path command
+
+        Args:
+            text: Caller's utterance
+            tools: Loaded agent tools to look the intent's tool up in
+            user_id: Authenticated user, passed to each intent's argument builder
+        """
+        if not FAST_PATH_ENABLED:
+            return None
+        intent = match_intent(text)
+        if intent is None:
+            return None
+
+        started = time.perf_counter()
+        tool = next((t for t in tools if getattr(t, "name", None) == intent.tool), None)
+        if tool is None:
+            return self._fallback(intent, f"{intent.tool} not loaded")
+        arguments = intent.arguments(user_id)
+        try:
+            if hasattr(tool, "ainvoke"):
+                raw = await asyncio.wait_for(tool.ainvoke(arguments), timeout=TOOL_TIMEOUT)
+            else:
+                raw = await asyncio.wait_for(asyncio.to_thread(tool.invoke, arguments), timeout=TOOL_TIMEOUT)
+            tool_result = _as_text(raw)
+            if tool_result.startswith("Error"):
+                return self._fallback(intent, tool_result[:100])
+            response = intent.render(tool_result)
+        except asyncio.TimeoutError:
+            return self._fallback(intent, f"{intent.tool} timed out")
+        except Exception as e:
+            return self._fallback(intent, f"{type(e).__name__}: {e}")
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.served += 1
+            self.total_ms += duration_ms
+            self.intents[intent.name] = self.intents.get(intent.name, 0) + 1
+        print(f"⚡ Intent fast path: {intent.name} via {intent.tool} in {duration_ms:.0f}ms", flush=True)
+        return FastPathResult(intent.name, intent.tool, arguments, tool_result, response, duration_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": FAST_PATH_ENABLED,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "avg_ms": round(self.total_ms / self.served, 1) if self.served else None,
+                "intents": dict(self.intents),
+            }
+
+
+# Global intent fast path instance
+_intent_fast_path = None
+
+
+def get_intent_fast_path() -> IntentFastPath:
+    """Get the global intent fast path instance"""
+    global _intent_fast_path
+    if _intent_fast_path is None:
+        _intent_fast_path = IntentFastPath()
+    return _intent_fast_path
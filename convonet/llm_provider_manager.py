@@ -265,7 +265,7 @@ class LLMProviderManager:
                     # For Claude and OpenAI, tool binding is usually fast and reliable
                     try:
                         print(f"🔧 Binding {len(tools)} tools to {provider} LLM...")
-                        llm = llm.bind_tools(tools=tools)
+                        llm = self.bind_tools(provider, llm, tools)
                         print(f"✅ Successfully bound tools to {provider} LLM")
                     except Exception as tool_error:
                         print(f"⚠️ Warning: Failed to bind tools to {provider} LLM: {tool_error}")
@@ -279,6 +279,15 @@ class LLMProviderManager:
             print(f"❌ Traceback: {traceback.format_exc()}")
             raise ValueError(error_msg)
     
+    def bind_tools(self, provider: LLMProvider, llm: BaseChatModel, tools: list):
+        """Bind tools to an unbound chat model (also used per tool subset by the tool router)."""
+        if provider == "claude":
+            # Cache breakpoint on the last tool schema (Anthropic prompt caching)
+            from .prompt_cache import anthropic_cached_tools
+            return llm.bind_tools(tools=anthropic_cached_tools(tools))
+        # OpenAI caches the tools + system prefix automatically
+        return llm.bind_tools(tools=tools)
+    
     def get_default_provider(self) -> Optional[LLMProvider]:
         """Get the default provider (first available)."""
         for provider_id, info in self.providers.items():
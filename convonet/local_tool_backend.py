@@ -0,0 +1,129 @@
+"""
+Local (In-Process) Tool Backend
+Registers the db_todo MCP tool functions directly as LangChain tools in the web
+process, skipping the stdio JSON-RPC hop and its serialization on every call
+"""
+
+import json
+import time
+import threading
+import logging
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    from langchain_core.tools import StructuredTool, ToolException
+    from convonet.mcps.local_servers import db_todo
+    LOCAL_TOOLS_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"⚠️ Local tool backend unavailable: {e}")
+    db_todo = None
+    LOCAL_TOOLS_AVAILABLE = False
+
+
+def _app_engine():
+    """The Flask-SQLAlchemy engine, when called inside an app context"""
+    try:
+        from flask import current_app, has_app_context
+        if has_app_context() and 'sqlalchemy' in current_app.extensions:
+            return current_app.extensions['sqlalchemy'].engine
+    except Exception as e:
+        logger.warning(f"⚠️ Could not get app database engine: {e}")
+    return None
+
+
+def _to_text(result) -> str:
+    """Tool results go back to the LLM as text, same as over MCP"""
+    if isinstance(result, str):
+        return result
+    return json.dumps(result, default=str)
+
+
+class LocalToolBackend:
+    """
+    In-process db_todo tools.
+
+    The FastMCP tool registry is reused as-is, so tool names, descriptions,
+    JSON schemas and argument validation (e.g. UUID parsing) match what the
+    stdio server exposes. When created inside a Flask app context the tools
+    share the app's SQLAlchemy engine and connection pool; otherwise db_todo
+    falls back to its own lazily-created engine.
+    """
+
+    def __init__(self):
+        self._tools: Optional[List[Any]] = None
+        self._lock = threading.Lock()
+        self.shared_engine = False
+        self.total_calls = 0
+        self.failed_calls = 0
+        self.total_call_ms = 0.0
+
+    def _bind_database(self):
+        engine = _app_engine()
+        if engine is not None:
+            db_todo.configure_database(engine)
+            self.shared_engine = True
+            logger.info("✅ Local tool backend using the app's database connection pool")
+        else:
+            db_todo._init_database()
+            logger.info("ℹ️ Local tool backend using db_todo's own database engine (no app context)")
+
+    def get_tools(self) -> List[Any]:
+        """Build (once) and return the in-process LangChain tools"""
+        if self._tools is None:
+            with self._lock:
+                if self._tools is None:
+                    self._bind_database()
+                    # FastMCP keeps its registered tools on the tool manager
+                    registered = db_todo.mcp._tool_manager.list_tools()
+                    self._tools = [self._make_tool(tool) for tool in registered]
+                    logger.info(f"✅ Local tool backend registered {len(self._tools)} db_todo tools in-process")
+        return list(self._tools)
+
+    def _make_tool(self, mcp_tool) -> "StructuredTool":
+        backend = self
+
+        async def call(**kwargs):
+            return await backend.call_tool(mcp_tool, kwargs)
+
+        return StructuredTool(
+            name=mcp_tool.name,
+            description=mcp_tool.description or "",
+            args_schema=mcp_tool.parameters,
+            coroutine=call,
+            metadata={"mcp_server": "db", "backend": "local"},
+        )
+
+    async def call_tool(self, mcp_tool, arguments: Dict[str, Any]) -> str:
+        """Run a registered tool function directly (validation via the tool's pydantic model)"""
+        start = time.time()
+        try:
+            return _to_text(await mcp_tool.run(arguments))
+        except Exception as e:
+            self.failed_calls += 1
+            raise ToolException(f"Error executing tool {mcp_tool.name}: {e}") from e
+        finally:
+            self.total_calls += 1
+            self.total_call_ms += (time.time() - start) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'tools': len(self._tools or []),
+            'shared_engine': self.shared_engine,
+            'total_calls': self.total_calls,
+            'failed_calls': self.failed_calls,
+            'avg_call_ms': round(self.total_call_ms / self.total_calls, 2) if self.total_calls else None,
+        }
+
+
+# Global local tool backend instance
+_local_tool_backend = None
+
+
+def get_local_tool_backend() -> Optional[LocalToolBackend]:
+    """Get the global local tool backend (None if db_todo can't be imported)"""
+    global _local_tool_backend
+    if _local_tool_backend is None and LOCAL_TOOLS_AVAILABLE:
+        _local_tool_backend = LocalToolBackend()
+    return _local_tool_backend
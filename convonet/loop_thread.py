@@ -0,0 +1,117 @@
+"""
+Loop Thread
+Long-lived asyncio event loops on real OS threads, for the background loops
+that Flask/Socket.IO handlers hand coroutines to
+
+Production runs gunicorn's eventlet worker with monkey_patch(thread=True). A
+plain threading.Thread is then a green thread whose run_forever holds the hub,
+and the patched locks behind concurrent.futures only wake green threads of the
+hub that released them. So under eventlet the loop gets an unpatched OS
+thread, futures and locks shared with it use unpatched primitives, and blocking
+waits from green threads go through eventlet.tpool so the hub keeps serving
+other requests.
+"""
+
+import sys
+import asyncio
+import threading
+import concurrent.futures
+from typing import Optional, Coroutine
+
+
+def _unpatched_threading():
+    """The original threading module if eventlet has monkey-patched threads, else None"""
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        return patcher.original("threading")
+    return None
+
+
+def _os_threading():
+    return _unpatched_threading() or threading
+
+
+def real_lock():
+    """Lock that works across OS threads as well as green threads"""
+    return _os_threading().Lock()
+
+
+def run_coroutine_threadsafe(coro: Coroutine, loop: asyncio.AbstractEventLoop) -> concurrent.futures.Future:
+    """asyncio.run_coroutine_threadsafe, with a future that can be completed and waited on across OS threads"""
+    original = _unpatched_threading()
+    if original is None:
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    future = concurrent.futures.Future()
+    # The patched Condition would never wake a waiter on another OS thread
+    future._condition = original.Condition()
+
+    def callback():
+        try:
+            asyncio.futures._chain_future(asyncio.ensure_future(coro, loop=loop), future)
+        except BaseException as exc:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(exc)
+            raise
+
+    loop.call_soon_threadsafe(callback)
+    return future
+
+
+def wait_future(future: concurrent.futures.Future, timeout: Optional[float] = None):
+    """
+    future.result(timeout) that doesn't block the eventlet hub
+
+    Raises:
+        concurrent.futures.TimeoutError / CancelledError, as Future.result does
+    """
+    original = _unpatched_threading()
+    if original is not None and original.get_ident() == original.main_thread().ident:
+        # Green threads all live on the main OS thread; wait on a tpool thread instead
+        from eventlet import tpool
+        return tpool.execute(future.result, timeout)
+    return future.result(timeout=timeout)
+
+
+class LoopThread:
+    """An asyncio event loop running forever on its own OS thread"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self.thread = _os_threading().Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def in_loop_thread(self) -> bool:
+        return self.thread.ident == _os_threading().get_ident()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop from any thread"""
+        return run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the loop and block the calling thread until it finishes
+
+        Raises:
+            asyncio.TimeoutError: it did not finish within timeout (it is cancelled)
+            RuntimeError: called from the loop's own thread, which would deadlock
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError(f"{self.name}: blocking run() called from the loop's own thread")
+        future = self.submit(coro)
+        try:
+            return wait_future(future, timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise asyncio.TimeoutError(f"Call on {self.name} did not finish within {timeout}s")
+
+    def stop(self, timeout: float = 5.0):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if not self.in_loop_thread():
+            self.thread.join(timeout=timeout)
@@ -0,0 +1,360 @@
+"""
+MCP Session Pool
+Keeps warm stdio MCP server processes (e.g. db_todo) with long-lived sessions,
+so a tool call costs one JSON-RPC round-trip instead of a process spawn
+"""
+
+import os
+import time
+import asyncio
+import threading
+import logging
+from typing import Optional, Dict, Any, List
+
+from convonet.loop_thread import LoopThread, run_coroutine_threadsafe
+
+logger = logging.getLogger(__name__)
+
+try:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from langchain_core.tools import StructuredTool, ToolException
+    MCP_AVAILABLE = True
+except ImportError as e:
+    logger.warning(f"⚠️ MCP session pool unavailable: {e}")
+    MCP_AVAILABLE = False
+
+
+def _pool_setting(pool_config: Dict[str, Any], key: str, env_name: str, default):
+    """Pool setting from environment, then mcp_config.json "pool" section, then default"""
+    value = os.getenv(env_name)
+    if value is None:
+        value = pool_config.get(key, default)
+    try:
+        return type(default)(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _result_to_text(result) -> str:
+    """Flatten an MCP CallToolResult into the string handed back to the LLM"""
+    parts = []
+    for content in getattr(result, 'content', None) or []:
+        text = getattr(content, 'text', None)
+        parts.append(text if text is not None else str(content))
+    text = "\n".join(parts)
+    if getattr(result, 'isError', False):
+        raise ToolException(text or "MCP tool returned an error")
+    return text
+
+
+class _MCPWorker:
+    """One warm MCP server process and its ClientSession (owned by the pool's event loop)"""
+
+    def __init__(self, server_name: str, index: int, params: "StdioServerParameters", max_concurrent: int):
+        self.server_name = server_name
+        self.index = index
+        self.params = params
+        self.session: Optional["ClientSession"] = None
+        self.slots = asyncio.Semaphore(max_concurrent)  # Calls running on this process at once
+        self.in_flight = 0  # Calls routed here, running or waiting for a slot
+        self.calls = 0
+        self.restarts = 0
+        self.healthy = False
+        self.restarting = False
+        self.started_at: Optional[float] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.server_name}#{self.index}"
+
+    async def start(self, timeout: float):
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        if not self.healthy:
+            raise RuntimeError(f"MCP worker {self.name} failed to start")
+
+    async def _run(self):
+        # stdio_client/ClientSession contexts must be entered and exited in the same task
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self.healthy = True
+                    self.started_at = time.time()
+                    logger.info(f"✅ MCP worker {self.name} ready")
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            logger.error(f"❌ MCP worker {self.name} stopped: {e}")
+        finally:
+            self.healthy = False
+            self.session = None
+            self._ready.set()
+
+    async def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5.0)
+            except Exception:
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Pool of warm MCP server processes shared by every request.
+
+    The pool runs on its own event loop thread (an OS thread even under
+    eventlet, see loop_thread), so sessions survive the per-request event
+    loops used by the Flask/Socket.IO handlers; callers on any loop await pool
+    work through run_coroutine_threadsafe. Calls are routed to
+    the least-busy healthy process of the owning server and run there once one
+    of its maxConcurrentPerProcess slots is free; a failed process is restarted
+    (once, whether the call path or the health check noticed) and the call
+    retried once on another process.
+    """
+
+    def __init__(self, mcp_config: Dict[str, Any], project_root: Optional[str] = None):
+        pool_config = mcp_config.get("pool", {}) or {}
+        self.size = max(1, _pool_setting(pool_config, "size", "MCP_POOL_SIZE", 2))
+        self.max_concurrent_per_process = max(1, _pool_setting(pool_config, "maxConcurrentPerProcess", "MCP_POOL_MAX_CONCURRENT", 4))
+        self.health_check_interval = _pool_setting(pool_config, "healthCheckInterval", "MCP_POOL_HEALTH_INTERVAL", 30.0)
+        self.call_timeout = _pool_setting(pool_config, "callTimeout", "MCP_POOL_CALL_TIMEOUT", 15.0)
+        self.start_timeout = _pool_setting(pool_config, "startTimeout", "MCP_POOL_START_TIMEOUT", 30.0)
+        self.project_root = project_root or os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        self._servers = {
+            name: config for name, config in mcp_config.get("mcpServers", {}).items()
+            if config.get("transport", "stdio") == "stdio"
+        }
+        self._workers: Dict[str, List[_MCPWorker]] = {}
+        self._tool_servers: Dict[str, str] = {}
+        self._tools: Optional[List[Any]] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        self.queue_depth = 0
+        self.total_calls = 0
+        self.failed_calls = 0
+        self.total_call_ms = 0.0
+
+        self._loop_thread = LoopThread("mcp-session-pool")
+        self._loop = self._loop_thread.loop
+
+    # -- cross-loop entry points ------------------------------------------------
+
+    async def _run_on_pool(self, coro):
+        future = run_coroutine_threadsafe(coro, self._loop)
+        return await asyncio.wrap_future(future)
+
+    async def get_tools(self) -> List[Any]:
+        """Start the pool (once) and return LangChain tools that dispatch through it"""
+        if self._tools is None:
+            await self._run_on_pool(self._start())
+        return list(self._tools or [])
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Call an MCP tool on a warm process (awaitable from any event loop)"""
+        return await self._run_on_pool(self._call(name, arguments))
+
+    # -- pool loop internals ----------------------------------------------------
+
+    def _server_params(self, config: Dict[str, Any]) -> "StdioServerParameters":
+        args = [
+            os.path.join(self.project_root, arg) if i == 0 and not os.path.isabs(arg) else arg
+            for i, arg in enumerate(config.get("args", []))
+        ]
+        env = {}
+        for key, value in (config.get("env") or {}).items():
+            if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
+                value = os.getenv(value[2:-1], "")
+            env[key] = value
+        return StdioServerParameters(
+            command=config.get("command", "python"),
+            args=args,
+            env=env or None,
+            cwd=config.get("cwd", self.project_root),
+        )
+
+    async def _start(self):
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._tools is not None:
+                return
+
+            tools = []
+            for server_name, config in self._servers.items():
+                params = self._server_params(config)
+                workers = [_MCPWorker(server_name, i, params, self.max_concurrent_per_process)
+                           for i in range(self.size)]
+                results = await asyncio.gather(*(w.start(self.start_timeout) for w in workers), return_exceptions=True)
+                started = [w for w, r in zip(workers, results) if not isinstance(r, Exception)]
+                for w, r in zip(workers, results):
+                    if isinstance(r, Exception):
+                        logger.error(f"❌ MCP worker {w.name} failed to start: {r}")
+                if not started:
+                    logger.error(f"❌ No MCP workers started for server '{server_name}'")
+                    continue
+
+                self._workers[server_name] = workers
+
+                listed = await started[0].session.list_tools()
+                for mcp_tool in listed.tools:
+                    self._tool_servers[mcp_tool.name] = server_name
+                    tools.append(self._make_tool(mcp_tool))
+                logger.info(f"✅ MCP pool: {len(started)}/{self.size} warm '{server_name}' process(es), {len(listed.tools)} tools")
+
+            self._tools = tools
+            if self._health_task is None:
+                self._health_task = asyncio.create_task(self._health_loop())
+
+    def _make_tool(self, mcp_tool) -> "StructuredTool":
+        pool = self
+        tool_name = mcp_tool.name
+
+        async def call(**kwargs):
+            return await pool.call_tool(tool_name, kwargs)
+
+        return StructuredTool(
+            name=tool_name,
+            description=mcp_tool.description or "",
+            args_schema=mcp_tool.inputSchema,
+            coroutine=call,
+            metadata={"mcp_server": self._tool_servers.get(tool_name), "backend": "pool"},
+        )
+
+    def _pick_worker(self, server_name: str) -> Optional[_MCPWorker]:
+        healthy = [w for w in self._workers.get(server_name, [])
+                   if w.healthy and not w.restarting and w.session is not None]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda w: w.in_flight)
+
+    async def _restart(self, worker: _MCPWorker):
+        # The call path and the health loop can both notice a dead process; only one restarts it
+        if worker.restarting:
+            return
+        worker.restarting = True
+        try:
+            logger.warning(f"🔄 Restarting MCP worker {worker.name}")
+            worker.healthy = False
+            await worker.stop()
+            worker.restarts += 1
+            try:
+                await worker.start(self.start_timeout)
+            except Exception as e:
+                logger.error(f"❌ MCP worker {worker.name} restart failed: {e}")
+        finally:
+            worker.restarting = False
+
+    async def _call(self, name: str, arguments: Dict[str, Any]) -> str:
+        server_name = self._tool_servers.get(name)
+        if server_name is None:
+            raise ToolException(f"Tool {name} is not served by the MCP pool")
+
+        start = time.time()
+        try:
+            for attempt in range(2):
+                worker = self._pick_worker(server_name)
+                if worker is None:
+                    raise ToolException(f"No healthy MCP process for server '{server_name}'")
+                worker.in_flight += 1
+                try:
+                    self.queue_depth += 1
+                    try:
+                        await worker.slots.acquire()
+                    finally:
+                        self.queue_depth -= 1
+                    try:
+                        if not worker.healthy or worker.session is None:
+                            raise ConnectionError(f"MCP worker {worker.name} went down while the call was queued")
+                        result = await asyncio.wait_for(worker.session.call_tool(name, arguments), timeout=self.call_timeout)
+                        worker.calls += 1
+                        return _result_to_text(result)
+                    finally:
+                        worker.slots.release()
+                except (ToolException, asyncio.TimeoutError):
+                    raise
+                except Exception as e:
+                    # Transport failure: restart this process in the background and retry once elsewhere
+                    logger.error(f"❌ MCP call {name} failed on {worker.name}: {e}")
+                    worker.healthy = False
+                    if not worker.restarting:
+                        asyncio.create_task(self._restart(worker))
+                    if attempt == 1:
+                        raise
+                finally:
+                    worker.in_flight -= 1
+        except Exception:
+            self.failed_calls += 1
+            raise
+        finally:
+            self.total_calls += 1
+            self.total_call_ms += (time.time() - start) * 1000
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for workers in self._workers.values():
+                for worker in workers:
+                    if worker.restarting:
+                        continue  # Already being restarted from the call path
+                    if worker.healthy and worker.session is not None:
+                        try:
+                            await asyncio.wait_for(worker.session.send_ping(), timeout=5.0)
+                            continue
+                        except Exception as e:
+                            logger.warning(f"⚠️ MCP worker {worker.name} failed health check: {e}")
+                    await self._restart(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, queue depth and per-process load"""
+        workers = [w for ws in self._workers.values() for w in ws]
+        return {
+            'started': self._tools is not None,
+            'pool_size': self.size,
+            'healthy_processes': sum(1 for w in workers if w.healthy),
+            'max_concurrent_per_process': self.max_concurrent_per_process,
+            'queue_depth': self.queue_depth,
+            'in_flight': sum(w.in_flight for w in workers),
+            'total_calls': self.total_calls,
+            'failed_calls': self.failed_calls,
+            'avg_call_ms': round(self.total_call_ms / self.total_calls, 2) if self.total_calls else None,
+            'tools': len(self._tools or []),
+            'processes': [
+                {
+                    'name': w.name,
+                    'healthy': w.healthy,
+                    'in_flight': w.in_flight,
+                    'calls': w.calls,
+                    'restarts': w.restarts,
+                    'restarting': w.restarting,
+                    'uptime_s': round(time.time() - w.started_at, 1) if w.started_at and w.healthy else None,
+                }
+                for w in workers
+            ],
+        }
+
+
+# Global MCP session pool instance
+_mcp_session_pool = None
+_mcp_session_pool_lock = threading.Lock()
+
+
+def get_mcp_session_pool(mcp_config: Optional[Dict[str, Any]] = None) -> Optional[MCPSessionPool]:
+    """Get the global MCP session pool (created on first call with a config)"""
+    global _mcp_session_pool
+    if _mcp_session_pool is None and mcp_config is not None and MCP_AVAILABLE:
+        with _mcp_session_pool_lock:
+            if _mcp_session_pool is None:
+                _mcp_session_pool = MCPSessionPool(mcp_config)
+    return _mcp_session_pool
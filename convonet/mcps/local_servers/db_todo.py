@@ -1,7 +1,7 @@
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 from typing import List, Optional
-from sqlalchemy import ForeignKey, String, text, Column, Boolean, Text, DateTime
+from sqlalchemy import ForeignKey, String, text, Column, Boolean, Text, DateTime, Index, or_, tuple_
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship, Session
 from uuid import UUID, uuid4
@@ -300,7 +300,15 @@ from convonet.models.base import Base
 
 class DBTodo(Base):
     __tablename__ = "todos_anthropic"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Filtered, keyset-paginated get_todos (see migrations/add_tool_query_indexes.py)
+        Index("ix_todos_anthropic_creator_completed_created", "creator_id", "completed", "created_at", "id"),
+        Index("ix_todos_anthropic_assignee_completed_created", "assignee_id", "completed", "created_at", "id"),
+        Index("ix_todos_anthropic_team_completed_created", "team_id", "completed", "created_at", "id"),
+        Index("ix_todos_anthropic_completed_created", "completed", "created_at", "id"),
+        Index("ix_todos_anthropic_due_date", "due_date"),
+        {'extend_existing': True},
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -326,7 +334,11 @@ class DBTodo(Base):
 
 class DBReminder(Base):
     __tablename__ = "reminders_anthropic"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_reminders_anthropic_created", "created_at", "id"),
+        Index("ix_reminders_anthropic_reminder_date", "reminder_date"),
+        {'extend_existing': True},
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -339,7 +351,10 @@ class DBReminder(Base):
 
 class DBCalendarEvent(Base):
     __tablename__ = "calendar_events_anthropic"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_calendar_events_anthropic_event_from", "event_from", "id"),
+        {'extend_existing': True},
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -353,7 +368,11 @@ class DBCalendarEvent(Base):
 
 class DBCallRecording(Base):
     __tablename__ = "call_recordings_anthropic"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_call_recordings_anthropic_created", "created_at", "id"),
+        Index("ix_call_recordings_anthropic_status_created", "status", "created_at", "id"),
+        {'extend_existing': True},
+    )
 
     id: Mapped[UUID] = mapped_column(primary_key=True, index=True, server_default=text("gen_random_uuid()"))
     created_at: Mapped[datetime] = mapped_column(nullable=False, server_default=text("now()"))
@@ -434,17 +453,112 @@ class CallRecording(BaseModel):
 # ----------------------------
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+import asyncio
+import importlib.util
+import threading
+import weakref
+
+# Async engine is optional - falls back to the sync engine run in worker threads
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
+    SQLALCHEMY_ASYNC_AVAILABLE = True
+except ImportError:
+    SQLALCHEMY_ASYNC_AVAILABLE = False
 
 # Lazy database connection - don't connect at import time
 db_uri = os.getenv("DB_URI")
 engine = None
 SessionLocal = None
+async_engine = None
+AsyncSessionLocal = None
 _db_initialized = False
 
+# asyncpg connections belong to the event loop that opened them; every loop
+# after the first that runs a query gets its own engine built like async_engine
+_async_engine_url = None
+_async_engine_kwargs = {}
+_async_engine_claimed = False
+_loop_session_factories = weakref.WeakKeyDictionary()  # loop -> async_sessionmaker
+_loop_session_factories_lock = threading.Lock()
+
+def _env_number(name, default):
+    try:
+        return type(default)(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+# Pool and timeout settings (connections are shared by concurrent tool calls)
+DB_POOL_SIZE = _env_number("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_number("DB_MAX_OVERFLOW", 5)
+DB_POOL_TIMEOUT = _env_number("DB_POOL_TIMEOUT", 5.0)
+DB_CONNECT_TIMEOUT = _env_number("DB_CONNECT_TIMEOUT", 5)
+DB_QUERY_TIMEOUT = _env_number("DB_QUERY_TIMEOUT", 10.0)
+
+# Per-tool query timeouts in seconds (override with DB_QUERY_TIMEOUT_<TOOL_NAME>)
+TOOL_QUERY_TIMEOUTS = {
+    "query_db": 15.0,
+    "sync_google_calendar_events": 60.0,
+    "create_team_todo": 20.0,
+}
+
+# Tools whose work calls the (blocking) Google Calendar API. They run on the
+# sync engine in a worker thread, so the calendar calls never block the loop.
+CALENDAR_TOOLS = {
+    "update_todo", "delete_todo",
+    "create_reminder", "update_reminder", "delete_reminder",
+    "update_calendar_event", "delete_calendar_event",
+    "sync_google_calendar_events", "create_team_todo",
+}
+
+def _query_timeout(tool_name=None):
+    """Query timeout for a tool: env override, then TOOL_QUERY_TIMEOUTS, then DB_QUERY_TIMEOUT."""
+    if tool_name:
+        default = TOOL_QUERY_TIMEOUTS.get(tool_name, DB_QUERY_TIMEOUT)
+        return _env_number(f"DB_QUERY_TIMEOUT_{tool_name.upper()}", default)
+    return DB_QUERY_TIMEOUT
+
+def _async_engine_args(uri):
+    """Map DB_URI to an async driver URL and engine kwargs, or None if no async driver is installed."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    
+    if backend == "postgresql" and importlib.util.find_spec("asyncpg"):
+        # asyncpg takes ssl as a connect arg instead of libpq's sslmode
+        sslmode = url.query.get("sslmode")
+        url = url.set(drivername="postgresql+asyncpg").difference_update_query(["sslmode"])
+        connect_args = {
+            "timeout": DB_CONNECT_TIMEOUT,
+            "server_settings": {"statement_timeout": str(int(DB_QUERY_TIMEOUT * 1000))},
+        }
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+        return url, {
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_pre_ping": False,
+            "pool_recycle": 1800,
+            "connect_args": connect_args,
+        }
+    
+    if backend == "sqlite" and importlib.util.find_spec("aiosqlite"):
+        return url.set(drivername="sqlite+aiosqlite"), {}
+    
+    return None, None
+
 def _init_database():
-    """Initialize database connection (lazy loading)."""
-    global engine, SessionLocal, _db_initialized
+    """Initialize database connection (lazy loading).
+    
+    Tool queries prefer an async engine (asyncpg/aiosqlite) so they are awaited
+    and concurrent tool calls overlap; otherwise they use the pooled sync engine
+    in worker threads. The sync engine and SessionLocal are always created, since
+    sync callers in the web process (PIN verification, WebRTC authentication,
+    customer profiles) use SessionLocal directly.
+    """
+    global engine, SessionLocal, async_engine, AsyncSessionLocal, _db_initialized
+    global _async_engine_url, _async_engine_kwargs
     
     if _db_initialized:
         return
@@ -456,6 +570,25 @@ def _init_database():
         pass  #         
         return
     
+    if SQLALCHEMY_ASYNC_AVAILABLE and os.getenv("DB_ASYNC_ENGINE", "true").lower() == "true":
+        try:
+            async_url, engine_args = _async_engine_args(db_uri)
+            if async_url is not None:
+                async_engine = create_async_engine(async_url, **engine_args)
+                AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+                _async_engine_url, _async_engine_kwargs = async_url, engine_args
+                logging.info(f"✅ Async database engine configured ({async_url.drivername}, pool_size={DB_POOL_SIZE})")
+        except Exception as e:
+            logging.warning(f"⚠️ Async database engine unavailable, using sync engine for tools: {e}")
+            async_engine = None
+            AsyncSessionLocal = None
+    
+    _init_sync_engine()
+
+def _init_sync_engine():
+    """Create the pooled sync engine and SessionLocal."""
+    global engine, SessionLocal
+    
     try:
         pass
         # print(...) # Removed to avoid MCP protocol issues
@@ -466,9 +599,9 @@ def _init_database():
             engine = create_engine(
                 url=db_uri,
                 pool_pre_ping=False,
-                pool_size=1,
-                max_overflow=0,
-                pool_timeout=1,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
                 pool_recycle=1800
             )
         else:
@@ -476,11 +609,14 @@ def _init_database():
             engine = create_engine(
                 url=db_uri,
                 pool_pre_ping=False,  # Skip pre-ping to avoid hanging
-                pool_size=1,  # Minimal pool for MCP server
-                max_overflow=0,  # No overflow
-                pool_timeout=1,  # 1 second timeout
+                pool_size=DB_POOL_SIZE,  # Concurrent tool calls each need a connection
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
                 pool_recycle=1800,  # Recycle connections every 30 mins
-                connect_args={"connect_timeout": 1}  # 1 second connection timeout
+                connect_args={
+                    "connect_timeout": DB_CONNECT_TIMEOUT,
+                    "options": f"-c statement_timeout={int(DB_QUERY_TIMEOUT * 1000)}",
+                }
             )
         
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -490,10 +626,41 @@ def _init_database():
         engine = None
         SessionLocal = None
 
+def configure_database(external_engine):
+    """Bind the tools to an existing engine instead of creating one.
+
+    Used by the in-process tool backend so tools share the web app's connection pool.
+    Accepts a sync Engine or an AsyncEngine.
+    """
+    global engine, SessionLocal, async_engine, AsyncSessionLocal, _db_initialized
+    global _async_engine_url, _async_engine_kwargs, _async_engine_claimed
+    if SQLALCHEMY_ASYNC_AVAILABLE and isinstance(external_engine, AsyncEngine):
+        async_engine = external_engine
+        AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False)
+        _async_engine_url, _async_engine_kwargs = external_engine.url, {}
+        with _loop_session_factories_lock:
+            _loop_session_factories.clear()
+            _async_engine_claimed = False
+        if SessionLocal is None and db_uri:
+            _init_sync_engine()  # Sync callers still need SessionLocal
+    else:
+        engine = external_engine
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _db_initialized = True
+
 # ----------------------------
 # Helper Functions
 # ----------------------------
 
+def get_session_factory():
+    """Sync session factory for callers outside the tools, initializing the database on first use.
+
+    Read SessionLocal through this rather than importing it: an imported name
+    stays None if it was imported before initialization.
+    """
+    _init_database()
+    return SessionLocal
+
 def check_database_available():
     """Check if database is available."""
     try:
@@ -502,9 +669,122 @@ def check_database_available():
         pass  #         
         raise Exception(f"Database initialization failed: {str(e)}")
     
-    if SessionLocal is None:
+    if SessionLocal is None and AsyncSessionLocal is None:
         raise Exception("Database not available - DB_URI not configured")
 
+def _run_sync_session(work):
+    with SessionLocal() as session:
+        return work(session)
+
+def _async_session_factory():
+    """Async session factory for the running event loop.
+
+    Tools run on several loops (agent runtime loops, the MCP pool loop). The
+    first loop to query uses async_engine; any other loop gets its own engine.
+    """
+    global _async_engine_claimed
+    loop = asyncio.get_running_loop()
+    with _loop_session_factories_lock:
+        factory = _loop_session_factories.get(loop)
+        if factory is None:
+            if not _async_engine_claimed:
+                _async_engine_claimed = True
+                factory = AsyncSessionLocal
+            else:
+                loop_engine = create_async_engine(_async_engine_url, **_async_engine_kwargs)
+                factory = async_sessionmaker(bind=loop_engine, autoflush=False)
+            _loop_session_factories[loop] = factory
+        return factory
+
+async def run_db(work, tool_name=None):
+    """Run a tool's ORM code and await it without blocking the event loop.
+    
+    Args:
+        work: Function taking a Session; its return value is the tool result.
+        tool_name: Tool name, used to look up the query timeout. Tools in
+            CALENDAR_TOOLS run on the sync engine in a worker thread.
+    
+    Returns:
+        Whatever work returns.
+    """
+    check_database_available()
+    timeout = _query_timeout(tool_name)
+    
+    use_async = AsyncSessionLocal is not None and (tool_name not in CALENDAR_TOOLS or SessionLocal is None)
+    if use_async:
+        session_factory = _async_session_factory()
+        
+        async def _run_async_session():
+            async with session_factory() as session:
+                # run_sync hands work a regular Session bound to the async connection
+                return await session.run_sync(work)
+        coro = _run_async_session()
+    else:
+        coro = asyncio.to_thread(_run_sync_session, work)
+    
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise Exception(f"Database query timed out after {timeout}s ({tool_name or 'query'})")
+
+# ----------------------------
+# Pagination Helpers
+# ----------------------------
+
+import base64
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def _page_limit(limit):
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE."""
+    return max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+def _encode_cursor(sort_value, row_id):
+    payload = json.dumps([sort_value.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor - pass next_cursor from the previous page unchanged")
+
+def _keyset_page(query, sort_column, id_column, cursor, limit, descending=True):
+    """Fetch one page ordered by (sort_column, id) using keyset pagination.
+    
+    Cost depends on the page size, not on how many rows precede the cursor.
+    
+    Returns:
+        (rows, next_cursor) - next_cursor is None on the last page.
+    """
+    limit = _page_limit(limit)
+    if cursor:
+        after = tuple_(sort_column, id_column)
+        key = _decode_cursor(cursor)
+        query = query.filter(after < key if descending else after > key)
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = _encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows, next_cursor
+
+def _iso(value):
+    return value.isoformat(timespec="minutes") if value else None
+
+def _page_result(items, next_cursor):
+    """Compact JSON for a page of results (no indentation - this goes back into the prompt)."""
+    return json.dumps({"count": len(items), "items": items, "next_cursor": next_cursor}, separators=(",", ":"), default=str)
+
 # ----------------------------
 # MCP Server
 # ----------------------------
@@ -645,11 +925,12 @@ async def test_database() -> str:
         check_database_available()
         # print(...) # Removed to avoid MCP protocol issues
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # print(...) # Removed to avoid MCP protocol issues
             result = session.execute(text("SELECT 1 as test")).fetchone()
             # print(...) # Removed to avoid MCP protocol issues
             return f"Database test successful: {result[0]}"
+        return await run_db(_db_work, "test_database")
     except Exception as e:
         pass  #         
         return f"Database test failed: {str(e)}"
@@ -683,7 +964,8 @@ async def create_todo(
         check_database_available()
         # print(...) # Removed to avoid MCP protocol issues
         
-        with SessionLocal() as session:
+        def _db_work(session):
+            nonlocal due_date
             # print(...) # Removed to avoid MCP protocol issues
             # Set default due date to today if not provided
             if due_date is None:
@@ -766,6 +1048,7 @@ async def create_todo(
             # Return simple success message
             due_str = f" due {new_todo.due_date.strftime('%b %d')}" if new_todo.due_date else ""
             return f"Todo '{title}' created successfully with {priority.value} priority{due_str}."
+        return await run_db(_db_work, "create_todo")
         
     except Exception as e:
         error_msg = f"Error executing tool create_todo: {str(e)}"
@@ -773,16 +1056,54 @@ async def create_todo(
         return error_msg
 
 @mcp.tool()
-async def get_todos() -> str:
-    """Get all todo items.
+async def get_todos(
+    completed: Optional[bool] = None,
+    user_id: Optional[str] = None,
+    team_id: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ) -> str:
+    """Get todo items, newest first, one page at a time.
     
+    Args:
+        completed: Only completed (true) or open (false) todos. Omit for both.
+        user_id: Only todos created by or assigned to this user.
+        team_id: Only todos belonging to this team.
+        due_after: Only todos due at or after this date/time.
+        due_before: Only todos due before this date/time.
+        limit: Max todos to return (default 20, max 100).
+        cursor: next_cursor from a previous call, to get the next page.
+
     Returns:
-        A list of all todo items.
+        JSON with count, items (id, title, priority, completed, due) and next_cursor (null on the last page).
     """
-    with SessionLocal() as session:
-        todos = session.query(DBTodo).all()
-        todos_list = [Todo.model_validate(todo.__dict__).model_dump_json(indent=2) for todo in todos]
-    return f"[{', \n'.join(todos_list)}]"
+    def _db_work(session):
+        query = session.query(
+            DBTodo.id, DBTodo.created_at, DBTodo.title, DBTodo.priority,
+            DBTodo.completed, DBTodo.due_date, DBTodo.team_id,
+        )
+        if completed is not None:
+            query = query.filter(DBTodo.completed == completed)
+        if user_id:
+            query = query.filter(or_(DBTodo.creator_id == user_id, DBTodo.assignee_id == user_id))
+        if team_id:
+            query = query.filter(DBTodo.team_id == team_id)
+        if due_after is not None:
+            query = query.filter(DBTodo.due_date >= due_after)
+        if due_before is not None:
+            query = query.filter(DBTodo.due_date < due_before)
+        
+        rows, next_cursor = _keyset_page(query, DBTodo.created_at, DBTodo.id, cursor, limit)
+        items = []
+        for row in rows:
+            item = {"id": str(row.id), "title": row.title, "priority": row.priority, "completed": row.completed, "due": _iso(row.due_date)}
+            if row.team_id:
+                item["team_id"] = str(row.team_id)
+            items.append(item)
+        return _page_result(items, next_cursor)
+    return await run_db(_db_work, "get_todos")
 
 @mcp.tool()
 async def complete_todo(id: UUID) -> str:
@@ -794,7 +1115,7 @@ async def complete_todo(id: UUID) -> str:
     Returns:
         The updated todo item.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         todo = session.query(DBTodo).filter(DBTodo.id == id).first()
         if not todo:
             return "Todo not found"
@@ -807,7 +1128,8 @@ async def complete_todo(id: UUID) -> str:
         
         session.refresh(todo)
     
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+        return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "complete_todo")
 
 @mcp.tool()
 async def update_todo(
@@ -831,7 +1153,7 @@ async def update_todo(
     Returns:
         The updated todo item.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         todo = session.query(DBTodo).filter(DBTodo.id == id).first()
         if not todo:
             return "Todo not found"
@@ -883,7 +1205,8 @@ async def update_todo(
             except Exception as calendar_error:
                 pass  #                 
     
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+        return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "update_todo")
 
 @mcp.tool()
 async def delete_todo(id: UUID) -> str:
@@ -895,7 +1218,7 @@ async def delete_todo(id: UUID) -> str:
     Returns:
         The deleted todo item.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         todo = session.query(DBTodo).filter(DBTodo.id == id).first()
         if not todo:
             return "Todo not found"
@@ -924,7 +1247,8 @@ async def delete_todo(id: UUID) -> str:
         session.delete(todo)
         session.commit()
     
-    return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+        return Todo.model_validate(todo.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "delete_todo")
 
 @mcp.tool()
 async def create_reminder(
@@ -947,7 +1271,7 @@ async def create_reminder(
         # print(...) # Removed to avoid MCP protocol issues
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Handle both string and enum inputs for importance
             importance_value = importance.value if hasattr(importance, 'value') else importance
             
@@ -1010,19 +1334,20 @@ async def create_reminder(
                 pass
                 # print(...) # Removed to avoid MCP protocol issues
     
-        # Convert SQLAlchemy object to dict properly
-        reminder_dict = {
-            "id": str(new_reminder.id),
-            "created_at": new_reminder.created_at.isoformat(),
-            "updated_at": new_reminder.updated_at.isoformat(),
-            "reminder_text": new_reminder.reminder_text,
-            "importance": new_reminder.importance,
-            "reminder_date": new_reminder.reminder_date.isoformat() if new_reminder.reminder_date else None,
-            "google_calendar_event_id": new_reminder.google_calendar_event_id
-        }
-        result = Reminder.model_validate(reminder_dict).model_dump_json(indent=2)
-        # print(...) # Removed to avoid MCP protocol issues
-        return result
+            # Convert SQLAlchemy object to dict properly
+            reminder_dict = {
+                "id": str(new_reminder.id),
+                "created_at": new_reminder.created_at.isoformat(),
+                "updated_at": new_reminder.updated_at.isoformat(),
+                "reminder_text": new_reminder.reminder_text,
+                "importance": new_reminder.importance,
+                "reminder_date": new_reminder.reminder_date.isoformat() if new_reminder.reminder_date else None,
+                "google_calendar_event_id": new_reminder.google_calendar_event_id
+            }
+            result = Reminder.model_validate(reminder_dict).model_dump_json(indent=2)
+            # print(...) # Removed to avoid MCP protocol issues
+            return result
+        return await run_db(_db_work, "create_reminder")
         
     except Exception as e:
         error_msg = f"Error executing tool create_reminder: {str(e)}"
@@ -1030,16 +1355,44 @@ async def create_reminder(
         return error_msg
 
 @mcp.tool()
-async def get_reminders() -> str:
-    """Get all reminders.
+async def get_reminders(
+    importance: Optional[ReminderImportance] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ) -> str:
+    """Get reminders, newest first, one page at a time.
     
+    Args:
+        importance: Only reminders with this importance. Options are: low, medium, high, urgent
+        date_from: Only reminders dated at or after this date/time.
+        date_to: Only reminders dated before this date/time.
+        limit: Max reminders to return (default 20, max 100).
+        cursor: next_cursor from a previous call, to get the next page.
+
     Returns:
-        A list of all reminders.
+        JSON with count, items (id, text, importance, date) and next_cursor (null on the last page).
     """
-    with SessionLocal() as session:
-        reminders = session.query(DBReminder).all()
-        reminders_list = [Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2) for reminder in reminders]
-    return f"[{', \n'.join(reminders_list)}]"
+    def _db_work(session):
+        query = session.query(
+            DBReminder.id, DBReminder.created_at, DBReminder.reminder_text,
+            DBReminder.importance, DBReminder.reminder_date,
+        )
+        if importance:
+            query = query.filter(DBReminder.importance == (importance.value if hasattr(importance, 'value') else importance))
+        if date_from is not None:
+            query = query.filter(DBReminder.reminder_date >= date_from)
+        if date_to is not None:
+            query = query.filter(DBReminder.reminder_date < date_to)
+        
+        rows, next_cursor = _keyset_page(query, DBReminder.created_at, DBReminder.id, cursor, limit)
+        items = [
+            {"id": str(row.id), "text": row.reminder_text, "importance": row.importance, "date": _iso(row.reminder_date)}
+            for row in rows
+        ]
+        return _page_result(items, next_cursor)
+    return await run_db(_db_work, "get_reminders")
 
 @mcp.tool()
 async def update_reminder(
@@ -1059,7 +1412,7 @@ async def update_reminder(
     Returns:
         The updated reminder.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         reminder = session.query(DBReminder).filter(DBReminder.id == id).first()
         if not reminder:
             return "Reminder not found"
@@ -1107,7 +1460,8 @@ async def update_reminder(
             except Exception as calendar_error:
                 pass  #                 
     
-    return Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2)
+        return Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "update_reminder")
 
 @mcp.tool()
 async def delete_reminder(id: UUID) -> str:
@@ -1119,7 +1473,7 @@ async def delete_reminder(id: UUID) -> str:
     Returns:
         The deleted reminder.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         reminder = session.query(DBReminder).filter(DBReminder.id == id).first()
         if not reminder:
             return "Reminder not found"
@@ -1148,7 +1502,8 @@ async def delete_reminder(id: UUID) -> str:
         session.delete(reminder)
         session.commit()
     
-    return Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2)
+        return Reminder.model_validate(reminder.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "delete_reminder")
 
 @mcp.tool()
 async def create_calendar_event(
@@ -1173,7 +1528,7 @@ async def create_calendar_event(
         # print(...) # Removed to avoid MCP protocol issues
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             new_event = DBCalendarEvent(
                 title=title,
                 description=description,
@@ -1194,6 +1549,7 @@ async def create_calendar_event(
             to_str = new_event.event_to.strftime('%I:%M %p') if new_event.event_to else "unknown time"
             
             return f"Calendar event '{title}' created successfully from {from_str} to {to_str}."
+        return await run_db(_db_work, "create_calendar_event")
         
     except Exception as e:
         error_msg = f"Error executing tool create_calendar_event: {str(e)}"
@@ -1201,17 +1557,37 @@ async def create_calendar_event(
         return json.dumps({"error": error_msg, "status": "failed"})
 
 @mcp.tool()
-async def get_calendar_events() -> str:
-    """Get all calendar events.
+async def get_calendar_events(
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ) -> str:
+    """Get calendar events in start-time order, one page at a time.
     
+    Args:
+        date_from: Only events starting at or after this date/time.
+        date_to: Only events starting before this date/time.
+        limit: Max events to return (default 20, max 100).
+        cursor: next_cursor from a previous call, to get the next page.
+
     Returns:
-        A list of all calendar events.
+        JSON with count, items (id, title, from, to) and next_cursor (null on the last page).
     """
-    check_database_available()
-    with SessionLocal() as session:
-        events = session.query(DBCalendarEvent).all()
-        events_list = [CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2) for event in events]
-    return f"[{', \n'.join(events_list)}]"
+    def _db_work(session):
+        query = session.query(DBCalendarEvent.id, DBCalendarEvent.title, DBCalendarEvent.event_from, DBCalendarEvent.event_to)
+        if date_from is not None:
+            query = query.filter(DBCalendarEvent.event_from >= date_from)
+        if date_to is not None:
+            query = query.filter(DBCalendarEvent.event_from < date_to)
+        
+        rows, next_cursor = _keyset_page(query, DBCalendarEvent.event_from, DBCalendarEvent.id, cursor, limit, descending=False)
+        items = [
+            {"id": str(row.id), "title": row.title, "from": _iso(row.event_from), "to": _iso(row.event_to)}
+            for row in rows
+        ]
+        return _page_result(items, next_cursor)
+    return await run_db(_db_work, "get_calendar_events")
 
 @mcp.tool()
 async def update_calendar_event(
@@ -1233,7 +1609,7 @@ async def update_calendar_event(
     Returns:
         The updated calendar event.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         event = session.query(DBCalendarEvent).filter(DBCalendarEvent.id == id).first()
         if not event:
             return "Calendar event not found"
@@ -1284,7 +1660,8 @@ async def update_calendar_event(
             except Exception as calendar_error:
                 pass  #                 
     
-    return CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2)
+        return CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "update_calendar_event")
 
 @mcp.tool()
 async def delete_calendar_event(id: UUID) -> str:
@@ -1296,7 +1673,7 @@ async def delete_calendar_event(id: UUID) -> str:
     Returns:
         The deleted calendar event.
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         event = session.query(DBCalendarEvent).filter(DBCalendarEvent.id == id).first()
         if not event:
             return "Calendar event not found"
@@ -1325,7 +1702,8 @@ async def delete_calendar_event(id: UUID) -> str:
         session.delete(event)
         session.commit()
     
-    return CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2)
+        return CalendarEvent.model_validate(event.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "delete_calendar_event")
 
 @mcp.tool()
 async def create_call_recording(
@@ -1353,7 +1731,7 @@ async def create_call_recording(
     Returns:
         The created call recording record
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         recording = DBCallRecording(
             call_sid=call_sid,
             recording_path=recording_path,
@@ -1368,19 +1746,47 @@ async def create_call_recording(
         session.commit()
         session.refresh(recording)
     
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+        return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "create_call_recording")
 
 @mcp.tool()
-async def get_call_recordings() -> str:
-    """Get all call recordings.
+async def get_call_recordings(
+    status: Optional[str] = None,
+    phone_number: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    ) -> str:
+    """Get call recordings, newest first, one page at a time.
+    
+    Args:
+        status: Only recordings with this status (completed, failed, processing).
+        phone_number: Only calls from or to this number.
+        limit: Max recordings to return (default 20, max 100).
+        cursor: next_cursor from a previous call, to get the next page.
     
     Returns:
-        A list of all call recordings
+        JSON with count, items (call_sid, from, to, status, duration_seconds, created) and next_cursor
     """
-    with SessionLocal() as session:
-        recordings = session.query(DBCallRecording).order_by(DBCallRecording.created_at.desc()).all()
-    
-    return [CallRecording.model_validate(recording.__dict__).model_dump() for recording in recordings]
+    def _db_work(session):
+        query = session.query(
+            DBCallRecording.id, DBCallRecording.created_at, DBCallRecording.call_sid, DBCallRecording.from_number,
+            DBCallRecording.to_number, DBCallRecording.status, DBCallRecording.duration_seconds,
+        )
+        if status:
+            query = query.filter(DBCallRecording.status == status)
+        if phone_number:
+            query = query.filter(or_(DBCallRecording.from_number == phone_number, DBCallRecording.to_number == phone_number))
+        
+        rows, next_cursor = _keyset_page(query, DBCallRecording.created_at, DBCallRecording.id, cursor, limit)
+        items = [
+            {
+                "call_sid": row.call_sid, "from": row.from_number, "to": row.to_number, "status": row.status,
+                "duration_seconds": row.duration_seconds, "created": _iso(row.created_at),
+            }
+            for row in rows
+        ]
+        return _page_result(items, next_cursor)
+    return await run_db(_db_work, "get_call_recordings")
 
 @mcp.tool()
 async def get_call_recording_by_sid(call_sid: str) -> str:
@@ -1392,13 +1798,14 @@ async def get_call_recording_by_sid(call_sid: str) -> str:
     Returns:
         The call recording record or error message
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
         
         if not recording:
             return f"Call recording with SID {call_sid} not found"
     
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+        return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "get_call_recording_by_sid")
 
 @mcp.tool()
 async def update_call_recording(
@@ -1420,7 +1827,7 @@ async def update_call_recording(
     Returns:
         The updated call recording record
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
         
         if not recording:
@@ -1438,7 +1845,8 @@ async def update_call_recording(
         session.commit()
         session.refresh(recording)
     
-    return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+        return CallRecording.model_validate(recording.__dict__).model_dump_json(indent=2)
+    return await run_db(_db_work, "update_call_recording")
 
 @mcp.tool()
 async def delete_call_recording(call_sid: str) -> str:
@@ -1450,7 +1858,7 @@ async def delete_call_recording(call_sid: str) -> str:
     Returns:
         Success message or error
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         recording = session.query(DBCallRecording).filter(DBCallRecording.call_sid == call_sid).first()
         
         if not recording:
@@ -1466,7 +1874,8 @@ async def delete_call_recording(call_sid: str) -> str:
         session.delete(recording)
         session.commit()
     
-    return f"Call recording {call_sid} deleted successfully"
+        return f"Call recording {call_sid} deleted successfully"
+    return await run_db(_db_work, "delete_call_recording")
 
 @mcp.tool()
 async def query_db(query: str) -> str:
@@ -1478,10 +1887,11 @@ async def query_db(query: str) -> str:
     Returns:
         The query results
     """
-    with SessionLocal() as session:
+    def _db_work(session):
         result = session.execute(text(query))
         
-    return pd.DataFrame(result.all(), columns=result.keys()).to_json(orient="records", indent=2)
+        return pd.DataFrame(result.all(), columns=result.keys()).to_json(orient="records", indent=2)
+    return await run_db(_db_work, "query_db")
 
 @mcp.tool()
 async def test_authentication() -> str:
@@ -1673,7 +2083,7 @@ async def sync_google_calendar_events() -> str:
         if not get_calendar_service:
             return "Google Calendar service not available. Please check your Google Calendar configuration."
         
-        calendar_service = get_calendar_service()
+        calendar_service = await asyncio.to_thread(get_calendar_service)
         sync_summary = {
             "todos_processed": 0,
             "todos_created": 0,
@@ -1684,7 +2094,7 @@ async def sync_google_calendar_events() -> str:
             "errors": []
         }
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Sync todos
             # print(...) # Removed to avoid MCP protocol issues
             todos = session.query(DBTodo).filter(DBTodo.google_calendar_event_id.is_(None)).all()
@@ -1817,8 +2227,8 @@ async def sync_google_calendar_events() -> str:
             session.commit()
             # print(...) # Removed to avoid MCP protocol issues
         
-        # Generate summary
-        summary = f"""Google Calendar Sync Complete!
+            # Generate summary
+            summary = f"""Google Calendar Sync Complete!
 
 📊 Summary:
 - Todos processed: {sync_summary['todos_processed']}, created: {sync_summary['todos_created']}
@@ -1828,11 +2238,12 @@ async def sync_google_calendar_events() -> str:
 
 ✅ Total Google Calendar events created: {sync_summary['todos_created'] + sync_summary['reminders_created'] + sync_summary['events_created']}"""
 
-        if sync_summary['errors']:
-            summary += f"\n\n❌ Errors encountered:\n" + "\n".join(sync_summary['errors'])
+            if sync_summary['errors']:
+                summary += f"\n\n❌ Errors encountered:\n" + "\n".join(sync_summary['errors'])
         
-        # print(...) # Removed to avoid MCP protocol issues
-        return summary
+            # print(...) # Removed to avoid MCP protocol issues
+            return summary
+        return await run_db(_db_work, "sync_google_calendar_events")
         
     except Exception as e:
         error_msg = f"Error during Google Calendar sync: {str(e)}"
@@ -1851,7 +2262,7 @@ async def get_teams() -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Get all teams
             teams = session.query(Team).filter(Team.is_active == True).all()
             
@@ -1865,6 +2276,7 @@ async def get_teams() -> str:
                 result += f"  Created: {team.created_at.strftime('%Y-%m-%d %H:%M')}\n\n"
             
             return result
+        return await run_db(_db_work, "get_teams")
             
     except Exception as e:
         return f"Error getting teams: {str(e)}"
@@ -1883,7 +2295,7 @@ async def get_team_members(team_id: str) -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Get team
             team = session.query(Team).filter(Team.id == team_id).first()
             if not team:
@@ -1904,6 +2316,7 @@ async def get_team_members(team_id: str) -> str:
                 result += f"  Joined: {membership.joined_at.strftime('%Y-%m-%d')}\n\n"
             
             return result
+        return await run_db(_db_work, "get_team_members")
             
     except Exception as e:
         return f"Error getting team members: {str(e)}"
@@ -1936,7 +2349,8 @@ async def create_team_todo(
         # print(...) # Removed to avoid MCP protocol issues
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
+            nonlocal due_date
             # Verify team exists
             team = session.query(Team).filter(Team.id == team_id).first()
             if not team:
@@ -2036,6 +2450,7 @@ async def create_team_todo(
                 result += f"📅 Google Calendar Event ID: {google_event_id}\n"
             
             return result
+        return await run_db(_db_work, "create_team_todo")
             
     except Exception as e:
         return f"Error creating team todo: {str(e)}"
@@ -2055,7 +2470,7 @@ async def create_team(name: str, description: str = "") -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Create new team
             team = Team(
                 name=name,
@@ -2074,6 +2489,7 @@ async def create_team(name: str, description: str = "") -> str:
             result += f"💡 Note: You can now add members to this team using the team dashboard or by saying 'Add [email] to {name} team as [role]'"
             
             return result
+        return await run_db(_db_work, "create_team")
             
     except Exception as e:
         return f"Error creating team: {str(e)}"
@@ -2094,7 +2510,7 @@ async def add_team_member(team_name: str, email: str, role: str = "member") -> s
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Find team by name (case-insensitive)
             team = session.query(Team).filter(
                 Team.name.ilike(f"%{team_name}%"),
@@ -2146,6 +2562,7 @@ async def add_team_member(team_name: str, email: str, role: str = "member") -> s
             result += f"📅 Joined: {membership.joined_at.strftime('%Y-%m-%d %H:%M UTC')}\n"
             
             return result
+        return await run_db(_db_work, "add_team_member")
             
     except Exception as e:
         return f"Error adding team member: {str(e)}"
@@ -2164,7 +2581,7 @@ async def verify_user_pin(pin: str) -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Find user by PIN
             user = session.query(User).filter(
                 User.voice_pin == pin,
@@ -2190,6 +2607,7 @@ async def verify_user_pin(pin: str) -> str:
                 result += "You're not currently a member of any teams.\n"
             
             return result
+        return await run_db(_db_work, "verify_user_pin")
             
     except Exception as e:
         return f"AUTHENTICATION_ERROR: {str(e)}"
@@ -2208,7 +2626,7 @@ async def search_users(search_term: str) -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Search by email, username, first_name, or last_name
             users = session.query(User).filter(
                 (User.email.ilike(f"%{search_term}%")) |
@@ -2227,6 +2645,7 @@ async def search_users(search_term: str) -> str:
                 result += f"  User ID: {user.id}\n\n"
             
             return result
+        return await run_db(_db_work, "search_users")
             
     except Exception as e:
         return f"Error searching users: {str(e)}"
@@ -2246,7 +2665,7 @@ async def remove_team_member(team_name: str, email: str) -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Find team
             team = session.query(Team).filter(
                 Team.name.ilike(f"%{team_name}%"),
@@ -2290,6 +2709,7 @@ async def remove_team_member(team_name: str, email: str) -> str:
             result += f"🏢 Removed from: {team.name}\n"
             
             return result
+        return await run_db(_db_work, "remove_team_member")
             
     except Exception as e:
         return f"Error removing team member: {str(e)}"
@@ -2310,7 +2730,7 @@ async def change_member_role(team_name: str, email: str, new_role: str) -> str:
         _lazy_import_team_models()
         check_database_available()
         
-        with SessionLocal() as session:
+        def _db_work(session):
             # Find team
             team = session.query(Team).filter(
                 Team.name.ilike(f"%{team_name}%"),
@@ -2355,6 +2775,7 @@ async def change_member_role(team_name: str, email: str, new_role: str) -> str:
             result += f"🎭 Role changed: {old_role.value} → {new_role_enum.value}\n"
             
             return result
+        return await run_db(_db_work, "change_member_role")
             
     except Exception as e:
         return f"Error changing member role: {str(e)}"
@@ -0,0 +1,367 @@
+"""
+Prompt Cache
+Provider-aware prompt prefix caching for the agent: the static system prompt and
+tool schemas are sent first and marked cacheable (Anthropic cache_control
+breakpoints, Gemini cached content, OpenAI's automatic prefix cache), and the
+cached-token counts reported by each LLM call are collected per turn
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List
+
+from langchain_core.messages import SystemMessage
+
+logger = logging.getLogger(__name__)
+
+try:
+    from google.genai import types as genai_types
+    GENAI_AVAILABLE = True
+except ImportError:
+    genai_types = None
+    GENAI_AVAILABLE = False
+
+PROMPT_CACHE_ENABLED = os.getenv('PROMPT_CACHE', 'true').lower() == 'true'
+
+EPHEMERAL = {"type": "ephemeral"}
+
+# Price of a cached input token relative to an uncached one, per provider
+CACHE_READ_PRICE = {"claude": 0.1, "openai": 0.5, "gemini": 0.25}
+# Anthropic bills cache writes at a premium; the others do not charge for them
+CACHE_WRITE_PRICE = {"claude": 1.25}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def system_messages(provider: str, static_prompt: str, summary: Optional[str] = None) -> List[SystemMessage]:
+    """
+    System messages for one LLM call, static prefix first
+
+    The static prompt is identical on every call, so together with the bound
+    tools it forms the cached prefix. The conversation summary changes only
+    when the window is compacted and always comes after it.
+
+    Args:
+        provider: "claude", "openai" or "gemini"
+        static_prompt: Formatted system prompt (see TodoAgent.static_system_prompt)
+        summary: Running summary of turns dropped from the message window
+    """
+    summary_block = f"<conversation_summary>\n{summary}\n</conversation_summary>" if summary else None
+
+    if provider == "claude" and PROMPT_CACHE_ENABLED:
+        # Breakpoint after the static block: tools + system prompt are read from cache
+        content = [{"type": "text", "text": static_prompt, "cache_control": dict(EPHEMERAL)}]
+        if summary_block:
+            content.append({"type": "text", "text": summary_block})
+        return [SystemMessage(content=content)]
+
+    if provider == "openai":
+        # OpenAI caches the longest matching prefix automatically; keep the summary out of it
+        messages = [SystemMessage(content=static_prompt)]
+        if summary_block:
+            messages.append(SystemMessage(content=summary_block))
+        return messages
+
+    # Gemini folds system messages into the first user turn, so send a single one
+    if summary_block:
+        return [SystemMessage(content=f"{static_prompt}\n\n{summary_block}")]
+    return [SystemMessage(content=static_prompt)]
+
+
+def anthropic_cached_tools(tools: List[Any]) -> List[Any]:
+    """
+    Tool schemas for ChatAnthropic.bind_tools with a cache breakpoint on the
+    last one, so the tool list stays cached even when the system prompt changes
+    """
+    if not tools or not PROMPT_CACHE_ENABLED:
+        return tools
+    try:
+        from langchain_anthropic.chat_models import convert_to_anthropic_tool
+        formatted = [dict(convert_to_anthropic_tool(tool)) for tool in tools]
+    except Exception as e:
+        logger.warning(f"⚠️ Could not format tools for Anthropic prompt caching: {e}")
+        return tools
+    formatted[-1]["cache_control"] = dict(EPHEMERAL)
+    return formatted
+
+
+class TurnUsage:
+    """Token usage of every LLM call made during one agent turn"""
+
+    def __init__(self):
+        self.calls = 0
+        self.provider: Optional[str] = None
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+        self.first_token_ms: Optional[float] = None
+        self.llm_ms = 0.0
+
+    def record(self, provider: str, usage: Dict[str, int], latency_ms: Optional[float], ttft_ms: Optional[float]):
+        self.calls += 1
+        self.provider = provider
+        self.input_tokens += usage["input_tokens"]
+        self.cache_read_tokens += usage["cache_read"]
+        self.cache_write_tokens += usage["cache_write"]
+        self.output_tokens += usage["output_tokens"]
+        if self.first_token_ms is None and ttft_ms is not None:
+            self.first_token_ms = ttft_ms
+        if latency_ms is not None:
+            self.llm_ms += latency_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "llm_calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cache_read_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_hit_rate": round(self.cache_read_tokens / self.input_tokens, 3) if self.input_tokens else None,
+            "input_cost_saving": input_cost_saving(self.provider, self.input_tokens, self.cache_read_tokens, self.cache_write_tokens),
+            "first_token_ms": round(self.first_token_ms, 1) if self.first_token_ms is not None else None,
+            "llm_ms": round(self.llm_ms, 1),
+        }
+
+
+_turn_usage: ContextVar[Optional[TurnUsage]] = ContextVar("prompt_cache_turn_usage", default=None)
+
+
+def begin_turn() -> TurnUsage:
+    """Start collecting usage for the current agent turn (the context is copied into LangGraph nodes)"""
+    usage = TurnUsage()
+    _turn_usage.set(usage)
+    return usage
+
+
+def input_cost_saving(provider: Optional[str], input_tokens: int, cache_read: int, cache_write: int) -> Optional[float]:
+    """Share of the input token cost saved by caching, against sending everything uncached"""
+    if not input_tokens:
+        return None
+    uncached = input_tokens - cache_read - cache_write
+    cost = uncached + cache_read * CACHE_READ_PRICE.get(provider, 1.0) + cache_write * CACHE_WRITE_PRICE.get(provider, 1.0)
+    return round(1 - cost / input_tokens, 3)
+
+
+def usage_from_message(message: Any) -> Optional[Dict[str, int]]:
+    """Normalized usage from a LangChain AIMessage (input_tokens include cached tokens)"""
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return None
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0) or 0,
+        "cache_read": details.get("cache_read", 0) or 0,
+        "cache_write": details.get("cache_creation", 0) or 0,
+        "output_tokens": usage.get("output_tokens", 0) or 0,
+    }
+
+
+def usage_from_gemini(usage_metadata: Any) -> Optional[Dict[str, int]]:
+    """Normalized usage from a google-genai response's usage_metadata"""
+    if usage_metadata is None:
+        return None
+    return {
+        "input_tokens": getattr(usage_metadata, "prompt_token_count", 0) or 0,
+        "cache_read": getattr(usage_metadata, "cached_content_token_count", 0) or 0,
+        "cache_write": 0,
+        "output_tokens": getattr(usage_metadata, "candidates_token_count", 0) or 0,
+    }
+
+
+class PromptCacheStats:
+    """Cached-token counters per provider, with latency split by cache hit and miss"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, provider: str, usage: Dict[str, int], latency_ms: Optional[float] = None, ttft_ms: Optional[float] = None):
+        hit = usage["cache_read"] > 0
+        with self._lock:
+            stats = self._providers.setdefault(provider, {
+                "calls": 0, "cache_hits": 0, "input_tokens": 0, "cache_read": 0, "cache_write": 0, "output_tokens": 0,
+                "latency": {"hit": [0, 0.0], "miss": [0, 0.0]}, "ttft": {"hit": [0, 0.0], "miss": [0, 0.0]},
+            })
+            stats["calls"] += 1
+            stats["cache_hits"] += int(hit)
+            for field in ("input_tokens", "cache_read", "cache_write", "output_tokens"):
+                stats[field] += usage[field]
+            for name, value in (("latency", latency_ms), ("ttft", ttft_ms)):
+                if value is not None:
+                    bucket = stats[name]["hit" if hit else "miss"]
+                    bucket[0] += 1
+                    bucket[1] += value
+
+    def get_stats(self) -> Dict[str, Any]:
+        def mean(bucket):
+            return round(bucket[1] / bucket[0], 1) if bucket[0] else None
+
+        with self._lock:
+            providers = copy.deepcopy(self._providers)
+        return {
+            name: {
+                "calls": stats["calls"],
+                "cache_hits": stats["cache_hits"],
+                "input_tokens": stats["input_tokens"],
+                "cached_tokens": stats["cache_read"],
+                "cache_write_tokens": stats["cache_write"],
+                "output_tokens": stats["output_tokens"],
+                "cache_hit_rate": round(stats["cache_read"] / stats["input_tokens"], 3) if stats["input_tokens"] else None,
+                "input_cost_saving": input_cost_saving(name, stats["input_tokens"], stats["cache_read"], stats["cache_write"]),
+                "avg_latency_ms": {kind: mean(bucket) for kind, bucket in stats["latency"].items()},
+                "avg_ttft_ms": {kind: mean(bucket) for kind, bucket in stats["ttft"].items()},
+            }
+            for name, stats in providers.items()
+        }
+
+
+_prompt_cache_stats = PromptCacheStats()
+
+
+def record_usage(provider: str, usage: Optional[Dict[str, int]], latency_ms: Optional[float] = None,
+                 ttft_ms: Optional[float] = None):
+    """Record one LLM call's token usage globally and on the current turn"""
+    if usage is None:
+        return
+    _prompt_cache_stats.record(provider, usage, latency_ms, ttft_ms)
+    turn = _turn_usage.get()
+    if turn is not None:
+        turn.record(provider, usage, latency_ms, ttft_ms)
+    written = f", {usage['cache_write']} written" if usage["cache_write"] else ""
+    print(f"💾 Prompt cache ({provider}): {usage['cache_read']}/{usage['input_tokens']} input tokens cached{written}", flush=True)
+
+
+class GeminiContextCache:
+    """
+    Gemini explicit context caches for the static request prefix (system
+    instruction + tool declarations), keyed by a hash of model, prompt and tools.
+
+    A cache is created on first use and reused until shortly before its TTL
+    (GEMINI_CONTEXT_CACHE_TTL seconds) runs out. Creation fails for prefixes
+    below the model's minimum cacheable size; such keys are not retried for
+    GEMINI_CONTEXT_CACHE_RETRY seconds and the request is sent inline.
+    """
+
+    def __init__(self):
+        self.enabled = PROMPT_CACHE_ENABLED and os.getenv('GEMINI_CONTEXT_CACHE', 'true').lower() == 'true'
+        self.ttl = _env_int('GEMINI_CONTEXT_CACHE_TTL', 3600)
+        self.retry_after = _env_int('GEMINI_CONTEXT_CACHE_RETRY', 600)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}  # key -> (cache name, expires_at)
+        self._failed: Dict[str, float] = {}  # key -> retry_at
+        self._creating = set()
+        self.created = 0
+        self.reused = 0
+        self.inline = 0
+        self.failures = 0
+
+    @staticmethod
+    def _fingerprint(model: str, system_instruction: Optional[str], tools: List[Any]) -> str:
+        def encode(obj):
+            return obj.model_dump(exclude_none=True) if hasattr(obj, "model_dump") else str(obj)
+
+        payload = json.dumps([model, system_instruction, tools], sort_keys=True, default=encode)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, client: Any, model: str, system_instruction: Optional[str], tools: List[Any]) -> Optional[str]:
+        """
+        Name of a cached content holding the prefix, or None to send it inline
+
+        Args:
+            client: google.genai Client
+            model: Gemini model name
+            system_instruction: System prompt
+            tools: types.Tool objects for the request config
+        """
+        if not self.enabled or not GENAI_AVAILABLE or not (system_instruction or tools):
+            return None
+        key = self._fingerprint(model, system_instruction, tools)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            # Leave a minute of headroom so a request never races the cache's expiry
+            if entry is not None and entry[1] - 60 > now:
+                self.reused += 1
+                return entry[0]
+            if self._failed.get(key, 0) > now or key in self._creating:
+                self.inline += 1
+                return None
+            self._creating.add(key)
+
+        try:
+            cache = await client.aio.caches.create(
+                model=model,
+                config=genai_types.CreateCachedContentConfig(
+                    display_name=f"convonet-prefix-{key[:12]}",
+                    system_instruction=system_instruction,
+                    tools=tools or None,
+                    ttl=f"{self.ttl}s",
+                ),
+            )
+            with self._lock:
+                self._entries[key] = (cache.name, now + self.ttl)
+                self.created += 1
+            print(f"💾 Created Gemini context cache {cache.name} for {model} (ttl {self.ttl}s)", flush=True)
+            return cache.name
+        except Exception as e:
+            with self._lock:
+                self._failed[key] = now + self.retry_after
+                self.failures += 1
+                self.inline += 1
+            logger.warning(f"⚠️ Gemini context cache unavailable for {model}, sending prefix inline: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._creating.discard(key)
+
+    def invalidate(self, name: str):
+        """Forget a cache the API no longer knows (e.g. expired or deleted)"""
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[0] == name:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "ttl_s": self.ttl,
+                "active_caches": len(self._entries),
+                "created": self.created,
+                "reused": self.reused,
+                "inline": self.inline,
+                "failures": self.failures,
+            }
+
+
+# Global Gemini context cache instance
+_gemini_context_cache = None
+
+
+def get_gemini_context_cache() -> GeminiContextCache:
+    """Get the global Gemini context cache instance"""
+    global _gemini_context_cache
+    if _gemini_context_cache is None:
+        _gemini_context_cache = GeminiContextCache()
+    return _gemini_context_cache
+
+
+def get_stats() -> Dict[str, Any]:
+    """Prompt cache statistics for the stats endpoint"""
+    return {
+        "enabled": PROMPT_CACHE_ENABLED,
+        "providers": _prompt_cache_stats.get_stats(),
+        "gemini_context_cache": get_gemini_context_cache().get_stats(),
+    }
@@ -38,17 +38,19 @@ class RedisManager:
             redis_password = os.getenv('REDIS_PASSWORD', '')
             redis_db = safe_int(os.getenv('REDIS_DB', '0'), 0)
         
+        self._connection_kwargs = {
+            'host': redis_host,
+            'port': redis_port,
+            'password': redis_password if redis_password else None,
+            'db': redis_db,
+            'socket_connect_timeout': 5,
+            'socket_timeout': 5,
+            'retry_on_timeout': True
+        }
+        self._binary_client = None
+        
         try:
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                password=redis_password if redis_password else None,
-                db=redis_db,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True
-            )
+            self.redis_client = redis.Redis(decode_responses=True, **self._connection_kwargs)
             
             # Test connection
             self.redis_client.ping()
@@ -64,6 +66,14 @@ class RedisManager:
         """Check if Redis is available"""
         return self.redis_client is not None
     
+    def get_binary_client(self) -> Optional[redis.Redis]:
+        """Get a Redis client that returns raw bytes (for binary payloads such as audio)"""
+        if self.redis_client is None:
+            return None
+        if self._binary_client is None:
+            self._binary_client = redis.Redis(decode_responses=False, **self._connection_kwargs)
+        return self._binary_client
+    
     # Session Management
     def create_session(self, session_id: str, session_data: Dict[str, Any], ttl: int = 3600) -> bool:
         """Create a new session with TTL"""
@@ -1,14 +1,18 @@
 from flask import Blueprint, request, jsonify, render_template, Response
 from flask_socketio import emit, join_room, leave_room
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, ToolMessage
 from langgraph.graph import StateGraph
-from typing import Optional
+from typing import Optional, Callable
 import asyncio
 import json
 import os
 import logging
 import time
+import hashlib
+import threading
+import weakref
 import sentry_sdk
+from collections import OrderedDict
 
 # Apply nest_asyncio to allow nested event loops (needed for eventlet compatibility)
 try:
@@ -22,6 +26,11 @@ from .state import AgentState
 from .assistant_graph_todo import get_agent, TodoAgent
 from .voice_intent_utils import has_transfer_intent
 from .llm_provider_manager import get_llm_provider_manager, LLMProvider
+from .agent_runtime import get_agent_runtime, AgentRuntimeBusy
+from .twilio_turns import get_twilio_turn_manager
+from .prompt_cache import begin_turn as begin_prompt_cache_turn, get_stats as get_prompt_cache_stats
+from .tool_router import get_tool_router, get_tool_router_stats
+from .intent_fast_path import get_intent_fast_path
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from .redis_manager import redis_manager
 import uuid
@@ -34,11 +43,33 @@ import uuid
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Global agent graph cache (initialized on first use)
+# Global agent graph cache: compiled graphs keyed by (provider, model, toolset hash), LRU-ordered
+# Built eagerly at startup for every available provider so mixed-provider traffic never builds on the request path
+_agent_graphs = OrderedDict()
+_agent_graphs_lock = threading.Lock()  # Guards _agent_graphs/_agent_graph_stats across event loops
+_AGENT_GRAPH_CACHE_SIZE = max(1, int(os.getenv("AGENT_GRAPH_CACHE_SIZE", "6")))
+_agent_graph_stats = {
+    'hits': 0,
+    'misses': 0,
+    'builds': 0,
+    'rebuilds': 0,  # Builds for a provider/model that had been built before (eviction, invalidation, new toolset)
+    'prebuilt': 0,
+    'evictions': 0,
+    'invalidations': 0,
+    'fallbacks': 0,  # Tool-less graphs built because the real build failed
+    'build_ms_total': 0.0,
+}
+# Tool-less fallback graphs, (provider, model) -> {'graph', 'expires_at'}; kept out of the LRU so a
+# slow MCP start can't pin them, and reused only briefly so the real build is retried soon
+_fallback_agent_graphs = {}
+_AGENT_GRAPH_FALLBACK_TTL = float(os.getenv("AGENT_GRAPH_FALLBACK_TTL", "30"))
+_agent_graph_built_models = set()  # (provider, model) pairs built at least once
+# Most recently served graph and its provider/model (kept for code that inspects the "current" graph)
 _agent_graph_cache = None
-_agent_graph_model = None  # Track which model was used for the cached graph
-_agent_graph_provider = None  # Track which provider was used for the cached graph
-_agent_graph_lock = asyncio.Lock()
+_agent_graph_model = None
+_agent_graph_provider = None
+# Graph build locks, one per event loop (an asyncio.Lock cannot be shared across loops)
+_agent_graph_build_locks = weakref.WeakKeyDictionary()
 
 # Global MCP tools cache (pre-loaded at startup to avoid hangs during requests)
 _mcp_tools_cache = None
@@ -191,11 +222,11 @@ def verify_pin_webhook():
         # Verify PIN - use direct database query (fast, <100ms, avoids Twilio timeout)
         try:
             # Import here to avoid circular import
-            from convonet.mcps.local_servers.db_todo import _init_database, SessionLocal
+            from convonet.mcps.local_servers.db_todo import get_session_factory
             from convonet.models.user_models import User as UserModel
             
             # Initialize database if needed
-            _init_database()
+            SessionLocal = get_session_factory()
             
             if SessionLocal is None:
                 raise Exception("Database not initialized - DB_URI not configured")
@@ -495,7 +526,8 @@ def voice_assistant_transfer_bridge():
 def process_audio_webhook():
     """
     Handles audio processing requests from Twilio.
-    Processes the audio and returns TwiML with the agent's response.
+    Submits the turn to the agent runtime and returns a <Redirect> to the polling
+    endpoint, which speaks the agent's response once it is ready.
     
     Features:
     - Barge-in capability: Users can interrupt the agent while it's speaking
@@ -563,13 +595,11 @@ def process_audio_webhook():
                 response.hangup()
                 return Response(str(response), mimetype='text/xml')
             
-            # Check if this user's thread needs to be reset (after previous timeout/error)
-            reset_thread = False
-            if user_id and hasattr(_run_agent_async, '_reset_threads') and user_id in _run_agent_async._reset_threads:
-                reset_thread = True
-                _run_agent_async._reset_threads.remove(user_id)
+            # Fresh conversation thread if the previous turn timed out or failed
+            turn_manager = get_twilio_turn_manager()
+            reset_thread = turn_manager.consume_thread_reset(user_id)
+            if reset_thread:
                 print(f"🔄 Resetting conversation thread for user {user_id} (previous timeout/error)")
-                print(f"🔄 Reset threads set contains: {_run_agent_async._reset_threads}")
                 
                 # Track thread reset in Sentry
                 sentry_sdk.capture_message(
@@ -578,190 +608,225 @@ def process_audio_webhook():
                     extras={"user_id": user_id}
                 )
         
-            # Process with the agent (with timeout to prevent hanging)
-            # Note: Twilio HTTP timeout is ~15 seconds, so we must respond faster
-            start_time = time.time()
-            transfer_marker = None
-            
-            with sentry_sdk.start_span(op="agent_processing", description="LangGraph agent execution"):
+            # Hand the agent call to the shared runtime and answer right away: Twilio follows the
+            # <Redirect> to the polling endpoint, so this worker is never parked on the LLM
+            with sentry_sdk.start_span(op="agent_submit", description="Submit LangGraph agent turn"):
                 try:
-                    agent_result = asyncio.run(asyncio.wait_for(
+                    turn_id = turn_manager.submit(
                         _run_agent_async(
                             transcribed_text,
                             user_id=user_id,
                             reset_thread=reset_thread,
                             include_metadata=True
                         ),
-                        timeout=12.0  # Reduced from 30 to 12 seconds to stay under Twilio's 15s timeout
-                    ))
-                    if isinstance(agent_result, dict):
-                        agent_response = agent_result.get("response", "")
-                        transfer_marker = agent_result.get("transfer_marker")
-                    else:
-                        agent_response = agent_result
-                        transfer_marker = None
-                    processing_time = time.time() - start_time
-                    sentry_sdk.set_measurement("agent_processing_time", processing_time, "second")
-                except asyncio.TimeoutError:
-                    processing_time = time.time() - start_time
-                    print(f"⏰ Outer timeout: Agent took more than 12 seconds (actual: {processing_time:.2f}s)")
-                    
-                    # Track timeout in Sentry
-                    sentry_sdk.capture_message(
-                        "Agent processing timeout",
-                        level="warning",
-                        extras={
-                            "user_id": user_id,
-                            "call_sid": call_sid,
-                            "prompt": transcribed_text,
-                            "timeout_duration": processing_time
-                        }
+                        call_sid=call_sid
                     )
-                    
-                    # Mark user for thread reset
-                    if user_id:
-                        if not hasattr(_run_agent_async, '_reset_threads'):
-                            _run_agent_async._reset_threads = set()
-                        _run_agent_async._reset_threads.add(user_id)
-                        print(f"🔄 Marked user {user_id} for thread reset")
-                    agent_response = "I'm sorry, that operation is taking too long. The task may still complete in the background. Please check your calendar or todo list."
-                except Exception as e:
-                    processing_time = time.time() - start_time
-                    print(f"Error in agent processing (outer): {e}")
-                    
-                    # Capture exception in Sentry
-                    sentry_sdk.capture_exception(e)
-                    
-                    agent_response = f"AGENT_ERROR:unexpected:{str(e)[:100]}"
-        
-            # Check if agent returned an error marker and handle accordingly
-            if agent_response.startswith("AGENT_TIMEOUT:"):
-                print(f"⏰ Agent timed out internally")
-                if user_id:
-                    if not hasattr(_run_agent_async, '_reset_threads'):
-                        _run_agent_async._reset_threads = set()
-                    _run_agent_async._reset_threads.add(user_id)
-                    print(f"🔄 Marked user {user_id} for thread reset")
-                agent_response = "I'm sorry, that operation is taking too long. Please try a simpler request."
-                
-            elif agent_response.startswith("AGENT_ERROR:"):
-                # Parse error type and message
-                parts = agent_response.split(":", 2)
-                error_type = parts[1] if len(parts) > 1 else "unknown"
-                error_msg = parts[2] if len(parts) > 2 else ""
-                
-                print(f"🔧 Agent returned error: type={error_type}, msg={error_msg}")
+                except AgentRuntimeBusy as e:
+                    print(f"🚦 Agent runtime at capacity, rejecting turn: {e}")
+                    return _twilio_agent_reply(f"AGENT_ERROR:busy:{str(e)[:100]}", None, user_id, call_sid, transfer_requested)
+            
+            response = VoiceResponse()
+            response.redirect(_twilio_poll_url(turn_id, user_id), method='POST')
+            return Response(str(response), mimetype='text/xml')
+            
+        except Exception as e:
+            print(f"Error processing audio: {e}")
+            sentry_sdk.capture_exception(e)
+            return _twilio_error_reply(user_id)
+
+
+@convonet_todo_bp.route('/twilio/process_audio/poll', methods=['GET', 'POST'])
+def process_audio_poll():
+    """
+    Twilio <Redirect> target while an agent turn runs on the agent runtime.
+    Answers without blocking: a short <Pause> and another poll while the agent is
+    still working, or the agent's reply once it has finished.
+    """
+    with sentry_sdk.start_transaction(op="voice_call", name="process_audio_poll"):
+        turn_id = request.args.get('turn_id', '')
+        user_id = request.args.get('user_id')
+        call_sid = request.form.get('CallSid', '')
+        try:
+            turn_manager = get_twilio_turn_manager()
+            status, outcome = turn_manager.poll(turn_id)
+            
+            if status == "pending":
+                response = VoiceResponse()
+                response.pause(length=turn_manager.poll_pause)
+                response.redirect(_twilio_poll_url(turn_id, user_id), method='POST')
+                return Response(str(response), mimetype='text/xml')
+            
+            if status == "unknown":
+                print(f"⚠️ Twilio turn {turn_id} not found (expired or lost)")
+                return _twilio_agent_reply("AGENT_ERROR:unexpected:turn not found", None, user_id, call_sid, False)
+            
+            sentry_sdk.set_measurement("agent_processing_time", outcome.processing_time, "second")
+            transfer_marker = None
+            if outcome.status == "done":
+                if isinstance(outcome.result, dict):
+                    agent_response = outcome.result.get("response", "")
+                    transfer_marker = outcome.result.get("transfer_marker")
+                else:
+                    agent_response = outcome.result or ""
+            elif outcome.status == "timeout":
+                print(f"⏰ Agent took more than {turn_manager.turn_timeout}s for call {call_sid}")
                 
-                # Track error in Sentry
+                # Track timeout in Sentry
                 sentry_sdk.capture_message(
-                    f"Agent error: {error_type}",
-                    level="error",
+                    "Agent processing timeout",
+                    level="warning",
                     extras={
-                        "error_type": error_type,
-                        "error_message": error_msg,
                         "user_id": user_id,
-                        "call_sid": call_sid
+                        "call_sid": call_sid,
+                        "timeout_duration": outcome.processing_time
                     }
                 )
-                
-                # Mark user for thread reset on these error types
-                if error_type in ["tool_call_incomplete", "broken_resource"]:
-                    if user_id:
-                        if not hasattr(_run_agent_async, '_reset_threads'):
-                            _run_agent_async._reset_threads = set()
-                        _run_agent_async._reset_threads.add(user_id)
-                        print(f"🔄 Marked user {user_id} for thread reset due to {error_type}")
-                
-                # User-friendly messages
-                if error_type == "tool_call_incomplete":
-                    agent_response = "I had trouble with the previous operation. Please try your request again."
-                elif error_type == "broken_resource":
-                    agent_response = "I encountered a connection issue. The operation may have completed. Please check your calendar or todo list."
-                else:
-                    agent_response = "I'm sorry, I encountered an error. Please try again or rephrase your question."
-            
-            # Check if agent response indicates a transfer request
-            transfer_marker_value = transfer_marker
-            if not transfer_marker_value and isinstance(agent_response, str) and agent_response.startswith("TRANSFER_INITIATED:"):
-                transfer_marker_value = agent_response
-            
-            if transfer_marker_value:
-                if not transfer_requested:
-                    logger.info("Transfer marker detected but caller did not request a human. Suppressing automatic transfer.")
-                    transfer_marker_value = None
-                else:
-                    transfer_data = transfer_marker_value.replace("TRANSFER_INITIATED:", "")
-                    parts = transfer_data.split("|")
-                    target_extension = parts[0] if len(parts) > 0 else "2001"
-                    
-                    webhook_base_url = get_webhook_base_url()
-                    response = VoiceResponse()
-                    response.redirect(f'{webhook_base_url}/convonet_todo/twilio/transfer?extension={target_extension}')
-                    logger.info(f"Agent initiated transfer to extension {target_extension}")
-                    if user_id:
-                        if not hasattr(_run_agent_async, '_reset_threads'):
-                            _run_agent_async._reset_threads = set()
-                        _run_agent_async._reset_threads.add(user_id)
-                    return Response(str(response), mimetype='text/xml')
-            
-            # Return TwiML with the agent's response and barge-in capability
-            response = VoiceResponse()
-            
-            # Preserve user_id in redirects
-            user_param = f'?user_id={user_id}' if user_id else ''
-            auth_param = f'&authenticated=true' if user_id else ''
+                turn_manager.mark_thread_reset(user_id)
+                agent_response = "I'm sorry, that operation is taking too long. The task may still complete in the background. Please check your calendar or todo list."
+            else:
+                print(f"Error in agent processing (outer): {outcome.status} {outcome.error}")
+                agent_response = f"AGENT_ERROR:unexpected:{outcome.error[:100]}"
             
-            # Enhanced Twilio speech recognition configuration
-            gather = Gather(
-                input='speech',
-                action=f'/convonet_todo/twilio/process_audio{user_param}',
-                method='POST',
-                speech_timeout='auto',
-                timeout=15,  # Increased from 10s
-                barge_in=True,
-                speech_model='experimental_conversations',
-                enhanced=True,
-                language='en-US',
-                # Add speech hints for better recognition
-                speech_hints='create todo reminder calendar team member assign task complete delete update schedule meeting appointment'
-            )
+            # Callers asking for a human were redirected to the transfer endpoint before the agent ran
+            return _twilio_agent_reply(agent_response, transfer_marker, user_id, call_sid, False)
         
-            # Add the agent's response to the gather
-            gather.say(agent_response, voice='Polly.Amy')
-            response.append(gather)
-            
-            # Fallback if no speech is detected after the response
-            response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-            response.redirect(f'/convonet_todo/twilio/call?is_continuation=true{auth_param}{user_param}')
-            
-            print(f"Generated TwiML response: {str(response)}")
-            return Response(str(response), mimetype='text/xml')
-            
         except Exception as e:
-            print(f"Error processing audio: {e}")
+            print(f"Error polling agent turn: {e}")
             sentry_sdk.capture_exception(e)
-            response = VoiceResponse()
-            
-            # Preserve user_id in error redirects
-            user_param = f'?user_id={user_id}' if user_id else ''
-            auth_param = f'&authenticated=true' if user_id else ''
-            
-            # Use Gather with barge-in for error messages too
-            gather = Gather(
-                input='speech',
-                action=f'/convonet_todo/twilio/process_audio{user_param}',
-                method='POST',
-                speech_timeout='auto',
-                timeout=10,
-                barge_in=True
-            )
-            gather.say("I'm sorry, I encountered an error processing your request. Please try again.", voice='Polly.Amy')
-            response.append(gather)
+            return _twilio_error_reply(user_id)
+
+
+def _twilio_poll_url(turn_id: str, user_id: Optional[str]) -> str:
+    user_param = f'&user_id={user_id}' if user_id else ''
+    return f'/convonet_todo/twilio/process_audio/poll?turn_id={turn_id}{user_param}'
+
+
+def _twilio_agent_reply(agent_response: str, transfer_marker: Optional[str], user_id: Optional[str],
+                        call_sid: str, transfer_requested: bool) -> Response:
+    """
+    TwiML for a finished agent turn: error markers become spoken apologies, an agent-initiated
+    transfer redirects the call, and anything else is spoken inside a barge-in <Gather>.
+    """
+    turn_manager = get_twilio_turn_manager()
+    
+    # Check if agent returned an error marker and handle accordingly
+    if agent_response.startswith("AGENT_TIMEOUT:"):
+        print(f"⏰ Agent timed out internally")
+        turn_manager.mark_thread_reset(user_id)
+        agent_response = "I'm sorry, that operation is taking too long. Please try a simpler request."
+        
+    elif agent_response.startswith("AGENT_ERROR:"):
+        # Parse error type and message
+        parts = agent_response.split(":", 2)
+        error_type = parts[1] if len(parts) > 1 else "unknown"
+        error_msg = parts[2] if len(parts) > 2 else ""
+        
+        print(f"🔧 Agent returned error: type={error_type}, msg={error_msg}")
+        
+        # Track error in Sentry
+        sentry_sdk.capture_message(
+            f"Agent error: {error_type}",
+            level="error",
+            extras={
+                "error_type": error_type,
+                "error_message": error_msg,
+                "user_id": user_id,
+                "call_sid": call_sid
+            }
+        )
+        
+        # Mark user for thread reset on these error types
+        if error_type in ["tool_call_incomplete", "broken_resource"]:
+            turn_manager.mark_thread_reset(user_id)
+        
+        # User-friendly messages
+        if error_type == "tool_call_incomplete":
+            agent_response = "I had trouble with the previous operation. Please try your request again."
+        elif error_type == "broken_resource":
+            agent_response = "I encountered a connection issue. The operation may have completed. Please check your calendar or todo list."
+        elif error_type == "busy":
+            agent_response = "I'm handling a lot of requests right now. Please say that again in a moment."
+        else:
+            agent_response = "I'm sorry, I encountered an error. Please try again or rephrase your question."
+    
+    # Check if agent response indicates a transfer request
+    transfer_marker_value = transfer_marker
+    if not transfer_marker_value and isinstance(agent_response, str) and agent_response.startswith("TRANSFER_INITIATED:"):
+        transfer_marker_value = agent_response
+    
+    if transfer_marker_value:
+        if not transfer_requested:
+            logger.info("Transfer marker detected but caller did not request a human. Suppressing automatic transfer.")
+            transfer_marker_value = None
+        else:
+            transfer_data = transfer_marker_value.replace("TRANSFER_INITIATED:", "")
+            parts = transfer_data.split("|")
+            target_extension = parts[0] if len(parts) > 0 else "2001"
             
-            # Fallback
-            response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
-            response.redirect(f'/convonet_todo/twilio/call?is_continuation=true{auth_param}{user_param}')
+            webhook_base_url = get_webhook_base_url()
+            response = VoiceResponse()
+            response.redirect(f'{webhook_base_url}/convonet_todo/twilio/transfer?extension={target_extension}')
+            logger.info(f"Agent initiated transfer to extension {target_extension}")
+            turn_manager.mark_thread_reset(user_id)
             return Response(str(response), mimetype='text/xml')
+    
+    # Return TwiML with the agent's response and barge-in capability
+    response = VoiceResponse()
+    
+    # Preserve user_id in redirects
+    user_param = f'?user_id={user_id}' if user_id else ''
+    auth_param = f'&authenticated=true' if user_id else ''
+    
+    # Enhanced Twilio speech recognition configuration
+    gather = Gather(
+        input='speech',
+        action=f'/convonet_todo/twilio/process_audio{user_param}',
+        method='POST',
+        speech_timeout='auto',
+        timeout=15,  # Increased from 10s
+        barge_in=True,
+        speech_model='experimental_conversations',
+        enhanced=True,
+        language='en-US',
+        # Add speech hints for better recognition
+        speech_hints='create todo reminder calendar team member assign task complete delete update schedule meeting appointment'
+    )
+
+    # Add the agent's response to the gather
+    gather.say(agent_response, voice='Polly.Amy')
+    response.append(gather)
+    
+    # Fallback if no speech is detected after the response
+    response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
+    response.redirect(f'/convonet_todo/twilio/call?is_continuation=true{auth_param}{user_param}')
+    
+    print(f"Generated TwiML response: {str(response)}")
+    return Response(str(response), mimetype='text/xml')
+
+
+def _twilio_error_reply(user_id: Optional[str]) -> Response:
+    response = VoiceResponse()
+    
+    # Preserve user_id in error redirects
+    user_param = f'?user_id={user_id}' if user_id else ''
+    auth_param = f'&authenticated=true' if user_id else ''
+    
+    # Use Gather with barge-in for error messages too
+    gather = Gather(
+        input='speech',
+        action=f'/convonet_todo/twilio/process_audio{user_param}',
+        method='POST',
+        speech_timeout='auto',
+        timeout=10,
+        barge_in=True
+    )
+    gather.say("I'm sorry, I encountered an error processing your request. Please try again.", voice='Polly.Amy')
+    response.append(gather)
+    
+    # Fallback
+    response.say("I didn't hear anything. Please try again.", voice='Polly.Amy')
+    response.redirect(f'/convonet_todo/twilio/call?is_continuation=true{auth_param}{user_param}')
+    return Response(str(response), mimetype='text/xml')
 
 # WebSocket server is now handled by a separate process
 # See websocket_server.py for the Twilio voice streaming implementation
@@ -775,6 +840,49 @@ def index():
     return "Convonet Todo: Convonet + MCP integration is ready. POST to /convonet_todo/run_agent with JSON {prompt: str}."
 
 
+def _mcp_tool_backend(mcp_config: dict) -> str:
+    """Tool backend from MCP_TOOL_BACKEND or mcp_config.json "toolBackend" ("pool", "local" or "client")"""
+    return os.getenv("MCP_TOOL_BACKEND", mcp_config.get("toolBackend", "client")).lower()
+
+
+async def _load_mcp_tools(mcp_config: dict):
+    """Load MCP tools from the configured backend.
+
+    "pool" keeps warm MCP server processes with long-lived sessions (see
+    mcp_session_pool); "local" runs the db_todo tools in-process on the app's
+    connection pool (see local_tool_backend); "client" uses MultiServerMCPClient,
+    which spawns a new stdio process for every tool call. Falls back to "client"
+    if the selected backend can't start.
+    """
+    backend = _mcp_tool_backend(mcp_config)
+    if backend == "local":
+        try:
+            from .local_tool_backend import get_local_tool_backend
+            local_backend = get_local_tool_backend()
+            if local_backend is not None:
+                tools = local_backend.get_tools()
+                print(f"✅ MCP tools served in-process by local tool backend ({len(tools)} tools)")
+                return tools
+        except Exception as e:
+            print(f"⚠️ Local tool backend unavailable, falling back to MultiServerMCPClient: {e}")
+
+    if backend == "pool":
+        try:
+            from .mcp_session_pool import get_mcp_session_pool
+            pool = get_mcp_session_pool(mcp_config)
+            if pool is not None:
+                tools = await pool.get_tools()
+                if tools:
+                    print(f"✅ MCP tools served by warm session pool ({pool.size} process(es) per server)")
+                    return tools
+                print("⚠️ MCP session pool returned no tools, falling back to MultiServerMCPClient")
+        except Exception as e:
+            print(f"⚠️ MCP session pool unavailable, falling back to MultiServerMCPClient: {e}")
+
+    client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
+    return await client.get_tools()
+
+
 async def _preload_mcp_tools():
     """Pre-load MCP tools at startup to cache them for all providers (including Gemini).
     
@@ -839,13 +947,10 @@ async def _preload_mcp_tools():
                                 if env_var_value:
                                     server_config["env"][env_key] = env_var_value
                 
-                # Initialize MCP client
-                print("🔧 Creating MCP client for pre-load...")
-                client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
-                print("🔧 Getting tools from MCP client (this may take a moment)...")
+                print(f"🔧 Getting MCP tools for pre-load (backend: {_mcp_tool_backend(mcp_config)}, this may take a moment)...")
                 
                 # Use a longer timeout for startup pre-load (30 seconds)
-                tools = await asyncio.wait_for(client.get_tools(), timeout=30.0)
+                tools = await asyncio.wait_for(_load_mcp_tools(mcp_config), timeout=30.0)
                 _mcp_tools_cache = tools.copy()
                 print(f"✅ MCP tools pre-loaded and cached: {len(_mcp_tools_cache)} tools")
                 print(f"✅ These tools will be available for all LLM providers including Gemini")
@@ -886,14 +991,192 @@ def preload_mcp_tools_sync():
         print(f"⚠️ Tools will be loaded on first request instead")
 
 
-async def _get_agent_graph(provider: Optional[LLMProvider] = None, user_id: Optional[str] = None) -> StateGraph:
-    """Helper to initialize the agent graph with tools (cached for performance).
+def _agent_model_for(provider: str) -> str:
+    """Model configured for a provider (same env vars TodoAgent reads)."""
+    if provider == "gemini":
+        return os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
+    if provider == "openai":
+        return os.getenv("OPENAI_MODEL", "gpt-4o")
+    return os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
+
+
+def _agent_toolset_hash() -> str:
+    """Short hash of the cached MCP tool names; changes when the tool set is (re)loaded."""
+    if _mcp_tools_cache is None:
+        return "none"
+    names = sorted(getattr(tool, 'name', str(tool)) for tool in _mcp_tools_cache)
+    return hashlib.sha1("\n".join(names).encode("utf-8")).hexdigest()[:12]
+
+
+def _agent_graph_key(provider: str, model: str) -> tuple:
+    return (provider, model, _agent_toolset_hash())
+
+
+def _lookup_agent_graph(key: tuple, count: bool = True):
+    """Return the cached graph for key (marking it most recently used), or None."""
+    global _agent_graph_cache, _agent_graph_provider, _agent_graph_model
+    with _agent_graphs_lock:
+        entry = _agent_graphs.get(key)
+        if entry is None:
+            if count:
+                _agent_graph_stats['misses'] += 1
+            return None
+        _agent_graphs.move_to_end(key)
+        entry['hits'] += 1
+        if count:
+            _agent_graph_stats['hits'] += 1
+        _agent_graph_cache, _agent_graph_provider, _agent_graph_model = entry['graph'], key[0], key[1]
+        return entry['graph']
+
+
+def _store_agent_graph(provider: str, model: str, graph, build_started: float):
+    """Cache a freshly built graph under its current key, evicting the least recently used entry."""
+    global _agent_graph_cache, _agent_graph_provider, _agent_graph_model
+    # Key is computed after the build - building may have loaded the MCP tool set
+    key = _agent_graph_key(provider, model)
+    build_ms = (time.time() - build_started) * 1000
+    with _agent_graphs_lock:
+        _agent_graph_stats['builds'] += 1
+        _agent_graph_stats['build_ms_total'] += build_ms
+        if (provider, model) in _agent_graph_built_models:
+            _agent_graph_stats['rebuilds'] += 1
+        _agent_graph_built_models.add((provider, model))
+
+        _agent_graphs[key] = {'graph': graph, 'built_at': time.time(), 'build_ms': build_ms, 'hits': 0}
+        _agent_graphs.move_to_end(key)
+        while len(_agent_graphs) > _AGENT_GRAPH_CACHE_SIZE:
+            evicted_key, _ = _agent_graphs.popitem(last=False)
+            _agent_graph_stats['evictions'] += 1
+            print(f"🗑️ Evicted agent graph (provider: {evicted_key[0]}, model: {evicted_key[1]})", flush=True)
+        _agent_graph_cache, _agent_graph_provider, _agent_graph_model = graph, provider, model
+    print(f"✅ Agent graph cached (provider: {provider}, model: {model}, tools: {key[2]}, built in {build_ms:.0f}ms)", flush=True)
+    return graph
+
+
+def _agent_graph_build_lock() -> asyncio.Lock:
+    """Graph build lock for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _agent_graphs_lock:
+        lock = _agent_graph_build_locks.get(loop)
+        if lock is None:
+            lock = _agent_graph_build_locks[loop] = asyncio.Lock()
+        return lock
+
+
+def _agent_graph_identity(graph) -> tuple:
+    """(provider, model) a cached or fallback graph was built for, or (None, None) if it is not cached."""
+    with _agent_graphs_lock:
+        for key, entry in _agent_graphs.items():
+            if entry['graph'] is graph:
+                return key[0], key[1]
+        for key, entry in _fallback_agent_graphs.items():
+            if entry['graph'] is graph:
+                return key
+    return None, None
+
+
+def _lookup_fallback_agent_graph(provider: str, model: str):
+    """Unexpired tool-less fallback graph for provider/model, or None."""
+    with _agent_graphs_lock:
+        entry = _fallback_agent_graphs.get((provider, model))
+        if entry is None:
+            return None
+        if entry['expires_at'] <= time.time():
+            _fallback_agent_graphs.pop((provider, model), None)
+            return None
+        return entry['graph']
+
+
+def invalidate_agent_graphs(provider: Optional[str] = None, model: Optional[str] = None) -> int:
+    """Drop cached graphs matching provider and/or model (all graphs if neither is given).
+
+    Returns:
+        Number of graphs removed
+    """
+    global _agent_graph_cache, _agent_graph_provider, _agent_graph_model
+    with _agent_graphs_lock:
+        doomed = [
+            key for key in _agent_graphs
+            if (provider is None or key[0] == provider) and (model is None or key[1] == model)
+        ]
+        for key in doomed:
+            if _agent_graphs.pop(key)['graph'] is _agent_graph_cache:
+                _agent_graph_cache, _agent_graph_provider, _agent_graph_model = None, None, None
+        _agent_graph_stats['invalidations'] += len(doomed)
+        for key in [key for key in _fallback_agent_graphs
+                    if (provider is None or key[0] == provider) and (model is None or key[1] == model)]:
+            _fallback_agent_graphs.pop(key)
+    if doomed:
+        print(f"🔄 Invalidated {len(doomed)} cached agent graph(s) (provider: {provider}, model: {model})", flush=True)
+    return len(doomed)
+
+
+def get_agent_graph_cache_stats() -> dict:
+    """Hit rate, build/rebuild counts and per-entry details of the agent graph cache."""
+    with _agent_graphs_lock:
+        stats = dict(_agent_graph_stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+        stats['avg_build_ms'] = round(stats['build_ms_total'] / stats['builds'], 1) if stats['builds'] else None
+        stats['build_ms_total'] = round(stats['build_ms_total'], 1)
+        stats['size'] = len(_agent_graphs)
+        stats['max_size'] = _AGENT_GRAPH_CACHE_SIZE
+        stats['entries'] = [
+            {
+                'provider': key[0],
+                'model': key[1],
+                'toolset': key[2],
+                'hits': entry['hits'],
+                'build_ms': round(entry['build_ms'], 1),
+                'age_seconds': round(time.time() - entry['built_at'], 1),
+            }
+            for key, entry in reversed(_agent_graphs.items())
+        ]
+    return stats
+
+
+async def _prebuild_agent_graphs():
+    """Build and cache an agent graph for every available LLM provider."""
+    providers = [
+        p['id'] for p in get_llm_provider_manager().get_available_providers()
+        if p.get('available')
+    ]
+    if not providers:
+        print("⚠️ No LLM providers available, skipping agent graph pre-build")
+        return
+
+    print(f"🔧 Pre-building agent graphs for providers: {', '.join(providers)}", flush=True)
+    for provider in providers:
+        try:
+            await asyncio.wait_for(_get_agent_graph(provider=provider, prebuild=True), timeout=60.0)
+            with _agent_graphs_lock:
+                _agent_graph_stats['prebuilt'] += 1
+        except Exception as e:
+            print(f"⚠️ Could not pre-build agent graph for {provider}: {e}")
+            print(f"⚠️ The {provider} graph will be built on first request instead")
+
+
+def prebuild_agent_graphs_sync():
+    """Synchronous wrapper to pre-build agent graphs at app startup (after MCP tools are pre-loaded)."""
+    if os.getenv("AGENT_GRAPH_PREBUILD", "true").lower() != "true":
+        print("⏭️ Agent graph pre-build disabled (AGENT_GRAPH_PREBUILD=false)")
+        return
+    try:
+        # Build on the agent runtime loop that will later execute the graphs
+        get_agent_runtime().run(_prebuild_agent_graphs(), timeout=240.0)
+    except Exception as e:
+        print(f"⚠️ Could not pre-build agent graphs: {e}")
+        print(f"⚠️ Graphs will be built on first request instead")
+
+
+async def _get_agent_graph(provider: Optional[LLMProvider] = None, user_id: Optional[str] = None, prebuild: bool = False) -> StateGraph:
+    """Helper to initialize the agent graph with tools (cached per provider/model/toolset).
     
     Args:
         provider: LLM provider to use (claude, gemini, openai). If None, gets from user preference or default.
         user_id: User ID to get provider preference from Redis
+        prebuild: Startup pre-build call (not counted in cache hit/miss stats)
     """
-    global _agent_graph_cache, _agent_graph_model, _agent_graph_provider
     
     # Add early logging
     print(f"🔧 _get_agent_graph() called with provider={provider}, user_id={user_id}", flush=True)
@@ -941,47 +1224,29 @@ async def _get_agent_graph(provider: Optional[LLMProvider] = None, user_id: Opti
                 provider = "claude"
             print(f"📋 Using environment/default LLM provider: {provider}")
     
-    # Get current model name based on provider
-    if provider == "gemini":
-        current_model = os.getenv("GOOGLE_MODEL", "gemini-2.5-flash")
-        # Force clear cache if old default model (gemini-3-pro-preview) is cached
-        if (_agent_graph_cache is not None and 
-            _agent_graph_provider == "gemini" and 
-            _agent_graph_model == "gemini-3-pro-preview" and
-            current_model == "gemini-2.5-flash"):
-            print(f"🔄 Clearing cache: default Gemini model changed from gemini-3-pro-preview to gemini-2.5-flash", flush=True)
-            _agent_graph_cache = None
-            _agent_graph_model = None
-            _agent_graph_provider = None
-    elif provider == "openai":
-        current_model = os.getenv("OPENAI_MODEL", "gpt-4o")
-    else:  # claude
-        current_model = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
-    
+    current_model = _agent_model_for(provider)
     print(f"🔧 Selected provider: {provider}, model: {current_model}")
     
-    # Return cached graph if available AND provider/model hasn't changed
-    if (_agent_graph_cache is not None and 
-        _agent_graph_provider == provider and 
-        _agent_graph_model == current_model):
+    # Return cached graph for this provider/model/toolset if available
+    cached_graph = _lookup_agent_graph(_agent_graph_key(provider, current_model), count=not prebuild)
+    if cached_graph is not None:
         print(f"♻️ Using cached agent graph (provider: {provider}, model: {current_model})")
-        return _agent_graph_cache
-    
-    # Clear cache if provider or model changed
-    if _agent_graph_cache is not None:
-        if _agent_graph_provider != provider or _agent_graph_model != current_model:
-            print(f"🔄 Provider/model changed (provider: {_agent_graph_provider}→{provider}, model: {_agent_graph_model}→{current_model}), clearing cache")
-            _agent_graph_cache = None
-            _agent_graph_model = None
-            _agent_graph_provider = None
+        return cached_graph
     
     # Use lock to prevent multiple simultaneous initializations
-    async with _agent_graph_lock:
-        # Check again after acquiring lock (another thread might have initialized)
-        if _agent_graph_cache is not None:
-            return _agent_graph_cache
-        
-        print("🔧 Initializing agent graph (first time only)...")
+    async with _agent_graph_build_lock():
+        # Check again after acquiring lock (another request might have built it)
+        cached_graph = _lookup_agent_graph(_agent_graph_key(provider, current_model), count=False)
+        if cached_graph is not None:
+            return cached_graph
+        # A recent build failed - serve its tool-less fallback until it expires instead of rebuilding per request
+        fallback_graph = None if prebuild else _lookup_fallback_agent_graph(provider, current_model)
+        if fallback_graph is not None:
+            print(f"⚠️ Using tool-less fallback agent graph (provider: {provider}, model: {current_model})")
+            return fallback_graph
+        
+        build_started = time.time()
+        print(f"🔧 Building agent graph (provider: {provider}, model: {current_model})...")
         
         config_path = os.path.join(os.path.dirname(__file__), 'mcps', 'mcp_config.json')
         if not os.path.exists(config_path):
@@ -1039,15 +1304,12 @@ async def _get_agent_graph(provider: Optional[LLMProvider] = None, user_id: Opti
             # Try to load MCP tools (with timeout to prevent hangs)
             print("🔧 Loading MCP tools (not cached yet)...")
             try:
-                # Initialize MCP client (langchain-mcp-adapters 0.1.0+ does not support context manager)
-                print("🔧 Creating MCP client...")
-                client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
-                print("🔧 Getting tools from MCP client...")
+                print(f"🔧 Getting MCP tools (backend: {_mcp_tool_backend(mcp_config)})...")
                 
                 # Create a wrapper function to catch any exceptions from nested coroutines
                 async def safe_get_tools():
                     try:
-                        return await client.get_tools()
+                        return await _load_mcp_tools(mcp_config)
                     except (UnboundLocalError, NameError) as e:
                         # Re-raise as a different exception type so we can catch it
                         raise RuntimeError(f"MCP library UnboundLocalError: {e}") from e
@@ -1180,76 +1442,68 @@ async def _get_agent_graph(provider: Optional[LLMProvider] = None, user_id: Opti
             print(f"🚀 About to create TodoAgent instance in separate thread...", flush=True)
             sys.stdout.flush()
             
-            import threading
-            # Don't import time here - import it locally in create_todo_agent() to avoid scoping conflicts
-            
-            todo_agent_result = {'agent': None, 'error': None, 'done': False}
-            
             def create_todo_agent():
-                """Create TodoAgent in separate thread to prevent blocking"""
+                """Create TodoAgent in a worker thread (binding tools and building the graph is synchronous)"""
                 import sys
                 import time as thread_time  # Import time locally to avoid scoping issues
                 try:
                     print(f"🧵 Thread: Starting TodoAgent creation...", flush=True)
                     sys.stdout.flush()
                     start_time = thread_time.time()
-                    todo_agent_result['agent'] = TodoAgent(tools=tools, provider=provider, model=current_model)
+                    agent = TodoAgent(tools=tools, provider=provider, model=current_model)
                     elapsed = thread_time.time() - start_time
                     print(f"🧵 Thread: TodoAgent created successfully in {elapsed:.2f}s", flush=True)
                     sys.stdout.flush()
+                    return agent
                 except Exception as e:
                     print(f"🧵 Thread: TodoAgent creation failed: {e}", flush=True)
                     sys.stdout.flush()
                     import traceback
                     traceback.print_exc()
-                    todo_agent_result['error'] = e
-                finally:
-                    todo_agent_result['done'] = True
-                    print(f"🧵 Thread: TodoAgent creation thread finished", flush=True)
-                    sys.stdout.flush()
+                    raise
             
             # Use aggressive timeout for Gemini (8s) vs others (12s)
             timeout_seconds = 8.0 if provider == "gemini" else 12.0
             print(f"⏱️ Creating TodoAgent with {timeout_seconds}s timeout...", flush=True)
             sys.stdout.flush()
             
-            agent_thread = threading.Thread(target=create_todo_agent, daemon=True)
-            agent_thread.start()
-            agent_thread.join(timeout=timeout_seconds)
-            
-            if not todo_agent_result['done']:
+            # Await the worker thread instead of joining it: this coroutine runs on the shared
+            # agent runtime loop, and a blocking join would stall every in-flight turn on it
+            try:
+                todo_agent = await asyncio.wait_for(asyncio.to_thread(create_todo_agent), timeout=timeout_seconds)
+            except asyncio.TimeoutError:
                 print(f"⏱️ TodoAgent creation timed out after {timeout_seconds} seconds", flush=True)
                 sys.stdout.flush()
                 raise TimeoutError(f"TodoAgent initialization timed out after {timeout_seconds}s - likely Gemini bind_tools() hang")
-            elif todo_agent_result['error']:
-                print(f"❌ TodoAgent creation failed: {todo_agent_result['error']}", flush=True)
-                sys.stdout.flush()
-                raise todo_agent_result['error']
-            elif todo_agent_result['agent']:
-                todo_agent = todo_agent_result['agent']
-                print(f"✅ TodoAgent created successfully, graph already built in __init__", flush=True)
-                sys.stdout.flush()
-            else:
+            if todo_agent is None:
                 raise Exception("TodoAgent creation returned no result")
+            print(f"✅ TodoAgent created successfully, graph already built in __init__", flush=True)
+            sys.stdout.flush()
             
             # Graph is already built in TodoAgent.__init__, just get it
-            _agent_graph_cache = todo_agent.graph
-            _agent_graph_model = current_model  # Store the model used for this cache
-            _agent_graph_provider = provider  # Store the provider used for this cache
-            print(f"✅ Agent graph cached for future requests (provider: {provider}, model: {current_model})")
-            return _agent_graph_cache
+            return _store_agent_graph(provider, current_model, todo_agent.graph, build_started)
         except Exception as e:
             print(f"❌ Error building agent graph: {e}")
             import traceback
             print(f"❌ Traceback: {traceback.format_exc()}")
+            if prebuild:
+                # Let the startup pre-build report the failure; the first request retries the real build
+                raise
             # Don't raise - try to build with empty tools as last resort
             print("⚠️ Attempting to build graph with empty tools list as fallback...")
             try:
-                _agent_graph_cache = TodoAgent(tools=[], provider=provider).build_graph()
-                _agent_graph_model = current_model  # Store the model used for this cache
-                _agent_graph_provider = provider  # Store the provider used for this cache
-                print(f"✅ Agent graph built with empty tools list (fallback, provider: {provider}, model: {current_model})")
-                return _agent_graph_cache
+                fallback_agent = await asyncio.to_thread(TodoAgent, tools=[], provider=provider)
+                fallback_graph = fallback_agent.graph
+                # Not cached under the real key: a tool-less graph must not outlive the outage
+                with _agent_graphs_lock:
+                    _agent_graph_stats['fallbacks'] += 1
+                    _fallback_agent_graphs[(provider, current_model)] = {
+                        'graph': fallback_graph,
+                        'expires_at': time.time() + _AGENT_GRAPH_FALLBACK_TTL,
+                    }
+                print(f"✅ Agent graph built with empty tools list (fallback, provider: {provider}, model: {current_model}, "
+                      f"retrying the real build after {_AGENT_GRAPH_FALLBACK_TTL:.0f}s)")
+                return fallback_graph
             except Exception as fallback_error:
                 print(f"❌ Even fallback graph building failed: {fallback_error}")
                 raise Exception(f"Failed to build agent graph even with empty tools: {str(e)}")
@@ -1299,6 +1553,17 @@ async def _run_agent_for_pin_verification(pin: str) -> str:
         traceback.print_exc()
         return f"AUTHENTICATION_ERROR: {str(e)}"
 
+def _fast_path_tools() -> list:
+    """Loaded MCP tools plus the call transfer tools, for the intent fast path"""
+    tools = list(_mcp_tools_cache or [])
+    try:
+        from .mcps.local_servers.call_transfer import get_transfer_tools
+        tools.extend(get_transfer_tools())
+    except Exception as e:
+        print(f"⚠️ Call transfer tools not available for the intent fast path: {e}")
+    return tools
+
+
 async def _run_agent_async(
     prompt: str,
     user_id: Optional[str] = None,
@@ -1307,6 +1572,7 @@ async def _run_agent_async(
     include_metadata: bool = False,
     socketio=None,
     session_id: Optional[str] = None,
+    on_text_chunk: Optional[Callable[[str], None]] = None,
 ) -> str | dict:
     """Runs the agent for a given prompt and returns the final response.
     
@@ -1315,16 +1581,16 @@ async def _run_agent_async(
         user_id: Authenticated user ID
         user_name: User's display name
         reset_thread: If True, starts a new conversation thread (used after timeouts/errors)
+        on_text_chunk: Optional callback receiving response text deltas as they stream (e.g. streaming TTS)
     """
     # Import agent monitor for tracking
     from .agent_monitor import get_agent_monitor, AgentInteractionStatus, ToolCallInfo
     
-    # Declare global variables at the start of the function
-    global _agent_graph_cache, _agent_graph_model, _agent_graph_provider
-    
     request_id = str(uuid.uuid4())
     start_time = time.time()
     monitor = get_agent_monitor()
+    # Collects cached-token counts from every LLM call of this turn
+    turn_usage = begin_prompt_cache_turn()
     
     # Add early logging to track provider selection
     print(f"🔧 Getting agent graph for user_id: {user_id}", flush=True)
@@ -1364,6 +1630,8 @@ async def _run_agent_async(
             )
             print(f"✅ Agent graph obtained successfully", flush=True)
             sys.stdout.flush()
+            # Provider/model this graph was built for (other requests may be served other graphs concurrently)
+            graph_provider, graph_model = _agent_graph_identity(agent_graph)
         except asyncio.TimeoutError:
             print(f"⏱️ Agent graph initialization timed out after {timeout_seconds} seconds", flush=True)
             sys.stdout.flush()
@@ -1432,11 +1700,57 @@ async def _run_agent_async(
     else:
         print(f"📝 Using existing thread_id: {thread_id} (reset=False)")
 
+    # Simple read-only commands ("what are my todos") are answered without the LLM
+    fast_path = await get_intent_fast_path().handle(prompt, _fast_path_tools(), user_id=user_id)
+    if fast_path is not None:
+        tool_call_id = f"fast-{uuid.uuid4().hex[:12]}"
+        try:
+            # Record the exchange in the thread so follow-ups ("mark the first one done") have context
+            await agent_graph.aupdate_state(config, {"messages": [
+                HumanMessage(content=prompt),
+                AIMessage(content="", tool_calls=[{"name": fast_path.tool_name, "args": fast_path.arguments, "id": tool_call_id}]),
+                ToolMessage(content=fast_path.tool_result, tool_call_id=tool_call_id, name=fast_path.tool_name),
+                AIMessage(content=fast_path.response),
+            ]}, as_node="assistant")
+        except Exception as e:
+            print(f"⚠️ Could not record fast-path turn in thread {thread_id}: {e}", flush=True)
+        if on_text_chunk:
+            on_text_chunk(fast_path.response)
+        monitor.track_interaction(
+            request_id=request_id,
+            user_id=user_id,
+            user_name=user_name,
+            provider=graph_provider,
+            model=graph_model,
+            user_prompt=prompt,
+            agent_response=fast_path.response,
+            tool_calls=[ToolCallInfo(
+                tool_name=fast_path.tool_name,
+                tool_id=tool_call_id,
+                arguments=fast_path.arguments,
+                result=fast_path.tool_result,
+                status="success",
+                duration_ms=fast_path.duration_ms,
+            )],
+            status=AgentInteractionStatus.SUCCESS,
+            duration_ms=(time.time() - start_time) * 1000,
+            metadata={"fast_path": fast_path.intent}
+        )
+        if include_metadata:
+            return {
+                "response": fast_path.response,
+                "transfer_marker": None,
+                "provider_used": graph_provider,
+                "model_used": graph_model,
+                "fast_path": fast_path.intent,
+            }
+        return fast_path.response
+
     # Stream through the graph to execute the agent logic with timeout
     try:
         # Get provider and model from cached graph (they're set when graph is created)
-        current_provider = _agent_graph_provider
-        current_model = _agent_graph_model
+        current_provider = graph_provider
+        current_model = graph_model
         
         print(f"🚀 Starting agent execution", flush=True)
         sys.stdout.flush()
@@ -1503,6 +1817,12 @@ Your messages are read aloud, so be brief and conversational."""
                         # AgentState is a Pydantic BaseModel, so we access it as an attribute
                         conversation_messages = input_state.messages if hasattr(input_state, 'messages') else []
                         
+                        # Only declare the tool groups this turn needs
+                        tool_router = get_tool_router(tools)
+                        if tool_router is not None:
+                            tools, tool_groups = tool_router.route(list(conversation_messages) + [HumanMessage(content=prompt)])
+                            print(f"🧭 Tool router: declaring {len(tools)}/{len(tool_router.tools)} tools ({', '.join(tool_groups) or 'all groups'})", flush=True)
+                        
                         # Stream using native SDK
                         print(f"📡 Streaming Gemini response with native SDK...", flush=True)
                         sys.stdout.flush()
@@ -1516,6 +1836,7 @@ Your messages are read aloud, so be brief and conversational."""
                             messages=conversation_messages,
                             socketio=socketio,
                             session_id=session_id,
+                            on_text_chunk=on_text_chunk,
                         )
                         
                         # Convert tool calls to ToolCallInfo (with results from Gemini streaming)
@@ -1536,6 +1857,8 @@ Your messages are read aloud, so be brief and conversational."""
                                 tool_call_info.error = tc.get('error')
                             if 'duration_ms' in tc:
                                 tool_call_info.duration_ms = tc.get('duration_ms')
+                            if tc.get('queued_ms') is not None:
+                                tool_call_info.queued_ms = tc['queued_ms']
                             tool_calls_info.append(tool_call_info)
                         
                         print(f"📊 Gemini tool calls info: {len(tool_calls_info)} tool call(s) with results", flush=True)
@@ -1627,8 +1950,41 @@ Your messages are read aloud, so be brief and conversational."""
                 sys.stdout.flush()
                 stream = None
                 stream_iter = None
+                # With a text callback (streaming TTS) also stream LLM tokens, so speech starts
+                # while the final answer is still being generated
+                stream_tokens = on_text_chunk is not None
+                tool_call_steps = set()
+                
+                def forward_text_delta(chunk, metadata):
+                    """Pass assistant text deltas to on_text_chunk, skipping tool-call chunks.
+                    
+                    A step stops forwarding at its first tool-call chunk; text a step produced
+                    before calling a tool ("Let me check your calendar") is spoken as a preamble.
+                    """
+                    if metadata.get("langgraph_node") != "assistant" or not isinstance(chunk, AIMessageChunk):
+                        return
+                    step = metadata.get("langgraph_step")
+                    if chunk.tool_call_chunks:
+                        tool_call_steps.add(step)
+                        return
+                    if step in tool_call_steps:
+                        return
+                    content = chunk.content
+                    if isinstance(content, list):
+                        content = "".join(block.get("text", "") for block in content
+                                          if isinstance(block, dict) and block.get("type") == "text")
+                    if content:
+                        try:
+                            on_text_chunk(content)
+                        except Exception as e:
+                            print(f"⚠️ on_text_chunk callback failed: {e}", flush=True)
+                
                 try:
-                    stream = agent_graph.astream(input=input_state, stream_mode="values", config=config)
+                    stream = agent_graph.astream(
+                        input=input_state,
+                        stream_mode=["values", "messages"] if stream_tokens else "values",
+                        config=config
+                    )
                     print(f"✅ Agent graph stream created, starting execution...", flush=True)
                     sys.stdout.flush()
                 
@@ -1648,6 +2004,7 @@ Your messages are read aloud, so be brief and conversational."""
                     last_state_time = watchdog_time.time()
                     # Watchdog should be longer than stream timeout to allow tool execution
                     watchdog_timeout = 10.0  # Maximum time between state updates (allows tool execution + buffer)
+                    last_was_state = True
                     
                     try:
                         while states_processed < max_states:
@@ -1662,13 +2019,22 @@ Your messages are read aloud, so be brief and conversational."""
                             try:
                                 # Get next state with timeout - this prevents hanging on a single iteration
                                 # Use asyncio.wait_for with a shorter timeout to catch hangs early
-                                print(f"⏳ Waiting for next state update (timeout: {stream_timeout}s, watchdog: {watchdog_timeout - time_since_last_state:.1f}s remaining)...", flush=True)
-                                sys.stdout.flush()
+                                if last_was_state:
+                                    print(f"⏳ Waiting for next state update (timeout: {stream_timeout}s, watchdog: {watchdog_timeout - time_since_last_state:.1f}s remaining)...", flush=True)
+                                    sys.stdout.flush()
                                 state = await asyncio.wait_for(stream_iter.__anext__(), timeout=stream_timeout)
+                                last_state_time = watchdog_time.time()  # Update watchdog timer (tokens count as progress)
+                                if stream_tokens:
+                                    mode, state = state
+                                    if mode == "messages":
+                                        # Token chunks don't count towards max_states
+                                        last_was_state = False
+                                        forward_text_delta(*state)
+                                        continue
+                                last_was_state = True
                                 print(f"✅ Received state update in time", flush=True)
                                 sys.stdout.flush()
                                 states_processed += 1
-                                last_state_time = watchdog_time.time()  # Update watchdog timer
                                 print(f"📊 Received state update #{states_processed} from agent graph", flush=True)
                                 sys.stdout.flush()
                                 
@@ -1851,19 +2217,24 @@ Your messages are read aloud, so be brief and conversational."""
             # Calculate duration using captured start_time
             # Use time_module to avoid scoping conflicts
             duration_ms = (time_module.time() - process_start_time) * 1000
+            prompt_cache_usage = turn_usage.to_dict()
+            if prompt_cache_usage["llm_calls"]:
+                print(f"💾 Turn prompt cache: {prompt_cache_usage['cached_tokens']}/{prompt_cache_usage['input_tokens']} input tokens cached "
+                      f"over {prompt_cache_usage['llm_calls']} LLM call(s), first token {prompt_cache_usage['first_token_ms']}ms", flush=True)
             
             # Track the interaction
             monitor.track_interaction(
                 request_id=request_id,
                 user_id=user_id,
                 user_name=user_name,
-                provider=_agent_graph_provider,
-                model=_agent_graph_model,
+                provider=graph_provider,
+                model=graph_model,
                 user_prompt=prompt,
                 agent_response=final_response if isinstance(final_response, str) else str(final_response),
                 tool_calls=tool_calls_info,
                 status=AgentInteractionStatus.SUCCESS,
-                duration_ms=duration_ms
+                duration_ms=duration_ms,
+                metadata={"prompt_cache": prompt_cache_usage}
             )
             
             # Cleanup: Clear large objects to help with memory management
@@ -1877,8 +2248,9 @@ Your messages are read aloud, so be brief and conversational."""
                 return {
                     "response": final_response,
                     "transfer_marker": transfer_marker,
-                    "provider_used": _agent_graph_provider,
-                    "model_used": _agent_graph_model,
+                    "provider_used": graph_provider,
+                    "model_used": graph_model,
+                    "prompt_cache": prompt_cache_usage,
                 }
             if transfer_marker:
                 return transfer_marker
@@ -1899,7 +2271,7 @@ Your messages are read aloud, so be brief and conversational."""
     except asyncio.TimeoutError:
         # Track timeout
         duration_ms = (time.time() - start_time) * 1000
-        current_provider = _agent_graph_provider
+        current_provider = graph_provider
         timeout_seconds = 25.0 if current_provider == "gemini" else 20.0
         print(f"⏱️ Agent execution timed out after {timeout_seconds} seconds")
         print(f"⏱️ Provider: {current_provider}, This likely means Gemini LLM is hanging during tool calling or response generation")
@@ -1907,8 +2279,8 @@ Your messages are read aloud, so be brief and conversational."""
             request_id=request_id,
             user_id=user_id,
             user_name=user_name,
-            provider=_agent_graph_provider,
-            model=_agent_graph_model,
+            provider=graph_provider,
+            model=graph_model,
             user_prompt=prompt,
             agent_response="AGENT_TIMEOUT: Taking too long to process. Please try a simpler request.",
             tool_calls=[],
@@ -1932,8 +2304,8 @@ Your messages are read aloud, so be brief and conversational."""
             request_id=request_id,
             user_id=user_id,
             user_name=user_name,
-            provider=_agent_graph_provider,
-            model=_agent_graph_model,
+            provider=graph_provider,
+            model=graph_model,
             user_prompt=prompt,
             agent_response=None,
             tool_calls=[],
@@ -1963,8 +2335,7 @@ Your messages are read aloud, so be brief and conversational."""
                     failed_model = model_match.group(1).strip()
                     print(f"🔄 Detected failed model: {failed_model}")
             
-            _agent_graph_cache = None
-            _agent_graph_model = None
+            invalidate_agent_graphs(provider=graph_provider, model=failed_model or graph_model)
             
             # Force a different model by setting env var to a known working model
             # Skip the failed model and try others (using actual model IDs from API)
@@ -1996,6 +2367,7 @@ Your messages are read aloud, so be brief and conversational."""
                 print(f"🔄 Retrying with fresh agent graph (will try model: {next_model})...")
                 print(f"🔄 Current ANTHROPIC_MODEL env var: {os.getenv('ANTHROPIC_MODEL')}")
                 agent_graph = await _get_agent_graph()
+                graph_provider, graph_model = _agent_graph_identity(agent_graph)
                 stream = agent_graph.astream(input=input_state, stream_mode="values", config=config)
                 
                 async def process_stream_retry():
@@ -2013,8 +2385,8 @@ Your messages are read aloud, so be brief and conversational."""
                         return {
                             "response": final_response,
                             "transfer_marker": transfer_marker,
-                            "provider_used": _agent_graph_provider,
-                            "model_used": _agent_graph_model,
+                            "provider_used": graph_provider,
+                            "model_used": graph_model,
                         }
                     if transfer_marker:
                         return transfer_marker
@@ -2198,8 +2570,10 @@ def run_agent():
         return jsonify({"error": "Missing 'prompt' in JSON body"}), 400
 
     try:
-        result = asyncio.run(_run_agent_async(prompt))
+        result = get_agent_runtime().run(_run_agent_async(prompt), timeout=60.0)
         return jsonify({"result": result})
+    except AgentRuntimeBusy as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
         # Log the full error for debugging
         print(f"Error in /run_agent: {e}")
@@ -2287,6 +2661,162 @@ def get_llm_providers():
         }), 500
 
 
+@convonet_todo_bp.route('/api/mcp-pool/stats', methods=['GET'])
+def get_mcp_pool_stats():
+    """Get MCP session pool size, queue depth and per-process health."""
+    try:
+        from .mcp_session_pool import get_mcp_session_pool
+        pool = get_mcp_session_pool()
+        return jsonify({
+            'success': True,
+            'enabled': pool is not None,
+            'stats': pool.get_stats() if pool is not None else None
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/agent-graph-cache/stats', methods=['GET'])
+def get_agent_graph_cache_stats_route():
+    """Get agent graph cache hit rate, build/rebuild counts and cached provider/model entries."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_agent_graph_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/http-pool/stats', methods=['GET'])
+def get_http_pool_stats():
+    """Get per-provider HTTP pool stats: requests, TCP/TLS handshakes, HTTP/2 use and latency."""
+    try:
+        from convonet.http_client_pool import get_http_client_pool
+        return jsonify({
+            'success': True,
+            'stats': get_http_client_pool().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/tts-cache/stats', methods=['GET'])
+def get_tts_cache_stats():
+    """Get TTS audio cache hit rate, hit/miss latency and per-tier size and evictions."""
+    try:
+        from convonet.tts_cache import get_tts_cache
+        return jsonify({
+            'success': True,
+            'stats': get_tts_cache().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/tts-router/stats', methods=['GET'])
+def get_tts_router_stats():
+    """Get TTS routing decisions (hedges fired, wins per provider) and rolling per-provider latency and error rates."""
+    try:
+        from convonet.tts_router import get_tts_router
+        return jsonify({
+            'success': True,
+            'stats': get_tts_router().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/twilio-turns/stats', methods=['GET'])
+def get_twilio_turn_stats():
+    """Get non-blocking Twilio turn counts: pending, completed, timed out, polls per turn."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_twilio_turn_manager().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/prompt-cache/stats', methods=['GET'])
+def get_prompt_cache_stats_route():
+    """Get cached-token counts, cost saving and hit/miss latency per LLM provider."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_prompt_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/tool-router/stats', methods=['GET'])
+def get_tool_router_stats_route():
+    """Get per-turn tool subset sizes, fallbacks to the full set and group picks."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_tool_router_stats().to_dict()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/intent-fast-path/stats', methods=['GET'])
+def get_intent_fast_path_stats_route():
+    """Get turns answered by the intent fast path, per intent, and fallbacks to the agent."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_intent_fast_path().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@convonet_todo_bp.route('/api/agent-runtime/stats', methods=['GET'])
+def get_agent_runtime_stats():
+    """Get agent runtime queue depth, concurrency and request outcome counts."""
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_agent_runtime().get_stats()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @convonet_todo_bp.route('/api/llm-provider', methods=['GET'])
 def get_user_llm_provider():
     """Get user's current LLM provider preference."""
@@ -2362,15 +2892,8 @@ def set_user_llm_provider():
         except Exception as redis_error:
             print(f"⚠️ Failed to store LLM provider in Redis: {redis_error}")
         
-        # Clear agent graph cache to force reinitialization with new provider (best-effort)
-        try:
-            global _agent_graph_cache, _agent_graph_provider
-            if _agent_graph_provider != provider:
-                _agent_graph_cache = None
-                _agent_graph_provider = None
-                print(f"🔄 Cleared agent graph cache due to provider change to {provider}")
-        except Exception as cache_error:
-            print(f"⚠️ Failed to clear agent graph cache: {cache_error}")
+        # Agent graphs are cached per provider, so switching needs no cache reset;
+        # the selected provider's graph was pre-built at startup (or is built on its first request)
         
         return jsonify({
             'success': True,
@@ -9,3 +9,4 @@ class AgentState(BaseModel):
     authenticated_user_id: Optional[str] = None  # User ID after PIN verification
     authenticated_user_name: Optional[str] = None  # User name for personalization
     is_authenticated: bool = False  # Whether user has been authenticated
+    conversation_summary: Optional[str] = None  # Running summary of turns dropped from the message window
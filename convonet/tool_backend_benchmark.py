@@ -0,0 +1,122 @@
+"""
+Tool Backend Benchmark
+Per-tool latency of the db_todo tools over stdio MCP (per-call client and warm
+session pool) versus the in-process local backend.
+
+Usage:
+    DB_URI=... python -m convonet.tool_backend_benchmark
+    DB_URI=... python -m convonet.tool_backend_benchmark --iterations 50 --backends pool,local --tools get_todos
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, Any, List
+
+# Read-only tools, safe to call repeatedly against a real database
+DEFAULT_TOOLS = ["test_connection", "get_todos", "get_reminders", "get_calendar_events"]
+DEFAULT_BACKENDS = ["client", "pool", "local"]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_mcp_config() -> Dict[str, Any]:
+    """mcp_config.json with absolute server paths and ${VAR} env substitution (as routes.py does)"""
+    with open(os.path.join(PROJECT_ROOT, 'convonet', 'mcps', 'mcp_config.json')) as f:
+        mcp_config = json.load(f)
+    for server_config in mcp_config["mcpServers"].values():
+        args = server_config.get("args") or []
+        if args and not os.path.isabs(args[0]):
+            args[0] = os.path.join(PROJECT_ROOT, args[0])
+        for env_key, env_value in (server_config.get("env") or {}).items():
+            if isinstance(env_value, str) and env_value.startswith("${") and env_value.endswith("}"):
+                server_config["env"][env_key] = os.getenv(env_value[2:-1], "")
+    return mcp_config
+
+
+async def get_backend_tools(backend: str, mcp_config: Dict[str, Any]) -> List[Any]:
+    if backend == "client":
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        return await MultiServerMCPClient(connections=mcp_config["mcpServers"]).get_tools()
+    if backend == "pool":
+        from convonet.mcp_session_pool import get_mcp_session_pool
+        return await get_mcp_session_pool(mcp_config).get_tools()
+    if backend == "local":
+        from convonet.local_tool_backend import get_local_tool_backend
+        return get_local_tool_backend().get_tools()
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+async def time_tool(tool, iterations: int) -> Dict[str, float]:
+    """Latency stats in ms; the first call is timed separately as warm-up"""
+    start = time.perf_counter()
+    await tool.ainvoke({})
+    first_ms = (time.perf_counter() - start) * 1000
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await tool.ainvoke({})
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'first': first_ms,
+        'p50': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'mean': statistics.fmean(samples),
+    }
+
+
+async def run_benchmark(backends: List[str], tool_names: List[str], iterations: int) -> Dict[str, Dict[str, Any]]:
+    mcp_config = load_mcp_config()
+    results = {}
+    for backend in backends:
+        print(f"🔧 Loading tools for backend '{backend}'...", flush=True)
+        try:
+            tools = {t.name: t for t in await get_backend_tools(backend, mcp_config)}
+        except Exception as e:
+            print(f"❌ Backend '{backend}' unavailable: {e}", flush=True)
+            continue
+        results[backend] = {}
+        for name in tool_names:
+            if name not in tools:
+                print(f"⚠️ Tool '{name}' not found on backend '{backend}'", flush=True)
+                continue
+            try:
+                results[backend][name] = await time_tool(tools[name], iterations)
+            except Exception as e:
+                print(f"❌ {backend}/{name} failed: {e}", flush=True)
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, Any]], iterations: int):
+    print(f"\n📊 Per-tool latency in ms ({iterations} iterations after one warm-up call)")
+    print(f"{'backend':<8} {'tool':<22} {'first':>9} {'p50':>9} {'p95':>9} {'mean':>9}")
+    for backend, tools in results.items():
+        for name, stats in tools.items():
+            print(f"{backend:<8} {name:<22} {stats['first']:>9.2f} {stats['p50']:>9.2f} {stats['p95']:>9.2f} {stats['mean']:>9.2f}")
+
+    baseline = results.get("client", {})
+    for backend in ("pool", "local"):
+        for name, stats in results.get(backend, {}).items():
+            if name in baseline and stats['p50'] > 0:
+                print(f"⚡ {name}: {backend} is {baseline[name]['p50'] / stats['p50']:.1f}x faster than client (p50)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark db_todo tool latency per backend")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--backends", default=",".join(DEFAULT_BACKENDS), help="comma-separated: client,pool,local")
+    parser.add_argument("--tools", default=",".join(DEFAULT_TOOLS), help="comma-separated read-only tool names")
+    args = parser.parse_args()
+
+    os.chdir(PROJECT_ROOT)  # db_todo's PYTHONPATH="." expects the project root
+    results = asyncio.run(run_benchmark(args.backends.split(","), args.tools.split(","), args.iterations))
+    print_results(results, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Tool Registry
+Per-toolset dispatch index built once and shared by the LangGraph tools node
+and the native Gemini streaming loop: name -> tool lookup, Gemini function
+declarations converted once instead of on every streaming iteration, and
+argument validators that reject malformed tool calls before they reach the
+MCP server
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+# JSON Schema type -> Python types a value of that type may arrive as
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int, float),  # Gemini sends whole numbers as floats
+    "number": (int, float),
+    "boolean": (bool,),
+    "array": (Sequence,),  # Includes SDK repeated containers
+    "object": (Mapping,),
+}
+
+MAX_REGISTRIES = 32
+
+
+def resolve_schema_refs(schema: Dict[str, Any], defs: Dict[str, Any] = None) -> Dict[str, Any]:
+    """Resolve $ref references in JSON Schema to flat schema"""
+    if defs is None:
+        defs = schema.get("$defs", {})
+
+    if not isinstance(schema, dict):
+        return schema
+
+    resolved = {}
+    for key, value in schema.items():
+        if key == "$ref":
+            # Resolve reference
+            ref_path = value
+            if ref_path.startswith("#/$defs/"):
+                ref_name = ref_path.split("/")[-1]
+                if ref_name in defs:
+                    # Recursively resolve the referenced schema
+                    resolved.update(resolve_schema_refs(defs[ref_name], defs))
+                else:
+                    # Reference not found, use string type as fallback
+                    resolved = {"type": "string"}
+            else:
+                # External reference, use string as fallback
+                resolved = {"type": "string"}
+        elif key == "anyOf":
+            # Handle anyOf - take first option and resolve it
+            if isinstance(value, list) and len(value) > 0:
+                resolved.update(resolve_schema_refs(value[0], defs))
+        elif isinstance(value, dict):
+            resolved[key] = resolve_schema_refs(value, defs)
+        elif isinstance(value, list):
+            resolved[key] = [resolve_schema_refs(item, defs) if isinstance(item, dict) else item for item in value]
+        else:
+            resolved[key] = value
+
+    return resolved
+
+
+def tool_input_schema(tool: Any) -> Dict[str, Any]:
+    """JSON Schema of a tool's arguments - handles Pydantic models and dicts"""
+    if hasattr(tool, 'args_schema') and tool.args_schema:
+        # Check if args_schema is a Pydantic model (has schema() method)
+        if hasattr(tool.args_schema, 'schema'):
+            return tool.args_schema.schema()
+        # Check if args_schema is already a dict
+        if isinstance(tool.args_schema, dict):
+            return tool.args_schema
+    # Fallback: try get_input_schema() (LangChain standard)
+    if hasattr(tool, 'get_input_schema'):
+        input_schema = tool.get_input_schema()
+        if hasattr(input_schema, 'schema'):
+            return input_schema.schema()
+        if isinstance(input_schema, dict):
+            return input_schema
+    return {}
+
+
+def _clean_property(prop_schema: Any) -> Any:
+    """Property schema without $ref/$defs, with anyOf collapsed to its first option"""
+    if not isinstance(prop_schema, dict):
+        return prop_schema
+    # Remove $ref, $defs, and anyOf with $ref
+    cleaned_prop = {k: v for k, v in prop_schema.items()
+                    if k not in ["$ref", "$defs"] and
+                    not (k == "anyOf" and isinstance(v, list) and any(isinstance(item, dict) and "$ref" in item for item in v))}
+    # If anyOf exists without $ref, use first option
+    if "anyOf" in cleaned_prop and isinstance(cleaned_prop["anyOf"], list) and len(cleaned_prop["anyOf"]) > 0:
+        first_option = cleaned_prop["anyOf"][0]
+        if isinstance(first_option, dict) and "$ref" not in first_option:
+            cleaned_prop = first_option
+        elif isinstance(first_option, dict):
+            # Still has $ref, use enum if available, else string
+            if "enum" in first_option:
+                cleaned_prop = {"type": "string", "enum": first_option["enum"]}
+            else:
+                cleaned_prop = {"type": "string"}
+    return cleaned_prop
+
+
+def gemini_function_declaration(tool: Any, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini tool entry for a LangChain tool given its (unresolved) argument schema"""
+    if isinstance(schema, dict) and schema:
+        schema = resolve_schema_refs(schema, schema.get("$defs", {}))
+    else:
+        schema = {}
+    properties = {name: _clean_property(prop) for name, prop in schema.get("properties", {}).items()}
+    return {
+        "function_declarations": [{
+            "name": tool.name,
+            "description": tool.description or "",
+            "parameters": {
+                "type": "OBJECT",
+                "properties": properties,
+                "required": schema.get("required", [])
+            }
+        }]
+    }
+
+
+def _accepted_types(prop_schema: Dict[str, Any]) -> Optional[set]:
+    """JSON types a property accepts, or None if unconstrained"""
+    options = prop_schema.get("anyOf") or prop_schema.get("oneOf") or [prop_schema]
+    types = set()
+    for option in options:
+        if not isinstance(option, dict):
+            return None
+        option_type = option.get("type")
+        if option_type is None:
+            return None  # $ref, enum-only, ... - leave it to the tool
+        for name in (option_type if isinstance(option_type, list) else [option_type]):
+            if name == "null":
+                continue
+            if name in JSON_TYPES:
+                types.add(name)
+            else:
+                return None
+    return types
+
+
+def _is_type(value: Any, types: set) -> bool:
+    if isinstance(value, bool):  # bool is an int subclass
+        return "boolean" in types
+    if isinstance(value, str):  # str is a Sequence
+        return "string" in types
+    return any(isinstance(value, JSON_TYPES[t]) for t in types)
+
+
+def build_validator(schema: Dict[str, Any]) -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Argument check for a tool: required arguments present and values of the
+    declared JSON type. Returns an error message, or None when the arguments
+    are acceptable. Deliberately loose where models commonly rely on
+    coercion: nulls for optional arguments, and numbers and booleans sent as
+    strings, are passed through for the tool's own validation.
+    """
+    properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
+    required = list(schema.get("required", [])) if isinstance(schema, dict) else []
+    checks = {}
+    for name, prop_schema in properties.items():
+        if isinstance(prop_schema, dict):
+            types = _accepted_types(prop_schema)
+            if types:
+                checks[name] = types
+
+    def validate(args: Dict[str, Any]) -> Optional[str]:
+        if not isinstance(args, Mapping):
+            return f"arguments must be an object, got {type(args).__name__}"
+        missing = [name for name in required if args.get(name) is None]
+        if missing:
+            return f"missing required argument(s): {', '.join(missing)}"
+        for name, value in args.items():
+            types = checks.get(name)
+            if not types or value is None:
+                continue
+            if isinstance(value, str) and types & {"integer", "number", "boolean"}:
+                continue  # Coercible by the tool
+            if _is_type(value, types):
+                continue
+            expected = " or ".join(sorted(types))
+            return f"argument '{name}' must be {expected}, got {type(value).__name__}"
+        return None
+
+    return validate
+
+
+class ToolRegistry:
+    """
+    Dispatch index for one toolset.
+
+    Lookup is a dict. Schemas are read once per tool; Gemini declarations are
+    converted on first use and reused by every later streaming iteration and
+    turn.
+    """
+
+    def __init__(self, tools: List[Any]):
+        started = time.perf_counter()
+        self.tools = list(tools)
+        self.by_name: Dict[str, Any] = {}
+        self.schemas: Dict[str, Dict[str, Any]] = {}
+        self.validators: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {}
+        for tool in self.tools:
+            # First tool wins on duplicate names, as with the linear scan this replaces
+            if tool.name in self.by_name:
+                continue
+            self.by_name[tool.name] = tool
+            try:
+                schema = tool_input_schema(tool)
+            except Exception as e:
+                print(f"⚠️ Error getting schema for tool {tool.name}: {e}", flush=True)
+                schema = {}
+            self.schemas[tool.name] = schema
+            self.validators[tool.name] = build_validator(schema)
+        self._gemini_tools: Optional[List[Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self.build_ms = (time.perf_counter() - started) * 1000
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.by_name
+
+    def get(self, name: str) -> Optional[Any]:
+        """Tool with the given name, or None"""
+        return self.by_name.get(name)
+
+    def validate(self, name: str, args: Dict[str, Any]) -> Optional[str]:
+        """Error message for a call's arguments, or None when they are acceptable (or the tool is unknown)"""
+        validator = self.validators.get(name)
+        return validator(args) if validator else None
+
+    def gemini_tools(self) -> List[Dict[str, Any]]:
+        """Gemini function declarations for every tool, converted once"""
+        if self._gemini_tools is None:
+            with self._lock:
+                if self._gemini_tools is None:
+                    self._gemini_tools = [
+                        gemini_function_declaration(tool, self.schemas[name])
+                        for name, tool in self.by_name.items()
+                    ]
+                    print(f"🔧 Converted {len(self._gemini_tools)} tools to Gemini format", flush=True)
+        return self._gemini_tools
+
+
+_tool_registries: "OrderedDict[Tuple[Tuple[str, int], ...], ToolRegistry]" = OrderedDict()
+_tool_registries_lock = threading.Lock()
+
+
+def get_tool_registry(tools: List[Any]) -> ToolRegistry:
+    """
+    Registry for a toolset, built once per distinct set of tool objects
+
+    Keyed by tool identity as well as name, so tools reloaded after an MCP
+    reconnect get a fresh registry; the most recent MAX_REGISTRIES are kept.
+    """
+    key = tuple((tool.name, id(tool)) for tool in tools or [])
+    with _tool_registries_lock:
+        registry = _tool_registries.get(key)
+        if registry is not None:
+            _tool_registries.move_to_end(key)
+            return registry
+    registry = ToolRegistry(tools or [])
+    with _tool_registries_lock:
+        registry = _tool_registries.setdefault(key, registry)
+        _tool_registries.move_to_end(key)
+        while len(_tool_registries) > MAX_REGISTRIES:
+            _tool_registries.popitem(last=False)
+    return registry
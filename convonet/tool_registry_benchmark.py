@@ -0,0 +1,136 @@
+"""
+Tool Registry Benchmark
+Dispatch overhead per tool call and per Gemini streaming iteration: linear
+scan vs registry lookup, Gemini declaration conversion on every iteration vs
+converted once, plus the cost of argument validation and of building the
+registry.
+
+Usage:
+    python -m convonet.tool_registry_benchmark
+    python -m convonet.tool_registry_benchmark --iterations 20000 --copies 3   # toolset with Composio-sized tool counts
+"""
+
+import argparse
+import timeit
+from typing import Dict, Any, List
+
+from convonet.tool_registry import ToolRegistry, gemini_function_declaration, tool_input_schema
+from convonet.tool_router_eval import load_tools
+
+# Python annotation fragment -> JSON Schema type, for tool specs parsed from source
+ANNOTATION_TYPES = (("bool", "boolean"), ("int", "integer"), ("float", "number"), ("list", "array"), ("dict", "object"))
+
+
+class BenchTool:
+    """Stand-in exposing what dispatch touches: name, description and a JSON args_schema"""
+
+    def __init__(self, name: str, description: str, args_schema: Dict[str, Any]):
+        self.name = name
+        self.description = description
+        self.args_schema = args_schema
+
+
+def _json_schema(parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Tool parameters as a JSON Schema (specs parsed from source only carry annotations)"""
+    if "properties" in parameters:
+        return parameters
+    if parameters and all(isinstance(value, dict) for value in parameters.values()):
+        return {"type": "object", "properties": parameters}
+    properties, required = {}, []
+    for name, annotation in parameters.items():
+        json_type = next((t for fragment, t in ANNOTATION_TYPES if fragment in annotation.lower()), "string")
+        if "optional" in annotation.lower() or "none" in annotation.lower():
+            properties[name] = {"anyOf": [{"type": json_type}, {"type": "null"}]}
+        else:
+            properties[name] = {"type": json_type}
+            required.append(name)
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def bench_tools(copies: int = 1) -> List[BenchTool]:
+    base = [BenchTool(spec.name, spec.description, _json_schema(spec.parameters)) for spec in load_tools()]
+    tools = list(base)
+    for copy in range(1, copies):
+        tools.extend(BenchTool(f"{tool.name}_{copy}", tool.description, tool.args_schema) for tool in base)
+    return tools
+
+
+def _linear_lookup(tools: List[Any], name: str):
+    """Lookup as tools_node and stream_gemini_with_tools did it"""
+    tool = None
+    for t in tools:
+        if t.name == name:
+            tool = t
+            break
+    return tool
+
+
+def _sample_args(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of the declared types for every required property"""
+    samples = {"string": "x", "integer": 1, "number": 1.0, "boolean": True, "array": [], "object": {}}
+    args = {}
+    for name in schema.get("required", []):
+        prop = schema.get("properties", {}).get(name, {})
+        args[name] = samples.get(prop.get("type"), "x")
+    return args
+
+
+def run_benchmark(tools: List[BenchTool], iterations: int) -> Dict[str, Any]:
+    registry = ToolRegistry(tools)
+    names = [tool.name for tool in tools]
+    calls = [(tool.name, _sample_args(tool.args_schema)) for tool in tools]
+
+    def per_call_ns(fn, number):
+        return min(timeit.repeat(fn, number=number, repeat=5)) / (number * len(names)) * 1e9
+
+    scan_ns = per_call_ns(lambda: [_linear_lookup(tools, name) for name in names], iterations)
+    dict_ns = per_call_ns(lambda: [registry.get(name) for name in names], iterations)
+    validate_ns = min(timeit.repeat(lambda: [registry.validate(name, args) for name, args in calls],
+                                    number=iterations, repeat=5)) / (iterations * len(calls)) * 1e9
+
+    conversions = max(1, iterations // 100)
+    convert_us = min(timeit.repeat(
+        lambda: [gemini_function_declaration(tool, tool_input_schema(tool)) for tool in tools],
+        number=conversions, repeat=5)) / conversions * 1e6
+    registry.gemini_tools()  # Converted once; every later iteration reuses it
+    cached_us = min(timeit.repeat(registry.gemini_tools, number=iterations, repeat=5)) / iterations * 1e6
+    build_ms = min(ToolRegistry(tools).build_ms for _ in range(5))
+
+    return {
+        "tools": len(tools),
+        "scan_ns": scan_ns,
+        "dict_ns": dict_ns,
+        "validate_ns": validate_ns,
+        "convert_us": convert_us,
+        "cached_us": cached_us,
+        "build_ms": build_ms,
+    }
+
+
+def print_results(results: Dict[str, Any]):
+    print(f"\n📊 Tool dispatch ({results['tools']} tools)")
+    rows = [
+        ("lookup, linear scan", f"{results['scan_ns']:.0f} ns/call"),
+        ("lookup, registry", f"{results['dict_ns']:.0f} ns/call"),
+        ("argument validation", f"{results['validate_ns']:.0f} ns/call"),
+        ("Gemini declarations, every iteration", f"{results['convert_us']:.0f} µs"),
+        ("Gemini declarations, registry", f"{results['cached_us']:.2f} µs"),
+        ("registry build (once per toolset)", f"{results['build_ms']:.2f} ms"),
+    ]
+    for label, value in rows:
+        print(f"   {label + ':':<40}{value}")
+    print(f"⚡ lookup {results['scan_ns'] / max(results['dict_ns'], 1e-9):.0f}x faster, "
+          f"{results['convert_us']:.0f} µs of schema conversion saved per Gemini iteration")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool dispatch with and without the tool registry")
+    parser.add_argument("--iterations", type=int, default=10000, help="lookups per tool per timing run")
+    parser.add_argument("--copies", type=int, default=1, help="grow the toolset by renamed copies of the tools")
+    args = parser.parse_args()
+
+    print_results(run_benchmark(bench_tools(args.copies), args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Tool Router
+Per-turn tool subset selection: scores the user's utterance against a
+precomputed keyword index of tool names and descriptions and binds only the
+relevant tool groups, so each LLM call carries a fraction of the tool schemas
+"""
+
+import os
+import re
+import math
+import time
+import threading
+from collections import Counter
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from langchain_core.messages import HumanMessage, AIMessage
+
+# Tools in a group are bound together, so a request that needs a lookup before
+# an update (e.g. get_calendar_events -> update_calendar_event) still works.
+TOOL_GROUPS = {
+    "todos": ["create_todo", "get_todos", "complete_todo", "update_todo", "delete_todo"],
+    "reminders": ["create_reminder", "get_reminders", "update_reminder", "delete_reminder"],
+    "calendar": ["create_calendar_event", "get_calendar_events", "update_calendar_event",
+                 "delete_calendar_event", "sync_google_calendar_events", "check_calendar_visibility"],
+    "recordings": ["create_call_recording", "get_call_recordings", "get_call_recording_by_sid",
+                   "update_call_recording", "delete_call_recording"],
+    "teams": ["get_teams", "get_team_members", "create_team", "create_team_todo", "add_team_member",
+              "remove_team_member", "change_member_role", "search_users"],
+    "transfer": ["transfer_to_agent", "get_available_departments"],
+    "auth": ["verify_user_pin"],
+    "debug": ["test_connection", "test_env_vars", "simple_test", "test_google_calendar", "test_database",
+              "test_authentication", "query_db"],
+}
+
+# Composio tool names start with the app slug (e.g. SLACK_SEND_MESSAGE)
+INTEGRATION_APPS = ("slack", "github", "gmail", "notion", "jira", "googlecalendar")
+
+# Verbs and fillers shared by most tools carry no signal about which group is meant
+STOPWORDS = {
+    "a", "an", "the", "my", "me", "i", "to", "for", "of", "on", "in", "at", "by", "and", "or", "is", "it", "be",
+    "can", "you", "please", "what", "which", "with", "from", "this", "that", "do", "does", "all", "any", "new",
+    "create", "get", "add", "update", "delete", "remove", "make", "set", "show", "list", "change", "item", "items",
+    "one", "page", "time", "first", "newest", "order", "id", "via", "use", "when", "are", "have", "has", "need",
+}
+
+# Spoken words -> the vocabulary used in tool names and descriptions
+SYNONYMS = {
+    "task": "todo", "chore": "todo", "done": "complete", "finish": "complete", "finished": "complete",
+    "remind": "reminder", "remember": "reminder", "forget": "reminder",
+    "meeting": "event", "appointment": "event", "schedule": "event", "scheduled": "event", "agenda": "calendar",
+    "book": "event", "reschedule": "event", "human": "agent", "person": "agent",
+    "representative": "agent", "operator": "agent", "support": "department",
+    "sales": "department", "billing": "department", "recorded": "recording",
+    "colleague": "member", "invite": "member", "teammate": "member", "promote": "role", "demote": "role",
+    "email": "gmail", "mail": "gmail", "ticket": "jira", "bug": "jira", "repo": "github", "issue": "github",
+    "channel": "slack", "authenticate": "pin", "passcode": "pin", "sql": "query",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with plurals folded and synonyms mapped to tool vocabulary"""
+    tokens = []
+    for token in TOKEN_RE.findall((text or "").lower().replace("to-do", "todo")):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        token = SYNONYMS.get(token, token)
+        if token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def tool_group(name: str) -> str:
+    """Group a tool belongs to; tools nobody has grouped are always bound"""
+    for group, names in TOOL_GROUPS.items():
+        if name in names:
+            return group
+    app = name.split("_", 1)[0].lower()
+    if app in INTEGRATION_APPS:
+        return app
+    return "other"
+
+
+class ToolRouter:
+    """
+    Picks the tool groups relevant to a turn.
+
+    Each tool's name (weighted TOOL_ROUTER_NAME_WEIGHT) and description are
+    indexed once as IDF-weighted tokens. A turn's text - the latest user
+    message plus the previous one, so short follow-ups keep their context - is
+    scored against every tool, and the groups whose best tool scores at least
+    TOOL_ROUTER_MIN_SCORE and within TOOL_ROUTER_RELATIVE of the top group are
+    selected. Groups used by recent tool calls stay selected, "transfer" and
+    ungrouped tools are always bound, and debug tools are never bound unless
+    TOOL_ROUTER_DEBUG_TOOLS=true. When nothing scores, every non-debug tool is
+    bound, as before the router.
+
+    The subset is always a union of whole groups, so there are few distinct
+    subsets and bound LLMs (and provider prompt caches) can be reused per subset.
+    """
+
+    def __init__(self, tools: List[Any]):
+        self.tools = list(tools)
+        self.name_weight = _env_float('TOOL_ROUTER_NAME_WEIGHT', 2.0)
+        self.min_score = _env_float('TOOL_ROUTER_MIN_SCORE', 1.0)
+        self.relative = _env_float('TOOL_ROUTER_RELATIVE', 0.35)
+        self.include_debug = os.getenv('TOOL_ROUTER_DEBUG_TOOLS', 'false').lower() == 'true'
+        always = os.getenv('TOOL_ROUTER_ALWAYS', 'transfer,other')
+        self.always_groups = {group.strip() for group in always.split(',') if group.strip()}
+
+        self.groups: Dict[str, List[Any]] = {}
+        for tool in self.tools:
+            self.groups.setdefault(tool_group(tool.name), []).append(tool)
+        self._index = self._build_index()
+
+    def _build_index(self) -> Dict[str, Dict[str, float]]:
+        """tool name -> {token: weight}, IDF-weighted across all tools"""
+        documents = {}
+        for tool in self.tools:
+            counts = Counter()
+            for token in tokenize(tool.name.replace("_", " ")):
+                counts[token] += self.name_weight
+            for token in set(tokenize(getattr(tool, "description", "") or "")):
+                counts[token] += 1.0
+            documents[tool.name] = counts
+
+        document_frequency = Counter(token for counts in documents.values() for token in counts)
+        total = max(1, len(documents))
+        idf = {token: math.log(1 + total / df) for token, df in document_frequency.items()}
+        return {
+            name: {token: weight * idf[token] for token, weight in counts.items()}
+            for name, counts in documents.items()
+        }
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Best tool score per group for the text"""
+        tokens = set(tokenize(text))
+        scores: Dict[str, float] = {}
+        for tool in self.tools:
+            weights = self._index[tool.name]
+            tool_score = sum(weights.get(token, 0.0) for token in tokens)
+            group = tool_group(tool.name)
+            if tool_score > scores.get(group, 0.0):
+                scores[group] = tool_score
+        return scores
+
+    @staticmethod
+    def _turn_context(messages: List[Any]) -> Tuple[str, List[str]]:
+        """Text of the last two user messages and the tools called since the earlier one"""
+        texts, called = [], []
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                texts.append(message.content if isinstance(message.content, str) else str(message.content))
+                if len(texts) == 2:
+                    break
+            elif isinstance(message, AIMessage):
+                called.extend(call.get("name", "") for call in (message.tool_calls or []))
+        return " ".join(reversed(texts)), called
+
+    def select_groups(self, text: str, called_tools: Iterable[str] = ()) -> Tuple[List[str], Dict[str, float]]:
+        """
+        Groups to bind for a turn
+
+        Returns:
+            (sorted group names, or [] when nothing matched; per-group scores)
+        """
+        scores = {group: score for group, score in self.score(text).items()
+                  if group != "debug" or self.include_debug}
+        top = max(scores.values(), default=0.0)
+        selected = {group for group, score in scores.items()
+                    if score >= self.min_score and score >= top * self.relative}
+        selected.update(tool_group(name) for name in called_tools if name)
+        if not selected:
+            return [], scores
+        selected.update(group for group in self.always_groups if group in self.groups)
+        if not self.include_debug:
+            selected.discard("debug")
+        return sorted(group for group in selected if group in self.groups), scores
+
+    def route(self, messages: List[Any]) -> Tuple[List[Any], List[str]]:
+        """
+        Tools to bind for the turn ending in messages
+
+        Returns:
+            (tools, selected groups - [] when every non-debug tool is bound)
+        """
+        started = time.perf_counter()
+        text, called = self._turn_context(messages)
+        groups, _ = self.select_groups(text, called)
+        if groups:
+            subset = [tool for group in groups for tool in self.groups[group]]
+        else:
+            subset = [tool for tool in self.tools if self.include_debug or tool_group(tool.name) != "debug"]
+        get_tool_router_stats().record(len(subset), len(self.tools), groups, (time.perf_counter() - started) * 1000)
+        return subset, groups
+
+    def select(self, messages: List[Any]) -> List[Any]:
+        """Tools to bind for the turn ending in messages"""
+        return self.route(messages)[0]
+
+
+class ToolRouterStats:
+    """Subset sizes, group picks and selection time across all routers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.fallbacks = 0
+        self.tools_bound = 0
+        self.tools_available = 0
+        self.total_select_ms = 0.0
+        self.groups = Counter()
+
+    def record(self, bound: int, available: int, groups: List[str], select_ms: float):
+        with self._lock:
+            self.turns += 1
+            self.fallbacks += int(not groups)
+            self.tools_bound += bound
+            self.tools_available += available
+            self.total_select_ms += select_ms
+            self.groups.update(groups)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": TOOL_ROUTER_ENABLED,
+                "turns": self.turns,
+                "fallbacks": self.fallbacks,
+                "avg_tools_bound": round(self.tools_bound / self.turns, 1) if self.turns else None,
+                "avg_tools_available": round(self.tools_available / self.turns, 1) if self.turns else None,
+                "avg_select_ms": round(self.total_select_ms / self.turns, 3) if self.turns else None,
+                "groups": dict(self.groups.most_common()),
+            }
+
+
+TOOL_ROUTER_ENABLED = os.getenv('TOOL_ROUTER', 'true').lower() == 'true'
+
+_tool_router_stats = ToolRouterStats()
+_tool_routers: Dict[Tuple[str, ...], ToolRouter] = {}
+_tool_routers_lock = threading.Lock()
+
+
+def get_tool_router_stats() -> ToolRouterStats:
+    """Get the global tool router statistics"""
+    return _tool_router_stats
+
+
+def get_tool_router(tools: List[Any]) -> Optional[ToolRouter]:
+    """Router for a tool set, indexed once per distinct set (None when TOOL_ROUTER=false)"""
+    if not TOOL_ROUTER_ENABLED or not tools:
+        return None
+    key = tuple(sorted(tool.name for tool in tools))
+    with _tool_routers_lock:
+        router = _tool_routers.get(key)
+        if router is None:
+            router = _tool_routers[key] = ToolRouter(tools)
+        return router
@@ -0,0 +1,178 @@
+"""
+Tool Router Evaluation
+Offline check of per-turn tool subset selection over recorded prompts: how
+often every tool a prompt needed was bound, how many tools were bound, and the
+tool-schema tokens saved against binding every tool.
+
+Usage:
+    python -m convonet.tool_router_eval
+    python -m convonet.tool_router_eval --file prompts.jsonl    # lines of {"prompt": ..., "expected_tools": [...]}
+    python -m convonet.tool_router_eval --from-monitor 500      # successful turns recorded by the agent monitor
+    python -m convonet.tool_router_eval --show-misses
+"""
+
+import os
+import ast
+import json
+import argparse
+import statistics
+from typing import Dict, Any, List, Tuple
+
+from langchain_core.messages import HumanMessage
+
+from convonet.tool_router import ToolRouter
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (prompt, tools the agent needed) - typical voice requests, including ones that need a lookup first
+SAMPLE_PROMPTS: List[Tuple[str, List[str]]] = [
+    ("Create a todo to buy groceries tomorrow", ["create_todo"]),
+    ("Add a task to call the plumber", ["create_todo"]),
+    ("What are my todos?", ["get_todos"]),
+    ("Mark the groceries todo as done", ["get_todos", "complete_todo"]),
+    ("Delete the todo about the dentist", ["get_todos", "delete_todo"]),
+    ("Change the priority of my report task to high", ["get_todos", "update_todo"]),
+    ("Remind me to take my medicine at 9pm", ["create_reminder"]),
+    ("What reminders do I have this week?", ["get_reminders"]),
+    ("Cancel my reminder about the car wash", ["get_reminders", "delete_reminder"]),
+    ("Schedule a meeting with Sarah on Friday at 3pm", ["create_calendar_event"]),
+    ("Create a workout event for December 4th at 7PM", ["create_calendar_event"]),
+    ("What's on my calendar tomorrow?", ["get_calendar_events"]),
+    ("Move my dentist appointment to next Tuesday", ["get_calendar_events", "update_calendar_event"]),
+    ("Sync my calendar with Google", ["sync_google_calendar_events"]),
+    ("What teams am I in?", ["get_teams"]),
+    ("Who is in the marketing team?", ["get_teams", "get_team_members"]),
+    ("Create a team called Design", ["create_team"]),
+    ("Add john@example.com to the engineering team as admin", ["add_team_member"]),
+    ("Remove alice@example.com from the sales team", ["remove_team_member"]),
+    ("Promote bob@example.com to owner in engineering", ["change_member_role"]),
+    ("Assign the release checklist to Maria in the engineering team", ["get_team_members", "create_team_todo"]),
+    ("Find the user named Kevin", ["search_users"]),
+    ("Transfer me to a human", ["transfer_to_agent"]),
+    ("I want to speak to someone in billing", ["transfer_to_agent"]),
+    ("Who can I talk to?", ["get_available_departments"]),
+    ("Show me my recent call recordings", ["get_call_recordings"]),
+    ("User is authenticating with PIN: 1234. Please verify their PIN using the verify_user_pin tool.", ["verify_user_pin"]),
+    ("Thanks, that's all", []),
+]
+
+
+class ToolSpec:
+    """Name, description and argument schema of a tool, enough to index and size it"""
+
+    def __init__(self, name: str, description: str, parameters: Dict[str, Any]):
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+
+    @property
+    def schema_tokens(self) -> int:
+        """Rough token count of the tool's schema as sent to the model (~4 chars per token)"""
+        payload = {"name": self.name, "description": self.description, "parameters": self.parameters}
+        return len(json.dumps(payload)) // 4
+
+
+def _tools_from_source() -> List[ToolSpec]:
+    """Tool specs parsed from the server sources when the tool modules can't be imported"""
+    specs = []
+    with open(os.path.join(PROJECT_ROOT, 'convonet', 'mcps', 'local_servers', 'db_todo.py')) as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and any("tool" in ast.unparse(d) for d in node.decorator_list):
+            parameters = {arg.arg: ast.unparse(arg.annotation) if arg.annotation else "any" for arg in node.args.args}
+            specs.append(ToolSpec(node.name, ast.get_docstring(node) or "", parameters))
+
+    with open(os.path.join(PROJECT_ROOT, 'convonet', 'mcps', 'local_servers', 'call_transfer.py')) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            keywords = {kw.arg: kw.value for kw in node.keywords}
+            if isinstance(keywords.get("name"), ast.Constant) and isinstance(keywords.get("description"), ast.Constant):
+                specs.append(ToolSpec(keywords["name"].value, keywords["description"].value, {}))
+    return specs
+
+
+def load_tools() -> List[ToolSpec]:
+    """db_todo and call transfer tools with their real schemas, or parsed from source"""
+    try:
+        from convonet.mcps.local_servers import db_todo
+        from convonet.mcps.local_servers.call_transfer import get_transfer_tools
+        specs = [ToolSpec(tool.name, tool.description or "", tool.parameters)
+                 for tool in db_todo.mcp._tool_manager.list_tools()]
+        specs.extend(ToolSpec(tool.name, tool.description, tool.args) for tool in get_transfer_tools())
+        return specs
+    except Exception as e:
+        print(f"⚠️ Could not import the tool modules ({e}) - parsing tool specs from source", flush=True)
+        return _tools_from_source()
+
+
+def load_prompts(path: str = None, from_monitor: int = 0) -> List[Tuple[str, List[str]]]:
+    if path:
+        with open(path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return [(row["prompt"], row.get("expected_tools", [])) for row in rows]
+    if from_monitor:
+        from convonet.agent_monitor import get_agent_monitor, AgentInteractionStatus
+        interactions = get_agent_monitor().get_recent_interactions(limit=from_monitor)
+        return [
+            (interaction.user_prompt, sorted({call.tool_name for call in interaction.tool_calls or []}))
+            for interaction in interactions
+            if interaction.status == AgentInteractionStatus.SUCCESS and interaction.user_prompt
+        ]
+    return SAMPLE_PROMPTS
+
+
+def run_eval(tools: List[ToolSpec], prompts: List[Tuple[str, List[str]]]) -> Dict[str, Any]:
+    router = ToolRouter(tools)
+    full_set, _ = router.route([])  # What every turn bound before the router
+    full_tokens = sum(tool.schema_tokens for tool in full_set)
+    hits, full_set_turns, bound_counts, bound_tokens, misses = 0, 0, [], [], []
+    for prompt, expected in prompts:
+        subset, groups = router.route([HumanMessage(content=prompt)])
+        names = {tool.name for tool in subset}
+        missing = [name for name in expected if name not in names]
+        if missing:
+            misses.append((prompt, missing))
+        else:
+            hits += 1
+        full_set_turns += int(not groups)
+        bound_counts.append(len(subset))
+        bound_tokens.append(sum(tool.schema_tokens for tool in subset))
+    return {
+        "prompts": len(prompts),
+        "tools_available": len(router.tools),
+        "recall": hits / len(prompts) if prompts else 0.0,
+        "full_set_rate": full_set_turns / len(prompts) if prompts else 0.0,
+        "avg_tools_bound": statistics.fmean(bound_counts) if bound_counts else 0.0,
+        "full_schema_tokens": full_tokens,
+        "avg_schema_tokens": statistics.fmean(bound_tokens) if bound_tokens else 0.0,
+        "misses": misses,
+    }
+
+
+def print_results(results: Dict[str, Any], show_misses: bool):
+    print(f"\n📊 Tool router evaluation ({results['prompts']} prompts, {results['tools_available']} tools)")
+    print(f"   recall (all needed tools bound): {results['recall']:.1%}")
+    print(f"   turns bound to the full set:     {results['full_set_rate']:.1%}")
+    print(f"   avg tools bound:                 {results['avg_tools_bound']:.1f}")
+    print(f"   avg schema tokens:               {results['avg_schema_tokens']:.0f} (all non-debug tools: {results['full_schema_tokens']})")
+    if results['full_schema_tokens']:
+        print(f"⚡ {1 - results['avg_schema_tokens'] / results['full_schema_tokens']:.0%} fewer tool-schema tokens per LLM call")
+    if show_misses:
+        for prompt, missing in results['misses']:
+            print(f"❌ {prompt!r}: missing {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate per-turn tool subset selection")
+    parser.add_argument("--file", help="JSONL of {\"prompt\": ..., \"expected_tools\": [...]}")
+    parser.add_argument("--from-monitor", type=int, default=0, help="evaluate the N most recent monitored interactions")
+    parser.add_argument("--show-misses", action="store_true", help="list prompts whose needed tools were not bound")
+    args = parser.parse_args()
+
+    results = run_eval(load_tools(), load_prompts(args.file, args.from_monitor))
+    print_results(results, args.show_misses)
+
+
+if __name__ == "__main__":
+    main()
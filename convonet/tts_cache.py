@@ -0,0 +1,443 @@
+"""
+TTS Audio Cache
+Content-addressed cache of synthesized speech keyed by provider, voice, model,
+voice settings and normalized text: an in-process LRU tier in front of a shared
+Redis tier (or a disk tier when Redis is unavailable), both size-bounded
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis - the cache works in-process without it
+try:
+    from convonet.redis_manager import redis_manager
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_manager = None
+    REDIS_AVAILABLE = False
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def normalize_tts_text(text: str) -> str:
+    """Collapse whitespace; case and punctuation are kept since they change the prosody"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def tts_cache_key(provider: str, text: str, voice_id: Optional[str] = None, model: Optional[str] = None,
+                  settings: Optional[Dict[str, Any]] = None) -> str:
+    """sha256 over everything that changes the synthesized audio"""
+    material = json.dumps(
+        [provider, voice_id or "", model or "", settings or {}, normalize_tts_text(text)],
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _MemoryTier:
+    """LRU over audio bytes, bounded by total size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._items.get(key)
+            if audio is not None:
+                self._items.move_to_end(key)
+            return audio
+
+    def put(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._items[key] = audio
+            self._bytes += len(audio)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+
+class _RedisTier:
+    """
+    Shared tier: audio under ``tts_cache:audio:{key}``, a sorted set of keys
+    scored by last access and a running byte total, so the least recently used
+    entries are dropped once the total exceeds max_bytes
+    """
+
+    EVICT_BATCH = 32
+
+    def __init__(self, max_bytes: int, ttl: int, prefix: str = "tts_cache"):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prefix = prefix
+        self.evictions = 0
+        self._total_checked = False
+
+    def _client(self):
+        if not REDIS_AVAILABLE or redis_manager is None or not redis_manager.is_available():
+            return None
+        return redis_manager.get_binary_client()
+
+    @property
+    def available(self) -> bool:
+        return self._client() is not None
+
+    def _ensure_total(self, client):
+        """Seed the running total once for caches written before it was kept"""
+        if self._total_checked:
+            return
+        if not client.hexists(f"{self.prefix}:stats", "bytes"):
+            total = sum(int(size) for size in client.hvals(f"{self.prefix}:sizes"))
+            client.hsetnx(f"{self.prefix}:stats", "bytes", total)
+        self._total_checked = True
+
+    def _drop(self, client, keys, sizes) -> int:
+        """Delete entries and take their sizes off the running total; returns the bytes freed"""
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.delete(f"{self.prefix}:audio:{key}")
+            pipe.zrem(f"{self.prefix}:index", key)
+            pipe.hdel(f"{self.prefix}:sizes", key)
+        removed = pipe.execute()[2::3]
+        # Only count entries this call removed, in case another process evicted them first
+        freed = sum(int(size or 0) for size, was_removed in zip(sizes, removed) if was_removed)
+        if freed:
+            client.hincrby(f"{self.prefix}:stats", "bytes", -freed)
+        return freed
+
+    def get(self, key: str) -> Optional[bytes]:
+        client = self._client()
+        if client is None:
+            return None
+        audio = client.get(f"{self.prefix}:audio:{key}")
+        if audio is None:
+            # Expired by TTL - drop it from the eviction bookkeeping too
+            size = client.hget(f"{self.prefix}:sizes", key)
+            if size is not None:
+                self._drop(client, [key], [size])
+            return None
+        client.zadd(f"{self.prefix}:index", {key: time.time()})
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        client = self._client()
+        if client is None:
+            return
+        self._ensure_total(client)
+        previous = client.hget(f"{self.prefix}:sizes", key)
+        pipe = client.pipeline(transaction=False)
+        pipe.set(f"{self.prefix}:audio:{key}", audio, ex=self.ttl)
+        pipe.zadd(f"{self.prefix}:index", {key: time.time()})
+        pipe.hset(f"{self.prefix}:sizes", key, len(audio))
+        pipe.hincrby(f"{self.prefix}:stats", "bytes", len(audio) - int(previous or 0))
+        total = pipe.execute()[-1]
+        if total > self.max_bytes:
+            self._evict(client, total)
+
+    def _evict(self, client, total: int):
+        # Oldest-accessed first until back under budget
+        while total > self.max_bytes:
+            raw_keys = client.zrange(f"{self.prefix}:index", 0, self.EVICT_BATCH - 1)
+            if not raw_keys:
+                # Index is empty, so the total has drifted - resync it
+                total = sum(int(size) for size in client.hvals(f"{self.prefix}:sizes"))
+                client.hset(f"{self.prefix}:stats", "bytes", total)
+                return
+            keys = [raw_key.decode() if isinstance(raw_key, bytes) else raw_key for raw_key in raw_keys]
+            sizes = client.hmget(f"{self.prefix}:sizes", keys)
+            victims, excess = 0, total - self.max_bytes
+            for size in sizes:
+                victims += 1
+                excess -= int(size or 0)
+                if excess <= 0:
+                    break
+            total -= self._drop(client, keys[:victims], sizes[:victims])
+            self.evictions += victims
+
+    def stats(self) -> Dict[str, Any]:
+        client = self._client()
+        if client is None:
+            return {"available": False}
+        self._ensure_total(client)
+        return {
+            "available": True,
+            "entries": client.hlen(f"{self.prefix}:sizes"),
+            "bytes": int(client.hget(f"{self.prefix}:stats", "bytes") or 0),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class _DiskTier:
+    """Fallback shared tier: one file per key, oldest-modified files removed over max_bytes"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # Recency for eviction
+            return audio
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, audio: bytes):
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            return [entry for entry in it if entry.name.endswith(".audio")]
+
+    def _evict(self):
+        entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries()]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        return {
+            "available": True,
+            "directory": self.directory,
+            "entries": len(entries),
+            "bytes": sum(entry.stat().st_size for entry in entries),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class TTSCache:
+    """
+    Two-tier TTS audio cache.
+
+    Lookups hit the in-process LRU first (microseconds), then the shared tier
+    (Redis, or TTS_CACHE_DIR on disk when Redis is down), whose hits are
+    promoted into memory. Shared-tier failures only cost a miss - synthesis
+    always remains the fallback.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('TTS_CACHE', 'true').lower() == 'true'
+        self.max_text_chars = _env_int('TTS_CACHE_MAX_TEXT_CHARS', 400)
+        self.memory = _MemoryTier(_env_int('TTS_CACHE_MEMORY_MB', 32) * 1024 * 1024)
+        self.redis = _RedisTier(_env_int('TTS_CACHE_REDIS_MB', 256) * 1024 * 1024, _env_int('TTS_CACHE_TTL', 7 * 24 * 3600))
+        cache_dir = os.getenv('TTS_CACHE_DIR')
+        self.disk = _DiskTier(cache_dir, _env_int('TTS_CACHE_DISK_MB', 512) * 1024 * 1024) if cache_dir else None
+
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+        self.hit_us_total = 0.0
+        self.miss_synthesis_ms_total = 0.0
+
+    def _shared_tier(self):
+        if self.redis.available:
+            return self.redis
+        return self.disk
+
+    def cacheable(self, text: str) -> bool:
+        # Long free-form replies rarely repeat; keep the cache for prompts and sentences
+        return self.enabled and bool(text) and len(text) <= self.max_text_chars
+
+    def get(self, key: str) -> Optional[bytes]:
+        started = time.perf_counter()
+        audio = self.memory.get(key)
+        if audio is not None:
+            self._count_hit("memory", started)
+            return audio
+
+        tier = self._shared_tier()
+        if tier is not None:
+            try:
+                audio = tier.get(key)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ TTS cache shared-tier read failed: {e}")
+                audio = None
+            if audio is not None:
+                self.memory.put(key, audio)
+                self._count_hit("shared", started)
+                return audio
+        return None
+
+    def put(self, key: str, audio: bytes):
+        if not audio:
+            return
+        self.memory.put(key, audio)
+        tier = self._shared_tier()
+        if tier is not None:
+            try:
+                tier.put(key, audio)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ TTS cache shared-tier write failed: {e}")
+        with self._lock:
+            self.stores += 1
+
+    def _count_hit(self, tier: str, started: float):
+        with self._lock:
+            if tier == "memory":
+                self.memory_hits += 1
+            else:
+                self.shared_hits += 1
+            self.hit_us_total += (time.perf_counter() - started) * 1_000_000
+
+    def get_or_synthesize(
+        self,
+        provider: str,
+        text: str,
+        synthesize: Callable[[], Optional[bytes]],
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> Optional[bytes]:
+        """
+        Cached audio for the utterance, synthesizing (and storing) it on a miss
+
+        Args:
+            provider: TTS provider name (part of the key)
+            text: Text to speak
+            synthesize: Zero-argument callable producing the audio on a miss
+            voice_id, model, settings: Everything else that changes the audio
+
+        Returns:
+            Audio bytes, or None if synthesis failed (failures are not cached)
+        """
+        if not self.cacheable(text):
+            return synthesize()
+        key = tts_cache_key(provider, text, voice_id, model, settings)
+        audio = self.get(key)
+        if audio is not None:
+            return audio
+
+        started = time.perf_counter()
+        audio = synthesize()
+        with self._lock:
+            self.misses += 1
+            self.miss_synthesis_ms_total += (time.perf_counter() - started) * 1000
+        if audio:
+            self.put(key, audio)
+        return audio
+
+    def stream_or_synthesize(
+        self,
+        provider: str,
+        text: str,
+        synthesize_stream: Callable[[], Iterable[bytes]],
+        voice_id: Optional[str] = None,
+        model: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[bytes]:
+        """
+        Streaming get_or_synthesize: yields the cached clip in one piece on a hit,
+        otherwise the provider's chunks as they arrive. The assembled clip is
+        stored only once the stream completes, so an interrupted stream is never
+        cached.
+        """
+        if not self.cacheable(text):
+            yield from synthesize_stream()
+            return
+        key = tts_cache_key(provider, text, voice_id, model, settings)
+        audio = self.get(key)
+        if audio is not None:
+            yield audio
+            return
+
+        started = time.perf_counter()
+        parts = []
+        for part in synthesize_stream():
+            parts.append(part)
+            yield part
+        with self._lock:
+            self.misses += 1
+            self.miss_synthesis_ms_total += (time.perf_counter() - started) * 1000
+        if parts:
+            self.put(key, b"".join(parts))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.memory_hits + self.shared_hits
+            lookups = hits + self.misses
+            stats = {
+                "enabled": self.enabled,
+                "memory_hits": self.memory_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "errors": self.errors,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "avg_hit_us": round(self.hit_us_total / hits, 1) if hits else None,
+                "avg_miss_synthesis_ms": round(self.miss_synthesis_ms_total / self.misses, 1) if self.misses else None,
+            }
+        stats["memory"] = self.memory.stats()
+        try:
+            stats["redis"] = self.redis.stats()
+        except Exception as e:
+            stats["redis"] = {"available": False, "error": str(e)}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+# Global TTS cache instance
+_tts_cache = None
+
+
+def get_tts_cache() -> TTSCache:
+    """Get the global TTS cache instance"""
+    global _tts_cache
+    if _tts_cache is None:
+        _tts_cache = TTSCache()
+    return _tts_cache
@@ -0,0 +1,262 @@
+"""
+Streaming TTS Pipeline
+Splits streamed LLM text into sentences and synthesizes them concurrently,
+delivering audio in sentence order so playback can start before the reply is complete
+"""
+
+import os
+import re
+import time
+import threading
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional, Callable, List, Dict, Any, Deque, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Sentence boundary: terminal punctuation (optionally followed by quotes/brackets) and whitespace
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…。！？])["\')\]]*\s+|\n+')
+_SOFT_BOUNDARY = re.compile(r'[,;:]\s+')
+_ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'a.m', 'p.m', 'jr', 'sr'}
+
+
+class SentenceSplitter:
+    """
+    Incremental sentence splitter for streamed text.
+
+    A sentence is only released once the whitespace after its terminal
+    punctuation has arrived, so "3." in "3.5" or a trailing "Dr." in a partial
+    chunk is not cut early. Very short sentences are merged with the next one,
+    and run-on text is split at a soft boundary once it exceeds ``max_chars``.
+    """
+
+    def __init__(self, min_chars: int = 20, max_chars: int = 240):
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text; return any sentences that are now complete"""
+        if not text:
+            return []
+        self._buffer += text
+        sentences = []
+
+        while True:
+            match = None
+            for candidate in _SENTENCE_BOUNDARY.finditer(self._buffer):
+                head = self._buffer[:candidate.start()].strip()
+                last_word = head.rsplit(None, 1)[-1].rstrip('.').lower() if head else ''
+                if last_word in _ABBREVIATIONS:
+                    continue
+                if len(head) >= self.min_chars:
+                    match = candidate
+                    break
+            if match is None:
+                break
+            sentences.append(self._buffer[:match.start()].strip())
+            self._buffer = self._buffer[match.end():]
+
+        if len(self._buffer) > self.max_chars:
+            cut = None
+            for candidate in _SOFT_BOUNDARY.finditer(self._buffer, 0, self.max_chars):
+                cut = candidate
+            split_at = cut.end() if cut else self._buffer.rfind(' ', 0, self.max_chars) + 1
+            if split_at > 0:
+                sentences.append(self._buffer[:split_at].strip())
+                self._buffer = self._buffer[split_at:]
+
+        return [s for s in sentences if s]
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the text stream has ended"""
+        remainder, self._buffer = self._buffer.strip(), ""
+        return remainder or None
+
+
+class StreamingTTSPipeline:
+    """
+    Sentence-level TTS with bounded parallelism and ordered delivery.
+
+    ``synthesize(text) -> bytes`` runs on a small worker pool (``max_parallel``
+    requests in flight). ``on_audio_chunk(index, text, audio_bytes)`` is called
+    strictly in sentence order; sentences whose synthesis failed are skipped so
+    the client never waits on a gap.
+
+    With ``synthesize_stream(text) -> Iterable[bytes]`` instead, the sentence at
+    the head of the queue is delivered chunk by chunk as the provider streams it
+    (several ``on_audio_chunk`` calls share its index), later sentences buffer
+    until it finishes, and ``on_sentence_end(index, text)`` marks each sentence
+    whose audio is complete.
+    """
+
+    def __init__(
+        self,
+        synthesize: Optional[Callable[[str], Optional[bytes]]],
+        on_audio_chunk: Callable[[int, str, bytes], None],
+        max_parallel: Optional[int] = None,
+        min_chars: int = 20,
+        max_chars: int = 240,
+        synthesize_stream: Optional[Callable[[str], Iterable[bytes]]] = None,
+        on_sentence_end: Optional[Callable[[int, str], None]] = None,
+    ):
+        self.synthesize = synthesize
+        self.synthesize_stream = synthesize_stream
+        self.on_audio_chunk = on_audio_chunk
+        self.on_sentence_end = on_sentence_end
+        self.max_parallel = max_parallel or int(os.getenv('STREAMING_TTS_MAX_PARALLEL', '2'))
+        self.splitter = SentenceSplitter(min_chars=min_chars, max_chars=max_chars)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix="tts-pipeline")
+        self._futures = []
+        self._sentences: Dict[int, str] = {}
+        self._parts: Dict[int, Deque[bytes]] = {}
+        self._finished = set()
+        self._next_index = 0
+        self._next_emit = 0
+        self._head_emitted = False
+        self._lock = threading.Lock()
+        self._emit_lock = threading.Lock()
+        self._shutdown = False  # Executor shut down; guarded by _lock like every submit
+
+        self.cancelled = False
+        self.closed = False
+        self.chars_fed = 0
+        self.chunks_emitted = 0
+        self.audio_bytes_emitted = 0
+        self.started_at = time.time()
+        self.first_audio_at: Optional[float] = None
+
+    @property
+    def streaming(self) -> bool:
+        return self.synthesize_stream is not None
+
+    def feed(self, text: str):
+        """Feed a streamed text delta"""
+        if self.cancelled or self.closed or not text:
+            return
+        self.chars_fed += len(text)
+        for sentence in self.splitter.feed(text):
+            self._submit(sentence)
+
+    def _submit(self, sentence: str):
+        with self._lock:
+            if self.cancelled or self._shutdown:
+                return
+            index = self._next_index
+            self._next_index += 1
+            self._sentences[index] = sentence
+            self._parts[index] = deque()
+            self._futures.append(self._executor.submit(self._synthesize_one, index, sentence))
+
+    def _synthesize_one(self, index: int, sentence: str):
+        try:
+            if self.streaming:
+                for part in self.synthesize_stream(sentence):
+                    if self.cancelled:
+                        break
+                    if part:
+                        self._add_part(index, part)
+            elif not self.cancelled:
+                audio = self.synthesize(sentence)
+                if audio:
+                    self._add_part(index, audio)
+        except Exception as e:
+            logger.error(f"❌ TTS pipeline: sentence {index} failed: {e}")
+        with self._lock:
+            self._finished.add(index)
+        self._drain()
+
+    def _add_part(self, index: int, part: bytes):
+        with self._lock:
+            self._parts[index].append(part)
+            is_head = index == self._next_emit
+        if is_head:
+            # The sentence being played streams straight through
+            self._drain()
+
+    def _drain(self):
+        """Deliver every available chunk of the head sentence, advancing past finished sentences in order"""
+        with self._emit_lock:
+            while True:
+                with self._lock:
+                    index = self._next_emit
+                    parts = self._parts.get(index)
+                    if parts:
+                        part, finished = parts.popleft(), False
+                    elif index in self._finished:
+                        part, finished = None, True
+                        self._next_emit += 1
+                        self._finished.discard(index)
+                        self._parts.pop(index, None)
+                    else:
+                        return
+                    sentence = self._sentences.pop(index) if finished else self._sentences[index]
+                if self.cancelled:
+                    continue
+                if finished:
+                    if self._head_emitted and self.on_sentence_end is not None:
+                        try:
+                            self.on_sentence_end(index, sentence)
+                        except Exception as e:
+                            logger.error(f"❌ TTS pipeline: sentence end emit failed: {e}")
+                    self._head_emitted = False
+                    continue
+                if self.first_audio_at is None:
+                    self.first_audio_at = time.time()
+                try:
+                    self.on_audio_chunk(index, sentence, part)
+                except Exception as e:
+                    logger.error(f"❌ TTS pipeline: emit failed: {e}")
+                self._head_emitted = True
+                self.chunks_emitted += 1
+                self.audio_bytes_emitted += len(part)
+
+    def close(self, timeout: float = 30.0) -> int:
+        """
+        Flush the remaining text and wait for all sentences to be delivered
+
+        Args:
+            timeout: Max seconds to wait for outstanding synthesis
+
+        Returns:
+            Number of audio chunks delivered
+        """
+        if not self.closed:
+            self.closed = True
+            remainder = self.splitter.flush()
+            if remainder:
+                self._submit(remainder)
+        with self._lock:
+            futures = list(self._futures)
+        # Wait in slices: futures dropped by cancel() never wake wait(), so a barge-in
+        # during close() would otherwise block for the whole timeout
+        deadline = time.time() + timeout
+        not_done = set(futures)
+        while not_done and not self.cancelled and time.time() < deadline:
+            _, not_done = wait(not_done, timeout=min(0.1, max(0.0, deadline - time.time())))
+        if not_done and not self.cancelled:
+            logger.warning(f"⚠️ TTS pipeline: {len(not_done)} sentence(s) still synthesizing after {timeout}s")
+        with self._lock:
+            self._shutdown = True
+            self._executor.shutdown(wait=False)
+        return self.chunks_emitted
+
+    def cancel(self):
+        """Drop all pending synthesis and stop delivering audio (safe to call from any thread, e.g. on barge-in)"""
+        # Under the lock so no _submit can land between the flag and the shutdown
+        with self._lock:
+            self.cancelled = True
+            self._shutdown = True
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'sentences': self._next_index,
+            'streaming': self.streaming,
+            'chunks_emitted': self.chunks_emitted,
+            'audio_bytes': self.audio_bytes_emitted,
+            'max_parallel': self.max_parallel,
+            'time_to_first_audio_ms': (self.first_audio_at - self.started_at) * 1000 if self.first_audio_at else None,
+        }
@@ -0,0 +1,325 @@
+"""
+TTS Router
+Latency-aware routing between TTS providers: tracks rolling time-to-first-byte
+and error rates per provider, hedges a slow primary (ElevenLabs) with the
+fallback (Deepgram Aura) once its first byte is overdue, and plays whichever
+provider answers first
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, Callable, Iterator, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (provider name, zero-argument callable returning the provider's audio chunks)
+ProviderCall = Tuple[str, Callable[[], Iterable[bytes]]]
+
+# Hedge budget before enough samples exist: streams answer with a first chunk, clips only when complete
+DEFAULT_HEDGE_MS = {"stream": 1200.0, "clip": 3000.0}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+class ProviderWindow:
+    """Rolling first-byte latencies and outcomes for one provider and mode"""
+
+    def __init__(self, size: int):
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=size)
+        self.outcomes = deque(maxlen=size)  # True = produced audio
+
+    def record(self, ttfb_ms: Optional[float], success: bool):
+        with self._lock:
+            if ttfb_ms is not None:
+                self.latencies.append(ttfb_ms)
+            self.outcomes.append(success)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(round(pct / 100.0 * (len(samples) - 1))))]
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> Optional[float]:
+        with self._lock:
+            outcomes = list(self.outcomes)
+        return outcomes.count(False) / len(outcomes) if outcomes else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        p50, p90 = self.percentile(50), self.percentile(90)
+        error_rate = self.error_rate
+        return {
+            "samples": self.samples,
+            "p50_ttfb_ms": round(p50, 1) if p50 is not None else None,
+            "p90_ttfb_ms": round(p90, 1) if p90 is not None else None,
+            "error_rate": round(error_rate, 3) if error_rate is not None else None,
+        }
+
+
+class _Attempt:
+    """One provider request running on its own thread, feeding chunks into a queue"""
+
+    def __init__(self, router: "TTSRouter", provider: str, mode: str, call: Callable[[], Iterable[bytes]], events: queue.Queue):
+        self.router = router
+        self.provider = provider
+        self.mode = mode
+        self.call = call
+        self.events = events
+        self.chunks: queue.Queue = queue.Queue()
+        self.cancelled = False
+        self.failed = False
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._run, name=f"tts-router-{provider}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        ttfb_ms = None
+        try:
+            for chunk in self.call():
+                if self.cancelled:
+                    break
+                if not chunk:
+                    continue
+                if ttfb_ms is None:
+                    ttfb_ms = (time.perf_counter() - self.started) * 1000
+                    self.events.put(("first_byte", self))
+                self.chunks.put(chunk)
+        except Exception as e:
+            logger.warning(f"⚠️ TTS router: {self.provider} failed: {e}")
+        finally:
+            self.chunks.put(None)
+            if self.cancelled and ttfb_ms is None:
+                # Lost the race before answering: its first byte took at least this long
+                self.router.window(self.provider, self.mode).record((time.perf_counter() - self.started) * 1000, True)
+            else:
+                self.router.window(self.provider, self.mode).record(ttfb_ms, ttfb_ms is not None)
+            if ttfb_ms is None:
+                self.failed = True
+                self.events.put(("failed", self))
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TTSRouter:
+    """
+    Picks the TTS provider for each request.
+
+    The primary runs first. If its first byte has not arrived within the hedge
+    budget (its rolling p90 time-to-first-byte, clamped to
+    [TTS_HEDGE_MIN_MS, TTS_HEDGE_MAX_MS]), the fallback is fired as well, and
+    whichever answers first is played while the other is abandoned. A primary
+    that fails before its first byte hands over to the fallback at once. A
+    primary whose rolling error rate reaches TTS_ROUTER_MAX_ERROR_RATE is
+    skipped, except for one probe every TTS_ROUTER_PROBE_EVERY requests so that
+    it can recover.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('TTS_HEDGING', 'true').lower() == 'true'
+        self.window_size = _env_int('TTS_ROUTER_WINDOW', 50)
+        self.min_samples = _env_int('TTS_ROUTER_MIN_SAMPLES', 5)
+        self.hedge_percentile = _env_float('TTS_HEDGE_PERCENTILE', 90.0)
+        self.hedge_min_ms = _env_float('TTS_HEDGE_MIN_MS', 250.0)
+        self.hedge_max_ms = _env_float('TTS_HEDGE_MAX_MS', 4000.0)
+        self.max_error_rate = _env_float('TTS_ROUTER_MAX_ERROR_RATE', 0.5)
+        self.probe_every = max(1, _env_int('TTS_ROUTER_PROBE_EVERY', 10))
+        self.read_timeout = _env_float('TTS_ROUTER_READ_TIMEOUT', 35.0)
+
+        self._lock = threading.Lock()
+        self._windows: Dict[str, ProviderWindow] = {}
+        self.decisions = {
+            "requests": 0,
+            "primary_only": 0,
+            "hedges_fired": 0,
+            "primary_wins": 0,
+            "fallback_wins": 0,
+            "fallback_on_error": 0,
+            "primary_skipped": 0,
+            "all_failed": 0,
+        }
+
+    def window(self, provider: str, mode: str) -> ProviderWindow:
+        key = f"{provider}:{mode}"
+        with self._lock:
+            if key not in self._windows:
+                self._windows[key] = ProviderWindow(self.window_size)
+            return self._windows[key]
+
+    def _count(self, decision: str):
+        with self._lock:
+            self.decisions[decision] += 1
+
+    def hedge_budget_ms(self, provider: str, mode: str = "stream") -> float:
+        """How long to wait for the provider's first byte before hedging"""
+        window = self.window(provider, mode)
+        budget = window.percentile(self.hedge_percentile) if window.samples >= self.min_samples else None
+        if budget is None:
+            budget = DEFAULT_HEDGE_MS.get(mode, DEFAULT_HEDGE_MS["stream"])
+        return min(self.hedge_max_ms, max(self.hedge_min_ms, budget))
+
+    def _primary_unhealthy(self, provider: str, mode: str) -> bool:
+        window = self.window(provider, mode)
+        error_rate = window.error_rate
+        if window.samples < self.min_samples or error_rate is None or error_rate < self.max_error_rate:
+            return False
+        with self._lock:
+            probe = self.decisions["requests"] % self.probe_every == 0
+        return not probe
+
+    def stream(self, primary: ProviderCall, fallback: Optional[ProviderCall] = None, mode: str = "stream",
+               on_winner: Optional[Callable[[str], None]] = None) -> Iterator[bytes]:
+        """
+        Audio chunks from whichever provider answers first
+
+        Args:
+            primary: (name, call) of the preferred provider
+            fallback: (name, call) used to hedge or replace the primary; None disables hedging
+            mode: "stream" for chunked providers, "clip" for calls that return one whole clip
+            on_winner: Called with the winning provider's name before its first chunk is yielded
+        """
+        self._count("requests")
+        if fallback is not None and self._primary_unhealthy(primary[0], mode):
+            self._count("primary_skipped")
+            primary, fallback = fallback, None
+        if fallback is None or not self.enabled:
+            self._count("primary_only")
+            yield from self._single(primary, mode, on_winner)
+            return
+
+        events: queue.Queue = queue.Queue()
+        first = _Attempt(self, primary[0], mode, primary[1], events)
+        attempts = [first]
+        budget_ms = self.hedge_budget_ms(primary[0], mode)
+        hedge_at = time.monotonic() + budget_ms / 1000.0
+        winner = None
+
+        while winner is None:
+            hedged = len(attempts) > 1
+            wait = self.read_timeout if hedged else max(0.0, hedge_at - time.monotonic())
+            try:
+                kind, attempt = events.get(timeout=wait)
+            except queue.Empty:
+                if hedged:
+                    break
+                logger.info(f"⏱️ TTS router: no first byte from {primary[0]} after {budget_ms:.0f}ms, hedging with {fallback[0]}")
+                self._count("hedges_fired")
+                attempts.append(_Attempt(self, fallback[0], mode, fallback[1], events))
+                continue
+            if kind == "first_byte":
+                winner = attempt
+            elif not hedged:
+                self._count("fallback_on_error")
+                attempts.append(_Attempt(self, fallback[0], mode, fallback[1], events))
+            elif all(a.failed for a in attempts):
+                break
+
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel()
+        if winner is None:
+            self._count("all_failed")
+            return
+
+        self._count("primary_wins" if winner is first else "fallback_wins")
+        if on_winner is not None:
+            on_winner(winner.provider)
+        try:
+            yield from self._drain(winner)
+        finally:
+            winner.cancel()
+
+    def _single(self, provider: ProviderCall, mode: str, on_winner: Optional[Callable[[str], None]]) -> Iterator[bytes]:
+        name, call = provider
+        started = time.perf_counter()
+        ttfb_ms = None
+        try:
+            for chunk in call():
+                if not chunk:
+                    continue
+                if ttfb_ms is None:
+                    ttfb_ms = (time.perf_counter() - started) * 1000
+                    if on_winner is not None:
+                        on_winner(name)
+                yield chunk
+        finally:
+            self.window(name, mode).record(ttfb_ms, ttfb_ms is not None)
+
+    def _drain(self, attempt: _Attempt) -> Iterator[bytes]:
+        while True:
+            try:
+                chunk = attempt.chunks.get(timeout=self.read_timeout)
+            except queue.Empty:
+                logger.warning(f"⚠️ TTS router: {attempt.provider} stalled mid-stream")
+                return
+            if chunk is None:
+                return
+            yield chunk
+
+    def synthesize(self, primary: Tuple[str, Callable[[], Optional[bytes]]],
+                   fallback: Optional[Tuple[str, Callable[[], Optional[bytes]]]] = None) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Whole-clip routing: (audio bytes, provider name) from whichever provider finishes first
+
+        Args:
+            primary, fallback: (name, call) where call() returns the complete clip or None
+        """
+        def as_stream(call):
+            return lambda: [call()]
+
+        winner = []
+        audio = b"".join(self.stream(
+            (primary[0], as_stream(primary[1])),
+            (fallback[0], as_stream(fallback[1])) if fallback else None,
+            mode="clip",
+            on_winner=winner.append
+        ))
+        return (audio or None), (winner[0] if winner else None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            windows = dict(self._windows)
+            decisions = dict(self.decisions)
+        return {
+            "enabled": self.enabled,
+            "decisions": decisions,
+            "providers": {
+                key: {**window.to_dict(), "hedge_budget_ms": round(self.hedge_budget_ms(*key.split(":", 1)), 1)}
+                for key, window in windows.items()
+            },
+        }
+
+
+# Global TTS router instance
+_tts_router = None
+
+
+def get_tts_router() -> TTSRouter:
+    """Get the global TTS router instance"""
+    global _tts_router
+    if _tts_router is None:
+        _tts_router = TTSRouter()
+    return _tts_router
@@ -0,0 +1,233 @@
+"""
+Twilio Turns
+Non-blocking agent turns for Twilio <Gather> callbacks: the webhook submits the
+agent call to the shared agent runtime and answers at once with a <Redirect> to
+a polling endpoint, so web workers never wait on the LLM
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Coroutine, Tuple
+
+from convonet.agent_runtime import get_agent_runtime
+
+logger = logging.getLogger(__name__)
+
+# Optional Redis - lets a poll land on a different worker process than the webhook
+try:
+    from convonet.redis_manager import redis_manager
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis_manager = None
+    REDIS_AVAILABLE = False
+
+RESULT_TTL = 300
+RESET_TTL = 3600
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass
+class TurnOutcome:
+    """Finished agent turn, as seen by the polling endpoint"""
+    status: str  # "done", "timeout", "error" or "cancelled"
+    result: Any = None  # Agent result (str, or dict when include_metadata=True)
+    error: str = ""
+    processing_time: float = 0.0
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "processing_time": self.processing_time,
+        }, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "TurnOutcome":
+        data = json.loads(raw)
+        return cls(data["status"], data.get("result"), data.get("error", ""), data.get("processing_time", 0.0))
+
+
+class TwilioTurnManager:
+    """
+    Tracks agent turns submitted from Twilio webhooks until a poll collects them.
+
+    The agent runs on the shared agent runtime with a timeout of
+    TWILIO_TURN_TIMEOUT seconds. Its outcome is kept in process and mirrored to
+    Redis, so a poll served by another worker process still finds it. Thread
+    resets requested after a timeout or error are tracked here as well, instead
+    of on a function attribute.
+    """
+
+    def __init__(self):
+        self.turn_timeout = _env_float('TWILIO_TURN_TIMEOUT', 20.0)
+        self.poll_pause = max(1, int(_env_float('TWILIO_POLL_PAUSE_S', 1)))
+        self._outcomes: "OrderedDict[str, TurnOutcome]" = OrderedDict()
+        self._pending: Dict[str, float] = {}  # turn_id -> submitted_at
+        self._reset_users = set()
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.timed_out = 0
+        self.failed = 0
+        self.polls = 0
+        self.total_processing_ms = 0.0
+
+    def _redis(self):
+        if REDIS_AVAILABLE and redis_manager is not None and redis_manager.is_available():
+            return redis_manager
+        return None
+
+    def submit(self, coro: Coroutine, call_sid: str) -> str:
+        """
+        Schedule an agent coroutine for a Twilio turn
+
+        Args:
+            coro: Agent coroutine (e.g. _run_agent_async(...))
+            call_sid: Twilio CallSid, used as the runtime key so the call's turns can be cancelled together
+
+        Returns:
+            Turn id to poll with
+
+        Raises:
+            AgentRuntimeBusy: the agent runtime is at capacity
+        """
+        turn_id = uuid.uuid4().hex
+        submitted_at = time.time()
+        job = get_agent_runtime().submit(coro, timeout=self.turn_timeout, key=call_sid, request_id=turn_id)
+        with self._lock:
+            self._pending[turn_id] = submitted_at
+            self.submitted += 1
+        redis = self._redis()
+        if redis is not None:
+            redis.set(f"twilio_turn:{turn_id}:pending", str(submitted_at), expire=RESULT_TTL)
+        job.future.add_done_callback(lambda future: self._finish(turn_id, submitted_at, future))
+        return turn_id
+
+    def _finish(self, turn_id: str, submitted_at: float, future):
+        processing_time = time.time() - submitted_at
+        if future.cancelled():
+            outcome = TurnOutcome("cancelled", processing_time=processing_time)
+        elif isinstance(future.exception(), asyncio.TimeoutError):
+            outcome = TurnOutcome("timeout", processing_time=processing_time)
+        elif future.exception() is not None:
+            outcome = TurnOutcome("error", error=str(future.exception())[:200], processing_time=processing_time)
+        else:
+            outcome = TurnOutcome("done", result=future.result(), processing_time=processing_time)
+
+        with self._lock:
+            self._pending.pop(turn_id, None)
+            self._outcomes[turn_id] = outcome
+            while len(self._outcomes) > 256:
+                self._outcomes.popitem(last=False)
+            if outcome.status == "done":
+                self.completed += 1
+                self.total_processing_ms += processing_time * 1000
+            elif outcome.status == "timeout":
+                self.timed_out += 1
+            else:
+                self.failed += 1
+
+        redis = self._redis()
+        if redis is not None:
+            try:
+                redis.set(f"twilio_turn:{turn_id}", outcome.to_json(), expire=RESULT_TTL)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not publish Twilio turn {turn_id}: {e}")
+
+    def poll(self, turn_id: str) -> Tuple[str, Optional[TurnOutcome]]:
+        """
+        Check on a turn without blocking
+
+        Returns:
+            ("pending", None), ("finished", outcome) or ("unknown", None) once the
+            turn is gone or overdue (e.g. its worker process restarted)
+        """
+        with self._lock:
+            self.polls += 1
+            outcome = self._outcomes.pop(turn_id, None)
+            submitted_at = self._pending.get(turn_id)
+        if outcome is not None:
+            return "finished", outcome
+        if submitted_at is not None:
+            return "pending", None
+
+        redis = self._redis()
+        if redis is not None:
+            raw = redis.get(f"twilio_turn:{turn_id}")
+            if raw:
+                return "finished", TurnOutcome.from_json(raw)
+            started = redis.get(f"twilio_turn:{turn_id}:pending")
+            # A little grace past the runtime timeout for the outcome to be published
+            if started and time.time() - float(started) < self.turn_timeout + 5:
+                return "pending", None
+        return "unknown", None
+
+    def mark_thread_reset(self, user_id: Optional[str]):
+        """Start a fresh conversation thread on the user's next turn (after a timeout or error)"""
+        if not user_id:
+            return
+        with self._lock:
+            self._reset_users.add(user_id)
+        redis = self._redis()
+        if redis is not None:
+            redis.set(f"twilio_reset_thread:{user_id}", "1", expire=RESET_TTL)
+        print(f"🔄 Marked user {user_id} for thread reset")
+
+    def consume_thread_reset(self, user_id: Optional[str]) -> bool:
+        """Whether the user's thread should be reset now (clears the flag)"""
+        if not user_id:
+            return False
+        with self._lock:
+            reset = user_id in self._reset_users
+            self._reset_users.discard(user_id)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                # DEL reports whether the flag existed, so only one worker consumes it
+                reset = bool(redis.redis_client.delete(f"twilio_reset_thread:{user_id}")) or reset
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read thread reset flag for {user_id}: {e}")
+        return reset
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "turn_timeout": self.turn_timeout,
+                "poll_pause_s": self.poll_pause,
+                "pending": len(self._pending),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "timed_out": self.timed_out,
+                "failed": self.failed,
+                "polls": self.polls,
+                "avg_polls_per_turn": round(self.polls / self.submitted, 2) if self.submitted else None,
+                "avg_processing_ms": round(self.total_processing_ms / self.completed, 1) if self.completed else None,
+                "pending_resets": len(self._reset_users),
+            }
+
+
+# Global Twilio turn manager instance
+_twilio_turn_manager = None
+
+
+def get_twilio_turn_manager() -> TwilioTurnManager:
+    """Get the global Twilio turn manager instance"""
+    global _twilio_turn_manager
+    if _twilio_turn_manager is None:
+        _twilio_turn_manager = TwilioTurnManager()
+    return _twilio_turn_manager
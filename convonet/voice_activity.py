@@ -0,0 +1,214 @@
+"""
+Voice Activity Detection
+Energy-based VAD over streamed PCM16 audio: drops leading silence, detects the
+end of an utterance after a configurable hangover, and tells the caller when to
+start processing
+"""
+
+import os
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PCM_FORMAT = "pcm16"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
+@dataclass
+class VADResult:
+    """Outcome of feeding one chunk to the VAD"""
+    audio: bytes = b""  # Audio to forward to storage/STT (pre-roll + speech + hangover)
+    speech_started: bool = False
+    speech_ended: bool = False
+    no_speech: bool = False  # Gave up waiting for speech
+
+
+class EnergyVAD:
+    """
+    Energy VAD for one utterance of 16-bit mono PCM.
+
+    Chunks are cut into fixed frames whose energies (dBFS) are computed in one
+    vectorized pass. A frame is speech when it is louder than both an absolute
+    floor and the adaptive noise floor plus a margin. Speech starts after
+    ``start_ms`` of consecutive speech frames (with ``preroll_ms`` of audio
+    before it kept, so the first syllable is not clipped) and ends after
+    ``hangover_ms`` of continuous silence.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        hangover_ms: Optional[float] = None,
+        start_ms: Optional[float] = None,
+        preroll_ms: Optional[float] = None,
+        min_speech_db: Optional[float] = None,
+        noise_margin_db: Optional[float] = None,
+        no_speech_timeout_ms: Optional[float] = None,
+        max_utterance_ms: Optional[float] = None,
+    ):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = max(1, sample_rate * frame_ms // 1000)
+        self.frame_bytes = self.frame_samples * 2
+
+        hangover_ms = hangover_ms if hangover_ms is not None else _env_float('VAD_HANGOVER_MS', 700)
+        start_ms = start_ms if start_ms is not None else _env_float('VAD_START_MS', 60)
+        preroll_ms = preroll_ms if preroll_ms is not None else _env_float('VAD_PREROLL_MS', 300)
+        no_speech_timeout_ms = no_speech_timeout_ms if no_speech_timeout_ms is not None else _env_float('VAD_NO_SPEECH_TIMEOUT_MS', 8000)
+        max_utterance_ms = max_utterance_ms if max_utterance_ms is not None else _env_float('VAD_MAX_UTTERANCE_MS', 30000)
+
+        self.hangover_frames = max(1, int(hangover_ms // frame_ms))
+        self.start_frames = max(1, int(start_ms // frame_ms))
+        self.no_speech_frames = int(no_speech_timeout_ms // frame_ms)
+        self.max_utterance_frames = int(max_utterance_ms // frame_ms)
+        self.min_speech_db = min_speech_db if min_speech_db is not None else _env_float('VAD_MIN_SPEECH_DB', -45.0)
+        self.noise_margin_db = noise_margin_db if noise_margin_db is not None else _env_float('VAD_NOISE_MARGIN_DB', 12.0)
+
+        self.noise_floor_db = -60.0
+        self.state = "waiting"  # waiting -> speech -> ended
+        self._remainder = b""
+        self._preroll = deque(maxlen=max(self.start_frames, int(preroll_ms // frame_ms)))
+        self._speech_run = 0
+        self._silence_run = 0
+        self._frames_seen = 0
+        self._speech_frames_total = 0
+        self._utterance_frames = 0
+
+    def frame_energies_db(self, pcm: bytes) -> np.ndarray:
+        """dBFS of each whole frame in pcm (vectorized)"""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        n_frames = len(samples) // self.frame_samples
+        if n_frames == 0:
+            return np.empty(0, dtype=np.float32)
+        frames = samples[:n_frames * self.frame_samples].reshape(n_frames, self.frame_samples).astype(np.float32)
+        power = np.mean(frames * frames, axis=1) / (32768.0 * 32768.0)
+        return 10.0 * np.log10(power + 1e-10)
+
+    def _update_noise_floor(self, energies: np.ndarray, is_speech: np.ndarray):
+        quiet = energies[~is_speech]
+        if quiet.size:
+            # Slow EMA over quiet frames, so a noisy room raises the speech threshold
+            self.noise_floor_db = 0.9 * self.noise_floor_db + 0.1 * float(np.mean(quiet))
+
+    def process(self, chunk: bytes) -> VADResult:
+        """Feed a PCM16 chunk (bytes-like); returns the audio to forward and any state change"""
+        result = VADResult()
+        if self.state == "ended":
+            return result
+
+        # Without a partial frame left over, frames are sliced straight from the caller's buffer
+        pcm = self._remainder + bytes(chunk) if self._remainder else memoryview(chunk)
+        whole = len(pcm) - len(pcm) % self.frame_bytes
+        self._remainder = bytes(pcm[whole:])
+        energies = self.frame_energies_db(pcm[:whole])
+        if energies.size == 0:
+            return result
+
+        threshold = max(self.min_speech_db, self.noise_floor_db + self.noise_margin_db)
+        is_speech = energies > threshold
+        forwarded = []
+
+        for i, speech in enumerate(is_speech):
+            frame = pcm[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            self._frames_seen += 1
+
+            if self.state == "waiting":
+                self._preroll.append(frame)
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= self.start_frames:
+                    self.state = "speech"
+                    result.speech_started = True
+                    forwarded.extend(self._preroll)
+                    self._utterance_frames = len(self._preroll)
+                    self._preroll.clear()
+                    self._silence_run = 0
+                elif self.no_speech_frames and self._frames_seen >= self.no_speech_frames:
+                    self.state = "ended"
+                    result.no_speech = True
+                    break
+                continue
+
+            # In speech: forward everything, including the trailing hangover silence
+            forwarded.append(frame)
+            self._utterance_frames += 1
+            if speech:
+                self._speech_frames_total += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+            if self._silence_run >= self.hangover_frames or (
+                self.max_utterance_frames and self._utterance_frames >= self.max_utterance_frames
+            ):
+                self.state = "ended"
+                result.speech_ended = True
+                break
+
+        if self.state == "waiting":
+            self._update_noise_floor(energies, is_speech)
+        result.audio = b"".join(forwarded)
+        return result
+
+    @property
+    def speech_detected(self) -> bool:
+        """Whether speech started at some point in this utterance"""
+        return self.state == "speech" or (self.state == "ended" and self._speech_frames_total > 0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "sample_rate": self.sample_rate,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+            "frames_seen": self._frames_seen,
+            "speech_ms": self._speech_frames_total * self.frame_ms,
+            "utterance_ms": self._utterance_frames * self.frame_ms,
+        }
+
+
+class VADManager:
+    """Per-session VAD state for sessions streaming raw PCM"""
+
+    def __init__(self):
+        self.enabled = os.getenv('SERVER_VAD', 'true').lower() == 'true'
+        self._sessions: Dict[str, EnergyVAD] = {}
+        self._lock = threading.Lock()
+
+    def start(self, session_id: str, sample_rate: int = 16000) -> Optional[EnergyVAD]:
+        """Start a fresh VAD for the session's next utterance (None when VAD is disabled)"""
+        if not self.enabled:
+            return None
+        vad = EnergyVAD(sample_rate=sample_rate)
+        with self._lock:
+            self._sessions[session_id] = vad
+        return vad
+
+    def get(self, session_id: str) -> Optional[EnergyVAD]:
+        return self._sessions.get(session_id)
+
+    def stop(self, session_id: str) -> Optional[EnergyVAD]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+
+# Global VAD manager instance
+_vad_manager = None
+
+
+def get_vad_manager() -> VADManager:
+    """Get the global VAD manager instance"""
+    global _vad_manager
+    if _vad_manager is None:
+        _vad_manager = VADManager()
+    return _vad_manager
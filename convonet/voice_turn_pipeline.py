@@ -0,0 +1,246 @@
+"""
+Voice Turn Pipeline
+Per-stage timing for a voice turn, a shared executor for the preparation
+stages (voice preferences, agent warm-up, TTS connection warm-up) that run
+concurrently with transcription, and per-session cancellation tokens for barge-in
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_prep_executor: Optional[ThreadPoolExecutor] = None
+_prep_executor_lock = threading.Lock()
+
+
+def get_prep_executor() -> ThreadPoolExecutor:
+    """Shared thread pool for turn preparation stages"""
+    global _prep_executor
+    if _prep_executor is None:
+        with _prep_executor_lock:
+            if _prep_executor is None:
+                workers = int(os.getenv('VOICE_TURN_PREP_WORKERS', '8'))
+                _prep_executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="voice-turn-prep")
+    return _prep_executor
+
+
+class TurnTimeline:
+    """
+    Timing record for one voice turn.
+
+    Stages are timed relative to the start of the turn, so overlapping stages
+    (e.g. STT alongside voice preference loading) show up as overlapping
+    intervals; marks record single points such as the first streamed audio chunk.
+    """
+
+    def __init__(self, session_id: Optional[str] = None, user_id: Optional[str] = None):
+        self.turn_id = str(uuid.uuid4())
+        self.session_id = session_id
+        self.user_id = user_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._marks: Dict[str, float] = {}
+        self._open: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.total_ms: Optional[float] = None
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def _record(self, name: str, start_ms: float, ok: bool, error: Optional[str] = None, parallel: bool = False):
+        end_ms = self._now_ms()
+        with self._lock:
+            self._stages[name] = {
+                "start_ms": round(start_ms, 1),
+                "end_ms": round(end_ms, 1),
+                "duration_ms": round(end_ms - start_ms, 1),
+                "ok": ok,
+                "parallel": parallel,
+            }
+            if error:
+                self._stages[name]["error"] = error[:200]
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a stage on the turn's critical path"""
+        start_ms = self._now_ms()
+        try:
+            yield
+        except BaseException as e:
+            self._record(name, start_ms, ok=False, error=str(e))
+            raise
+        self._record(name, start_ms, ok=True)
+
+    def start(self, name: str):
+        """Open a stage whose end is not lexically scoped (closed by end() or finish())"""
+        with self._lock:
+            self._open[name] = self._now_ms()
+
+    def end(self, name: str, ok: bool = True, error: Optional[str] = None):
+        with self._lock:
+            start_ms = self._open.pop(name, None)
+        if start_ms is not None:
+            self._record(name, start_ms, ok=ok, error=error)
+
+    def run_parallel(self, name: str, fn: Callable, *args, **kwargs) -> Future:
+        """Start fn on the preparation executor as a timed background stage"""
+        start_ms = self._now_ms()
+
+        def timed():
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._record(name, start_ms, ok=False, error=str(e), parallel=True)
+                raise
+            self._record(name, start_ms, ok=True, parallel=True)
+            return result
+
+        return get_prep_executor().submit(timed)
+
+    def mark(self, name: str):
+        """Record a point in time (first occurrence wins)"""
+        with self._lock:
+            self._marks.setdefault(name, round(self._now_ms(), 1))
+
+    def has_stage(self, name: str) -> bool:
+        with self._lock:
+            return name in self._stages
+
+    def finish(self) -> Dict[str, Any]:
+        """Close the turn and return its timing breakdown"""
+        for name in list(self._open):
+            self.end(name, ok=False, error="turn ended before stage completed")
+        if self.total_ms is None:
+            self.total_ms = round(self._now_ms(), 1)
+        return self.to_dict()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = dict(sorted(self._stages.items(), key=lambda item: item[1]["start_ms"]))
+            marks = dict(self._marks)
+        return {
+            "turn_id": self.turn_id,
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "timestamp": self.started_at,
+            "total_ms": self.total_ms if self.total_ms is not None else round(self._now_ms(), 1),
+            "stages": stages,
+            "marks": marks,
+        }
+
+
+class TurnCancelled(Exception):
+    """Raised by TurnToken.check() once the turn has been superseded or interrupted"""
+
+
+class TurnToken:
+    """
+    Cancellation token for one voice turn.
+
+    Work belonging to the turn (the agent job, the TTS pipeline) registers a
+    cancel callback; emits check ``cancelled`` so nothing from a superseded
+    turn reaches the client.
+    """
+
+    def __init__(self, session_id: str, turn_id: Optional[str] = None):
+        self.session_id = session_id
+        self.turn_id = turn_id or str(uuid.uuid4())
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def on_cancel(self, fn: Callable[[], Any]):
+        """Register a callback to run on cancellation (runs now if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(fn)
+                return
+        self._run_callback(fn)
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the turn; returns False if it was already cancelled"""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            self._run_callback(fn)
+        return True
+
+    def check(self):
+        if self._event.is_set():
+            raise TurnCancelled(f"Turn {self.turn_id} cancelled: {self.reason}")
+
+    def _run_callback(self, fn: Callable[[], Any]):
+        try:
+            fn()
+        except Exception as e:
+            logger.error(f"❌ Turn {self.turn_id}: cancel callback failed: {e}")
+
+
+class TurnRegistry:
+    """Tracks the current turn per session so a new one (barge-in) can cancel the old"""
+
+    def __init__(self):
+        self._turns: Dict[str, TurnToken] = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.cancelled = 0
+
+    def begin(self, session_id: str, turn_id: Optional[str] = None) -> TurnToken:
+        """Register a new turn for the session, cancelling any turn still in flight"""
+        token = TurnToken(session_id, turn_id)
+        with self._lock:
+            previous = self._turns.get(session_id)
+            self._turns[session_id] = token
+            self.started += 1
+        if previous is not None and previous.cancel("superseded"):
+            self.cancelled += 1
+        return token
+
+    def cancel(self, session_id: str, reason: str = "interrupted") -> Optional[TurnToken]:
+        """Cancel the session's in-flight turn; returns it, or None if nothing was running"""
+        with self._lock:
+            token = self._turns.pop(session_id, None)
+        if token is not None and token.cancel(reason):
+            self.cancelled += 1
+            logger.info(f"🛑 Cancelled turn {token.turn_id} for {session_id} ({reason})")
+            return token
+        return None
+
+    def end(self, token: TurnToken):
+        """Forget a finished turn (no-op if a newer turn has replaced it)"""
+        with self._lock:
+            if self._turns.get(token.session_id) is token:
+                del self._turns[token.session_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._turns), "started": self.started, "cancelled": self.cancelled}
+
+
+# Global turn registry instance
+_turn_registry: Optional[TurnRegistry] = None
+
+
+def get_turn_registry() -> TurnRegistry:
+    """Get the global turn registry instance"""
+    global _turn_registry
+    if _turn_registry is None:
+        _turn_registry = TurnRegistry()
+    return _turn_registry
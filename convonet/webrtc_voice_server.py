@@ -9,6 +9,7 @@ import os
 import base64
 import time
 import re
+from concurrent.futures import CancelledError
 from uuid import UUID
 from urllib.parse import quote
 from flask import Blueprint, render_template, request, jsonify
@@ -31,6 +32,14 @@ from twilio.rest import Client
 from deepgram_webrtc_integration import transcribe_audio_with_deepgram_webrtc, get_deepgram_webrtc_info
 from deepgram_service import get_deepgram_service
 
+# Deepgram live (WebSocket) transcription - optional, falls back to batch STT
+try:
+    from convonet.deepgram_streaming import get_streaming_stt_manager
+    STREAMING_STT_AVAILABLE = True
+except ImportError as e:
+    print(f"⚠️ Deepgram streaming STT not available: {e}")
+    STREAMING_STT_AVAILABLE = False
+
 # ElevenLabs integration
 try:
     from convonet.elevenlabs_service import get_elevenlabs_service, EmotionType
@@ -73,6 +82,36 @@ except ImportError as e:
     def delete_session(*args, **kwargs):
         return False
 
+# Raw per-session audio buffers (Redis APPEND, in-memory fallback)
+from convonet.audio_buffer_store import get_audio_buffer_store
+from convonet.tts_pipeline import StreamingTTSPipeline
+from convonet.agent_runtime import get_agent_runtime, AgentRuntimeBusy
+from convonet.voice_turn_pipeline import TurnTimeline, get_turn_registry
+from convonet.voice_activity import get_vad_manager, PCM_FORMAT
+from convonet.tts_cache import get_tts_cache
+from convonet.tts_router import get_tts_router
+
+# Sentence-chunked streaming TTS (agent_audio_chunk events); set STREAMING_TTS=false for single-shot TTS
+STREAMING_TTS_ENABLED = os.getenv('STREAMING_TTS', 'true').lower() == 'true'
+# Forward provider audio chunks as they arrive instead of whole sentences (STREAMING_TTS_CHUNKS=false to disable)
+STREAMING_TTS_CHUNKS = os.getenv('STREAMING_TTS_CHUNKS', 'true').lower() == 'true'
+
+# Fixed spoken replies - synthesized at startup so they are served from the TTS cache
+DEEPGRAM_TTS_VOICE = "aura-asteria-en"
+AGENT_TIMEOUT_REPLY = "I'm sorry, I'm taking too long to process that request. Please try a simpler request or try again."
+AGENT_BUSY_REPLY = "I'm handling a lot of requests right now. Please say that again in a moment."
+AGENT_ERROR_REPLY = "I'm sorry, I encountered an error. Please try again."
+TRANSFER_DECLINED_REPLY = "Let me know how else I can help."
+DEFAULT_TRANSFER_EXTENSION = '2001'
+DEFAULT_TRANSFER_DEPARTMENT = 'support'
+STATIC_TTS_PROMPTS = [
+    AGENT_TIMEOUT_REPLY,
+    AGENT_BUSY_REPLY,
+    AGENT_ERROR_REPLY,
+    TRANSFER_DECLINED_REPLY,
+    f"I'm transferring you to {DEFAULT_TRANSFER_DEPARTMENT}. Extension {DEFAULT_TRANSFER_EXTENSION}.",
+]
+
 # Optional test PIN support (disabled by default unless explicitly enabled)
 ENABLE_TEST_PIN = os.getenv('ENABLE_TEST_PIN', 'false').lower() == 'true'
 TEST_VOICE_PIN = os.getenv('TEST_VOICE_PIN', '1234')
@@ -92,6 +131,23 @@ def get_deepgram_tts_service():
 # Active sessions storage (fallback for when Redis is unavailable)
 active_sessions = {}
 
+# Sessions whose client takes audio as binary attachments (declared with authenticate)
+binary_audio_sessions = set()
+
+
+def decode_audio_chunk(audio) -> memoryview:
+    """Incoming audio as a zero-copy view: binary attachments as-is, base64 strings (older clients) decoded"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return memoryview(audio)
+    return memoryview(base64.b64decode(audio))
+
+
+def encode_audio_payload(session_id: str, audio_bytes: bytes):
+    """Outgoing audio field: raw bytes (sent as a binary attachment) for binary clients, else base64"""
+    if session_id in binary_audio_sessions:
+        return audio_bytes
+    return base64.b64encode(audio_bytes).decode('utf-8')
+
 # Global references for background tasks
 socketio = None
 flask_app = None
@@ -115,10 +171,12 @@ def build_customer_profile_from_session(session_data: dict | None) -> dict | Non
     user_id = session_data.get('user_id')
     if user_id:
         try:
-            from convonet.mcps.local_servers.db_todo import SessionLocal, _init_database
+            from convonet.mcps.local_servers.db_todo import get_session_factory
             from convonet.models.user_models import User as UserModel
             
-            _init_database()
+            SessionLocal = get_session_factory()
+            if SessionLocal is None:
+                raise Exception("Database not initialized - DB_URI not configured")
             with SessionLocal() as db_session:
                 user = db_session.query(UserModel).filter(UserModel.id == UUID(user_id)).first()
                 if user:
@@ -334,23 +392,10 @@ def debug_session(session_id):
                     else:
                         debug_data[key] = str(value)
                 
-                # Add audio buffer info
-                audio_buffer = session_data.get('audio_buffer', '')
-                debug_data['audio_buffer_length'] = len(audio_buffer)
-                debug_data['audio_buffer_preview'] = audio_buffer[:100] + "..." if len(audio_buffer) > 100 else audio_buffer
-                
-                # Test base64 decoding
-                try:
-                    if audio_buffer:
-                        decoded = base64.b64decode(audio_buffer)
-                        debug_data['decoded_audio_length'] = len(decoded)
-                        debug_data['base64_valid'] = True
-                    else:
-                        debug_data['decoded_audio_length'] = 0
-                        debug_data['base64_valid'] = True
-                except Exception as e:
-                    debug_data['base64_valid'] = False
-                    debug_data['base64_error'] = str(e)
+                # Add audio buffer info (raw bytes, stored outside the session hash)
+                audio_info = get_audio_buffer_store().info(session_id)
+                debug_data['audio_buffer_length'] = audio_info['length']
+                debug_data['audio_buffer_info'] = audio_info
                 
                 return jsonify({
                     'success': True,
@@ -373,7 +418,7 @@ def debug_session(session_id):
                     'user_id': session_data.get('user_id'),
                     'user_name': session_data.get('user_name'),
                     'is_recording': session_data.get('is_recording', False),
-                    'audio_buffer_length': len(session_data.get('audio_buffer', b'')),
+                    'audio_buffer_length': get_audio_buffer_store().length(session_id),
                     'storage': 'memory'
                 }
                 return jsonify({
@@ -400,6 +445,7 @@ def debug_session(session_id):
 def clear_session(session_id):
     """Clear Redis session data for testing"""
     try:
+        get_audio_buffer_store().clear(session_id)
         if redis_manager.is_available():
             # Clear the session
             delete_session(session_id)
@@ -428,6 +474,22 @@ def clear_session(session_id):
         })
 
 
+def prewarm_tts_cache():
+    """Synthesize STATIC_TTS_PROMPTS into the TTS cache (TTS_CACHE_PREWARM=false to skip)"""
+    if os.getenv('TTS_CACHE_PREWARM', 'true').lower() != 'true' or not get_tts_cache().enabled:
+        return
+    deepgram_tts = get_deepgram_tts_service()
+    warmed = 0
+    for prompt in STATIC_TTS_PROMPTS:
+        try:
+            # synthesize_speech stores the audio under the same key live turns look up
+            if deepgram_tts.synthesize_speech(prompt, voice=DEEPGRAM_TTS_VOICE):
+                warmed += 1
+        except Exception as e:
+            print(f"⚠️ TTS cache prewarm failed for '{prompt[:40]}': {e}", flush=True)
+    print(f"🔥 TTS cache prewarmed: {warmed}/{len(STATIC_TTS_PROMPTS)} static prompts", flush=True)
+
+
 def init_socketio(socketio_instance: SocketIO, app):
     """Initialize Socket.IO event handlers"""
     
@@ -435,6 +497,7 @@ def init_socketio(socketio_instance: SocketIO, app):
     global socketio, flask_app
     socketio = socketio_instance
     flask_app = app  # Store Flask app directly (passed as parameter)
+    socketio.start_background_task(prewarm_tts_cache)
     
     @socketio.on('connect', namespace='/voice')
     def handle_connect():
@@ -450,7 +513,6 @@ def init_socketio(socketio_instance: SocketIO, app):
             'authenticated': 'False',
             'user_id': '',
             'user_name': '',
-            'audio_buffer': '',
             'is_recording': 'False',
             'connected_at': str(time.time())
         }
@@ -470,7 +532,6 @@ def init_socketio(socketio_instance: SocketIO, app):
                     'authenticated': False,
                     'user_id': None,
                     'user_name': None,
-                    'audio_buffer': b'',
                     'is_recording': False
                 }
                 print(f"⚠️ Using in-memory storage (Redis unavailable): {session_id}")
@@ -483,7 +544,6 @@ def init_socketio(socketio_instance: SocketIO, app):
                 'authenticated': False,
                 'user_id': None,
                 'user_name': None,
-                'audio_buffer': b'',
                 'is_recording': False
             }
         
@@ -499,6 +559,14 @@ def init_socketio(socketio_instance: SocketIO, app):
         # Capture disconnection event in Sentry
         sentry_capture_voice_event("client_disconnected", session_id)
         set_transfer_flag(session_id, False)
+        binary_audio_sessions.discard(session_id)
+        get_audio_buffer_store().clear(session_id)
+        if STREAMING_STT_AVAILABLE:
+            get_streaming_stt_manager().close(session_id)
+        get_vad_manager().stop(session_id)
+        # Stop any agent turn still running for this client
+        get_turn_registry().cancel(session_id, reason="disconnected")
+        get_agent_runtime().cancel_key(session_id)
         
         try:
             if redis_manager.is_available():
@@ -525,6 +593,12 @@ def init_socketio(socketio_instance: SocketIO, app):
         session_id = request.sid
         pin = data.get('pin', '')
         
+        # Clients that can handle binary attachments get raw audio bytes instead of base64
+        if data.get('binary_audio'):
+            binary_audio_sessions.add(session_id)
+        else:
+            binary_audio_sessions.discard(session_id)
+        
         print(f"🔐 Authentication request for session {session_id}: PIN={pin}")
         
         # Capture authentication attempt in Sentry
@@ -589,10 +663,12 @@ def init_socketio(socketio_instance: SocketIO, app):
                 return
             
             # Import here to avoid circular imports
-            from convonet.mcps.local_servers.db_todo import _init_database, SessionLocal
+            from convonet.mcps.local_servers.db_todo import get_session_factory
             from convonet.models.user_models import User as UserModel
             
-            _init_database()
+            SessionLocal = get_session_factory()
+            if SessionLocal is None:
+                raise Exception("Database not initialized - DB_URI not configured")
             
             with SessionLocal() as db_session:
                 user = db_session.query(UserModel).filter(
@@ -675,9 +751,10 @@ def init_socketio(socketio_instance: SocketIO, app):
     
     
     @socketio.on('start_recording', namespace='/voice')
-    def handle_start_recording():
-        """Start audio recording"""
+    def handle_start_recording(data=None):
+        """Start audio recording (data may declare raw PCM: {'format': 'pcm16', 'sample_rate': 16000})"""
         session_id = request.sid
+        data = data or {}
         
         # Get session data
         session_data = None
@@ -700,25 +777,65 @@ def init_socketio(socketio_instance: SocketIO, app):
         
         print(f"🎤 Recording started: {session_id}")
         
-        # Update recording state and clear audio buffer
+        # Barge-in: the user speaking again cancels the previous turn's agent run, TTS and emits
+        interrupt_turn(session_id, reason="barge_in")
+        
+        # Raw PCM clients get server-side VAD (auto end-of-utterance); WebM clients stop explicitly
+        sample_rate = None
+        if data.get('format') == PCM_FORMAT:
+            try:
+                sample_rate = int(data.get('sample_rate') or 16000)
+            except (TypeError, ValueError):
+                sample_rate = 16000
+        if sample_rate:
+            vad = get_vad_manager().start(session_id, sample_rate)
+        else:
+            get_vad_manager().stop(session_id)
+            vad = None
+        
+        # Clear the audio buffer and update recording state
+        get_audio_buffer_store().clear(session_id)
         if redis_manager.is_available():
-            # Clear the audio buffer completely
-            redis_client = redis_manager.redis_client
-            if redis_client:
-                redis_client.hset(f"session:{session_id}", "audio_buffer", "")
-                redis_client.hset(f"session:{session_id}", "is_recording", "True")
-                print(f"🔍 Debug: cleared Redis audio buffer for session: {session_id}")
-            else:
-                update_session(session_id, {
-                    'is_recording': 'True',
-                    'audio_buffer': ''  # Start with empty string for base64 concatenation
-                })
+            update_session(session_id, {'is_recording': 'True', 'audio_sample_rate': str(sample_rate or '')})
         else:
             active_sessions[session_id]['is_recording'] = True
-            active_sessions[session_id]['audio_buffer'] = b''  # Start with empty bytes for binary concatenation
-            print(f"🔍 Debug: cleared in-memory audio buffer for session: {session_id}")
+            active_sessions[session_id]['audio_sample_rate'] = str(sample_rate or '')
+        print(f"🔍 Debug: cleared audio buffer for session: {session_id}")
+        
+        # Attach a live Deepgram stream so transcripts arrive while the user is speaking
+        streaming = False
+        if STREAMING_STT_AVAILABLE:
+            def on_transcript(text, is_final):
+                socketio.emit('interim_transcription', {
+                    'text': text,
+                    'is_final': is_final
+                }, namespace='/voice', room=session_id)
+            
+            try:
+                streaming = get_streaming_stt_manager().start_utterance(session_id, on_transcript, sample_rate=sample_rate)
+            except Exception as e:
+                print(f"⚠️ Deepgram streaming STT unavailable, using batch transcription: {e}")
         
-        emit('recording_started', {'success': True})
+        emit('recording_started', {'success': True, 'streaming_stt': streaming, 'server_vad': vad is not None})
+    
+    
+    @socketio.on('interrupt', namespace='/voice')
+    def handle_interrupt(data=None):
+        """Cancel the in-flight turn (e.g. the user tapped to stop the assistant talking)"""
+        session_id = request.sid
+        if not interrupt_turn(session_id, reason=(data or {}).get('reason') or "interrupt"):
+            emit('interrupted', {'turn_id': None, 'reason': 'idle'})
+    
+    
+    def interrupt_turn(session_id, reason="interrupt"):
+        """Cancel the session's in-flight turn and tell the client to stop playback"""
+        turn = get_turn_registry().cancel(session_id, reason=reason)
+        if turn is None:
+            return False
+        print(f"🛑 Barge-in: cancelled turn {turn.turn_id} for {session_id} ({reason})", flush=True)
+        sentry_capture_voice_event("turn_interrupted", session_id, details={"turn_id": turn.turn_id, "reason": reason})
+        emit('interrupted', {'turn_id': turn.turn_id, 'reason': reason})
+        return True
     
     
     @socketio.on('audio_data', namespace='/voice')
@@ -745,95 +862,44 @@ def init_socketio(socketio_instance: SocketIO, app):
             sentry_capture_voice_event("audio_received_not_recording", session_id, details={"is_recording": is_recording})
             return
         
-        # Append audio chunk to buffer
-        audio_chunk = base64.b64decode(data['audio'])
-        print(f"🔍 Debug: received audio chunk: {len(audio_chunk)} bytes")
+        # Append raw audio chunk to the session buffer (O(chunk), no copies for binary frames)
+        audio_chunk = decode_audio_chunk(data['audio'])
+        
+        # Server-side VAD: silence before speech never reaches storage or STT
+        vad_result = None
+        vad = get_vad_manager().get(session_id)
+        if vad is not None:
+            vad_result = vad.process(audio_chunk)
+            audio_chunk = vad_result.audio
+            if vad_result.speech_started:
+                emit('vad_speech_start', {'noise_floor_db': round(vad.noise_floor_db, 1)})
         
         try:
-            if redis_manager.is_available():
-                # For Redis, we need to handle binary data differently
-                # Store as base64 string in Redis
-                current_buffer = session_data.get('audio_buffer', '')
-                
-                # Decode current buffer to binary, append new chunk, then re-encode
-                if current_buffer:
-                    try:
-                        # Decode current buffer to binary
-                        current_binary = base64.b64decode(current_buffer)
-                        print(f"🔍 Debug: current buffer decoded to binary, length: {len(current_binary)} bytes")
-                        
-                        # Append new chunk to binary data
-                        combined_binary = current_binary + audio_chunk
-                        print(f"🔍 Debug: combined binary length: {len(combined_binary)} bytes")
-                        
-                        # Re-encode to base64
-                        updated_buffer = base64.b64encode(combined_binary).decode('utf-8')
-                        print(f"🔍 Debug: re-encoded to base64, length: {len(updated_buffer)} chars")
-                        
-                    except Exception as e:
-                        print(f"⚠️ Error processing current buffer, using only new chunk: {e}")
-                        # If current buffer is corrupted, use only new chunk
-                        updated_buffer = base64.b64encode(audio_chunk).decode('utf-8')
-                        print(f"🔍 Debug: using only new chunk, base64 length: {len(updated_buffer)} chars")
-                else:
-                    # No current buffer, just encode new chunk
-                    updated_buffer = base64.b64encode(audio_chunk).decode('utf-8')
-                    print(f"🔍 Debug: new chunk encoded to base64, length: {len(updated_buffer)} chars")
-                
-                # Validate the final buffer
-                try:
-                    test_decode = base64.b64decode(updated_buffer)
-                    print(f"🔍 Debug: final buffer validation - decoded length: {len(test_decode)} bytes")
-                except Exception as e:
-                    print(f"❌ Final buffer validation failed: {e}")
-                    # This should not happen, but if it does, use only new chunk
-                    updated_buffer = base64.b64encode(audio_chunk).decode('utf-8')
-                    print(f"🔍 Debug: fallback to new chunk only, length: {len(updated_buffer)} chars")
-                
-                # Use Redis append operation for better performance
-                try:
-                    # Get the Redis client directly for append operation
-                    redis_client = redis_manager.redis_client
-                    if redis_client:
-                        # Use Redis HSET to update the audio buffer
-                        redis_client.hset(f"session:{session_id}", "audio_buffer", updated_buffer)
-                        print(f"🔍 Debug: updated Redis audio buffer: {len(updated_buffer)} chars")
-                        sentry_capture_redis_operation("update_audio_buffer", session_id, True)
-                    else:
-                        # Fallback to update_session method
-                        success = update_session(session_id, {'audio_buffer': updated_buffer})
-                        if success:
-                            print(f"🔍 Debug: updated Redis audio buffer (fallback): {len(updated_buffer)} chars")
-                            sentry_capture_redis_operation("update_audio_buffer", session_id, True)
-                        else:
-                            print(f"❌ Failed to update Redis audio buffer")
-                            sentry_capture_redis_operation("update_audio_buffer", session_id, False, "Redis update_session returned False")
-                except Exception as redis_error:
-                    print(f"❌ Redis direct operation failed: {redis_error}")
-                    # Fallback to update_session method
-                    success = update_session(session_id, {'audio_buffer': updated_buffer})
-                    if success:
-                        print(f"🔍 Debug: updated Redis audio buffer (error fallback): {len(updated_buffer)} chars")
-                        sentry_capture_redis_operation("update_audio_buffer", session_id, True)
-                    else:
-                        print(f"❌ Failed to update Redis audio buffer (error fallback)")
-                        sentry_capture_redis_operation("update_audio_buffer", session_id, False, f"Redis error: {redis_error}")
-            else:
-                # In-memory storage
-                active_sessions[session_id]['audio_buffer'] += audio_chunk
-                print(f"🔍 Debug: updated in-memory audio buffer: {len(active_sessions[session_id]['audio_buffer'])} bytes")
-                sentry_capture_voice_event("audio_buffer_updated", session_id, details={"storage": "memory", "buffer_size": len(active_sessions[session_id]['audio_buffer'])})
+            if audio_chunk:
+                buffer_length = get_audio_buffer_store().append(session_id, audio_chunk)
+                print(f"🔍 Debug: appended audio chunk: {len(audio_chunk)} bytes (buffer: {buffer_length} bytes)")
+                if STREAMING_STT_AVAILABLE:
+                    get_streaming_stt_manager().send_audio(session_id, audio_chunk)
         except Exception as e:
             print(f"❌ Error updating audio buffer: {e}")
             sentry_capture_redis_operation("update_audio_buffer", session_id, False, str(e))
             if SENTRY_AVAILABLE:
                 sentry_sdk.capture_exception(e)
+        
+        if vad_result is not None and (vad_result.speech_ended or vad_result.no_speech):
+            stats = vad.get_stats()
+            print(f"🔇 VAD end of utterance for {session_id}: {stats}")
+            sentry_capture_voice_event("vad_end_of_utterance", session_id, details=stats)
+            emit('vad_speech_end', {'speech_detected': vad_result.speech_ended, **stats})
+            # Process right away instead of waiting for the user to release the button
+            handle_stop_recording({'reason': 'vad'})
     
     
     @socketio.on('stop_recording', namespace='/voice')
     def handle_stop_recording(data=None):
         """Stop recording and process audio"""
         session_id = request.sid
+        vad = get_vad_manager().stop(session_id)
         
         # Capture stop recording event in Sentry
         sentry_capture_voice_event("stop_recording", session_id)
@@ -862,6 +928,23 @@ def init_socketio(socketio_instance: SocketIO, app):
         
         print(f"🛑 Recording stopped: {session_id}")
         
+        if vad is not None and not vad.speech_detected:
+            # VAD never heard speech - nothing was buffered, so skip STT entirely
+            try:
+                if redis_manager.is_available():
+                    update_session(session_id, {'is_recording': 'False'})
+                else:
+                    session_data['is_recording'] = False
+            except Exception as e:
+                print(f"❌ Error updating recording state: {e}")
+            if STREAMING_STT_AVAILABLE:
+                get_streaming_stt_manager().finish_utterance(session_id, timeout=0.5)
+            emit('transcription', {
+                'success': False,
+                'message': 'No speech detected. Please speak clearly into your microphone.'
+            })
+            return
+        
         # Update recording state
         try:
             if redis_manager.is_available():
@@ -883,29 +966,9 @@ def init_socketio(socketio_instance: SocketIO, app):
         # Check if audio data is provided directly from client
         if data and 'audio' in data:
             try:
-                # Preserve base64 for Redis audio player, and decode for processing
-                audio_buffer_b64_from_client = data['audio']
-                audio_buffer = base64.b64decode(audio_buffer_b64_from_client)
+                audio_buffer = bytes(decode_audio_chunk(data['audio']))
                 print(f"🎵 Received complete WebM blob from client: {len(audio_buffer)} bytes")
                 sentry_capture_voice_event("audio_blob_received", session_id, details={"buffer_size": len(audio_buffer), "source": "client"})
-
-                # Store the complete base64 blob into Redis/in-memory for the audio player tool
-                try:
-                    if redis_manager.is_available():
-                        stored = update_session(session_id, {'audio_buffer': audio_buffer_b64_from_client})
-                        if stored:
-                            print(f"💾 Stored complete audio blob in Redis for session {session_id}: {len(audio_buffer_b64_from_client)} chars")
-                            sentry_capture_redis_operation("store_audio_blob_on_stop", session_id, True)
-                        else:
-                            print("⚠️ Redis update_session returned False while storing audio blob")
-                            sentry_capture_redis_operation("store_audio_blob_on_stop", session_id, False, "update_session returned False")
-                    else:
-                        session_data['audio_buffer'] = audio_buffer_b64_from_client
-                        print(f"💾 Stored complete audio blob in memory for session {session_id}: {len(audio_buffer_b64_from_client)} chars")
-                        sentry_capture_voice_event("audio_blob_stored_memory", session_id, details={"length": len(audio_buffer_b64_from_client)})
-                except Exception as store_err:
-                    print(f"⚠️ Failed to store audio blob for audio player: {store_err}")
-                    sentry_capture_redis_operation("store_audio_blob_on_stop", session_id, False, str(store_err))
             except Exception as decode_error:
                 print(f"❌ Error decoding client audio blob: {decode_error}")
                 sentry_capture_voice_event("audio_decode_error", session_id, details={"error": str(decode_error), "source": "client"})
@@ -914,27 +977,29 @@ def init_socketio(socketio_instance: SocketIO, app):
                     'message': 'Error decoding audio data.'
                 })
                 return
+            
+            # Store the complete blob as raw bytes for the audio player tool
+            try:
+                get_audio_buffer_store().set(session_id, audio_buffer)
+                print(f"💾 Stored complete audio blob for session {session_id}: {len(audio_buffer)} bytes")
+                sentry_capture_redis_operation("store_audio_blob_on_stop", session_id, True)
+            except Exception as store_err:
+                print(f"⚠️ Failed to store audio blob for audio player: {store_err}")
+                sentry_capture_redis_operation("store_audio_blob_on_stop", session_id, False, str(store_err))
         else:
-            # Fallback to session buffer (legacy)
+            # Fallback to the streamed session buffer (legacy clients)
             try:
-                if redis_manager.is_available():
-                    audio_buffer_b64 = session_data.get('audio_buffer', '')
-                    if not audio_buffer_b64:
-                        print("❌ No audio data in Redis session")
-                        sentry_capture_voice_event("no_audio_data", session_id, details={"storage": "redis"})
-                        emit('transcription', {
-                            'success': False,
-                            'message': 'No audio data received.'
-                        })
-                        return
-                    
-                    audio_buffer = base64.b64decode(audio_buffer_b64)
-                    print(f"🔍 Debug: decoded session audio_buffer length: {len(audio_buffer)}")
-                    sentry_capture_voice_event("audio_buffer_retrieved", session_id, details={"storage": "redis", "buffer_size": len(audio_buffer)})
-                else:
-                    audio_buffer = session_data['audio_buffer']
-                    print(f"🔍 Debug: in-memory audio_buffer length: {len(audio_buffer)}")
-                    sentry_capture_voice_event("audio_buffer_retrieved", session_id, details={"storage": "memory", "buffer_size": len(audio_buffer)})
+                audio_buffer = get_audio_buffer_store().get(session_id)
+                if not audio_buffer:
+                    print("❌ No audio data in session buffer")
+                    sentry_capture_voice_event("no_audio_data", session_id)
+                    emit('transcription', {
+                        'success': False,
+                        'message': 'No audio data received.'
+                    })
+                    return
+                print(f"🔍 Debug: session audio_buffer length: {len(audio_buffer)}")
+                sentry_capture_voice_event("audio_buffer_retrieved", session_id, details={"buffer_size": len(audio_buffer)})
             except Exception as e:
                 print(f"❌ Error retrieving session audio buffer: {e}")
                 sentry_capture_voice_event("audio_buffer_error", session_id, details={"error": str(e)})
@@ -1000,6 +1065,13 @@ def init_socketio(socketio_instance: SocketIO, app):
     
     def send_welcome_greeting(session_id, user_name):
         """Send welcome greeting with TTS audio after authentication"""
+        # Open the Deepgram stream now so the first utterance skips the handshake
+        if STREAMING_STT_AVAILABLE:
+            try:
+                get_streaming_stt_manager().prewarm(session_id)
+            except Exception as e:
+                print(f"⚠️ Deepgram stream prewarm failed: {e}")
+        
         with flask_app.app_context():
             try:
                 print(f"🎤 Generating welcome greeting for {user_name}")
@@ -1009,18 +1081,15 @@ def init_socketio(socketio_instance: SocketIO, app):
                 
                 # Generate TTS audio using Deepgram
                 deepgram_tts = get_deepgram_tts_service()
-                audio_bytes = deepgram_tts.synthesize_speech(welcome_text, voice="aura-asteria-en")
+                audio_bytes = deepgram_tts.synthesize_speech(welcome_text, voice=DEEPGRAM_TTS_VOICE)
                 
                 if not audio_bytes:
                     raise Exception("Deepgram TTS failed to generate audio")
                 
-                # Convert to base64
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                
-                # Send to client
+                # Send to client (binary attachment or base64, per client capability)
                 socketio.emit('welcome_greeting', {
                     'text': welcome_text,
-                    'audio': audio_base64
+                    'audio': encode_audio_payload(session_id, audio_bytes)
                 }, namespace='/voice', room=session_id)
                 
                 print(f"✅ Welcome greeting sent to {user_name}")
@@ -1029,9 +1098,11 @@ def init_socketio(socketio_instance: SocketIO, app):
                 print(f"❌ Error generating welcome greeting: {e}")
     
     
-    def process_audio_async(session_id, audio_buffer):
+    def process_audio_async(session_id, audio_buffer=None):
         """Process audio in background task"""
         import sys
+        if audio_buffer is None:
+            audio_buffer = get_audio_buffer_store().get(session_id)
         print(f"🚀 process_audio_async STARTED for session: {session_id}, buffer size: {len(audio_buffer)}", flush=True)
         sys.stdout.flush()
         # Use the stored Flask app instance for application context
@@ -1040,37 +1111,56 @@ def init_socketio(socketio_instance: SocketIO, app):
         with flask_app.app_context():
             print(f"✅ Flask app context entered", flush=True)
             sys.stdout.flush()
+            timeline = TurnTimeline(session_id=session_id)
+            # A new recording or an explicit 'interrupt' from the client cancels this turn (barge-in)
+            turn = get_turn_registry().begin(session_id, turn_id=timeline.turn_id)
+            turn.on_cancel(lambda: timeline.mark("cancelled"))
+            
+            def turn_emit(event, payload):
+                """Emit to the client unless the turn was cancelled (stale results are dropped)"""
+                if turn.cancelled:
+                    return False
+                socketio.emit(event, {**payload, 'turn_id': turn.turn_id}, namespace='/voice', room=session_id)
+                return True
+            
             try:
                 # Get session data
                 print(f"🔍 Getting session data from Redis/memory...", flush=True)
                 sys.stdout.flush()
                 session = None
                 session_record = None
-                if redis_manager.is_available():
-                    print(f"📦 Redis is available, getting session from Redis...", flush=True)
-                    sys.stdout.flush()
-                    session_data = get_session(session_id)
-                    if not session_data:
-                        sentry_capture_voice_event("session_not_found_processing", session_id, details={"operation": "audio_processing"})
-                        return
-                    session_record = session_data
-                    # Convert Redis session data to expected format
-                    session = {
-                        'user_id': session_data.get('user_id'),
-                        'user_name': session_data.get('user_name')
-                    }
-                else:
-                    session = active_sessions.get(session_id)
-                    if not session:
-                        sentry_capture_voice_event("session_not_found_processing", session_id, details={"operation": "audio_processing", "storage": "memory"})
-                        return
-                    session_record = session
+                with timeline.stage("session"):
+                    if redis_manager.is_available():
+                        print(f"📦 Redis is available, getting session from Redis...", flush=True)
+                        sys.stdout.flush()
+                        session_data = get_session(session_id)
+                        if not session_data:
+                            sentry_capture_voice_event("session_not_found_processing", session_id, details={"operation": "audio_processing"})
+                            return
+                        session_record = session_data
+                        # Convert Redis session data to expected format
+                        session = {
+                            'user_id': session_data.get('user_id'),
+                            'user_name': session_data.get('user_name')
+                        }
+                    else:
+                        session = active_sessions.get(session_id)
+                        if not session:
+                            sentry_capture_voice_event("session_not_found_processing", session_id, details={"operation": "audio_processing", "storage": "memory"})
+                            return
+                        session_record = session
+                timeline.user_id = session.get('user_id')
+                
+                # Preparation stages that do not depend on the transcript run alongside STT
+                voice_profile_future = timeline.run_parallel("voice_prefs", load_voice_profile, session.get('user_id'))
+                timeline.run_parallel("agent_warmup", warm_agent_graph, session.get('user_id'))
+                timeline.run_parallel("tts_warmup", warm_tts_connections)
                 
                 print(f"🎧 Processing audio: {len(audio_buffer)} bytes")
                 sentry_capture_voice_event("audio_processing_started", session_id, session.get('user_id'), details={"buffer_size": len(audio_buffer)})
                 
                 # Step 1: Transcribe audio using AssemblyAI
-                socketio.emit('status', {'message': 'Transcribing with Deepgram...'}, namespace='/voice', room=session_id)
+                turn_emit('status', {'message': 'Transcribing with Deepgram...'})
                 sentry_capture_voice_event("transcription_started", session_id, session.get('user_id'), details={"method": "deepgram"})
                 
                 # Use Deepgram for transcription (WebRTC-optimized solution)
@@ -1083,17 +1173,27 @@ def init_socketio(socketio_instance: SocketIO, app):
                 print(f"🔧 About to call transcribe_audio_with_deepgram_webrtc with auto language detection...", flush=True)
                 sys.stdout.flush()
                 try:
-                    # Always use None/"auto" for automatic language detection (supports 30+ languages)
-                    # This allows Deepgram to detect Korean, Japanese, Spanish, etc. automatically
-                    transcribed_text = transcribe_audio_with_deepgram_webrtc(audio_buffer, language=None)
-                    print(f"✅ transcribe_audio_with_deepgram_webrtc returned: {transcribed_text[:50] if transcribed_text else 'None'}...", flush=True)
-                    sys.stdout.flush()
+                    with timeline.stage("stt"):
+                        # Prefer the live stream: its final transcript is ready as soon as Deepgram flushes
+                        transcribed_text = None
+                        if STREAMING_STT_AVAILABLE:
+                            transcribed_text = get_streaming_stt_manager().finish_utterance(session_id)
+                            if transcribed_text:
+                                print(f"✅ Deepgram streaming transcript: {transcribed_text[:50]}...", flush=True)
+                    
+                        if not transcribed_text:
+                            # Always use None/"auto" for automatic language detection (supports 30+ languages)
+                            # This allows Deepgram to detect Korean, Japanese, Spanish, etc. automatically
+                            sample_rate = int(session_record.get('audio_sample_rate') or 0) or None
+                            transcribed_text = transcribe_audio_with_deepgram_webrtc(audio_buffer, language=None, sample_rate=sample_rate)
+                            print(f"✅ transcribe_audio_with_deepgram_webrtc returned: {transcribed_text[:50] if transcribed_text else 'None'}...", flush=True)
+                        sys.stdout.flush()
                 except Exception as e:
                     print(f"❌ Deepgram integration failed: {e}", flush=True)
                     sys.stdout.flush()
                     import traceback
                     traceback.print_exc()
-                    socketio.emit('error', {'message': 'Deepgram service not available. Please check configuration.'}, namespace='/voice', room=session_id)
+                    turn_emit('error', {'message': 'Deepgram service not available. Please check configuration.'})
                     sentry_capture_voice_event("transcription_failed", session_id, session.get('user_id'), details={"method": "deepgram", "error": str(e)})
                     return
                 
@@ -1101,10 +1201,10 @@ def init_socketio(socketio_instance: SocketIO, app):
                 sys.stdout.flush()
                 if not transcribed_text:
                     print("❌ Deepgram transcription failed")
-                    socketio.emit('error', {
+                    turn_emit('error', {
                         'message': 'Transcription failed. Please try speaking more clearly or check your microphone.',
                         'details': 'The audio was captured but no speech was detected. Make sure you are speaking clearly into your microphone.'
-                    }, namespace='/voice', room=session_id)
+                    })
                     sentry_capture_voice_event("transcription_failed", session_id, session.get('user_id'), details={"method": "deepgram"})
                     return
                 
@@ -1119,17 +1219,18 @@ def init_socketio(socketio_instance: SocketIO, app):
                 # Send transcription to client
                 print(f"📤 Sending transcription to client...", flush=True)
                 sys.stdout.flush()
-                socketio.emit('transcription', {
+                turn_emit('transcription', {
                     'success': True,
                     'text': transcribed_text,
                     'method': 'assemblyai'
-                }, namespace='/voice', room=session_id)
+                })
                 print(f"✅ Transcription sent to client", flush=True)
                 sys.stdout.flush()
                 
                 print(f"🔍 Checking for transfer intent...", flush=True)
                 sys.stdout.flush()
-                transfer_requested = has_transfer_intent(transcribed_text)
+                with timeline.stage("intent"):
+                    transfer_requested = has_transfer_intent(transcribed_text)
                 print(f"✅ Transfer intent check complete: {transfer_requested}", flush=True)
                 sys.stdout.flush()
                 
@@ -1167,7 +1268,7 @@ def init_socketio(socketio_instance: SocketIO, app):
 
                     transfer_message_text = f"I'm transferring you to {department} (extension {target_extension})."
 
-                    socketio.emit('transfer_initiated', {
+                    turn_emit('transfer_initiated', {
                         'success': True,
                         'extension': target_extension,
                         'department': department,
@@ -1176,12 +1277,12 @@ def init_socketio(socketio_instance: SocketIO, app):
                         'message': transfer_message_text,
                         'call_started': transfer_success,
                         'call_details': transfer_details
-                    }, namespace='/voice', room=session_id)
+                    })
 
-                    socketio.emit('transfer_status', {
+                    turn_emit('transfer_status', {
                         'success': transfer_success,
                         'details': transfer_details
-                    }, namespace='/voice', room=session_id)
+                    })
 
                     print(f"🔄 Transfer instructions sent to WebRTC client for extension {target_extension}")
 
@@ -1189,32 +1290,34 @@ def init_socketio(socketio_instance: SocketIO, app):
                     try:
                         # Generate TTS audio using Deepgram
                         deepgram_tts = get_deepgram_tts_service()
-                        audio_bytes = deepgram_tts.synthesize_speech(transfer_message, voice="aura-asteria-en")
+                        audio_bytes = deepgram_tts.synthesize_speech(transfer_message, voice=DEEPGRAM_TTS_VOICE)
                         
                         if not audio_bytes:
                             raise Exception("Deepgram TTS failed to generate audio")
                         
-                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                        
-                        socketio.emit('agent_response', {
+                        turn_emit('agent_response', {
                             'success': True,
                             'text': transfer_message,
-                            'audio': audio_base64,
+                            'audio': encode_audio_payload(session_id, audio_bytes),
                             'transfer': True
-                        }, namespace='/voice', room=session_id)
+                        })
                     except Exception as e:
                         print(f"❌ Error generating TTS for transfer: {e}")
                 
                 if transfer_requested:
                     print(f"🔄 Transfer requested, starting transfer flow...", flush=True)
                     sys.stdout.flush()
-                    start_transfer_flow('2001', 'support', 'User requested transfer to human agent', source="caller_intent")
+                    start_transfer_flow(DEFAULT_TRANSFER_EXTENSION, DEFAULT_TRANSFER_DEPARTMENT, 'User requested transfer to human agent', source="caller_intent")
                     return
 
+                if turn.cancelled:
+                    print(f"🛑 Turn {turn.turn_id} cancelled before agent processing ({turn.reason})", flush=True)
+                    return
+                
                 # Step 2: Process with agent
                 print(f"🚀 About to emit status message...", flush=True)
                 sys.stdout.flush()
-                socketio.emit('status', {'message': 'Processing request...'}, namespace='/voice', room=session_id)
+                turn_emit('status', {'message': 'Processing request...'})
                 print(f"✅ Status message emitted", flush=True)
                 sys.stdout.flush()
                 
@@ -1224,182 +1327,198 @@ def init_socketio(socketio_instance: SocketIO, app):
                 print(f"✅ sentry_capture_voice_event for agent_processing_started completed", flush=True)
                 sys.stdout.flush()
                 
+                # Voice preferences were loaded alongside STT; this normally returns immediately
+                with timeline.stage("voice_prefs_wait"):
+                    try:
+                        voice_profile = voice_profile_future.result(timeout=5.0)
+                    except Exception as e:
+                        print(f"⚠️ Voice preferences not ready, resolving on demand: {e}", flush=True)
+                        voice_profile = None
+                
+                # Sentence-chunked TTS: the first sentence is synthesized while the agent is still generating
+                tts_pipeline = None
+                streamed_text_chunks = []
+                if STREAMING_TTS_ENABLED:
+                    try:
+                        def emit_audio_chunk(index, text, audio_bytes):
+                            timeline.mark("first_audio")
+                            turn_emit('agent_audio_chunk', {
+                                'index': index,
+                                'text': text,
+                                'audio': encode_audio_payload(session_id, audio_bytes),
+                                'partial': STREAMING_TTS_CHUNKS,
+                                'is_final': False
+                            })
+                        
+                        def emit_sentence_end(index, text):
+                            turn_emit('agent_audio_chunk', {
+                                'index': index,
+                                'sentence_end': True,
+                                'is_final': False
+                            })
+                        
+                        if STREAMING_TTS_CHUNKS:
+                            tts_pipeline = StreamingTTSPipeline(
+                                synthesize=None,
+                                synthesize_stream=build_tts_stream_synthesizer(session.get('user_id'), transcribed_text, voice_profile=voice_profile),
+                                on_audio_chunk=emit_audio_chunk,
+                                on_sentence_end=emit_sentence_end
+                            )
+                        else:
+                            tts_pipeline = StreamingTTSPipeline(
+                                synthesize=build_tts_synthesizer(session.get('user_id'), transcribed_text, voice_profile=voice_profile),
+                                on_audio_chunk=emit_audio_chunk
+                            )
+                        turn.on_cancel(tts_pipeline.cancel)
+                    except Exception as e:
+                        print(f"⚠️ Streaming TTS unavailable, using single-shot TTS: {e}", flush=True)
+                        tts_pipeline = None
+                
+                def on_agent_text_chunk(chunk):
+                    """Feed streamed agent text into the TTS pipeline (never speak transfer markers)"""
+                    timeline.mark("agent_first_text")
+                    if tts_pipeline is None or tts_pipeline.cancelled:
+                        return
+                    if 'TRANSFER_INITIATED' in chunk:
+                        tts_pipeline.cancel()
+                        return
+                    streamed_text_chunks.append(chunk)
+                    tts_pipeline.feed(chunk)
+                
                 print(f"🤖 Starting agent processing for: {transcribed_text[:100]}", flush=True)
                 sys.stdout.flush()
-                print(f"🔧 About to call process_with_agent in separate thread...", flush=True)
+                print(f"🔧 Submitting process_with_agent to the agent runtime...", flush=True)
                 sys.stdout.flush()
                 try:
-                    print(f"🔧 Setting up ThreadPoolExecutor...", flush=True)
-                    sys.stdout.flush()
-                    # Use eventlet's spawn_n to run async code in completely separate greenlet
-                    # This prevents blocking the main eventlet worker
-                    import eventlet
-                    from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
-                    
-                    result_container = {'response': None, 'transfer': None, 'error': None, 'done': False}
-                    
-                    print(f"🔧 Defining run_async_in_thread function...", flush=True)
-                    sys.stdout.flush()
-                    def run_async_in_thread():
-                        """Run async function in a new thread with its own event loop"""
-                        import sys
-                        print(f"🧵 Thread started for async execution", flush=True)
+                    # Runs on the shared long-lived agent loop (reused SDK/MCP connections) instead of a
+                    # per-turn thread + event loop; the session id lets a disconnect cancel the turn
+                    # 60s allows for tool execution (database operations, external API calls)
+                    agent_job = get_agent_runtime().submit(
+                        process_with_agent(
+                            transcribed_text,
+                            session['user_id'],
+                            session['user_name'],
+                            socketio=socketio_instance,
+                            session_id=session_id,
+                            on_text_chunk=on_agent_text_chunk
+                        ),
+                        timeout=60.0,
+                        key=session_id
+                    )
+                    turn.on_cancel(agent_job.cancel)
+                    # Outer wait also covers time queued behind other turns
+                    wait_timeout = 90.0
+                    try:
+                        print(f"⏳ Waiting for agent result with {wait_timeout}s timeout...", flush=True)
                         sys.stdout.flush()
-                        
-                        # Create new event loop for this thread
-                        print(f"🔧 Creating new event loop in thread...", flush=True)
+                        with timeline.stage("agent"):
+                            agent_response, transfer_marker = agent_job.result(timeout=wait_timeout)
+                        print(f"🤖 Agent response received: {agent_response[:100] if agent_response else 'None'}", flush=True)
                         sys.stdout.flush()
-                        new_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(new_loop)
-                        print(f"✅ Event loop created and set", flush=True)
+                    except asyncio.TimeoutError as e:
+                        print(f"⏱️ Agent timeout: {e}", flush=True)
                         sys.stdout.flush()
-                        
-                        # Use timeout that matches routes.py execution_timeout (15s for Claude/OpenAI, 12s for Gemini)
-                        # Add buffer for tool execution which can be slow (MCP calls, API calls, etc.)
-                        # Increased to 60s to allow for database operations and external API calls
-                        # Tool execution (calendar event creation, database operations) can take time
-                        timeout_seconds = 60.0  # Increased from 20s to allow tool execution time
-                        try:
-                            print(f"🔄 Running process_with_agent in thread (timeout: {timeout_seconds}s)...", flush=True)
-                            sys.stdout.flush()
-                            result = new_loop.run_until_complete(
-                                asyncio.wait_for(
-                                    process_with_agent(
-                                        transcribed_text,
-                                        session['user_id'],
-                                        session['user_name'],
-                                        socketio=socketio_instance,
-                                        session_id=session_id
-                                    ),
-                                    timeout=timeout_seconds
-                                )
-                            )
-                            print(f"✅ process_with_agent completed in thread", flush=True)
-                            sys.stdout.flush()
-                            result_container['response'] = result[0]
-                            result_container['transfer'] = result[1]
-                            result_container['done'] = True
-                            return result
-                        except asyncio.TimeoutError:
-                            print(f"⏱️ Async timeout in thread after {timeout_seconds} seconds", flush=True)
-                            sys.stdout.flush()
-                            result_container['error'] = 'timeout'
-                            result_container['done'] = True
-                            raise
-                        except Exception as e:
-                            print(f"❌ Error in thread: {e}", flush=True)
-                            sys.stdout.flush()
-                            import traceback
-                            traceback.print_exc()
-                            result_container['error'] = str(e)
-                            result_container['done'] = True
-                            raise
-                        finally:
-                            print(f"🧵 Closing event loop...", flush=True)
-                            sys.stdout.flush()
-                            try:
-                                # Cancel any pending tasks
-                                pending = asyncio.all_tasks(new_loop)
-                                for task in pending:
-                                    task.cancel()
-                                new_loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                            except:
-                                pass
-                            new_loop.close()
-                            print(f"🧵 Thread event loop closed", flush=True)
-                            sys.stdout.flush()
-                    
-                    # Run in thread pool with aggressive timeout for Gemini hackathon
-                    print(f"🚀 Submitting to ThreadPoolExecutor...", flush=True)
-                    sys.stdout.flush()
-                    with ThreadPoolExecutor(max_workers=1) as executor:
-                        print(f"✅ ThreadPoolExecutor created, submitting task...", flush=True)
+                        agent_response = AGENT_TIMEOUT_REPLY
+                        transfer_marker = None
+                    except CancelledError:
+                        print(f"🛑 Agent request cancelled for session {session_id}", flush=True)
                         sys.stdout.flush()
-                        future = executor.submit(run_async_in_thread)
-                        print(f"✅ Task submitted to executor, future created", flush=True)
-                        sys.stdout.flush()
-                        # Use 60s timeout to allow for tool execution (database operations, API calls)
-                        # Tool execution (MCP calls, API calls, database operations) can take time
-                        # Increased from 25s to 60s to handle complex operations like calendar event creation
-                        executor_timeout = 90.0  # Increased for MCP tools loading (was 60s)
-                        try:
-                            print(f"⏳ Waiting for result with {executor_timeout}s timeout...", flush=True)
-                            sys.stdout.flush()
-                            agent_response, transfer_marker = future.result(timeout=executor_timeout)
-                            print(f"🤖 Agent response received: {agent_response[:100] if agent_response else 'None'}", flush=True)
-                            sys.stdout.flush()
-                        except FutureTimeoutError:
-                            print(f"⏱️ ThreadPoolExecutor timed out after {executor_timeout} seconds", flush=True)
-                            sys.stdout.flush()
-                            agent_response = "I'm sorry, I'm taking too long to process that request. Please try a simpler request or try again."
-                            transfer_marker = None
-                            # Cancel the future if possible
-                            try:
-                                future.cancel()
-                                print(f"✅ Future cancelled", flush=True)
-                                sys.stdout.flush()
-                            except:
-                                pass
-                        except asyncio.TimeoutError as e:
-                            print(f"⏱️ Async timeout: {e}", flush=True)
-                            sys.stdout.flush()
-                            agent_response = "I'm sorry, I'm taking too long to process that request. Please try a simpler request or switch to Claude model."
-                            transfer_marker = None
-                        except Exception as e:
-                            print(f"❌ Exception in ThreadPoolExecutor: {e}", flush=True)
-                            sys.stdout.flush()
-                            import traceback
-                            traceback.print_exc()
-                            agent_response = "I'm sorry, I encountered an error. Please try again."
-                            transfer_marker = None
+                        if tts_pipeline is not None:
+                            tts_pipeline.cancel()
+                        return
+                except AgentRuntimeBusy as e:
+                    print(f"🚦 {e}", flush=True)
+                    sys.stdout.flush()
+                    agent_response = AGENT_BUSY_REPLY
+                    transfer_marker = None
                 except asyncio.TimeoutError:
                     print(f"⏱️ Agent processing timed out after 18 seconds (async timeout)")
-                    agent_response = "I'm sorry, I'm taking too long to process that request. Please try a simpler request."
+                    agent_response = AGENT_TIMEOUT_REPLY
                     transfer_marker = None
                 except Exception as e:
                     print(f"❌ Error in agent processing: {e}")
                     import traceback
                     traceback.print_exc()
-                    agent_response = "I'm sorry, I encountered an error. Please try again."
+                    agent_response = AGENT_ERROR_REPLY
                     transfer_marker = None
                 sentry_capture_voice_event("agent_processing_completed", session_id, session.get('user_id'), details={"response_length": len(agent_response)})
                 
                 effective_marker = transfer_marker or (agent_response if isinstance(agent_response, str) and agent_response.startswith("TRANSFER_INITIATED:") else None)
                 if effective_marker:
+                    if tts_pipeline is not None:
+                        tts_pipeline.cancel()
+                        tts_pipeline = None
                     if transfer_requested:
                         marker_data = effective_marker.replace("TRANSFER_INITIATED:", "")
                         parts = marker_data.split("|")
-                        target_extension = parts[0] if len(parts) > 0 else '2001'
-                        department = parts[1] if len(parts) > 1 else 'support'
+                        target_extension = parts[0] if len(parts) > 0 else DEFAULT_TRANSFER_EXTENSION
+                        department = parts[1] if len(parts) > 1 else DEFAULT_TRANSFER_DEPARTMENT
                         reason = parts[2] if len(parts) > 2 else 'User requested transfer'
                         start_transfer_flow(target_extension, department, reason)
                         return
                     else:
                         print("Transfer marker detected but caller did not request a human. Ignoring marker.")
-                        agent_response = agent_response if not isinstance(agent_response, str) or not agent_response.startswith("TRANSFER_INITIATED:") else "Let me know how else I can help."
+                        agent_response = agent_response if not isinstance(agent_response, str) or not agent_response.startswith("TRANSFER_INITIATED:") else TRANSFER_DECLINED_REPLY
+                
+                if turn.cancelled:
+                    print(f"🛑 Turn {turn.turn_id} cancelled before TTS ({turn.reason})", flush=True)
+                    return
                 
                 # Step 3: Convert response to speech using ElevenLabs (with Deepgram fallback)
-                socketio.emit('status', {'message': 'Generating speech...'}, namespace='/voice', room=session_id)
+                timeline.start("tts")
+                turn_emit('status', {'message': 'Generating speech...'})
                 sentry_capture_voice_event("tts_generation_started", session_id, session.get('user_id'))
                 
+                # Streaming path: finish the sentence pipeline (speaks the full reply if nothing was streamed)
+                if tts_pipeline is not None and not tts_pipeline.cancelled:
+                    streamed_text = "".join(streamed_text_chunks)
+                    if agent_response and agent_response.strip() not in streamed_text:
+                        tts_pipeline.feed("\n" + agent_response)
+                    chunks_emitted = tts_pipeline.close()
+                    if chunks_emitted:
+                        turn_emit('agent_audio_chunk', {
+                            'index': tts_pipeline.get_stats()['sentences'],  # One past the last sentence index
+                            'is_final': True
+                        })
+                        turn_emit('agent_response', {
+                            'success': True,
+                            'text': agent_response,
+                            'audio': None,
+                            'streamed_audio': True
+                        })
+                        timeline.end("tts")
+                        print(f"🔊 Streaming TTS completed: {tts_pipeline.get_stats()}", flush=True)
+                        sentry_capture_voice_event("tts_generation_completed", session_id, session.get('user_id'), details=tts_pipeline.get_stats())
+                        sentry_capture_voice_event("audio_processing_completed", session_id, session.get('user_id'), details={"success": True})
+                        return
+                    print(f"⚠️ Streaming TTS produced no audio, falling back to single-shot TTS", flush=True)
+                if turn.cancelled:
+                    print(f"🛑 Turn {turn.turn_id} cancelled, skipping single-shot TTS ({turn.reason})", flush=True)
+                    return
+                
                 # Get user preferences
                 user_id = session.get('user_id')
                 print(f"🔍 TTS Debug: ELEVENLABS_AVAILABLE={ELEVENLABS_AVAILABLE}, user_id={user_id}", flush=True)
                 
                 voice_prefs = get_voice_preferences() if ELEVENLABS_AVAILABLE else None
+                if voice_profile is not None and voice_prefs is not None:
+                    voice_prefs_prefetched = voice_profile.get('prefs')
+                else:
+                    voice_prefs_prefetched = None
                 print(f"🔍 TTS Debug: voice_prefs={voice_prefs is not None}", flush=True)
                 
-                audio_bytes = None
-                tts_provider = "deepgram"  # Default fallback
+                deepgram_tts = get_deepgram_tts_service()
+                deepgram_call = ("deepgram", lambda: deepgram_tts.synthesize_speech(agent_response, voice=DEEPGRAM_TTS_VOICE))
+                elevenlabs_call = None
                 
-                # Try ElevenLabs first if available and enabled
+                # ElevenLabs is the primary provider when available and enabled for the user
                 if ELEVENLABS_AVAILABLE and voice_prefs:
                     print(f"🔍 TTS Debug: Entering ElevenLabs block", flush=True)
                     try:
                         elevenlabs = get_elevenlabs_service()
                         print(f"🔍 TTS Debug: elevenlabs service obtained, is_available()={elevenlabs.is_available() if elevenlabs else False}", flush=True)
                         if elevenlabs.is_available():
-                            prefs = voice_prefs.get_user_preferences(user_id) if user_id else voice_prefs._get_default_preferences()
+                            prefs = voice_prefs_prefetched or (voice_prefs.get_user_preferences(user_id) if user_id else voice_prefs._get_default_preferences())
                             print(f"🔍 TTS Debug: prefs={prefs}, use_elevenlabs={prefs.get('use_elevenlabs', True)}", flush=True)
                             
                             # Check if user wants ElevenLabs
@@ -1419,34 +1538,27 @@ def init_socketio(socketio_instance: SocketIO, app):
                                         agent_response=agent_response
                                     )
                                     print(f"🎭 Using ElevenLabs with emotion: {emotion.value}", flush=True)
-                                    audio_bytes = elevenlabs.synthesize_with_emotion(
+                                    elevenlabs_call = ("elevenlabs", lambda: elevenlabs.synthesize_with_emotion(
                                         text=agent_response,
                                         emotion=emotion,
                                         voice_id=voice_id
-                                    )
-                                else:
+                                    ))
+                                elif language != "en":
                                     # Use multilingual if language is not English
-                                    if language != "en":
-                                        print(f"🌍 Using ElevenLabs multilingual for {language}", flush=True)
-                                        audio_bytes = elevenlabs.synthesize_multilingual(
-                                            text=agent_response,
-                                            language=language,
-                                            voice_id=voice_id
-                                        )
-                                    else:
-                                        print(f"🔊 Using ElevenLabs standard TTS", flush=True)
-                                        audio_bytes = elevenlabs.synthesize(
-                                            text=agent_response,
-                                            voice_id=voice_id
-                                        )
-                                
-                                if audio_bytes:
-                                    tts_provider = "elevenlabs"
-                                    print(f"✅ ElevenLabs TTS successful: {len(audio_bytes)} bytes", flush=True)
-                                    # Update status to show ElevenLabs is being used
-                                    socketio.emit('status', {'message': 'Generating speech with ElevenLabs...'}, namespace='/voice', room=session_id)
+                                    print(f"🌍 Using ElevenLabs multilingual for {language}", flush=True)
+                                    elevenlabs_call = ("elevenlabs", lambda: elevenlabs.synthesize_multilingual(
+                                        text=agent_response,
+                                        language=language,
+                                        voice_id=voice_id
+                                    ))
+                                else:
+                                    print(f"🔊 Using ElevenLabs standard TTS", flush=True)
+                                    elevenlabs_call = ("elevenlabs", lambda: elevenlabs.synthesize(
+                                        text=agent_response,
+                                        voice_id=voice_id
+                                    ))
                     except Exception as e:
-                        print(f"⚠️ ElevenLabs TTS failed, falling back to Deepgram: {e}", flush=True)
+                        print(f"⚠️ ElevenLabs TTS unavailable, using Deepgram: {e}", flush=True)
                         import traceback
                         traceback.print_exc()
                 else:
@@ -1455,30 +1567,35 @@ def init_socketio(socketio_instance: SocketIO, app):
                     if not voice_prefs:
                         print(f"🔍 TTS Debug: voice_prefs is None", flush=True)
                 
-                # Fallback to Deepgram if ElevenLabs failed or not available
-                if not audio_bytes:
-                    print(f"🔊 Using Deepgram TTS (fallback)", flush=True)
-                    # Update status to show Deepgram is being used
-                    socketio.emit('status', {'message': 'Generating speech with Deepgram...'}, namespace='/voice', room=session_id)
-                    deepgram_tts = get_deepgram_tts_service()
-                    audio_bytes = deepgram_tts.synthesize_speech(agent_response, voice="aura-asteria-en")
-                    tts_provider = "deepgram"
+                # The router hedges a slow ElevenLabs request with Deepgram and keeps whichever finishes first
+                if elevenlabs_call is not None:
+                    turn_emit('status', {'message': 'Generating speech with ElevenLabs...'})
+                    audio_bytes, tts_provider = get_tts_router().synthesize(elevenlabs_call, deepgram_call)
+                else:
+                    print(f"🔊 Using Deepgram TTS", flush=True)
+                    turn_emit('status', {'message': 'Generating speech with Deepgram...'})
+                    audio_bytes, tts_provider = get_tts_router().synthesize(deepgram_call)
+                tts_provider = tts_provider or ("elevenlabs" if elevenlabs_call is not None else "deepgram")
+                if audio_bytes:
+                    print(f"✅ {tts_provider} TTS successful: {len(audio_bytes)} bytes", flush=True)
                 
                 if not audio_bytes:
                     raise Exception(f"{tts_provider.capitalize()} TTS failed to generate audio")
                 
-                # Convert speech to base64 for transmission
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                print(f"🔊 TTS generated: {len(audio_bytes)} bytes, base64: {len(audio_base64)} chars")
-                print(f"🔊 TTS audio preview: {audio_base64[:100]}...")
-                sentry_capture_voice_event("tts_generation_completed", session_id, session.get('user_id'), details={"audio_size": len(audio_base64)})
+                timeline.end("tts")
+                timeline.mark("first_audio")
+                
+                # Binary clients get the raw MP3 as an attachment; older clients get base64
+                audio_payload = encode_audio_payload(session_id, audio_bytes)
+                print(f"🔊 TTS generated: {len(audio_bytes)} bytes, sent as {'binary' if isinstance(audio_payload, bytes) else 'base64'} ({len(audio_payload)})")
+                sentry_capture_voice_event("tts_generation_completed", session_id, session.get('user_id'), details={"audio_size": len(audio_payload)})
                 
                 # Send response to client
-                socketio.emit('agent_response', {
+                turn_emit('agent_response', {
                     'success': True,
                     'text': agent_response,
-                    'audio': audio_base64
-                }, namespace='/voice', room=session_id)
+                    'audio': audio_payload
+                })
                 
                 sentry_capture_voice_event("audio_processing_completed", session_id, session.get('user_id'), details={"success": True})
             
@@ -1491,9 +1608,137 @@ def init_socketio(socketio_instance: SocketIO, app):
                 if SENTRY_AVAILABLE:
                     sentry_sdk.capture_exception(e)
                 
-                socketio.emit('error', {
+                turn_emit('error', {
                     'message': f"Error processing audio: {str(e)}"
-                }, namespace='/voice', room=session_id)
+                })
+            finally:
+                get_turn_registry().end(turn)
+                # Turns that got as far as STT report their stage breakdown
+                if timeline.has_stage("stt"):
+                    report_turn_timing(timeline)
+
+
+def load_voice_profile(user_id: str | None) -> dict:
+    """
+    Resolve the user's voice preferences and whether ElevenLabs will be used.
+    Runs alongside STT so TTS setup is not on the turn's critical path.
+    """
+    elevenlabs = None
+    prefs = {}
+    if ELEVENLABS_AVAILABLE:
+        try:
+            service = get_elevenlabs_service()
+            voice_prefs = get_voice_preferences()
+            prefs = voice_prefs.get_user_preferences(user_id) if user_id else voice_prefs._get_default_preferences()
+            if service.is_available() and prefs.get("use_elevenlabs", True):
+                elevenlabs = service
+        except Exception as e:
+            print(f"⚠️ ElevenLabs preferences unavailable, using Deepgram: {e}", flush=True)
+    return {'elevenlabs': elevenlabs, 'prefs': prefs}
+
+
+def warm_agent_graph(user_id: str | None):
+    """Resolve the user's LLM provider and make sure its agent graph is built (on the agent runtime)"""
+    from convonet.routes import _get_agent_graph
+    get_agent_runtime().run(_get_agent_graph(user_id=user_id, prebuild=True), timeout=30.0)
+
+
+def warm_tts_connections():
+    """Open the Deepgram HTTPS connection (TTS fallback and transfer prompts) before the reply is ready"""
+    return get_deepgram_tts_service().warm_connection()
+
+
+def report_turn_timing(timeline: TurnTimeline):
+    """Emit a finished turn's per-stage timing to the client and record it in the agent monitor"""
+    timing = timeline.finish()
+    print(f"⏱️ Voice turn {timing['total_ms']:.0f}ms: " + ", ".join(
+        f"{name}={stage['duration_ms']:.0f}ms" for name, stage in timing['stages'].items()
+    ), flush=True)
+    try:
+        socketio.emit('turn_timing', timing, namespace='/voice', room=timeline.session_id)
+    except Exception as e:
+        print(f"⚠️ Could not emit turn timing: {e}", flush=True)
+    try:
+        from convonet.agent_monitor import get_agent_monitor
+        get_agent_monitor().track_turn_timing(timing)
+    except Exception as e:
+        print(f"⚠️ Could not record turn timing: {e}", flush=True)
+
+
+def build_tts_synthesizer(user_id: str | None, user_text: str = "", voice_profile: dict | None = None):
+    """
+    Resolve the user's voice preferences once and return a per-sentence synthesize(text) -> bytes.
+    Uses ElevenLabs (emotion / multilingual / standard) when enabled, hedged with Deepgram Aura by the
+    TTS router; Deepgram Aura alone otherwise.
+    A voice_profile already loaded by load_voice_profile() skips the preference lookup.
+    """
+    if voice_profile is None:
+        voice_profile = load_voice_profile(user_id)
+    elevenlabs = voice_profile.get('elevenlabs')
+    prefs = voice_profile.get('prefs') or {}
+    
+    emotion_state = {}
+    
+    def synthesize(text: str):
+        deepgram_call = ("deepgram", lambda: get_deepgram_tts_service().synthesize_speech(text, voice=DEEPGRAM_TTS_VOICE))
+        if elevenlabs is None:
+            return get_tts_router().synthesize(deepgram_call)[0]
+        
+        voice_id = prefs.get("voice_id")
+        language = prefs.get("language", "en")
+        if prefs.get("emotion_enabled", True):
+            # Pick the emotion once per reply so the voice stays consistent across sentences
+            if 'emotion' not in emotion_state:
+                emotion_state['emotion'] = get_emotion_detector().detect_emotion_from_context(
+                    user_input=user_text,
+                    agent_response=text
+                )
+            elevenlabs_call = lambda: elevenlabs.synthesize_with_emotion(text=text, emotion=emotion_state['emotion'], voice_id=voice_id)
+        elif language != "en":
+            elevenlabs_call = lambda: elevenlabs.synthesize_multilingual(text=text, language=language, voice_id=voice_id)
+        else:
+            elevenlabs_call = lambda: elevenlabs.synthesize(text=text, voice_id=voice_id)
+        # Deepgram hedges ElevenLabs when it is slow and replaces it when it fails
+        return get_tts_router().synthesize(("elevenlabs", elevenlabs_call), deepgram_call)[0]
+    
+    return synthesize
+
+
+def build_tts_stream_synthesizer(user_id: str | None, user_text: str = "", voice_profile: dict | None = None):
+    """
+    Streaming counterpart of build_tts_synthesizer: returns synthesize_stream(text), a generator of
+    MP3 chunks forwarded as the provider sends them. ElevenLabs is hedged with Deepgram Aura by the
+    TTS router.
+    """
+    if voice_profile is None:
+        voice_profile = load_voice_profile(user_id)
+    elevenlabs = voice_profile.get('elevenlabs')
+    prefs = voice_profile.get('prefs') or {}
+    
+    emotion_state = {}
+    
+    def synthesize_stream(text: str):
+        deepgram_call = ("deepgram", lambda: get_deepgram_tts_service().synthesize_stream(text, voice=DEEPGRAM_TTS_VOICE))
+        if elevenlabs is None:
+            yield from get_tts_router().stream(deepgram_call)
+            return
+        
+        voice_id = prefs.get("voice_id")
+        if prefs.get("emotion_enabled", True):
+            # Pick the emotion once per reply so the voice stays consistent across sentences
+            if 'emotion' not in emotion_state:
+                emotion_state['emotion'] = get_emotion_detector().detect_emotion_from_context(
+                    user_input=user_text,
+                    agent_response=text
+                )
+            elevenlabs_call = lambda: elevenlabs.synthesize_stream_with_emotion(text=text, emotion=emotion_state['emotion'], voice_id=voice_id)
+        else:
+            # Multilingual replies use the default (multilingual) model, as synthesize_multilingual does
+            elevenlabs_call = lambda: elevenlabs.synthesize_stream(text=text, voice_id=voice_id)
+        # Deepgram is fired if ElevenLabs' first chunk is overdue (or it fails); the first to answer is played
+        yield from get_tts_router().stream(("elevenlabs", elevenlabs_call), deepgram_call)
+    
+    return synthesize_stream
 
 
 async def process_with_agent(
@@ -1502,6 +1747,7 @@ async def process_with_agent(
     user_name: str,
     socketio=None,
     session_id: str | None = None,
+    on_text_chunk=None,
 ) -> str:
     """Process user input with the agent"""
     try:
@@ -1534,6 +1780,7 @@ async def process_with_agent(
             include_metadata=True,
             socketio=socketio,
             session_id=session_id,
+            on_text_chunk=on_text_chunk,
         )
         
         if isinstance(result, dict):
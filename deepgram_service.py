@@ -2,15 +2,24 @@ from deepgram import DeepgramClient
 import logging
 import os
 import asyncio
-from typing import Optional, Dict, Any, Callable
+from typing import Optional, Dict, Any, Callable, Iterator, AsyncIterator
 import base64
+import io
 from dotenv import load_dotenv
-import tempfile
 import wave
 import struct
-import requests
 import numpy as np
 
+from convonet.http_client_pool import get_http_client_pool
+from convonet.tts_cache import get_tts_cache
+
+# In-memory decode/resample stage for STT uploads (needs numpy; PyAV for WebM)
+try:
+    from convonet.audio_normalizer import normalize_audio, webm_upload_mode
+    NORMALIZER_AVAILABLE = True
+except ImportError:
+    NORMALIZER_AVAILABLE = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -32,9 +41,12 @@ class DeepgramService:
         # Initialize Deepgram client
         self.client = DeepgramClient(api_key=self.api_key)
         
+        # Shared keep-alive pool (convonet.http_client_pool) for the REST STT/TTS calls
+        self.http_pool = get_http_client_pool()
+        
         logger.info("✅ Deepgram service initialized for real-time streaming")
     
-    def transcribe_audio_buffer(self, audio_buffer: bytes, language: Optional[str] = None) -> Optional[str]:
+    def transcribe_audio_buffer(self, audio_buffer: bytes, language: Optional[str] = None, sample_rate: Optional[int] = None) -> Optional[str]:
         """
         Transcribe audio buffer using Deepgram's streaming API
         
@@ -42,6 +54,7 @@ class DeepgramService:
             audio_buffer: Raw audio data bytes from WebRTC
             language: Language code. Use None or "auto" for automatic detection (default: None = auto-detect).
                       Supports 30+ languages including: en, ko, ja, es, fr, de, zh, etc.
+            sample_rate: Known sample rate of raw PCM16 audio (skips guessing the PCM format)
             
         Returns:
             Transcribed text string or None if failed
@@ -58,19 +71,32 @@ class DeepgramService:
                        logger.warning(f"⚠️ Audio too short for transcription: {len(audio_buffer)} bytes (need {min_audio_length}+)")
                        return None
                    
-                   # Detect WebM/EBML header (Opus in WebM from MediaRecorder)
+                   # Normalize in memory: WebM/Opus is decoded, PCM of known rate resampled to 16 kHz mono
                    is_webm = len(audio_buffer) >= 4 and audio_buffer[:4] == b"\x1a\x45\xdf\xa3"
+                   normalized = None
+                   if NORMALIZER_AVAILABLE:
+                       try:
+                           normalized = normalize_audio(audio_buffer, sample_rate=sample_rate)
+                       except Exception as e:
+                           logger.warning(f"⚠️ Audio normalization failed, sending original audio: {e}")
+                   
+                   if normalized is not None:
+                       logger.info(f"🎚️ Normalized audio: {normalized.to_dict()}")
+                       if normalized.is_silence:
+                           logger.warning("⚠️ Audio appears to be silence, skipping transcription")
+                           return None
+                       if is_webm and webm_upload_mode() == "passthrough":
+                           # Opus is already far smaller than PCM; the decode only gated silence
+                           return self._transcribe_bytes(bytes(audio_buffer), language, "audio/webm")
+                       return self._transcribe_bytes(normalized.pcm, language, "audio/l16", {
+                           "encoding": "linear16",
+                           "sample_rate": str(normalized.sample_rate),
+                           "channels": "1",
+                       })
+                   
                    if is_webm:
                        logger.info("🧭 Detected WebM/EBML header - sending as audio/webm to Deepgram")
-                       with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_file:
-                           webm_path = temp_file.name
-                           temp_file.write(audio_buffer)
-                       try:
-                           result = self._transcribe_file(webm_path, language)
-                           return result
-                       finally:
-                           if os.path.exists(webm_path):
-                               os.unlink(webm_path)
+                       return self._transcribe_bytes(bytes(audio_buffer), language, "audio/webm")
                    
                    # Analyze audio quality before PCM processing
                    audio_quality = self._analyze_audio_quality(audio_buffer)
@@ -83,71 +109,61 @@ class DeepgramService:
                    if audio_quality.get('clipping_percentage', 0) > 10:
                        logger.warning(f"⚠️ Audio has severe clipping ({audio_quality.get('clipping_percentage', 0):.1f}%), may affect transcription quality")
                    
-                   # Fallback: treat as raw PCM and create WAV
-                   wav_file_path = self._create_wav_from_pcm(audio_buffer)
-                   if not wav_file_path:
-                       logger.error("❌ Failed to create WAV file from PCM data")
+                   # Fallback: raw PCM of undeclared rate, wrapped in an in-memory WAV
+                   wav_data = self._create_wav_from_pcm(audio_buffer, sample_rate)
+                   if not wav_data:
+                       logger.error("❌ Failed to create WAV from PCM data")
                        return None
-                   try:
-                       result = self._transcribe_file(wav_file_path, language)
-                       return result
-                   finally:
-                       if os.path.exists(wav_file_path):
-                           os.unlink(wav_file_path)
+                   return self._transcribe_bytes(wav_data, language, "audio/wav")
         except Exception as e:
             logger.error(f"❌ Deepgram transcription failed: {e}")
             return None
     
-    def _create_wav_from_pcm(self, pcm_data: bytes) -> Optional[str]:
-        """Create a WAV file from raw PCM data optimized for Deepgram"""
+    def _create_wav_from_pcm(self, pcm_data: bytes, sample_rate: Optional[int] = None) -> Optional[bytes]:
+        """Wrap raw 16-bit mono PCM in an in-memory WAV (48 kHz WebRTC capture rate unless declared)"""
         try:
-            # Create temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                wav_path = temp_file.name
-            
-            # Try different PCM configurations optimized for Deepgram
-            # Start with WebRTC standard format first, then Deepgram's preferred format
-            pcm_configs = [
-                {"sample_rate": 48000, "channels": 1, "sample_width": 2, "desc": "48kHz, mono, 16-bit (WebRTC standard)"},
-                {"sample_rate": 16000, "channels": 1, "sample_width": 2, "desc": "16kHz, mono, 16-bit (Deepgram optimized)"},
-                {"sample_rate": 44100, "channels": 1, "sample_width": 2, "desc": "44.1kHz, mono, 16-bit (CD quality)"},
-                {"sample_rate": 8000, "channels": 1, "sample_width": 2, "desc": "8kHz, mono, 16-bit (telephone quality)"},
-            ]
-            
-            for config in pcm_configs:
-                try:
-                    logger.info(f"🔍 Trying PCM config: {config['desc']}")
-                    
-                    # Write WAV file with proper headers
-                    with wave.open(wav_path, 'wb') as wav_file:
-                        wav_file.setnchannels(config['channels'])
-                        wav_file.setsampwidth(config['sample_width'])
-                        wav_file.setframerate(config['sample_rate'])
-                        wav_file.writeframes(pcm_data)
-                    
-                    # Test if the file is valid
-                    with wave.open(wav_path, 'rb') as test_file:
-                        frames = test_file.getnframes()
-                        if frames > 0:
-                            logger.info(f"✅ Created valid WAV file: {config['desc']}, {frames} frames")
-                            return wav_path
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ PCM config {config['desc']} failed: {e}")
-                    continue
-            
-            logger.error("❌ All PCM configurations failed")
-            return None
-            
+            rate = sample_rate or 48000
+            buffer = io.BytesIO()
+            with wave.open(buffer, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(rate)
+                wav_file.writeframes(pcm_data)
+            logger.info(f"✅ Created WAV: {rate}Hz, mono, 16-bit, {len(pcm_data) // 2} frames")
+            return buffer.getvalue()
         except Exception as e:
-            logger.error(f"❌ Failed to create WAV file: {e}")
+            logger.error(f"❌ Failed to create WAV: {e}")
             return None
     
     def _transcribe_file(self, file_path: str, language: Optional[str] = None) -> Optional[str]:
         """Transcribe a file using Deepgram's HTTP API"""
+        with open(file_path, 'rb') as audio_file:
+            buffer_data = audio_file.read()
+        content_type = "audio/webm" if file_path.lower().endswith('.webm') else "audio/wav"
+        return self._transcribe_bytes(buffer_data, language, content_type)
+    
+    def _transcribe_bytes(self, buffer_data: bytes, language: Optional[str] = None,
+                          content_type: str = "audio/wav", audio_params: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Blocking wrapper around atranscribe_bytes (runs on the shared HTTP pool loop)"""
         try:
-            logger.info(f"📤 Uploading file to Deepgram: {file_path}")
-            logger.info(f"📊 File size: {os.path.getsize(file_path)} bytes")
+            return self.http_pool.run(self.atranscribe_bytes(buffer_data, language, content_type, audio_params), timeout=35)
+        except Exception as e:
+            logger.error(f"❌ Deepgram batch transcription failed: {e}")
+            return None
+    
+    async def atranscribe_bytes(self, buffer_data: bytes, language: Optional[str] = None,
+                                content_type: str = "audio/wav", audio_params: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        Transcribe in-memory audio using Deepgram's HTTP API
+        
+        Args:
+            buffer_data: Audio bytes (container format or raw PCM)
+            language: Language code, or None/"auto" for detection
+            content_type: MIME type of buffer_data
+            audio_params: Extra query params describing raw audio (encoding, sample_rate, channels)
+        """
+        try:
+            logger.info(f"📤 Uploading {len(buffer_data)} bytes ({content_type}) to Deepgram")
             
             # Use Deepgram's HTTP API directly
             url = "https://api.deepgram.com/v1/listen"
@@ -176,15 +192,8 @@ class DeepgramService:
             # Only add language parameter if not using auto-detection
             if not use_auto_detect:
                 params["language"] = language
-            
-            # Read the file
-            with open(file_path, 'rb') as audio_file:
-                buffer_data = audio_file.read()
-            
-            # Choose content type by extension
-            content_type = "audio/wav"
-            if file_path.lower().endswith('.webm'):
-                content_type = "audio/webm"
+            if audio_params:
+                params.update(audio_params)
             
             # Make the request
             headers = {
@@ -192,7 +201,8 @@ class DeepgramService:
                 "Content-Type": content_type
             }
             
-            response = requests.post(url, params=params, headers=headers, data=buffer_data, timeout=30)
+            client = self.http_pool.async_client("deepgram")
+            response = await client.post(url, params=params, headers=headers, content=buffer_data)
             
             if response.status_code == 200:
                 result = response.json()
@@ -241,7 +251,7 @@ class DeepgramService:
                 return None
                 
         except Exception as e:
-            logger.error(f"❌ Deepgram file transcription failed: {e}")
+            logger.error(f"❌ Deepgram batch transcription failed: {e}")
             return None
     
     def _analyze_audio_quality(self, audio_buffer: bytes) -> Dict[str, Any]:
@@ -305,6 +315,17 @@ class DeepgramService:
             return {"is_silence": False, "rms": 0, "clipping_percentage": 0}
     
     def synthesize_speech(self, text: str, voice: str = "aura-asteria-en", model: str = None) -> Optional[bytes]:
+        """Blocking wrapper around asynthesize_speech (runs on the shared HTTP pool loop); served from the TTS cache when possible"""
+        def synthesize():
+            try:
+                return self.http_pool.run(self.asynthesize_speech(text, voice, model), timeout=35)
+            except Exception as e:
+                logger.error(f"❌ Deepgram TTS synthesis failed: {e}")
+                return None
+        
+        return get_tts_cache().get_or_synthesize("deepgram", text, synthesize, voice_id=voice, model=model)
+    
+    async def asynthesize_speech(self, text: str, voice: str = "aura-asteria-en", model: str = None) -> Optional[bytes]:
         """
         Synthesize speech from text using Deepgram's Aura TTS API
         
@@ -320,29 +341,9 @@ class DeepgramService:
         try:
             logger.info(f"🔊 Deepgram TTS: Synthesizing speech for text: '{text[:50]}...'")
             
-            # Use Deepgram's TTS API
-            url = "https://api.deepgram.com/v1/speak"
-            
-            # Configure parameters - model is not required for TTS, only voice
-            params = {
-                "voice": voice
-            }
-            # Only add model if explicitly provided (though it's usually not needed)
-            if model:
-                params["model"] = model
-            
-            # Request body
-            payload = {
-                "text": text
-            }
-            
-            # Make the request
-            headers = {
-                "Authorization": f"Token {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(url, params=params, headers=headers, json=payload, timeout=30)
+            url, params, headers, payload = self._speak_request(text, voice, model)
+            client = self.http_pool.async_client("deepgram")
+            response = await client.post(url, params=params, headers=headers, json=payload)
             
             if response.status_code == 200:
                 audio_bytes = response.content
@@ -356,6 +357,76 @@ class DeepgramService:
             logger.error(f"❌ Deepgram TTS synthesis failed: {e}")
             return None
 
+    def _speak_request(self, text: str, voice: str, model: Optional[str]):
+        """URL, query params, headers and body for Deepgram's Aura TTS API (/v1/speak)"""
+        url = "https://api.deepgram.com/v1/speak"
+        
+        # Configure parameters - model is not required for TTS, only voice
+        params = {
+            "voice": voice
+        }
+        # Only add model if explicitly provided (though it's usually not needed)
+        if model:
+            params["model"] = model
+        
+        headers = {
+            "Authorization": f"Token {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        return url, params, headers, {"text": text}
+    
+    def synthesize_stream(self, text: str, voice: str = "aura-asteria-en", model: str = None) -> Iterator[bytes]:
+        """
+        Streaming synthesize_speech: yields MP3 chunks as Deepgram sends them
+        (cached clips are yielded whole). Errors end the stream early.
+        """
+        stream = get_tts_cache().stream_or_synthesize(
+            "deepgram", text,
+            lambda: self.http_pool.iterate(self.asynthesize_stream(text, voice, model), timeout=35),
+            voice_id=voice, model=model
+        )
+        try:
+            yield from stream
+        except Exception as e:
+            logger.error(f"❌ Deepgram streaming TTS failed: {e}")
+    
+    async def asynthesize_stream(self, text: str, voice: str = "aura-asteria-en", model: str = None) -> AsyncIterator[bytes]:
+        """Async generator over the MP3 chunks of Deepgram's Aura TTS response"""
+        logger.info(f"🔊 Deepgram TTS (stream): Synthesizing speech for text: '{text[:50]}...'")
+        url, params, headers, payload = self._speak_request(text, voice, model)
+        client = self.http_pool.async_client("deepgram")
+        async with client.stream("POST", url, params=params, headers=headers, json=payload) as response:
+            if response.status_code != 200:
+                body = await response.aread()
+                raise RuntimeError(f"Deepgram TTS API error: {response.status_code} - {body[:200]!r}")
+            async for chunk in response.aiter_bytes():
+                if chunk:
+                    yield chunk
+    
+    def warm_connection(self) -> bool:
+        """
+        Open (or refresh) the pooled HTTPS connection to the Deepgram API so the next
+        STT/TTS request skips the TCP/TLS handshake
+        
+        Returns:
+            True if the API host answered
+        """
+        try:
+            return self.http_pool.run(self.awarm_connection(), timeout=6)
+        except Exception as e:
+            logger.warning(f"⚠️ Deepgram connection warm-up failed: {e}")
+            return False
+    
+    async def awarm_connection(self) -> bool:
+        try:
+            client = self.http_pool.async_client("deepgram")
+            await client.head("https://api.deepgram.com/v1/projects",
+                              headers={"Authorization": f"Token {self.api_key}"}, timeout=5)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Deepgram connection warm-up failed: {e}")
+            return False
+
 # Global service instance
 _deepgram_service = None
 
@@ -5,7 +5,7 @@ from deepgram_service import get_deepgram_service
 
 logger = logging.getLogger(__name__)
 
-def transcribe_audio_with_deepgram_webrtc(audio_buffer: bytes, language: Optional[str] = None) -> Optional[str]:
+def transcribe_audio_with_deepgram_webrtc(audio_buffer: bytes, language: Optional[str] = None, sample_rate: Optional[int] = None) -> Optional[str]:
     """
     Transcribe audio buffer using Deepgram, specifically for WebRTC chunks.
     
@@ -13,6 +13,7 @@ def transcribe_audio_with_deepgram_webrtc(audio_buffer: bytes, language: Optiona
         audio_buffer: Raw audio data bytes from WebRTC.
         language: Language code. Use None or "auto" for automatic detection (default: None = auto-detect).
                   Supports 30+ languages including: en, ko, ja, es, fr, de, zh, etc.
+        sample_rate: Sample rate of raw PCM16 audio, if the client declared one.
         
     Returns:
         Transcribed text string or None if failed.
@@ -27,7 +28,7 @@ def transcribe_audio_with_deepgram_webrtc(audio_buffer: bytes, language: Optiona
         
         # Deepgram is designed for real-time streaming and handles WebRTC chunks well
         # It can process smaller audio buffers more effectively than AssemblyAI
-        transcribed_text = service.transcribe_audio_buffer(audio_buffer, language)
+        transcribed_text = service.transcribe_audio_buffer(audio_buffer, language, sample_rate=sample_rate)
         
         if transcribed_text:
             logger.info(f"✅ Deepgram WebRTC transcription successful: {transcribed_text}")
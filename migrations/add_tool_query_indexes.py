@@ -0,0 +1,82 @@
+"""
+Migration script to add composite indexes used by the paginated MCP list tools
+(get_todos, get_reminders, get_calendar_events, get_call_recordings).
+
+This script:
+1. Creates each index with CREATE INDEX CONCURRENTLY IF NOT EXISTS (no table locks)
+2. Skips tables that do not exist
+3. Is safe to run multiple times
+
+Index definitions must match __table_args__ in convonet/mcps/local_servers/db_todo.py.
+"""
+
+import os
+import sys
+from sqlalchemy import create_engine, text
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# (index name, table, columns)
+TOOL_QUERY_INDEXES = [
+    ("ix_todos_anthropic_creator_completed_created", "todos_anthropic", ["creator_id", "completed", "created_at", "id"]),
+    ("ix_todos_anthropic_assignee_completed_created", "todos_anthropic", ["assignee_id", "completed", "created_at", "id"]),
+    ("ix_todos_anthropic_team_completed_created", "todos_anthropic", ["team_id", "completed", "created_at", "id"]),
+    ("ix_todos_anthropic_completed_created", "todos_anthropic", ["completed", "created_at", "id"]),
+    ("ix_todos_anthropic_due_date", "todos_anthropic", ["due_date"]),
+    ("ix_reminders_anthropic_created", "reminders_anthropic", ["created_at", "id"]),
+    ("ix_reminders_anthropic_reminder_date", "reminders_anthropic", ["reminder_date"]),
+    ("ix_calendar_events_anthropic_event_from", "calendar_events_anthropic", ["event_from", "id"]),
+    ("ix_call_recordings_anthropic_created", "call_recordings_anthropic", ["created_at", "id"]),
+    ("ix_call_recordings_anthropic_status_created", "call_recordings_anthropic", ["status", "created_at", "id"]),
+]
+
+def add_tool_query_indexes():
+    """Create the composite indexes backing filtered, keyset-paginated tool queries"""
+
+    db_uri = os.getenv("DB_URI")
+    if not db_uri:
+        print("❌ DB_URI environment variable not set")
+        sys.exit(1)
+
+    try:
+        engine = create_engine(db_uri)
+
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            check_query = text("""
+                SELECT EXISTS (
+                    SELECT FROM information_schema.tables
+                    WHERE table_schema = 'public'
+                    AND table_name = :table_name
+                );
+            """)
+
+            for index_name, table_name, columns in TOOL_QUERY_INDEXES:
+                result = conn.execute(check_query, {"table_name": table_name}).fetchone()
+                if not (result and result[0]):
+                    print(f"⚠️  Table {table_name} does not exist, skipping {index_name}...")
+                    continue
+
+                column_list = ", ".join(f'"{c}"' for c in columns)
+                print(f"📋 Creating {index_name} on {table_name} ({', '.join(columns)})...")
+                try:
+                    conn.execute(text(f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" ON "{table_name}" ({column_list});'))
+                    print(f"✅ {index_name} ready")
+                except Exception as e:
+                    print(f"❌ Failed to create {index_name}: {e}")
+
+        print("\n✅ Index migration completed!")
+
+    except Exception as e:
+        print(f"❌ Database connection error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Add Tool Query Indexes Migration")
+    print("=" * 60)
+    print("\nThis will add composite indexes for the paginated list tools.")
+    print("Indexes are built CONCURRENTLY - existing queries are not blocked.\n")
+
+    add_tool_query_indexes()